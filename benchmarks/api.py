@@ -0,0 +1,191 @@
+"""
+Benchmark the PRAX client against a local fake API, e.g.
+`python benchmarks/api.py --latency 0.02 --output results.json`.
+
+The fake API in fake_prax.py serves synthetic projects, routes, tasks,
+pipelines, builds and sources at the given scale and latency. Every scenario
+runs several times, reports the best and median wall time and its throughput,
+and results can be written to a JSON file. Given the results of a previous
+release with --baseline, exits with 1 when a scenario median is slower than
+its baseline by more than the tolerance.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+from fake_prax import FakePRAX, Scale
+
+from oceanum.cli.prax import __version__
+from oceanum.cli.prax.artifacts import ArtifactDownloader
+from oceanum.cli.prax.client import PRAXClient
+from oceanum.cli.prax.deployment import DeploymentWaiter
+
+# Scenario name -> (function returning how many units it processed, unit)
+Scenario = tuple[Callable[[], int], str]
+
+
+def scenarios(client: PRAXClient, server: FakePRAX) -> dict[str, Scenario]:
+    def listing(method: str) -> Scenario:
+        def run() -> int:
+            items = list(getattr(client, method)())
+            assert all(not hasattr(i, "detail") for i in items), items[:1]
+            return len(items)
+
+        return run, "items"
+
+    def get_project() -> int:
+        assert client.get_project("project-0").name == "project-0"
+        return 1
+
+    def get_projects() -> int:
+        names = [f"project-{i}" for i in range(server.scale.projects)]
+        return sum(1 for _ in client.get_projects(names))
+
+    def wait_deployment() -> int:
+        name = f"deploy-{time.monotonic_ns()}"
+        waiter = DeploymentWaiter(
+            client, initial_interval=0.01, max_interval=0.01, echo=lambda _: None
+        )
+        assert waiter.wait(project_name=name)
+        return server.deploy_polls[name]
+
+    def stream_logs() -> int:
+        lines = client.get_task_run_logs("task-0-run", lines=0, follow=False)
+        return sum(1 for _ in lines)
+
+    def download_artifact() -> int:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "artifact"
+            downloader = ArtifactDownloader(client, progress=False)
+            downloader.download("task-runs/task-0-run/artifacts/output", path)
+            return path.stat().st_size
+
+    return {
+        "iter_projects": listing("iter_projects"),
+        "iter_routes": listing("iter_routes"),
+        "iter_tasks": listing("iter_tasks"),
+        "iter_pipelines": listing("iter_pipelines"),
+        "iter_builds": listing("iter_builds"),
+        "iter_sources": listing("iter_sources"),
+        "get_project": (get_project, "projects"),
+        "get_projects": (get_projects, "projects"),
+        "wait_project_deployment": (wait_deployment, "polls"),
+        "task run logs": (stream_logs, "lines"),
+        "artifact download": (download_artifact, "bytes"),
+    }
+
+
+def sample(func: Callable[[], int], runs: int) -> tuple[list[float], int]:
+    func()  # warm up connections and imports
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        units = func()
+        timings.append(time.perf_counter() - start)
+    return timings, units
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        limit = previous["median"] * (1 + tolerance)
+        if result["median"] > limit:
+            regressions.append(
+                f"{name}: {result['median']:.3f}s > {previous['median']:.3f}s "
+                f"baseline (+{tolerance:.0%})"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--projects", type=int, default=Scale.projects)
+    parser.add_argument(
+        "--items",
+        type=int,
+        default=Scale.items,
+        help="Routes, tasks, pipelines, builds and sources listed",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to every response"
+    )
+    parser.add_argument("--log-lines", type=int, default=Scale.log_lines)
+    parser.add_argument(
+        "--artifact-mb", type=float, default=Scale.artifact_size / 1024**2
+    )
+    parser.add_argument(
+        "-k", "--select", default=None, help="Only run scenarios containing this"
+    )
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    parser.add_argument(
+        "--baseline", type=Path, help="Results of a previous run to compare with"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Slowdown allowed over the baseline medians, 0.2 for 20%%",
+    )
+    args = parser.parse_args()
+    scale = Scale(
+        projects=args.projects,
+        items=args.items,
+        log_lines=args.log_lines,
+        artifact_size=int(args.artifact_mb * 1024**2),
+        latency=args.latency,
+    )
+    results = {}
+    with FakePRAX(scale) as server:
+        client = PRAXClient(service=server.url, token="Bearer benchmark", retries=0)
+        for name, (func, unit) in scenarios(client, server).items():
+            if args.select and args.select not in name:
+                continue
+            server.requests = 0
+            timings, units = sample(func, args.runs)
+            median = statistics.median(timings)
+            results[name] = {
+                "median": median,
+                "best": min(timings),
+                "units": units,
+                "unit": unit,
+                "requests": server.requests // (args.runs + 1),
+            }
+            print(
+                f"{name:<24} median {median:.3f}s best {min(timings):.3f}s "
+                f"{units / median:>12,.0f} {unit}/s "
+                f"{results[name]['requests']:>5} requests"
+            )
+    report = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "date": datetime.now(tz=timezone.utc).isoformat(),
+        "scale": vars(scale),
+        "runs": args.runs,
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.baseline:
+        regressions = compare(
+            results, json.loads(args.baseline.read_text()), args.tolerance
+        )
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
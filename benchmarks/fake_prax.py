@@ -0,0 +1,235 @@
+"""
+Local fake PRAX API serving synthetic resources for the benchmarks.
+
+Collections are generated at a configurable scale and served with the same
+limit/offset pagination as the API, every response is delayed by a fixed
+latency, and projects named `deploy-*` go through a deployment, from a
+created revision to healthy stages, over successive requests.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ORG = "bench-org"
+NOW = "2024-01-01T00:00:00+00:00"
+
+RESOURCES = ["tasks", "pipelines", "builds", "routes", "sources"]
+
+
+@dataclass
+class Scale:
+    """Size of the synthetic data and latency of every response."""
+
+    projects: int = 200
+    items: int = 1000
+    stages: int = 2
+    log_lines: int = 10000
+    artifact_size: int = 16 * 1024 * 1024
+    latency: float = 0.0
+    deploy_polls: int = 6
+
+
+def resource(kind: str, index: int, project: str, stage: str) -> dict:
+    name = f"{kind[:-1]}-{index}"
+    item = {
+        "id": f"{kind}-{index}",
+        "name": name,
+        "org": ORG,
+        "project": project,
+        "stage": stage,
+        "created_at": NOW,
+        "updated_at": NOW,
+    }
+    if kind == "routes":
+        item |= {
+            "display_name": name,
+            "status": "online",
+            "url": f"https://{name}.{ORG}.oceanum.test",
+            "notebook": False,
+        }
+    elif kind in ("tasks", "pipelines", "builds"):
+        item["last_run"] = {
+            "id": f"{name}-run",
+            "name": f"{name}-run",
+            "parent": name,
+            "org": ORG,
+            "project": project,
+            "stage": stage,
+            "status": "Succeeded",
+            "created_at": NOW,
+            "updated_at": NOW,
+            "started_at": NOW,
+        }
+    return item
+
+
+def stage(project: str, index: int, status: str, routes: int = 1) -> dict:
+    name = f"stage-{index}"
+    return {
+        "id": f"{project}-{name}",
+        "name": name,
+        "status": status,
+        "updated_at": NOW,
+        "resources": {
+            "routes": [
+                resource("routes", i, project, name)
+                | {"status": "online" if status == "healthy" else "starting"}
+                for i in range(routes)
+            ],
+            "tasks": [resource("tasks", 0, project, name)],
+            "pipelines": [resource("pipelines", 0, project, name)],
+            "builds": [],
+            "sources": [],
+        },
+    }
+
+
+def project(
+    name: str, stages: int, revision: str = "commited", status: str = "healthy"
+) -> dict:
+    return {
+        "id": name,
+        "name": name,
+        "org": ORG,
+        "owner": "bench-user",
+        "created_at": NOW,
+        "last_revision": {
+            "id": f"{name}-revision",
+            "author": "bench-user",
+            "created_at": NOW,
+            "number": 2,
+            "status": revision,
+            "spec": {"name": name, "resources": {}},
+        },
+        "stages": [stage(name, i, status) for i in range(stages)],
+    }
+
+
+class FakePRAX(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, scale: Scale | None = None) -> None:
+        super().__init__(("127.0.0.1", 0), FakePRAXHandler)
+        self.scale = scale or Scale()
+        self.requests = 0
+        self.deploy_polls: dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.collections = {
+            kind: [
+                resource(kind, i, f"project-{i % self.scale.projects}", "stage-0")
+                for i in range(self.scale.items)
+            ]
+            for kind in RESOURCES
+        }
+        self.collections["projects"] = [
+            project(f"project-{i}", self.scale.stages)
+            for i in range(self.scale.projects)
+        ]
+        self.log = "".join(
+            f"2024-01-01T00:00:{i % 60:02d}Z INFO step {i}: processed batch\n"
+            for i in range(self.scale.log_lines)
+        ).encode()
+        self.artifact = hashlib.sha256(b"bench").digest() * (
+            self.scale.artifact_size // 32
+        )
+        self.etag = f'"{hashlib.md5(self.artifact).hexdigest()}"'
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/api"
+
+    def deployment(self, name: str) -> dict:
+        """Next snapshot of a project being deployed."""
+        with self.lock:
+            polls = self.deploy_polls.get(name, 0)
+            self.deploy_polls[name] = polls + 1
+        steps = self.scale.deploy_polls
+        if polls < steps // 3:
+            return project(name, self.scale.stages, "created", "ready")
+        if polls < steps:
+            return project(name, self.scale.stages, "commited", "updating")
+        return project(name, self.scale.stages, "commited", "healthy")
+
+    def __enter__(self) -> "FakePRAX":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class FakePRAXHandler(BaseHTTPRequestHandler):
+    server: FakePRAX
+    # Keep connections alive like the API does, without the delayed ACKs
+    # of headers and body being sent in separate packets
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def send_body(self, status: int, body: bytes, headers: dict | None = None) -> None:
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, data, status: int = 200) -> None:
+        self.send_body(
+            status, json.dumps(data).encode(), {"Content-Type": "application/json"}
+        )
+
+    def do_GET(self) -> None:
+        with self.server.lock:
+            self.server.requests += 1
+        if self.server.scale.latency:
+            time.sleep(self.server.scale.latency)
+        url = urlparse(self.path)
+        path = url.path.removeprefix("/api/").rstrip("/")
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if path in self.server.collections:
+            items = self.server.collections[path]
+            offset = int(query.get("offset", 0))
+            limit = int(query.get("limit", len(items)))
+            self.send_json(items[offset : offset + limit])
+        elif match := re.fullmatch(r"projects/([^/]+)", path):
+            name = match.group(1)
+            if name.startswith("deploy-"):
+                self.send_json(self.server.deployment(name))
+            else:
+                self.send_json(project(name, self.server.scale.stages))
+        elif re.fullmatch(r"(task|pipeline|build)-runs/[^/]+/logs", path):
+            tail = int(query.get("tail", 0))
+            body = self.server.log
+            if tail:
+                body = b"".join(body.splitlines(keepends=True)[-tail:])
+            self.send_body(200, body, {"Content-Type": "text/plain"})
+        elif re.fullmatch(r"task-runs/[^/]+/artifacts/[^/]+", path):
+            self.send_artifact()
+        else:
+            self.send_json({"detail": "Not found"}, status=404)
+
+    def send_artifact(self) -> None:
+        artifact = self.server.artifact
+        headers = {"Accept-Ranges": "bytes", "ETag": self.server.etag}
+        range_header = self.headers.get("Range")
+        if range_header:
+            start, _, end = range_header.removeprefix("bytes=").partition("-")
+            start, end = (
+                int(start),
+                min(int(end or len(artifact) - 1), len(artifact) - 1),
+            )
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(artifact)}"
+            self.send_body(206, artifact[start : end + 1], headers)
+        else:
+            self.send_body(200, artifact, headers)
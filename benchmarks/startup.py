@@ -0,0 +1,65 @@
+"""
+Time CLI startup, e.g. `python benchmarks/startup.py --budget 0.5`.
+
+Every sample runs in a fresh interpreter, reports the best and median wall time
+of importing the PRAX commands and of `oceanum prax --help`, and exits with 1
+when the median command time exceeds the budget.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_CODE = "import oceanum.cli.prax"
+HELP_CODE = (
+    "import sys; import oceanum.cli.prax; from oceanum.cli import main; "
+    "main(['prax', '--help'], standalone_mode=False); "
+    "assert type(sys.modules['oceanum.cli.prax.models']).__name__ == '_LazyModule', "
+    "'--help imported the generated models'"
+)
+
+
+def sample(code: str, runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", code], check=True, stdout=subprocess.DEVNULL
+        )
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=None,
+        help="Maximum median seconds for 'oceanum prax --help'",
+    )
+    args = parser.parse_args()
+    sample("pass", 1)  # warm up the bytecode and filesystem caches
+    baseline = statistics.median(sample("pass", args.runs))
+    results = {
+        "import oceanum.cli.prax": sample(IMPORT_CODE, args.runs),
+        "oceanum prax --help": sample(HELP_CODE, args.runs),
+    }
+    print(f"{'interpreter':<26} median {baseline:.3f}s")
+    for name, timings in results.items():
+        print(
+            f"{name:<26} median {statistics.median(timings):.3f}s "
+            f"best {min(timings):.3f}s"
+        )
+    median = statistics.median(results["oceanum prax --help"])
+    if args.budget is not None and median > args.budget:
+        print(f"Startup regression: {median:.3f}s > {args.budget:.3f}s budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
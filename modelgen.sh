@@ -5,6 +5,7 @@ datamodel-codegen \
     --output src/oceanum/cli/prax/models.py \
     --target-python-version "3.11" \
     --output-model-type pydantic_v2.BaseModel \
+    --base-class oceanum.cli.prax.base.BaseModel \
     --snake-case-field \
     --use-default-kwarg \
     --reuse-model \
@@ -14,3 +15,4 @@ datamodel-codegen \
     --field-constraints \
     --use-one-literal-as-default \
     --disable-timestamp
+
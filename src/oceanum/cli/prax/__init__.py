@@ -1,4 +1,36 @@
+import importlib
+import sys
+import threading
+import types
+
 __version__ = "0.9.2"
 
+
+class _LazyModule(types.ModuleType):
+    """
+    Stand-in for a submodule that is only imported on first attribute access.
+    """
+
+    _lock = threading.Lock()
+
+    def __getattr__(self, attr: str):
+        with self._lock:
+            module = sys.modules.get(self.__name__)
+            if module is self:
+                del sys.modules[self.__name__]
+                module = importlib.import_module(self.__name__)
+                # Later lookups on references to the stand-in skip this hook
+                self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def _lazy_import(name: str) -> types.ModuleType:
+    return sys.modules.setdefault(name, _LazyModule(name))
+
+
+# The generated models take most of the import time, so only load them once a
+# command actually uses a schema and keep `--help` and completion fast
+models = _lazy_import(f"{__name__}.models")
+
 # Import command modules to register decorators
-from . import main, project, route, user, workflows  # noqa: F401
+from . import main, project, route, user, workflows  # noqa: E402, F401
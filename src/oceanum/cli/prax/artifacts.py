@@ -0,0 +1,551 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, NamedTuple
+
+import click
+import requests
+import urllib3
+
+from . import models
+from .concurrency import DEFAULT_CONCURRENCY, bounded_map
+
+if TYPE_CHECKING:
+    from .client import PRAXClient
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DEFAULT_SEGMENTS = 4
+SEGMENT_THRESHOLD = 64 * 1024 * 1024
+# Bytes written between saves of the resume state
+STATE_SAVE_INTERVAL = 16 * DOWNLOAD_CHUNK_SIZE
+
+# Records the ETag of every artifact downloaded into a directory
+ARTIFACTS_MANIFEST = ".prax-artifacts.json"
+
+# Digest algorithm names used in HTTP headers mapped to hashlib names
+DIGEST_ALGORITHMS = {
+    "md5": "md5",
+    "sha": "sha1",
+    "sha-1": "sha1",
+    "sha1": "sha1",
+    "sha-256": "sha256",
+    "sha256": "sha256",
+    "sha-512": "sha512",
+    "sha512": "sha512",
+}
+
+
+class DownloadError(Exception):
+    def __init__(self, message: str, resumable: bool = False) -> None:
+        super().__init__(message)
+        self.resumable = resumable
+
+
+class DownloadResult(NamedTuple):
+    path: Path
+    size: int
+    downloaded: int
+    elapsed: float
+    segments: int
+    verified: list[str]
+    etag: str | None = None
+    skipped: bool = False
+
+    @property
+    def resumed(self) -> bool:
+        return not self.skipped and self.downloaded < self.size
+
+    @property
+    def throughput(self) -> float:
+        return self.downloaded / self.elapsed if self.elapsed else 0.0
+
+
+def parse_checksum(checksum: str) -> tuple[str, str]:
+    """
+    Parse an 'algorithm:hexdigest' checksum, i.e. 'sha256:9f86d0...'.
+    """
+    algorithm, _, digest = checksum.partition(":")
+    algorithm = DIGEST_ALGORITHMS.get(algorithm.strip().lower(), "")
+    if not algorithm or not digest:
+        raise ValueError(
+            f"Invalid checksum '{checksum}', expected <algorithm>:<hexdigest> "
+            f"with one of {', '.join(sorted(set(DIGEST_ALGORITHMS.values())))}"
+        )
+    return algorithm, digest.strip().lower()
+
+
+def response_checksums(response: requests.Response) -> dict[str, str]:
+    """
+    Collect the checksums of the whole artifact advertised by the response
+    headers, as hex digests keyed by hashlib algorithm name.
+    """
+    values = []
+    for header in ["Digest", "X-Goog-Hash"]:
+        values += response.headers.get(header, "").split(",")
+    if response.status_code == 200 and "Content-MD5" in response.headers:
+        # Only describes the whole artifact on full responses
+        values.append(f"md5={response.headers['Content-MD5']}")
+    checksums = {}
+    for value in values:
+        name, _, digest = value.strip().partition("=")
+        algorithm = DIGEST_ALGORITHMS.get(name.lower())
+        if algorithm and digest:
+            try:
+                checksums[algorithm] = base64.b64decode(digest).hex()
+            except ValueError:
+                continue
+    return checksums
+
+
+def _content_range_size(response: requests.Response) -> int | None:
+    # Content-Range: bytes 0-0/1234
+    total = response.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+class _PartState:
+    """
+    Progress of a partial download, saved next to the .part file so an
+    interrupted download resumes where each segment stopped.
+    """
+
+    def __init__(
+        self, path: Path, size: int, etag: str | None, segments: list[list[int]]
+    ) -> None:
+        self.path = path
+        self.size = size
+        self.etag = etag
+        # [start, end (inclusive), bytes written] for every segment
+        self.segments = segments
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path) -> _PartState | None:
+        try:
+            with path.open() as f:
+                state = json.load(f)
+            return cls(path, state["size"], state["etag"], state["segments"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @classmethod
+    def plan(cls, path: Path, size: int, etag: str | None, segments: int) -> _PartState:
+        step = max(1, math.ceil(size / segments))
+        ranges = [
+            [start, min(start + step, size) - 1, 0] for start in range(0, size, step)
+        ]
+        return cls(path, size, etag, ranges or [[0, -1, 0]])
+
+    @property
+    def written(self) -> int:
+        return sum(segment[2] for segment in self.segments)
+
+    def save(self) -> None:
+        with self._lock:
+            state = {"size": self.size, "etag": self.etag, "segments": self.segments}
+            with self.path.open("w") as f:
+                json.dump(state, f)
+
+
+class ArtifactDownloader:
+    """
+    Download artifacts into a .part file, resumed or fetched in parallel
+    ranges when the server allows it, and renamed once verified.
+    """
+
+    def __init__(
+        self,
+        client: PRAXClient,
+        segments: int = DEFAULT_SEGMENTS,
+        segment_threshold: int = SEGMENT_THRESHOLD,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        checksum: str | None = None,
+        progress: bool = True,
+        label: str = "",
+    ) -> None:
+        self.client = client
+        self.segments = max(1, segments)
+        self.segment_threshold = segment_threshold
+        self.chunk_size = chunk_size
+        self.checksums = dict([parse_checksum(checksum)]) if checksum else {}
+        self.progress = progress
+        self.label = label
+
+    def download(
+        self, endpoint: str, path: str | Path, etag: str | None = None
+    ) -> DownloadResult:
+        """
+        Download the artifact at `endpoint` to `path`, keeping an existing file
+        that still matches the `etag` or the checksums advertised by the API.
+        """
+        path = Path(path)
+        part_path = path.with_name(f"{path.name}.part")
+        state_path = path.with_name(f"{path.name}.part.json")
+        start = time.monotonic()
+        # A one byte range request tells the size, ETag and range support
+        probe = self._get(endpoint, headers={"Range": "bytes=0-0"})
+        if probe.status_code == 416:
+            # Empty artifacts have no satisfiable range
+            probe.close()
+            probe = self._get(endpoint)
+        checksums = response_checksums(probe) | self.checksums
+        known_etag, etag = etag, probe.headers.get("ETag")
+        size = _content_range_size(probe) if probe.status_code == 206 else None
+        ranges = size is not None
+        if not ranges and probe.headers.get("Content-Length"):
+            size = int(probe.headers["Content-Length"])
+
+        if path.exists() and (size is None or path.stat().st_size == size):
+            unchanged = known_etag is not None and known_etag == etag
+            if unchanged or (checksums and self._hashes(path, checksums) == checksums):
+                probe.close()
+                return DownloadResult(
+                    path=path,
+                    size=path.stat().st_size,
+                    downloaded=0,
+                    elapsed=time.monotonic() - start,
+                    segments=0,
+                    verified=[] if unchanged else sorted(checksums),
+                    etag=etag,
+                    skipped=True,
+                )
+
+        if not ranges:
+            # No range support, stream the full response and start over
+            state_path.unlink(missing_ok=True)
+            try:
+                with self._progress_bar(size) as update:
+                    downloaded = self._write_stream(probe, part_path, "wb", update)
+            except DownloadError:
+                self._discard(part_path)
+                raise
+            state = None
+            segments = 1
+        else:
+            probe.close()
+            state = _PartState.load(state_path)
+            if (
+                state is None
+                or not part_path.exists()
+                or state.size != size
+                or state.etag != etag
+            ):
+                segments = self.segments if size >= self.segment_threshold else 1
+                state = _PartState.plan(state_path, size, etag, segments)
+                with part_path.open("wb") as f:
+                    f.truncate(size)
+                state.save()
+            segments = len(state.segments)
+            resumed = state.written
+            with self._progress_bar(size, resumed) as update:
+                self._download_segments(endpoint, part_path, state, update)
+            downloaded = state.written - resumed
+            if state.written != size:
+                raise DownloadError(
+                    f"Downloaded {state.written} of {size} bytes!", resumable=True
+                )
+
+        if size is not None and part_path.stat().st_size != size:
+            self._discard(part_path, state_path)
+            raise DownloadError(
+                f"Downloaded {part_path.stat().st_size} bytes, expected {size}!"
+            )
+        verified = self._verify(part_path, checksums)
+        part_path.replace(path)
+        state_path.unlink(missing_ok=True)
+        return DownloadResult(
+            path=path,
+            size=path.stat().st_size,
+            downloaded=downloaded,
+            elapsed=time.monotonic() - start,
+            segments=segments,
+            verified=verified,
+            etag=etag,
+        )
+
+    def _get(self, endpoint: str, headers: dict | None = None) -> requests.Response:
+        try:
+            response, errs = self.client._request(
+                "GET", endpoint, stream=True, headers=headers or {}
+            )
+        except requests.exceptions.RequestException as e:
+            raise DownloadError(str(e), resumable=True) from e
+        if errs:
+            raise DownloadError(str(errs.detail))
+        return response
+
+    def _progress_bar(self, size: int | None, done: int = 0) -> _ProgressUpdater:
+        return _ProgressUpdater(self.label, size, done, enabled=self.progress)
+
+    def _write_stream(
+        self,
+        response: requests.Response,
+        part_path: Path,
+        mode: str,
+        update: Callable[[int], None],
+        offset: int = 0,
+        on_chunk: Callable[[int], None] | None = None,
+    ) -> int:
+        written = 0
+        try:
+            # Unbuffered, so the saved resume state never runs ahead of the file
+            with part_path.open(mode, buffering=0) as f:
+                f.seek(offset)
+                # Keep the artifact bytes as sent, i.e. still gzipped
+                for chunk in response.raw.stream(self.chunk_size, decode_content=False):
+                    f.write(chunk)
+                    written += len(chunk)
+                    update(len(chunk))
+                    if on_chunk is not None:
+                        on_chunk(len(chunk))
+        except (
+            requests.exceptions.RequestException,
+            urllib3.exceptions.HTTPError,
+            OSError,
+        ) as e:
+            raise DownloadError(str(e), resumable=on_chunk is not None) from e
+        finally:
+            response.close()
+        return written
+
+    def _download_segments(
+        self,
+        endpoint: str,
+        part_path: Path,
+        state: _PartState,
+        update: Callable[[int], None],
+    ) -> None:
+        pending = [s for s in state.segments if s[0] + s[2] <= s[1]]
+
+        def fetch(segment: list[int]) -> None:
+            start, end, _ = segment
+            unsaved = 0
+
+            def on_chunk(n: int) -> None:
+                nonlocal unsaved
+                segment[2] += n
+                unsaved += n
+                if unsaved >= STATE_SAVE_INTERVAL:
+                    state.save()
+                    unsaved = 0
+
+            headers = {"Range": f"bytes={start + segment[2]}-{end}"}
+            if state.etag:
+                # Fall back to a full response if the artifact changed
+                headers["If-Range"] = state.etag
+            response = self._get(endpoint, headers=headers)
+            if response.status_code != 206:
+                response.close()
+                raise DownloadError(
+                    "Artifact changed on the server while downloading, "
+                    "run the command again to restart!"
+                )
+            self._write_stream(
+                response, part_path, "r+b", update, start + segment[2], on_chunk
+            )
+
+        try:
+            if len(pending) == 1:
+                fetch(pending[0])
+            elif pending:
+                with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+                    for future in [executor.submit(fetch, s) for s in pending]:
+                        future.result()
+        finally:
+            state.save()
+
+    def _hashes(self, path: Path, algorithms: Iterable[str]) -> dict[str, str]:
+        hashes = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+        with path.open("rb") as f:
+            while chunk := f.read(self.chunk_size):
+                for h in hashes.values():
+                    h.update(chunk)
+        return {algorithm: h.hexdigest() for algorithm, h in hashes.items()}
+
+    def _verify(self, part_path: Path, checksums: dict[str, str]) -> list[str]:
+        if not checksums:
+            return []
+        hashes = self._hashes(part_path, checksums)
+        for algorithm, expected in checksums.items():
+            actual = hashes[algorithm]
+            if actual != expected:
+                self._discard(part_path, part_path.with_name(f"{part_path.name}.json"))
+                raise DownloadError(
+                    f"Checksum mismatch, expected {algorithm}:{expected} "
+                    f"but got {algorithm}:{actual}!"
+                )
+        return sorted(checksums)
+
+    @staticmethod
+    def _discard(*paths: Path) -> None:
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+
+class _ProgressUpdater:
+    """
+    Thread-safe wrapper around click's progress bar.
+    """
+
+    def __init__(self, label: str, size: int | None, done: int, enabled: bool):
+        self.label = label
+        self.size = size
+        self.done = done
+        # click needs a length to draw the bar
+        self.enabled = enabled and size is not None
+        self._lock = threading.Lock()
+        self._bar = None
+
+    def __enter__(self) -> Callable[[int], None]:
+        if self.enabled:
+            self._bar = click.progressbar(length=self.size, label=self.label)
+            self._bar.__enter__()
+            if self.done:
+                self._bar.update(self.done)
+        return self.update
+
+    def __exit__(self, *exc_info) -> None:
+        if self._bar is not None:
+            self._bar.__exit__(*exc_info)
+
+    def update(self, n: int) -> None:
+        if self._bar is not None:
+            with self._lock:
+                self._bar.update(n)
+
+
+class PipelineArtifact(NamedTuple):
+    step: str
+    name: str
+    directory: Path
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"{self.name}.gz"
+
+
+def pipeline_step_tree(
+    spec: models.PipelineSpec,
+) -> dict[str, tuple[str | None, Path]]:
+    """
+    Map every step of a pipeline to its task name, None for nested pipelines,
+    and a directory mirroring the pipeline DAG.
+    """
+    steps: dict[str, tuple[str | None, list[str]]] = {}
+    for task in spec.dag or []:
+        # Inter-cycle dependencies point back to earlier cycles, not parents
+        depends = [d for d in task.dependencies or [] if isinstance(d, str)]
+        steps[task.name] = (getattr(task.task_ref, "root", None), depends)
+    previous: list[str] = []
+    for group in spec.steps or []:
+        for task in group.root:
+            steps[task.name] = (getattr(task.task_ref, "root", None), previous[:1])
+        previous = [task.name for task in group.root]
+
+    directories: dict[str, Path] = {}
+
+    def directory(name: str, seen: frozenset[str]) -> Path:
+        if name not in directories:
+            parents = [d for d in steps[name][1] if d in steps and d not in seen]
+            parent = directory(parents[0], seen | {name}) if parents else Path()
+            directories[name] = parent / name
+        return directories[name]
+
+    return {
+        name: (task_name, directory(name, frozenset()))
+        for name, (task_name, _) in steps.items()
+    }
+
+
+def list_pipeline_run_artifacts(
+    client: PRAXClient, run: models.StagedRunSchema
+) -> list[PipelineArtifact] | models.ErrorResponse:
+    """
+    List the output artifacts of every step of a pipeline run, from the
+    outputs declared by the task each step runs.
+    """
+    filters = {"project": run.project, "stage": run.stage, "org": run.org}
+    spec = run.spec
+    if not isinstance(spec, models.PipelineSpec):
+        pipeline = client.get_pipeline(run.parent, **filters)
+        if isinstance(pipeline, models.ErrorResponse):
+            return pipeline
+        spec = pipeline.spec
+    if spec is None:
+        return models.ErrorResponse(
+            detail=f"No pipeline spec found for pipeline run '{run.name}'!"
+        )
+    tree = pipeline_step_tree(spec)
+    task_names = {task_name for task_name, _ in tree.values() if task_name}
+
+    def get_task(name: str) -> models.TaskSchema | models.ErrorResponse:
+        try:
+            return client.get_task(name, **filters)
+        except requests.exceptions.RequestException as e:
+            return models.ErrorResponse(detail=f"Failed to get task '{name}': {e}")
+
+    tasks = dict(bounded_map(get_task, task_names))
+    artifacts = []
+    for step, (task_name, directory) in tree.items():
+        task = tasks.get(task_name) if task_name else None
+        if isinstance(task, models.ErrorResponse):
+            return task
+        outputs = task.spec.outputs if task and task.spec else None
+        for artifact in outputs.artifacts if outputs else []:
+            artifacts.append(PipelineArtifact(step, artifact.name, directory))
+    return artifacts
+
+
+def download_pipeline_run_artifacts(
+    client: PRAXClient,
+    run_name: str,
+    artifacts: Iterable[PipelineArtifact],
+    output_dir: str | Path,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    segments: int = 1,
+) -> Iterator[tuple[PipelineArtifact, DownloadResult | DownloadError]]:
+    """
+    Download pipeline run artifacts concurrently into `output_dir`, yielding
+    each artifact with its result as downloads finish.
+    """
+    output_dir = Path(output_dir)
+    manifest_path = output_dir / ARTIFACTS_MANIFEST
+    try:
+        with manifest_path.open() as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    downloader = ArtifactDownloader(client, segments=segments, progress=False)
+
+    def fetch(artifact: PipelineArtifact) -> DownloadResult | DownloadError:
+        path = output_dir / artifact.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = manifest.get(artifact.path.as_posix(), {})
+        endpoint = f"pipeline-runs/{run_name}/artifacts/{artifact.step}/{artifact.name}"
+        try:
+            return downloader.download(endpoint, path, etag=entry.get("etag"))
+        except DownloadError as e:
+            return e
+
+    try:
+        for artifact, result in bounded_map(fetch, artifacts, concurrency):
+            if isinstance(result, DownloadResult):
+                manifest[artifact.path.as_posix()] = {
+                    "step": artifact.step,
+                    "artifact": artifact.name,
+                    "size": result.size,
+                    "etag": result.etag,
+                }
+            yield artifact, result
+    finally:
+        if manifest:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            with manifest_path.open("w") as f:
+                json.dump(manifest, f, indent=2)
@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Any, AsyncIterator, Literal, Type
+
+import aiohttp
+import click
+from pydantic import ValidationError
+
+from oceanum.cli.symbols import err, spin, wrn
+
+from . import models
+from .artifacts import DOWNLOAD_CHUNK_SIZE
+from .client import (
+    DEFAULT_POOL_MAXSIZE,
+    parse_error_response,
+    resolve_credentials,
+    validate_data,
+    validation_error_response,
+)
+from .deadline import request_timeout
+
+
+def _query_params(params: dict | None) -> dict | None:
+    # aiohttp rejects None and bool values, mirror what requests sends instead
+    if not params:
+        return None
+    return {k: str(v) for k, v in params.items() if v is not None}
+
+
+class AsyncPRAXClient:
+    """
+    asyncio counterpart of PRAXClient.
+
+    Responses are validated with the same models and failures are returned as
+    models.ErrorResponse, so both clients can be used interchangeably. Use it
+    as an async context manager, or call close() when done, to release the
+    pooled connections.
+    """
+
+    def __init__(
+        self,
+        ctx: click.Context | None = None,
+        token: str | None = None,
+        service: str | None = None,
+        session: aiohttp.ClientSession | None = None,
+        limit: int = 100,
+        limit_per_host: int | None = None,
+    ) -> None:
+        self.token, self.service = resolve_credentials(ctx, token, service)
+        self.ctx = ctx
+        self.limit = limit
+        self.limit_per_host = limit_per_host or int(
+            os.getenv("PRAX_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE)
+        )
+        self.timeout = request_timeout()
+        self._session = session
+        self._owns_session = session is None
+
+    async def __aenter__(self) -> "AsyncPRAXClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # Created lazily so the session binds to the running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit, limit_per_host=self.limit_per_host
+            )
+            # No total limit, like the sync client only connect and reads time out
+            timeout = aiohttp.ClientTimeout(
+                total=None, sock_connect=self.timeout[0], sock_read=self.timeout[1]
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self._owns_session = True
+        return self._session
+
+    async def close(self) -> None:
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+        self._session = None
+
+    async def _request(
+        self,
+        method: Literal["GET", "POST", "PUT", "DELETE", "PATCH"],
+        endpoint,
+        schema: Type[models.BaseModel] | None = None,
+        stream: bool = False,
+        **kwargs,
+    ) -> tuple[Any | aiohttp.ClientResponse | None, models.ErrorResponse | None]:
+        """
+        Send a request to the PRAX API. With a schema the decoded and validated
+        object is returned, otherwise the response itself; streamed responses
+        must be released by the caller.
+        """
+        assert self.service is not None, "Service URL is required"
+        headers = kwargs.pop("headers", {})
+        if self.token is not None:
+            headers = headers | {"Authorization": f"{self.token}"}
+        url = f"{self.service.removesuffix('/')}/{endpoint}"
+        params = _query_params(kwargs.pop("params", None))
+        try:
+            response = await self.session.request(
+                method, url, headers=headers, params=params, **kwargs
+            )
+        except (aiohttp.ClientError, OSError, asyncio.TimeoutError) as e:
+            return None, models.ErrorResponse(detail=str(e) or "Request timed out")
+        if response.status >= 400:
+            async with response:
+                return response, parse_error_response(await response.text())
+        if stream:
+            return response, None
+        async with response:
+            if schema is None:
+                await response.read()
+                return response, None
+            try:
+                data = await response.json(content_type=None)
+            except ValueError:
+                return response, models.ErrorResponse(detail=await response.text())
+            try:
+                return validate_data(data, schema), None
+            except ValidationError as e:
+                return response, validation_error_response(e)
+
+    async def list_projects(
+        self, **filters
+    ) -> list[models.ProjectItemSchema] | models.ErrorResponse:
+        obj, errs = await self._request(
+            "GET", "projects", params=filters, schema=models.ProjectItemSchema
+        )
+        list_projects_err = models.ErrorResponse(detail="Failed to list projects!")
+        return obj if isinstance(obj, list) else errs or list_projects_err
+
+    async def get_project(
+        self, project_name: str, **filters
+    ) -> models.ProjectDetailsSchema | models.ErrorResponse:
+        obj, errs = await self._request(
+            "GET",
+            f"projects/{project_name}",
+            params=filters,
+            schema=models.ProjectDetailsSchema,
+        )
+        get_project_err = models.ErrorResponse(
+            detail=f"Failed to get project '{project_name}'!"
+        )
+        return (
+            obj
+            if isinstance(obj, models.ProjectDetailsSchema)
+            else errs or get_project_err
+        )
+
+    async def list_tasks(
+        self, **filters
+    ) -> list[models.TaskSchema] | models.ErrorResponse:
+        obj, errs = await self._request(
+            "GET", "tasks", params=filters, schema=models.TaskSchema
+        )
+        list_tasks_err = models.ErrorResponse(detail="Failed to list tasks!")
+        return obj if isinstance(obj, list) else errs or list_tasks_err
+
+    async def get_task(
+        self, task_id: str, **filters
+    ) -> models.TaskSchema | models.ErrorResponse:
+        obj, errs = await self._request(
+            "GET", f"tasks/{task_id}", params=filters, schema=models.TaskSchema
+        )
+        get_task_err = models.ErrorResponse(detail=f"Failed to get task '{task_id}'!")
+        return obj if isinstance(obj, models.TaskSchema) else errs or get_task_err
+
+    async def submit_task(
+        self, task_name: str, parameters: dict | None, **filters
+    ) -> models.TaskSchema | models.ErrorResponse:
+        obj, errs = await self._request(
+            "POST",
+            f"tasks/{task_name}/submit",
+            json={"parameters": parameters} if parameters else None,
+            params=filters,
+            schema=models.TaskSchema,
+        )
+        submit_task_err = models.ErrorResponse(detail="Failed to submit task!")
+        return obj if isinstance(obj, models.TaskSchema) else errs or submit_task_err
+
+    async def get_task_run(
+        self, run_name: str, **filters
+    ) -> models.StagedRunSchema | models.ErrorResponse:
+        obj, errs = await self._request(
+            "GET",
+            f"task-runs/{run_name}",
+            params=filters,
+            schema=models.StagedRunSchema,
+        )
+        get_task_run_err = models.ErrorResponse(
+            detail=f"Failed to get task run '{run_name}'!"
+        )
+        return (
+            obj if isinstance(obj, models.StagedRunSchema) else errs or get_task_run_err
+        )
+
+    async def get_pipeline_run(
+        self, run_name: str, **filters
+    ) -> models.StagedRunSchema | models.ErrorResponse:
+        obj, errs = await self._request(
+            "GET",
+            f"pipeline-runs/{run_name}",
+            params=filters,
+            schema=models.StagedRunSchema,
+        )
+        get_pipeline_run_err = models.ErrorResponse(
+            detail=f"Failed to get pipeline run '{run_name}'!"
+        )
+        return (
+            obj
+            if isinstance(obj, models.StagedRunSchema)
+            else errs or get_pipeline_run_err
+        )
+
+    async def _get_logs(
+        self,
+        run_name: str,
+        lines: int,
+        follow: bool,
+        endpoint: Literal["task-runs", "pipeline-runs", "build-runs", "routes"],
+        **filters,
+    ) -> AsyncIterator[str | models.ErrorResponse]:
+        filters["follow"] = follow
+        filters["tail"] = lines
+        response, errs = await self._request(
+            "GET",
+            f"{endpoint}/{run_name}/logs",
+            params=filters,
+            stream=True,
+            timeout=aiohttp.ClientTimeout(
+                total=None,
+                sock_connect=self.timeout[0],
+                sock_read=None if follow else self.timeout[1],
+            ),
+        )
+        if errs or response is None:
+            yield errs or models.ErrorResponse(detail="Failed to get logs!")
+            return
+        async with response:
+            try:
+                async for line in response.content:
+                    yield line.decode("utf-8", errors="replace").rstrip("\r\n")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                yield models.ErrorResponse(detail=str(e) or "Log stream timed out")
+
+    def get_task_run_logs(
+        self, run_name: str, lines: int, follow: bool, **filters
+    ) -> AsyncIterator[str | models.ErrorResponse]:
+        return self._get_logs(run_name, lines, follow, "task-runs", **filters)
+
+    def get_pipeline_run_logs(
+        self, run_name: str, lines: int, follow: bool, **filters
+    ) -> AsyncIterator[str | models.ErrorResponse]:
+        return self._get_logs(run_name, lines, follow, "pipeline-runs", **filters)
+
+    def get_build_run_logs(
+        self, run_name: str, lines: int, follow: bool, **filters
+    ) -> AsyncIterator[str | models.ErrorResponse]:
+        return self._get_logs(run_name, lines, follow, "build-runs", **filters)
+
+    def get_route_logs(
+        self, route_name: str, lines: int, follow: bool, **filters
+    ) -> AsyncIterator[str | models.ErrorResponse]:
+        return self._get_logs(route_name, lines, follow, "routes", **filters)
+
+    async def _download_artifact(
+        self,
+        resource_type: Literal["task", "pipeline"],
+        resource_name: str,
+        artifact_name: str,
+        step_name: str | None = None,
+        output_path: str | None = None,
+    ) -> bool:
+        if resource_type == "pipeline" and step_name is None:
+            click.echo(
+                f" {err} 'step_name' is required to download artifact from pipeline runs!"
+            )
+            return False
+        elif resource_type == "pipeline":
+            url = f"pipeline-runs/{resource_name}/artifacts/{step_name}/{artifact_name}"
+        else:
+            url = f"task-runs/{resource_name}/artifacts/{artifact_name}"
+        if output_path is not None:
+            artifact_path = Path(output_path)
+        else:
+            artifact_path = Path(os.getcwd()) / f"{artifact_name}.gz"
+        click.echo(
+            f" {spin} Downloading artifact '{artifact_name}' from {resource_type.title()}-Run '{resource_name}' to '{artifact_path.name}' file..."
+        )
+        # Keep the raw (gzipped) payload on disk, like the sync client does
+        response, errs = await self._request(
+            "GET", url, stream=True, auto_decompress=False
+        )
+        if response is not None and not errs:
+            async with response:
+                try:
+                    await self._write_stream(response, artifact_path)
+                except (aiohttp.ClientError, OSError, asyncio.TimeoutError) as e:
+                    errs = models.ErrorResponse(detail=str(e) or "Download timed out")
+        if errs or response is None:
+            click.echo(
+                f" {err} Failed to download artifact '{artifact_name}' from {resource_type} '{resource_name}'!"
+            )
+            if errs:
+                click.echo(f" {wrn} {errs.detail}")
+            return False
+        return True
+
+    async def _write_stream(self, response: aiohttp.ClientResponse, path: Path) -> None:
+        # File writes run on a thread so large downloads do not block the loop
+        f = await asyncio.to_thread(open, path, "w+b")
+        try:
+            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                await asyncio.to_thread(f.write, chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+
+    async def download_task_run_artifact(
+        self, task_run_name: str, artifact_name: str, output_path: str | None = None
+    ) -> bool:
+        return await self._download_artifact(
+            resource_type="task",
+            resource_name=task_run_name,
+            artifact_name=artifact_name,
+            output_path=output_path,
+        )
+
+    async def download_pipeline_run_artifact(
+        self,
+        pipeline_run_name: str,
+        artifact_name: str,
+        step_name: str,
+        output_path: str | None = None,
+    ) -> bool:
+        return await self._download_artifact(
+            resource_type="pipeline",
+            resource_name=pipeline_run_name,
+            artifact_name=artifact_name,
+            step_name=step_name,
+            output_path=output_path,
+        )
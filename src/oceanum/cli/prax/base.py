@@ -0,0 +1,10 @@
+from pydantic import BaseModel as _BaseModel, ConfigDict
+
+
+class BaseModel(_BaseModel):
+    """
+    Base of the generated models, validators and serializers are built on
+    first use rather than when the models module is imported.
+    """
+
+    model_config = ConfigDict(defer_build=True)
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import click
+import platformdirs
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CACHE_TTL = 30.0
+DEFAULT_CACHE_MAX_SIZE = 50 * 1024 * 1024
+
+CACHE_META_KEY = "oceanum.prax.cache"
+REFRESH_META_KEY = "oceanum.prax.cache.refresh"
+
+# Response headers worth replaying from a cached entry
+_CACHED_HEADERS = ["Content-Type", "ETag", "Last-Modified"]
+
+
+def default_cache_dir() -> Path:
+    return Path(platformdirs.user_data_dir("oceanum", "Oceanum LTD.")) / "prax-cache"
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "0").lower() in ["1", "true", "yes"]
+
+
+class ResponseCache:
+    """
+    On-disk cache of successful GET responses from the PRAX API, keyed by URL,
+    query parameters and credentials.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        ttl: float | None = None,
+        max_size: int | None = None,
+        refresh: bool = False,
+    ) -> None:
+        self.directory = Path(directory) if directory else default_cache_dir()
+        if ttl is None:
+            ttl = float(os.getenv("PRAX_CACHE_TTL", DEFAULT_CACHE_TTL))
+        if max_size is None:
+            max_size = int(os.getenv("PRAX_CACHE_MAX_SIZE", DEFAULT_CACHE_MAX_SIZE))
+        self.ttl = ttl
+        self.max_size = max_size
+        self.refresh = refresh
+
+    @classmethod
+    def from_context(cls, ctx: click.Context) -> "ResponseCache | None":
+        """
+        Return the cache selected by the command line options, None when
+        caching is off or the command does not support it.
+        """
+        if CACHE_META_KEY not in ctx.meta:
+            return None
+        refresh = bool(ctx.meta.get(REFRESH_META_KEY))
+        enabled = ctx.meta[CACHE_META_KEY]
+        if enabled is None:
+            enabled = refresh or _env_flag("PRAX_CACHE")
+        return cls(refresh=refresh) if enabled else None
+
+    def key(self, url: str, params: dict | None, credentials: str | None) -> str:
+        identity = hashlib.sha256((credentials or "").encode()).hexdigest()
+        query = sorted((k, str(v)) for k, v in (params or {}).items() if v is not None)
+        payload = json.dumps([url, query, identity])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> dict | None:
+        path = self._path(key)
+        try:
+            with path.open() as f:
+                entry = json.load(f)
+            # Reads count as use for the LRU eviction
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            path.unlink(missing_ok=True)
+            return None
+        return entry
+
+    def set(self, key: str, response: requests.Response) -> dict | None:
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        if "no-store" in cache_control:
+            return None
+        try:
+            body = response.content.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+        entry = {
+            "url": response.url,
+            "stored_at": time.time(),
+            "headers": {
+                h: response.headers[h] for h in _CACHED_HEADERS if h in response.headers
+            },
+            "body": body,
+        }
+        self._write(key, entry)
+        self._evict()
+        return entry
+
+    def _write(self, key: str, entry: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            Path(path).unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        if self.directory.is_dir():
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.time() - entry["stored_at"] < self.ttl
+
+    def fetch(
+        self,
+        session: requests.Session,
+        url: str,
+        headers: dict,
+        params: dict | None = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        GET `url`, answering from the cache when the entry is fresh or the API
+        confirms it is unchanged.
+        """
+        key = self.key(url, params, headers.get("Authorization"))
+        entry = None if self.refresh else self.get(key)
+        if entry is not None and self.is_fresh(entry):
+            return self._replay(entry)
+        etag = entry["headers"].get("ETag") if entry else None
+        if etag:
+            headers = headers | {"If-None-Match": etag}
+        response = session.request("GET", url, headers=headers, params=params, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            entry["stored_at"] = time.time()
+            self._write(key, entry)
+            return self._replay(entry)
+        if response.status_code == 200:
+            self.set(key, response)
+        return response
+
+    def _replay(self, entry: dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry["url"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = "utf-8"
+        response._content = entry["body"].encode("utf-8")
+        return response
+
+
+def _store_meta(key: str) -> Callable[[click.Context, click.Parameter, Any], Any]:
+    def callback(ctx: click.Context, param: click.Parameter, value: Any) -> Any:
+        ctx.meta[key] = value
+        return value
+
+    return callback
+
+
+def cache_options(func: Callable) -> Callable:
+    """
+    Add the --cache/--no-cache and --refresh options to a read-only command.
+    """
+    func = click.option(
+        "--refresh",
+        help="Ignore cached responses and store fresh ones",
+        is_flag=True,
+        default=False,
+        expose_value=False,
+        callback=_store_meta(REFRESH_META_KEY),
+    )(func)
+    func = click.option(
+        "--cache/--no-cache",
+        help="Cache API responses on disk, defaults to the PRAX_CACHE env var",
+        default=None,
+        expose_value=False,
+        callback=_store_meta(CACHE_META_KEY),
+    )(func)
+    return func
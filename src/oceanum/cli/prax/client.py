@@ -1,89 +1,149 @@
+from __future__ import annotations
+
+import atexit
+import json
 import os
+import threading
 import time
-from datetime import timedelta
+import uuid
 from pathlib import Path
-from typing import Any, Iterable, Literal, Optional, Type
+from typing import Any, Iterable, Iterator, Literal, Type
 
 import click
 import humanize
 import requests
 import yaml
-from pydantic import Field, RootModel, SecretStr, ValidationError, model_validator
+from pydantic import ValidationError
 
-from oceanum.cli.symbols import chk, err, globe, spin, watch, wrn
+from oceanum.cli.symbols import chk, err, spin, wrn
 
 from . import models
-from .utils import format_route_status as _frs
-
-
-class RevealedSecretStr(RootModel):
-    root: Optional[str | SecretStr] = None
-
-    @model_validator(mode="after")
-    def validate_revealed_secret_str(self):
-        if isinstance(self.root, SecretStr):
-            self.root = self.root.get_secret_value()
-        return self
-
-
-class RevealedSecretData(models.SecretData):
-    root: Optional[dict[str, RevealedSecretStr]] = None
-
-
-class RevealedSecretSpec(models.SecretSpec):
-    data: Optional[RevealedSecretData] = None
-
-
-class RevealedSecretsBuildCredentials(models.BuildCredentials):
-    password: Optional[RevealedSecretStr] = None
-
-
-class RevealedSecretsBuildSpec(models.BuildSpec):
-    credentials: Optional[RevealedSecretsBuildCredentials] = None
-
-
-class RevealedSecretsCustomDomainSpec(models.CustomDomainSpec):
-    tls_cert: Optional[RevealedSecretStr] = Field(default=None, alias="tlsCert")
-    tls_key: Optional[RevealedSecretStr] = Field(default=None, alias="tlsKey")
-
-
-class RevealedSecretsRouteSpec(models.ServiceRouteSpec):
-    custom_domains: Optional[list[RevealedSecretsCustomDomainSpec]] = Field(
-        default=None, alias="customDomains"
+from .artifacts import DEFAULT_SEGMENTS, ArtifactDownloader, DownloadError
+from .cache import ResponseCache
+from .concurrency import DEFAULT_CONCURRENCY, bounded_map
+from .deadline import Deadline, request_timeout
+from .deployment import DeploymentWaiter
+from .projection import project
+from .retry import IDEMPOTENCY_KEY_HEADER, RetryAdapter, RetryPolicy
+from .specrender import SpecCache, SpecRenderError, load_spec
+from .tracing import RequestSpan, Tracer
+
+
+def resolve_credentials(
+    ctx: click.Context | None, token: str | None, service: str | None
+) -> tuple[str | None, str | None]:
+    """
+    Resolve the PRAX API authorization header and service URL from the CLI
+    context, falling back to the given values and the PRAX_API_TOKEN and
+    PRAX_API_URL environment variables.
+    """
+    if ctx is not None and ctx.obj.token:
+        token = f"Bearer {ctx.obj.token.access_token}"
+    else:
+        token = token or os.getenv("PRAX_API_TOKEN")
+    if ctx is not None and ctx.obj.domain.startswith("oceanum."):
+        service = f"https://PRAX.{ctx.obj.domain}/api"
+    else:
+        service = service or os.getenv("PRAX_API_URL")
+    return token, service
+
+
+def validation_error_response(error: ValidationError) -> models.ErrorResponse:
+    return models.ErrorResponse(
+        detail=[
+            models.ValidationErrorDetail(
+                loc=[str(v) for v in e["loc"]], msg=e["msg"], type=e["type"]
+            )
+            for e in error.errors()
+        ]
     )
 
 
-class RevealedSecretsServiceSpec(models.ServiceSpec):
-    routes: Optional[list[RevealedSecretsRouteSpec]] = None
-
-
-class RevealedSecretsImageSpec(models.ImageSpec):
-    username: Optional[RevealedSecretStr] = None
-    password: Optional[RevealedSecretStr] = None
-
-
-class RevealedSecretsSourceRepositorySpec(models.SourceRepositorySpec):
-    token: Optional[RevealedSecretStr] = None
-
-
-class RevealedSecretProjectResourcesSpec(models.ProjectResourcesSpec):
-    secrets: Optional[list[RevealedSecretSpec]] = None
-    build: Optional[RevealedSecretsBuildCredentials] = None
-    images: Optional[list[RevealedSecretsImageSpec]] = None
-    sources: Optional[list[RevealedSecretsSourceRepositorySpec]] = None
-
-
-class RevealedSecretsProjectSpec(models.ProjectSpec):
-    resources: Optional[RevealedSecretProjectResourcesSpec] = None
+def parse_error_response(text: str) -> models.ErrorResponse:
+    """
+    Build an ErrorResponse from an API error body, keeping the raw body as
+    detail when it is not a valid error payload.
+    """
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return models.ErrorResponse(detail=text)
+    try:
+        return models.ErrorResponse(**data)
+    except (TypeError, ValidationError):
+        return models.ErrorResponse(detail=data)
+
+
+def validate_data(data: Any, schema: Type[Any]) -> Any:
+    """
+    Validate decoded JSON against a response schema, item by item for lists.
+    """
+    if isinstance(data, list):
+        return [schema(**item) for item in data]
+    return schema(**data)
+
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_POOL_MAXSIZE = 10
+
+# Actions sent as PUT requests on runs, none of them is idempotent
+RUN_ACTIONS = frozenset(["retry", "terminate", "stop", "resume"])
+
+_sessions: dict[tuple, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(
+    pool_connections: int | None = None,
+    pool_maxsize: int | None = None,
+    pool_block: bool | None = None,
+    keep_alive: bool | None = None,
+    retries: int | None = None,
+) -> requests.Session:
+    """
+    Return a pooled HTTP session shared by every client of this process with
+    the same settings, unset ones read from environment variables.
+    """
+    if pool_connections is None:
+        pool_connections = int(
+            os.getenv("PRAX_POOL_CONNECTIONS", DEFAULT_POOL_CONNECTIONS)
+        )
+    if pool_maxsize is None:
+        pool_maxsize = int(os.getenv("PRAX_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE))
+    if pool_block is None:
+        pool_block = os.getenv("PRAX_POOL_BLOCK", "0").lower() in ["1", "true"]
+    if keep_alive is None:
+        keep_alive = os.getenv("PRAX_KEEP_ALIVE", "1").lower() not in ["0", "false"]
+
+    policy = RetryPolicy(retries=retries)
+
+    key = (pool_connections, pool_maxsize, pool_block, keep_alive, policy.retries)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = RetryAdapter(
+                policy,
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            if not keep_alive:
+                session.headers["Connection"] = "close"
+            _sessions[key] = session
+    return session
 
 
-def dump_with_secrets(spec: models.ProjectSpec) -> dict:
-    spec_dict = spec.model_dump(
-        exclude_none=True, exclude_unset=True, by_alias=True, mode="python"
-    )
-    return RevealedSecretsProjectSpec(**spec_dict).model_dump(
-        exclude_none=True, exclude_unset=True, by_alias=True, mode="json"
-    )
+@atexit.register
+def close_sessions() -> None:
+    """Close every shared session and drop their pooled connections."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
 
 
 class PRAXClient:
@@ -92,21 +152,47 @@ class PRAXClient:
         ctx: click.Context | None = None,
         token: str | None = None,
         service: str | None = None,
+        session: requests.Session | None = None,
+        pool_connections: int | None = None,
+        pool_maxsize: int | None = None,
+        pool_block: bool | None = None,
+        keep_alive: bool | None = None,
+        cache: ResponseCache | None = None,
+        retries: int | None = None,
+        timeout: tuple[float | None, float | None] | None = None,
+        deadline: Deadline | None = None,
+        tracer: Tracer | None = None,
     ) -> None:
-        if ctx is not None:
-            if ctx.obj.token:
-                self.token = f"Bearer {ctx.obj.token.access_token}"
-            else:
-                self.token = token or os.getenv("PRAX_API_TOKEN")
+        self.token, self.service = resolve_credentials(ctx, token, service)
+        self.ctx = ctx
+        if cache is None and ctx is not None:
+            cache = ResponseCache.from_context(ctx)
+        self.cache = cache
+        self.timeout = timeout if timeout is not None else request_timeout()
+        if deadline is None:
+            deadline = Deadline.from_context(ctx) if ctx is not None else Deadline()
+        self.deadline = deadline
+        if tracer is None and ctx is not None:
+            tracer = Tracer.from_context(ctx)
+        self.tracer = tracer
+        self.session = session or get_session(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
+            retries=retries,
+        )
+
+    def __enter__(self) -> "PRAXClient":
+        return self
 
-            if ctx.obj.domain.startswith("oceanum."):
-                self.service = f"https://PRAX.{ctx.obj.domain}/api"
-            else:
-                self.service = service or os.getenv("PRAX_API_URL")
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
-        self.ctx = ctx
-        self._lag = 2  # seconds
-        self._deploy_start_time = time.time()
+    def close(self) -> None:
+        """Close the client session unless it is shared with other clients."""
+        if self.session not in _sessions.values():
+            self.session.close()
 
     def _request(
         self,
@@ -120,213 +206,90 @@ class PRAXClient:
             headers = kwargs.pop("headers", {}) | {"Authorization": f"{self.token}"}
         else:
             headers = kwargs.pop("headers", {})
+        if method == "PUT" and endpoint.rpartition("/")[2] in RUN_ACTIONS:
+            # Run actions start or stop runs, retried as writes, not blindly
+            headers.setdefault(IDEMPOTENCY_KEY_HEADER, str(uuid.uuid4()))
         url = f"{self.service.removesuffix('/')}/{endpoint}"
-        response = requests.request(method, url, headers=headers, **kwargs)
+        self.deadline.check()
+        kwargs["timeout"] = self.deadline.timeout(kwargs.get("timeout", self.timeout))
+        started, clock = time.time(), time.perf_counter()
+        try:
+            if self.cache is not None and method == "GET" and not kwargs.get("stream"):
+                response = self.cache.fetch(
+                    self.session, url, headers=headers, **kwargs
+                )
+            else:
+                response = self.session.request(method, url, headers=headers, **kwargs)
+                if self.cache is not None and method != "GET" and response.ok:
+                    # Any change can show up in cached listings and details
+                    self.cache.clear()
+        except requests.exceptions.RequestException as e:
+            latency = time.perf_counter() - clock
+            self._trace(method, endpoint, url, started, latency, error=e)
+            if not isinstance(e, requests.exceptions.Timeout):
+                raise
+            self.deadline.check()
+            if kwargs.get("stream"):
+                # Streaming callers handle dropped connections themselves
+                raise
+            return None, models.ErrorResponse(detail=f"Request timed out: {e}")
+        latency = time.perf_counter() - clock
         errs = self._handle_errors(response)
         obj = None
+        validation = 0.0
         if not errs and schema is not None:
+            clock = time.perf_counter()
             obj = self._validate_schema(response, schema)
+            validation = time.perf_counter() - clock
+        self._trace(
+            method,
+            endpoint,
+            url,
+            started,
+            latency,
+            response=response,
+            validation=validation,
+            schema=schema if not errs else None,
+            stream=bool(kwargs.get("stream")),
+        )
         return obj if obj is not None else response, errs
 
-    def _wait_project_commit(self, **params) -> bool:
-        while True:
-            project = self.get_project(**params)
-            if (
-                isinstance(project, models.ProjectDetailsSchema)
-                and project.last_revision is not None
-            ):
-                if project.last_revision.status == "created":
-                    time.sleep(self._lag)
-                    click.echo(
-                        f" {spin} Waiting for Revision #{project.last_revision.number} to be committed..."
-                    )
-                    continue
-                elif project.last_revision.status == "no-change":
-                    click.echo(f" {wrn} No changes to commit, exiting...")
-                    return False
-                elif project.last_revision.status == "failed":
-                    click.echo(
-                        f" {err} Revision #{project.last_revision.number} failed to commit, exiting..."
-                    )
-                    return False
-                elif project.last_revision.status == "commited":
-                    click.echo(
-                        f" {chk} Revision #{project.last_revision.number} committed successfully"
-                    )
-                    return True
-            else:
-                click.echo(f" {err} No project revision found, exiting...")
-                break
-        return True
-
-    def _wait_stages_start_updating(self, **params):
-        counter = 0
-        while True:
-            project = self.get_project(**params)
-            if isinstance(project, models.ProjectDetailsSchema):
-                updating = any(
-                    [s.status in ["updating", "degraded"] for s in project.stages]
-                )
-                ready_stages = all(
-                    [s.status in ["ready", "error"] for s in project.stages]
-                )
-                if updating:
-                    break
-                elif counter > 5 and ready_stages:
-                    # click.echo(f"Project '{project.name}' finished being updated in {time.time()-start:.2f}s")
-                    break
-                else:
-                    click.echo(f" {spin} Waiting for project to start updating...")
-                    time.sleep(self._lag)
-                    counter += 1
-            else:
-                click.echo(f" {err} Failed to get project details!")
-                break
-        return project
-
-    def _wait_builds_to_finish(self, **params):
-        def get_builds(project) -> list[models.BuildSchema]:
-            builds = self.list_builds(project=project.name, org=project.org)
-            if not isinstance(builds, list):
-                click.echo(f" {err} Failed to get project builds!")
-                return []
-            return builds
-
-        project = self.get_project(**params)
-
-        if (
-            isinstance(project, models.ProjectDetailsSchema)
-            and project.last_revision is not None
-        ):
-            params["project"] = params.pop("project_name", project.name)
-
-            spec = project.last_revision.spec
-            builds = spec.resources.builds if spec.resources else None
-
-            if not builds:
-                return True
-
-            click.echo(f" {spin} Waiting for build-run status...")
-            time.sleep(10)
-            to_finish_msg = False
-            while True:
-                time.sleep(self._lag)
-                project_builds = get_builds(project)
-                if not project_builds:
-                    continue
-
-                finished_builds = [
-                    b
-                    for b in project_builds
-                    if b.last_run
-                    and b.last_run.status in ["Succeeded", "Failed", "Error"]
-                ]
-                running_builds = [
-                    b
-                    for b in project_builds
-                    if b.last_run and b.last_run.status in ["Pending", "Running"]
-                ]
-
-                if project_builds == finished_builds:
-                    click.echo(f" {chk} All builds finished!")
-                    for build in project_builds:
-                        if build.last_run and build.last_run.status in [
-                            "Failed",
-                            "Error",
-                        ]:
-                            click.echo(
-                                f" {err} Build '{build.name}-{build.stage}' failed to start or while running!"
-                            )
-                            click.echo(
-                                f"Inspect Build Run logs with 'oceanum prax logs build {build.name} --project {project.name} --org {project.org} --stage {build.stage}' command !"
-                            )
-                            return False
-                        elif build.last_run and build.last_run.status == "Succeeded":
-                            click.echo(
-                                f" {chk} Build '{build.name}-{build.stage}' finished successfully!"
-                            )
-                    break
-                elif running_builds:
-                    if not to_finish_msg:
-                        click.echo(
-                            f" {spin} Waiting for builds to finish, this can take several minutes..."
-                        )
-                        to_finish_msg = True
-                    continue
-        else:
-            click.echo(f" {err} Failed to get project details!")
-            return False
-        return True
-
-    def _wait_stages_finish_updating(self, **params):
-        counter = 0
-        click.echo(f" {spin} Waiting for all stages to finish updating...")
-        while True:
-            counter += 1
-            project = self.get_project(**params)
-            if isinstance(project, models.ProjectDetailsSchema):
-                project_name = project.name if project else "unknown"
-                stages = project.stages or []
-                all_finished = all([s.status in ["healthy", "error"] for s in stages])
-                if all_finished:
-                    click.echo(
-                        f" {chk} Project '{project_name}' finished being updated!"
-                    )
-                    break
-                elif counter > 10:
-                    routes_error = False
-                    # Check for routes with errors
-                    for stage in stages:
-                        if stage.resources:
-                            for route in stage.resources.routes:
-                                if getattr(
-                                    route.next_revision_status,
-                                    "root",
-                                    route.next_revision_status,
-                                ) in ["error"]:
-                                    click.echo(
-                                        f" {err} Route '{route.name}' at revision #{project.last_revision.number} failed to start!"
-                                    )
-                                    msg = (route.details or {}).get(
-                                        "message", "No error message provided"
-                                    )
-                                    click.echo(
-                                        f" {wrn} See container error details:{os.linesep}{os.linesep}{msg}"
-                                    )
-                                    routes_error = True
-                    if routes_error:
-                        break
-                else:
-                    time.sleep(self._lag)
-
-    def _check_routes(self, **params):
-        project = self.get_project(**params)
-        if isinstance(project, models.ProjectDetailsSchema):
-            for stage in project.stages:
-                for route in stage.resources.routes:
-                    urls = [f"https://{d}" for d in route.custom_domains] + [route.url]
-                    if route.next_revision_status and str(
-                        route.next_revision_status
-                    ) in ["error"]:
-                        click.echo(
-                            f" {err} Route '{route.name}' at revision #{project.last_revision.number} failed to start!"
-                        )
-                        if route.details:
-                            msg = route.details.get(
-                                "message", "No error message provided"
-                            )
-                        else:
-                            msg = "No error details provided"
-                        click.echo(
-                            f" {wrn} Error details:{os.linesep}{os.linesep}{msg}"
-                        )
-                    if route.status in ["online", "offline"]:
-                        s = "s" if len(urls) > 1 else ""
-                        click.echo(
-                            f" {chk} Route '{route.name}' is {_frs(route.status)} and available at URL{s}:"
-                        )
-                        for url in urls:
-                            click.echo(f" {globe} {url}")
+    def _trace(
+        self,
+        method: str,
+        endpoint: str,
+        url: str,
+        started: float,
+        latency: float,
+        response: requests.Response | None = None,
+        error: Exception | None = None,
+        validation: float = 0.0,
+        schema: Type[Any] | None = None,
+        stream: bool = False,
+    ) -> None:
+        if self.tracer is None:
+            return
+        size = 0
+        if response is not None and stream:
+            # Streamed bodies are read later by the caller
+            size = int(response.headers.get("Content-Length") or 0)
+        elif response is not None:
+            size = len(response.content or b"")
+        self.tracer.record(
+            RequestSpan(
+                method=method,
+                endpoint=endpoint,
+                url=url,
+                start=started,
+                latency=latency,
+                status=response.status_code if response is not None else None,
+                size=size,
+                retries=getattr(response, "retry_count", 0),
+                validation=validation,
+                schema=getattr(schema, "__name__", None),
+                error=f"{type(error).__name__}: {error}" if error else None,
+            )
+        )
 
     def _handle_errors(
         self, response: requests.Response
@@ -413,11 +376,7 @@ class PRAXClient:
         self, response: requests.Response, schema: Type[Any]
     ) -> Any | models.ErrorResponse:
         try:
-            json_data = response.json()
-            if isinstance(json_data, list):
-                return [schema(**item) for item in json_data]
-            else:
-                return schema(**response.json())
+            return validate_data(response.json(), schema)
         except requests.exceptions.JSONDecodeError:
             click.echo(f" {err} API Response Error: {response.text}")
             if self.ctx:
@@ -431,45 +390,71 @@ class PRAXClient:
             )
             if self.ctx:
                 self.ctx.exit(1)
-            return models.ErrorResponse(
-                detail=[
-                    models.ValidationErrorDetail(
-                        loc=[str(v) for v in e["loc"]], msg=e["msg"], type=e["type"]
-                    )
-                    for e in e.errors()
-                ]
-            )
+            return validation_error_response(e)
+
+    def _paginate(
+        self,
+        endpoint: str,
+        schema: Type[Any],
+        limit: int | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+        **filters,
+    ) -> Iterator[Any | models.ErrorResponse]:
+        """
+        Yield the items of a list endpoint page by page with limit/offset
+        query parameters, stopping after `limit` items. Only one page of items
+        is held at a time. An ErrorResponse is yielded last if a page fails.
+        With `fields`, items are light views of those fields only.
+        """
+        schema = project(schema, fields)
+        offset = 0
+        yielded = 0
+        first_id = None
+        while limit is None or yielded < limit:
+            size = page_size if limit is None else min(page_size, limit - yielded)
+            params = filters | {"limit": size, "offset": offset}
+            page, errs = self._request("GET", endpoint, params=params, schema=schema)
+            if not isinstance(page, list):
+                yield errs or models.ErrorResponse(detail=f"Failed to list {endpoint}!")
+                return
+            page_id = getattr(page[0], "id", None) if page else None
+            if offset and page_id is not None and page_id == first_id:
+                # The API ignored the offset and sent the first page again
+                return
+            if not offset:
+                first_id = page_id
+            for item in page[: None if limit is None else limit - yielded]:
+                yield item
+                yielded += 1
+            # A short page is the last one, a longer one means the API
+            # returned the whole collection at once
+            if len(page) != size:
+                return
+            offset += size
 
     def wait_project_deployment(self, **params) -> bool:
-        self._deploy_start_time = time.time()
-        committed = self._wait_project_commit(**params)
-        if committed:
-            self._wait_stages_start_updating(**params)
-            build_succeeded = self._wait_builds_to_finish(**params)
-            if build_succeeded:
-                self._wait_stages_finish_updating(**params)
-                self._check_routes(**params)
-            delta = timedelta(seconds=time.time() - self._deploy_start_time)
-            click.echo(f" {watch} Deployment finished {humanize.naturaldelta(delta)}.")
-        return True
+        return DeploymentWaiter(self).wait(**params)
 
     @classmethod
-    def load_spec(cls, specfile: str) -> models.ProjectSpec | models.ErrorResponse:
+    def load_spec(
+        cls,
+        specfile: str,
+        overlays: Iterable[str] = (),
+        variables: dict[str, str] | None = None,
+    ) -> models.ProjectSpec | models.ErrorResponse:
+        """
+        Load a project spec file, with its overlays merged and variables
+        substituted, from the rendered specs cache when unchanged.
+        """
         try:
-            with Path(specfile).open() as f:
-                spec_dict = yaml.safe_load(f)
-            return models.ProjectSpec(**spec_dict)
-        except FileNotFoundError:
-            return models.ErrorResponse(detail=f"Specfile not found: {specfile}")
+            return load_spec(specfile, overlays, variables, SpecCache.from_env())
+        except FileNotFoundError as e:
+            return models.ErrorResponse(detail=f"Specfile not found: {e.filename}")
+        except (SpecRenderError, yaml.YAMLError) as e:
+            return models.ErrorResponse(detail=f"Invalid specfile {specfile}: {e}")
         except ValidationError as e:
-            return models.ErrorResponse(
-                detail=[
-                    models.ValidationErrorDetail(
-                        loc=[str(v) for v in e["loc"]], msg=e["msg"], type=e["type"]
-                    )
-                    for e in e.errors()
-                ]
-            )
+            return validation_error_response(e)
 
     def list_projects(
         self, **filters
@@ -480,6 +465,22 @@ class PRAXClient:
         list_projects_err = models.ErrorResponse(detail="Failed to list projects!")
         return obj if isinstance(obj, list) else errs or list_projects_err
 
+    def iter_projects(
+        self,
+        limit: int | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+        **filters,
+    ) -> Iterator[models.ProjectItemSchema | models.ErrorResponse]:
+        yield from self._paginate(
+            "projects",
+            models.ProjectItemSchema,
+            limit=limit,
+            page_size=page_size,
+            fields=fields,
+            **filters,
+        )
+
     def get_project(
         self, project_name: str, **filters
     ) -> models.ProjectDetailsSchema | models.ErrorResponse:
@@ -502,9 +503,33 @@ class PRAXClient:
             else errs or get_project_err
         )
 
+    def get_projects(
+        self,
+        project_names: Iterable[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        **filters,
+    ) -> Iterator[tuple[str, models.ProjectDetailsSchema | models.ErrorResponse]]:
+        """
+        Get the details of many projects with up to `concurrency` requests in
+        flight, yielding (name, project) pairs in the order of `project_names`.
+        """
+
+        def get(
+            project_name: str,
+        ) -> models.ProjectDetailsSchema | models.ErrorResponse:
+            try:
+                return self.get_project(project_name, **filters)
+            except requests.exceptions.RequestException as e:
+                return models.ErrorResponse(detail=str(e))
+
+        yield from bounded_map(get, project_names, concurrency, ordered=True)
+
     def deploy_project(
         self, spec: models.ProjectSpec
     ) -> models.ProjectDetailsSchema | models.ErrorResponse:
+        # Deferred, the revealed-secrets models subclass the generated ones
+        from .revealed import dump_with_secrets
+
         payload = dump_with_secrets(spec)
         obj, errs = self._request(
             "POST", "projects", json=payload, schema=models.ProjectDetailsSchema
@@ -515,13 +540,14 @@ class PRAXClient:
         )
 
     def patch_project(
-        self, project_name: str, ops: list[models.JSONPatchOpSchema]
+        self, project_name: str, ops: list[models.JSONPatchOpSchema], **filters
     ) -> models.ProjectDetailsSchema | models.ErrorResponse:
         payload = [op.model_dump(exclude_none=True, mode="json") for op in ops]
         obj, errs = self._request(
             "PATCH",
             f"projects/{project_name}",
             json=payload,
+            params=filters or None,
             schema=models.ProjectDetailsSchema,
         )
         patch_err = models.ErrorResponse(detail="Failed to patch project!")
@@ -576,6 +602,22 @@ class PRAXClient:
         list_sources_err = models.ErrorResponse(detail="Failed to list sources!")
         return obj if isinstance(obj, list) else errs or list_sources_err
 
+    def iter_sources(
+        self,
+        limit: int | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+        **filters,
+    ) -> Iterator[models.SourceSchema | models.ErrorResponse]:
+        yield from self._paginate(
+            "sources",
+            models.SourceSchema,
+            limit=limit,
+            page_size=page_size,
+            fields=fields,
+            **filters,
+        )
+
     def list_tasks(self, **filters) -> list[models.TaskSchema] | models.ErrorResponse:
         obj, errs = self._request(
             "GET", "tasks", params=filters or None, schema=models.TaskSchema
@@ -583,6 +625,22 @@ class PRAXClient:
         list_tasks_err = models.ErrorResponse(detail="Failed to list tasks!")
         return obj if isinstance(obj, list) else errs or list_tasks_err
 
+    def iter_tasks(
+        self,
+        limit: int | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+        **filters,
+    ) -> Iterator[models.TaskSchema | models.ErrorResponse]:
+        yield from self._paginate(
+            "tasks",
+            models.TaskSchema,
+            limit=limit,
+            page_size=page_size,
+            fields=fields,
+            **filters,
+        )
+
     def get_task(
         self, task_id: str, **filters
     ) -> models.TaskSchema | models.ErrorResponse:
@@ -670,6 +728,22 @@ class PRAXClient:
         list_pipelines_err = models.ErrorResponse(detail="Failed to list pipelines!")
         return obj if isinstance(obj, list) else errs or list_pipelines_err
 
+    def iter_pipelines(
+        self,
+        limit: int | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+        **filters,
+    ) -> Iterator[models.PipelineSchema | models.ErrorResponse]:
+        yield from self._paginate(
+            "pipelines",
+            models.PipelineSchema,
+            limit=limit,
+            page_size=page_size,
+            fields=fields,
+            **filters,
+        )
+
     def get_pipeline(
         self, pipeline_name: str, **filters
     ) -> models.PipelineSchema | models.ErrorResponse:
@@ -804,6 +878,22 @@ class PRAXClient:
         list_builds_err = models.ErrorResponse(detail="Failed to list builds!")
         return obj if isinstance(obj, list) else errs or list_builds_err
 
+    def iter_builds(
+        self,
+        limit: int | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+        **filters,
+    ) -> Iterator[models.BuildSchema | models.ErrorResponse]:
+        yield from self._paginate(
+            "builds",
+            models.BuildSchema,
+            limit=limit,
+            page_size=page_size,
+            fields=fields,
+            **filters,
+        )
+
     def get_build(
         self, build_name: str, **filters
     ) -> models.BuildSchema | models.ErrorResponse:
@@ -896,6 +986,22 @@ class PRAXClient:
         list_routes_err = models.ErrorResponse(detail="Failed to list routes!")
         return obj if isinstance(obj, list) else errs or list_routes_err
 
+    def iter_routes(
+        self,
+        limit: int | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        fields: Iterable[str] | None = None,
+        **filters,
+    ) -> Iterator[models.RouteSchema | models.ErrorResponse]:
+        yield from self._paginate(
+            "routes",
+            models.RouteSchema,
+            limit=limit,
+            page_size=page_size,
+            fields=fields,
+            **filters,
+        )
+
     def get_route(self, route_name: str) -> models.RouteSchema | models.ErrorResponse:
         obj, errs = self._request(
             "GET", f"routes/{route_name}", schema=models.RouteSchema
@@ -912,7 +1018,8 @@ class PRAXClient:
         artifact_name: str,
         step_name: str | None = None,
         output_path: str | None = None,
-        # force: bool = False,
+        segments: int = DEFAULT_SEGMENTS,
+        checksum: str | None = None,
     ) -> bool:
         if resource_type == "pipeline" and step_name is None:
             click.echo(
@@ -934,22 +1041,29 @@ class PRAXClient:
         click.echo(
             f" {spin} Downloading artifact '{artifact_name}' from {resource_type.title()}-Run '{resource_name}' to '{output_file}' file..."
         )
-        response, errs = self._request("GET", url, schema=None, stream=True)
-        if errs:
+        try:
+            downloader = ArtifactDownloader(
+                self, segments=segments, checksum=checksum, label=f"   {output_file}"
+            )
+            result = downloader.download(url, artifact_path)
+        except (DownloadError, ValueError) as e:
             click.echo(
                 f" {err} Failed to download artifact '{artifact_name}' from {resource_type} '{resource_name}'!"
             )
-            click.echo(f" {wrn} {errs.detail}")
+            click.echo(f" {wrn} {e}")
+            if getattr(e, "resumable", False):
+                click.echo(
+                    f" {wrn} Partial download kept, run the command again to resume."
+                )
             return False
-        elif isinstance(response, requests.Response) and response.ok:
-            with open(artifact_path, "w+b") as f:
-                for chunk in response.raw.stream(1024, decode_content=False):
-                    f.write(chunk)
-            return True
+        resumed = " (resumed)" if result.resumed else ""
         click.echo(
-            f" {err} Failed to download artifact '{artifact_name}' from {resource_type} '{resource_name}'!"
+            f" {chk} Downloaded {humanize.naturalsize(result.size, binary=True)}{resumed} "
+            f"in {result.elapsed:.1f}s, {humanize.naturalsize(result.throughput, binary=True)}/s"
         )
-        return False
+        if result.verified:
+            click.echo(f" {chk} Verified {', '.join(result.verified)} checksum")
+        return True
 
     def _get_logs(
         self,
@@ -962,7 +1076,12 @@ class PRAXClient:
         filters["follow"] = follow
         filters["tail"] = lines
         response, errs = self._request(
-            "GET", f"{endpoint}/{run_name}/logs", params=filters or None, stream=True
+            "GET",
+            f"{endpoint}/{run_name}/logs",
+            params=filters or None,
+            stream=True,
+            # Followed logs can stay quiet for a long time
+            timeout=(self.timeout[0], None) if follow else self.timeout,
         )
         if isinstance(response, requests.Response) and response.ok:
             for line in response.iter_lines():
@@ -971,13 +1090,20 @@ class PRAXClient:
             yield errs if errs else models.ErrorResponse(detail=response.text)
 
     def download_task_run_artifact(
-        self, task_run_name: str, artifact_name: str, output_path: str | None = None
+        self,
+        task_run_name: str,
+        artifact_name: str,
+        output_path: str | None = None,
+        segments: int = DEFAULT_SEGMENTS,
+        checksum: str | None = None,
     ) -> bool:
         return self._download_artifact(
             resource_type="task",
             resource_name=task_run_name,
             artifact_name=artifact_name,
             output_path=output_path,
+            segments=segments,
+            checksum=checksum,
         )
 
     def download_pipeline_run_artifact(
@@ -986,6 +1112,8 @@ class PRAXClient:
         artifact_name: str,
         step_name: str,
         output_path: str | None = None,
+        segments: int = DEFAULT_SEGMENTS,
+        checksum: str | None = None,
     ) -> bool:
         return self._download_artifact(
             resource_type="pipeline",
@@ -993,6 +1121,8 @@ class PRAXClient:
             artifact_name=artifact_name,
             step_name=step_name,
             output_path=output_path,
+            segments=segments,
+            checksum=checksum,
         )
 
     def get_build_run_logs(
@@ -1058,8 +1188,13 @@ class PRAXClient:
             else errs or update_route_thumbnail_err
         )
 
-    def validate(self, specfile: str) -> models.ProjectSpec | models.ErrorResponse:
-        resp = self.load_spec(specfile)
+    def validate(
+        self,
+        specfile: str,
+        overlays: Iterable[str] = (),
+        variables: dict[str, str] | None = None,
+    ) -> models.ProjectSpec | models.ErrorResponse:
+        resp = self.load_spec(specfile, overlays, variables)
         if isinstance(resp, models.ErrorResponse):
             return resp
         else:
@@ -0,0 +1,70 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_CONCURRENCY = 8
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter spacing calls evenly at most `rate` times per second.
+    A rate of None or 0 disables limiting.
+    """
+
+    def __init__(self, rate: float | None = None) -> None:
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def bounded_map(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: float | None = None,
+    ordered: bool = False,
+) -> Iterator[tuple[T, R]]:
+    """
+    Call `func` on every item from a bounded pool of worker threads, yielding
+    (item, result) pairs in completion order, or in the order of `items`.
+    """
+    limiter = RateLimiter(rate)
+
+    def call(item: T) -> R:
+        limiter.wait()
+        return func(item)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {
+            executor.submit(call, item): (index, item)
+            for index, item in enumerate(items)
+        }
+        done: dict[int, tuple[T, R]] = {}
+        next_index = 0
+        try:
+            for future in as_completed(futures):
+                index, item = futures[future]
+                if not ordered:
+                    yield item, future.result()
+                    continue
+                done[index] = (item, future.result())
+                while next_index in done:
+                    yield done.pop(next_index)
+                    next_index += 1
+        finally:
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Any
+
+import click
+import humanize
+from urllib3.util import Timeout
+
+from oceanum.cli.symbols import err
+
+from .logfilter import parse_duration
+
+DEADLINE_META_KEY = "oceanum.prax.deadline"
+
+# Same exit code as coreutils' timeout, so CI scripts can tell a command that
+# ran out of time from one that failed
+DEADLINE_EXIT_CODE = 124
+
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 60.0
+
+# urllib3 rejects zero timeouts, an expired deadline still gets a last try
+_MIN_TIMEOUT = 0.001
+
+
+class DeadlineExceeded(click.ClickException):
+    """Raised when a command runs past its --deadline."""
+
+    exit_code = DEADLINE_EXIT_CODE
+
+    def __init__(self, seconds: float | None) -> None:
+        limit = humanize.precisedelta(seconds or 0, minimum_unit="seconds")
+        super().__init__(f"Deadline of {limit} exceeded, giving up!")
+
+    def show(self, file: Any = None) -> None:
+        click.echo(f" {err} {self.format_message()}", file=file)
+
+
+def _timeout_env(name: str, default: float) -> float | None:
+    value = float(os.getenv(name, default))
+    return value if value > 0 else None
+
+
+def request_timeout() -> tuple[float | None, float | None]:
+    """
+    Default (connect, read) timeout of API requests, from PRAX_CONNECT_TIMEOUT
+    and PRAX_READ_TIMEOUT, 0 disabling either.
+    """
+    return (
+        _timeout_env("PRAX_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT),
+        _timeout_env("PRAX_READ_TIMEOUT", DEFAULT_READ_TIMEOUT),
+    )
+
+
+class Deadline:
+    """
+    Time budget of a whole command, shared by all of its requests and waits.
+
+    Request timeouts are shortened to the time left, and waits that would
+    outlast the deadline raise `DeadlineExceeded` instead. A deadline without
+    `seconds` never expires.
+    """
+
+    def __init__(self, seconds: float | None = None) -> None:
+        self.seconds = seconds
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    @classmethod
+    def from_context(cls, ctx: click.Context) -> "Deadline":
+        """Return the deadline set with --deadline, or one that never expires."""
+        deadline = ctx.meta.get(DEADLINE_META_KEY)
+        return deadline if deadline is not None else cls()
+
+    def remaining(self) -> float | None:
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def check(self) -> None:
+        if self.expired:
+            raise DeadlineExceeded(self.seconds)
+
+    def allows(self, seconds: float) -> bool:
+        """Whether waiting `seconds` still leaves time before the deadline."""
+        remaining = self.remaining()
+        return remaining is None or seconds < remaining
+
+    def sleep(self, seconds: float) -> None:
+        if not self.allows(seconds):
+            time.sleep(max(self.remaining() or 0.0, 0.0))
+            raise DeadlineExceeded(self.seconds)
+        time.sleep(seconds)
+
+    def timeout(self, timeout: Any) -> Any:
+        """Bound a requests `timeout` argument by the deadline."""
+        if self.expires_at is None:
+            return timeout
+        if isinstance(timeout, Timeout):
+            connect, read = timeout.connect_timeout, timeout.read_timeout
+        elif isinstance(timeout, tuple):
+            connect, read = timeout
+        else:
+            connect = read = timeout
+        return DeadlineTimeout(self, connect=connect, read=read)
+
+
+def _bound(timeout: Any, remaining: float) -> float:
+    if isinstance(timeout, (int, float)):
+        return min(timeout, remaining)
+    return remaining
+
+
+class DeadlineTimeout(Timeout):
+    """
+    urllib3 timeout cut down to the time left before a deadline every time a
+    connection uses it, so retries and reconnects never outlast the deadline.
+    """
+
+    def __init__(
+        self,
+        deadline: Deadline,
+        connect: float | None = None,
+        read: float | None = None,
+    ) -> None:
+        super().__init__(connect=connect, read=read)
+        self.deadline = deadline
+
+    def clone(self) -> Timeout:
+        remaining = max(self.deadline.remaining() or 0.0, _MIN_TIMEOUT)
+        return Timeout(
+            connect=_bound(self._connect, remaining),
+            read=_bound(self._read, remaining),
+        )
+
+
+def _store_deadline(ctx: click.Context, param: click.Parameter, value: Any) -> Any:
+    if value is None:
+        return value
+    seconds = parse_duration(value)
+    if seconds is None:
+        try:
+            seconds = float(value)
+        except ValueError:
+            raise click.BadParameter(
+                f"Invalid duration '{value}', expected seconds or a duration like 15m",
+                ctx=ctx,
+                param=param,
+            ) from None
+    if seconds <= 0:
+        raise click.BadParameter("The deadline must be positive", ctx=ctx, param=param)
+    ctx.meta[DEADLINE_META_KEY] = Deadline(seconds)
+    return value
+
+
+deadline_option = click.option(
+    "--deadline",
+    help=(
+        "Give up once the command ran for DURATION, such as 90s, 15m or 2h, "
+        f"exiting with code {DEADLINE_EXIT_CODE}. Bounds every request and wait"
+    ),
+    default=None,
+    type=str,
+    metavar="DURATION",
+    envvar="PRAX_DEADLINE",
+    callback=_store_deadline,
+    expose_value=False,
+)
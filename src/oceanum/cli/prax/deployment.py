@@ -0,0 +1,355 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import TYPE_CHECKING, Callable, Iterator
+
+import click
+import humanize
+import requests
+from pydantic import ValidationError
+
+from oceanum.cli.symbols import chk, err, globe, spin, watch, wrn
+
+from . import models
+from .utils import format_route_status as _frs
+
+if TYPE_CHECKING:
+    from .client import PRAXClient
+
+
+class DeploymentPhase(str, Enum):
+    COMMIT = "commit"
+    START_UPDATING = "start-updating"
+    BUILDS = "builds"
+    FINISH_UPDATING = "finish-updating"
+    DONE = "done"
+
+
+class Backoff:
+    """
+    Adaptive polling interval: starts fast and grows geometrically while
+    nothing changes, up to a maximum. Reset it whenever progress is observed.
+    """
+
+    def __init__(
+        self, initial: float = 1.0, maximum: float = 15.0, factor: float = 1.5
+    ) -> None:
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.current = initial
+
+    def reset(self) -> None:
+        self.current = self.initial
+
+    def next(self) -> float:
+        interval = self.current
+        self.current = min(self.current * self.factor, self.maximum)
+        return interval
+
+
+def iter_sse_data(lines: Iterator[str | bytes]) -> Iterator[str]:
+    """
+    Yield the data payload of each Server-Sent Event from a stream of lines.
+    """
+    data: list[str] = []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line:
+            if data:
+                yield os.linesep.join(data)
+                data = []
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip())
+    if data:
+        yield os.linesep.join(data)
+
+
+def deployment_failed(project: models.ProjectDetailsSchema) -> bool:
+    """Whether the last revision of a project failed to deploy."""
+    revision = project.last_revision
+    return (revision is not None and revision.status == "failed") or any(
+        stage.status == "error" for stage in project.stages
+    )
+
+
+class DeploymentWaiter:
+    """
+    Deployment state machine that follows a project revision from commit to
+    running routes.
+
+    Every tick fetches the project details once and evaluates the current phase
+    against that snapshot, so commit, stages, builds and routes are all tracked
+    from a single request. Ticks come from the project events stream when the
+    API provides one, otherwise from polling with an adaptive backoff.
+    """
+
+    def __init__(
+        self,
+        client: "PRAXClient",
+        initial_interval: float = 1.0,
+        max_interval: float = 15.0,
+        backoff_factor: float = 1.5,
+        stream: bool = True,
+        start_grace: float = 10.0,
+        build_grace: float = 10.0,
+        build_start_grace: float = 300.0,
+        route_error_grace: float = 20.0,
+        echo: Callable[[str], None] = click.echo,
+    ) -> None:
+        self.client = client
+        self.backoff = Backoff(initial_interval, max_interval, backoff_factor)
+        self.stream = stream
+        self.start_grace = start_grace
+        self.build_grace = build_grace
+        self.build_start_grace = build_start_grace
+        self.route_error_grace = route_error_grace
+        self.echo = echo
+        self.phase = DeploymentPhase.COMMIT
+        self.succeeded = False
+        self.project: models.ProjectDetailsSchema | None = None
+        self._start_time = time.time()
+        self._phase_start = time.monotonic()
+        self._notified: set[str] = set()
+
+    @property
+    def done(self) -> bool:
+        return self.phase == DeploymentPhase.DONE
+
+    @property
+    def elapsed(self) -> float:
+        return time.time() - self._start_time
+
+    def wait(self, **params) -> bool:
+        self._start_time = time.time()
+        for project in self._snapshots(**params):
+            if not self.advance(project):
+                continue
+            delta = timedelta(seconds=self.elapsed)
+            self.echo(f" {watch} Deployment finished {humanize.naturaldelta(delta)}.")
+            break
+        return self.succeeded
+
+    def advance(
+        self, project: models.ProjectDetailsSchema | models.ErrorResponse
+    ) -> bool:
+        """
+        Evaluate one project snapshot, moving through as many phases as the
+        snapshot allows. Returns True once the deployment wait is finished.
+        """
+        if not isinstance(project, models.ProjectDetailsSchema):
+            self.echo(f" {err} Failed to get project details!")
+            self._finish(False)
+            return True
+        self.project = project
+        while not self.done:
+            phase = self.phase
+            getattr(self, f"_on_{phase.value.replace('-', '_')}")(project)
+            if self.phase == phase:
+                break
+            self.backoff.reset()
+            self._phase_start = time.monotonic()
+        return self.done
+
+    def _echo_once(self, message: str) -> None:
+        if message not in self._notified:
+            self._notified.add(message)
+            self.echo(message)
+
+    def _phase_elapsed(self) -> float:
+        return time.monotonic() - self._phase_start
+
+    def _finish(self, succeeded: bool) -> None:
+        self.succeeded = succeeded
+        self.phase = DeploymentPhase.DONE
+
+    def _on_commit(self, project: models.ProjectDetailsSchema) -> None:
+        revision = project.last_revision
+        if revision is None:
+            self.echo(f" {err} No project revision found, exiting...")
+            self._finish(False)
+        elif revision.status == "created":
+            self._echo_once(
+                f" {spin} Waiting for Revision #{revision.number} to be committed..."
+            )
+        elif revision.status == "no-change":
+            self.echo(f" {wrn} No changes to commit, exiting...")
+            self._finish(False)
+        elif revision.status == "failed":
+            self.echo(
+                f" {err} Revision #{revision.number} failed to commit, exiting..."
+            )
+            self._finish(False)
+        elif revision.status == "commited":
+            self.echo(f" {chk} Revision #{revision.number} committed successfully")
+            self.phase = DeploymentPhase.START_UPDATING
+
+    def _on_start_updating(self, project: models.ProjectDetailsSchema) -> None:
+        updating = any(s.status in ["updating", "degraded"] for s in project.stages)
+        ready = all(s.status in ["ready", "error"] for s in project.stages)
+        if updating or (ready and self._phase_elapsed() > self.start_grace):
+            self.phase = DeploymentPhase.BUILDS
+        else:
+            self._echo_once(f" {spin} Waiting for project to start updating...")
+
+    def _on_builds(self, project: models.ProjectDetailsSchema) -> None:
+        spec = project.last_revision.spec if project.last_revision else None
+        if not (spec and spec.resources and spec.resources.builds):
+            self.phase = DeploymentPhase.FINISH_UPDATING
+            return
+        self._echo_once(f" {spin} Waiting for build-run status...")
+        builds = [
+            build
+            for stage in project.stages
+            if stage.resources
+            for build in stage.resources.builds
+        ]
+        runs = [b.last_run for b in builds]
+        if not builds or any(r is None for r in runs):
+            if self._phase_elapsed() > self.build_start_grace:
+                self.echo(
+                    f" {wrn} Builds did not start within {self.build_start_grace:.0f}s, "
+                    f"check them with 'oceanum prax list builds --project {project.name} --org {project.org}' command, exiting..."
+                )
+                self._finish(True)
+            return
+        if any(r.status in ["Pending", "Running"] for r in runs):
+            if any(r.status == "Running" for r in runs):
+                self._echo_once(
+                    f" {spin} Waiting for builds to finish, this can take several minutes..."
+                )
+            return
+        started = datetime.fromtimestamp(self._start_time, tz=timezone.utc)
+        fresh = any(r.created_at >= started for r in runs)
+        if not fresh and self._phase_elapsed() < self.build_grace:
+            # Finished runs may still belong to the previous revision
+            return
+        self.echo(f" {chk} All builds finished!")
+        for build in builds:
+            if build.last_run.status in ["Failed", "Error"]:
+                self.echo(
+                    f" {err} Build '{build.name}-{build.stage}' failed to start or while running!"
+                )
+                self.echo(
+                    f"Inspect Build Run logs with 'oceanum prax logs build {build.name} --project {project.name} --org {project.org} --stage {build.stage}' command !"
+                )
+                self._finish(False)
+                return
+            self.echo(
+                f" {chk} Build '{build.name}-{build.stage}' finished successfully!"
+            )
+        self.phase = DeploymentPhase.FINISH_UPDATING
+
+    def _on_finish_updating(self, project: models.ProjectDetailsSchema) -> None:
+        self._echo_once(f" {spin} Waiting for all stages to finish updating...")
+        stages = project.stages or []
+        if all(s.status in ["healthy", "error"] for s in stages):
+            self.echo(f" {chk} Project '{project.name}' finished being updated!")
+        elif self._phase_elapsed() > self.route_error_grace:
+            routes_error = False
+            for stage in stages:
+                for route in stage.resources.routes if stage.resources else []:
+                    status = getattr(
+                        route.next_revision_status, "root", route.next_revision_status
+                    )
+                    if status == "error":
+                        self.echo(
+                            f" {err} Route '{route.name}' at revision #{project.last_revision.number} failed to start!"
+                        )
+                        msg = (route.details or {}).get(
+                            "message", "No error message provided"
+                        )
+                        self.echo(
+                            f" {wrn} See container error details:{os.linesep}{os.linesep}{msg}"
+                        )
+                        routes_error = True
+            if not routes_error:
+                return
+        else:
+            return
+        self.report_routes(project)
+        self._finish(True)
+
+    def report_routes(self, project: models.ProjectDetailsSchema) -> None:
+        for stage in project.stages:
+            for route in stage.resources.routes if stage.resources else []:
+                urls = [f"https://{d}" for d in route.custom_domains] + [route.url]
+                if route.next_revision_status and str(route.next_revision_status) in [
+                    "error"
+                ]:
+                    self.echo(
+                        f" {err} Route '{route.name}' at revision #{project.last_revision.number} failed to start!"
+                    )
+                    if route.details:
+                        msg = route.details.get("message", "No error message provided")
+                    else:
+                        msg = "No error details provided"
+                    self.echo(f" {wrn} Error details:{os.linesep}{os.linesep}{msg}")
+                if route.status in ["online", "offline"]:
+                    s = "s" if len(urls) > 1 else ""
+                    self.echo(
+                        f" {chk} Route '{route.name}' is {_frs(route.status)} and available at URL{s}:"
+                    )
+                    for url in urls:
+                        self.echo(f" {globe} {url}")
+
+    def _snapshots(
+        self, **params
+    ) -> Iterator[models.ProjectDetailsSchema | models.ErrorResponse]:
+        if self.stream:
+            yield from self._stream_snapshots(**params)
+        while True:
+            yield self.client.get_project(**params)
+            self.client.deadline.sleep(self.backoff.next())
+
+    def _stream_snapshots(
+        self, project_name: str, **filters
+    ) -> Iterator[models.ProjectDetailsSchema | models.ErrorResponse]:
+        """
+        Yield a project snapshot for every event pushed by the project events
+        stream. Returns as soon as the stream is not available, so the caller
+        can fall back to polling.
+        """
+        while True:
+            try:
+                response, errs = self.client._request(
+                    "GET",
+                    f"projects/{project_name}/events",
+                    params=filters or None,
+                    headers={"Accept": "text/event-stream"},
+                    stream=True,
+                    timeout=(self.backoff.maximum, self.backoff.maximum),
+                )
+            except requests.exceptions.RequestException:
+                # The stream cannot be reached, e.g. through a proxy
+                return
+            content_type = getattr(response, "headers", {}).get("Content-Type", "")
+            if errs or not content_type.startswith("text/event-stream"):
+                if isinstance(response, requests.Response):
+                    response.close()
+                return
+            yield self.client.get_project(project_name, **filters)
+            try:
+                for data in iter_sse_data(response.iter_lines(decode_unicode=True)):
+                    yield self._parse_event(data, project_name, **filters)
+            except requests.exceptions.RequestException:
+                # Idle or dropped stream, poll once and reconnect
+                pass
+            finally:
+                response.close()
+            yield self.client.get_project(project_name, **filters)
+            self.client.deadline.sleep(self.backoff.next())
+
+    def _parse_event(
+        self, data: str, project_name: str, **filters
+    ) -> models.ProjectDetailsSchema | models.ErrorResponse:
+        try:
+            return models.ProjectDetailsSchema(**json.loads(data))
+        except (ValueError, TypeError, ValidationError):
+            # Events without a full project payload only signal a change
+            return self.client.get_project(project_name, **filters)
@@ -0,0 +1,561 @@
+from __future__ import annotations
+
+import fnmatch
+import gzip
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+import click
+import humanize
+import platformdirs
+
+from oceanum.cli.renderer import Renderer, RenderField, output_format_option
+from oceanum.cli.symbols import err, wrn
+
+from . import models
+from .logfilter import ARCHIVE_META_KEY, LogWriter, log_time, parse_time
+from .tail import FINISHED_RUN_STATUSES, LOG_KINDS, LogKind, ReplayFilter
+
+INDEX_FILE = "index.json"
+# Lines kept in the index to line up newly fetched logs with the archive
+RECENT_LINES = 200
+SEGMENT_LINES = 100_000
+# Growing tails requested until fetched logs overlap the archived ones
+SYNC_TAILS = [1_000, 10_000, 100_000, 1_000_000]
+# Lines fetched for a new archive are appended in chunks of this size
+SYNC_CHUNK_LINES = 10_000
+APPEND_FLUSH_LINES = 1_000
+APPEND_FLUSH_INTERVAL = 5.0
+
+FetchLogs = Callable[[int, bool], Iterable["bytes | str | models.ErrorResponse"]]
+
+
+def default_archive_dir() -> Path:
+    return Path(platformdirs.user_data_dir("oceanum", "Oceanum LTD.")) / "prax-logs"
+
+
+def archive_scope(ctx: click.Context) -> str:
+    """Domain and active organization the logs of a command belong to."""
+    token = ctx.obj.token
+    org = token.active_org if token else None
+    return f"{ctx.obj.domain}-{org}" if org else ctx.obj.domain
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "0").lower() in ["1", "true", "yes"]
+
+
+def _decode(line: bytes | str) -> str:
+    return line.decode("utf-8", errors="replace") if isinstance(line, bytes) else line
+
+
+def new_lines_offset(recent: list[str], fetched: list[str]) -> int | None:
+    """
+    Return the index of the first line of `fetched` that comes after the
+    `recent` archived lines, or None when the two do not overlap.
+    """
+    if not recent:
+        return 0
+    size = len(recent)
+    # The fetched logs contain every recent line, take the last occurrence
+    for end in range(len(fetched), size - 1, -1):
+        if fetched[end - 1] == recent[-1] and fetched[end - size : end] == recent:
+            return end
+    # The fetched logs start within the recent lines
+    for overlap in range(min(size, len(fetched)), 0, -1):
+        if fetched[:overlap] == recent[-overlap:]:
+            return overlap
+    return None
+
+
+class ArchivedLog:
+    """
+    Archived logs of one run or route, in gzip segments indexed by line
+    offset and time range.
+    """
+
+    def __init__(self, directory: Path, kind: LogKind, name: str) -> None:
+        self.directory = directory
+        self.index: dict[str, Any] = {
+            "kind": kind,
+            "name": name,
+            "complete": False,
+            "lines": 0,
+            "segments": [],
+            "recent": [],
+            "logged_at": None,
+        }
+        try:
+            with (directory / INDEX_FILE).open() as f:
+                self.index.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError):
+            # Without a readable index the segments cannot be trusted, start
+            # the archive again on the next sync
+            for path in directory.glob("*.log.gz"):
+                path.unlink(missing_ok=True)
+
+    @property
+    def kind(self) -> LogKind:
+        return self.index["kind"]
+
+    @property
+    def name(self) -> str:
+        return self.index["name"]
+
+    @property
+    def lines(self) -> int:
+        return self.index["lines"]
+
+    @property
+    def complete(self) -> bool:
+        return self.index["complete"]
+
+    @property
+    def recent(self) -> list[str]:
+        return self.index["recent"]
+
+    @property
+    def size(self) -> int:
+        return sum(
+            (self.directory / s["file"]).stat().st_size
+            for s in self.index["segments"]
+            if (self.directory / s["file"]).exists()
+        )
+
+    def update(self, **meta) -> None:
+        self.index.update({k: v for k, v in meta.items() if v is not None})
+
+    def save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index["updated_at"] = time.time()
+        path = self.directory / INDEX_FILE
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, path)
+
+    def append(self, lines: list[str], archived_at: float | None = None) -> None:
+        """Append lines to the archive, saving the index."""
+        if not lines:
+            return
+        archived_at = archived_at or time.time()
+        stamps = []
+        logged_at = self.index["logged_at"]
+        for line in lines:
+            if (parsed := log_time(line)) is not None:
+                logged_at = parsed.timestamp()
+            stamps.append(archived_at if logged_at is None else logged_at)
+        self.index["logged_at"] = logged_at
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segments = self.index["segments"]
+        start = 0
+        while start < len(lines):
+            if not segments or segments[-1]["lines"] >= SEGMENT_LINES:
+                segments.append(
+                    {
+                        "file": f"{len(segments):06d}.log.gz",
+                        "first_line": self.index["lines"],
+                        "lines": 0,
+                        "first_time": stamps[start],
+                        "last_time": stamps[start],
+                    }
+                )
+            segment = segments[-1]
+            end = start + SEGMENT_LINES - segment["lines"]
+            chunk, chunk_stamps = lines[start:end], stamps[start:end]
+            payload = "".join(
+                f"{stamp:.3f}\t{line}\n" for stamp, line in zip(chunk_stamps, chunk)
+            )
+            # Every append adds a gzip member, readers see them as one stream
+            path = self.directory / segment["file"]
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+            with os.fdopen(fd, "ab") as f, gzip.GzipFile(fileobj=f, mode="ab") as gz:
+                gz.write(payload.encode("utf-8"))
+            segment["lines"] += len(chunk)
+            # Lines are not always logged in order, keep the whole time range
+            segment["first_time"] = min(segment["first_time"], *chunk_stamps)
+            segment["last_time"] = max(segment["last_time"], *chunk_stamps)
+            self.index["lines"] += len(chunk)
+            start += len(chunk)
+        self.index["recent"] = (self.recent + lines)[-RECENT_LINES:]
+        self.save()
+
+    def _read_segment(self, segment: dict) -> Iterator[tuple[float, str]]:
+        try:
+            with gzip.open(self.directory / segment["file"], "rb") as f:
+                for raw in f:
+                    stamp, _, line = raw.rstrip(b"\n").partition(b"\t")
+                    yield float(stamp), line.decode("utf-8", errors="replace")
+        except FileNotFoundError:
+            return
+
+    def read(
+        self, since: datetime | None = None, until: datetime | None = None
+    ) -> Iterator[tuple[datetime, str]]:
+        """Yield (logged time, line) pairs, skipping segments out of range."""
+        start = since.timestamp() if since else None
+        end = until.timestamp() if until else None
+        for segment in self.index["segments"]:
+            if start is not None and segment["last_time"] < start:
+                continue
+            if end is not None and segment["first_time"] > end:
+                continue
+            for stamp, line in self._read_segment(segment):
+                if (start is None or stamp >= start) and (end is None or stamp <= end):
+                    yield datetime.fromtimestamp(stamp, tz=timezone.utc), line
+
+    def tail(self, count: int) -> list[str]:
+        """Return the last `count` archived lines."""
+        if count <= 0:
+            return []
+        needed = []
+        total = 0
+        for segment in reversed(self.index["segments"]):
+            needed.append(segment)
+            total += segment["lines"]
+            if total >= count:
+                break
+        last: deque[str] = deque(maxlen=count)
+        for segment in reversed(needed):
+            last.extend(line for _, line in self._read_segment(segment))
+        return list(last)
+
+    def sync(self, fetch: FetchLogs) -> int | models.ErrorResponse:
+        """
+        Fetch and archive the lines logged since the last sync, returning how
+        many were added.
+        """
+        if not self.recent:
+            return self._sync_new(fetch)
+        for tail in SYNC_TAILS:
+            fetched = []
+            for line in fetch(tail, False):
+                if isinstance(line, models.ErrorResponse):
+                    return line
+                fetched.append(_decode(line))
+            offset = new_lines_offset(self.recent, fetched)
+            if offset is None and len(fetched) >= tail and tail != SYNC_TAILS[-1]:
+                continue
+            new = fetched[offset or 0 :]
+            self.append(new)
+            return len(new)
+        return 0
+
+    def _sync_new(self, fetch: FetchLogs) -> int | models.ErrorResponse:
+        # A new archive starts with as much of the log as the API returns,
+        # appended in chunks rather than held in memory
+        added = 0
+        chunk: list[str] = []
+        for line in fetch(SYNC_TAILS[-1], False):
+            if isinstance(line, models.ErrorResponse):
+                return line
+            chunk.append(_decode(line))
+            if len(chunk) >= SYNC_CHUNK_LINES:
+                self.append(chunk)
+                added += len(chunk)
+                chunk = []
+        self.append(chunk)
+        return added + len(chunk)
+
+
+class LogArchive:
+    """
+    Local, append-only archive of run and route logs, one `ArchivedLog`
+    directory per run or route under a `scope` such as the domain and org.
+    """
+
+    def __init__(self, scope: str, directory: str | Path | None = None) -> None:
+        safe_scope = re.sub(r"[^A-Za-z0-9_.-]", "_", scope)
+        self.directory = (
+            Path(directory) if directory else default_archive_dir()
+        ) / safe_scope
+
+    @classmethod
+    def from_context(cls, ctx: click.Context) -> "LogArchive | None":
+        """
+        Return the archive when the command line options or the
+        PRAX_LOG_ARCHIVE env var turned it on.
+        """
+        enabled = ctx.meta.get(ARCHIVE_META_KEY)
+        if enabled is None:
+            enabled = _env_flag("PRAX_LOG_ARCHIVE")
+        return cls(archive_scope(ctx)) if enabled else None
+
+    def open(self, kind: LogKind, name: str) -> ArchivedLog:
+        return ArchivedLog(self.directory / kind / name, kind, name)
+
+    def list(
+        self, kinds: Iterable[LogKind] = LOG_KINDS, patterns: Iterable[str] = ()
+    ) -> list[ArchivedLog]:
+        patterns = list(patterns)
+        archived = []
+        for kind in kinds:
+            kind_dir = self.directory / kind
+            if not kind_dir.is_dir():
+                continue
+            for path in sorted(kind_dir.iterdir()):
+                if not (path / INDEX_FILE).exists():
+                    continue
+                log = ArchivedLog(path, kind, path.name)
+                names = [log.name, log.index.get("parent") or log.name]
+                if patterns and not any(
+                    fnmatch.fnmatchcase(n, p) for n in names for p in patterns
+                ):
+                    continue
+                archived.append(log)
+        return archived
+
+    def logs(
+        self,
+        kind: LogKind,
+        name: str,
+        fetch: FetchLogs,
+        lines: int,
+        follow: bool = False,
+        run: models.StagedRunSchema | None = None,
+    ) -> Iterator[str | models.ErrorResponse]:
+        """
+        Yield the last `lines` of a run or route logs from the archive, after
+        archiving the lines logged since the last call.
+        """
+        log = self.open(kind, name)
+        if run is not None:
+            log.update(
+                parent=run.parent,
+                project=run.project,
+                stage=run.stage,
+                org=run.org,
+                status=run.status,
+            )
+        if not log.complete:
+            synced = log.sync(fetch)
+            if isinstance(synced, models.ErrorResponse):
+                yield synced
+                return
+            if run is not None and run.status.lower() in FINISHED_RUN_STATUSES:
+                # Nothing is logged after a run finished
+                log.update(complete=True)
+            log.save()
+        yield from log.tail(lines)
+        if not follow or log.complete:
+            return
+        replay = ReplayFilter(history=RECENT_LINES)
+        replay.seen.extend(log.recent)
+        tail = replay.reconnect()
+        pending: list[str] = []
+        flushed_at = time.monotonic()
+        try:
+            for line in fetch(tail or lines, True):
+                if isinstance(line, models.ErrorResponse):
+                    yield line
+                    return
+                for new in replay.feed(_decode(line)):
+                    pending.append(new)
+                    yield new
+                if (
+                    len(pending) >= APPEND_FLUSH_LINES
+                    or time.monotonic() - flushed_at >= APPEND_FLUSH_INTERVAL
+                ):
+                    log.append(pending)
+                    pending = []
+                    flushed_at = time.monotonic()
+            for new in replay.flush():
+                pending.append(new)
+                yield new
+        finally:
+            log.append(pending)
+
+
+def log_stream(
+    ctx: click.Context,
+    kind: LogKind,
+    name: str,
+    fetch: FetchLogs,
+    lines: int,
+    follow: bool,
+    run: models.StagedRunSchema | None = None,
+) -> Iterable[bytes | str | models.ErrorResponse]:
+    """
+    Return the log lines of a run or route, through the local archive when
+    it is turned on.
+    """
+    archive = LogArchive.from_context(ctx)
+    if archive is None:
+        return fetch(lines, follow)
+    return archive.logs(kind, name, fetch, lines, follow, run=run)
+
+
+kind_option = click.option(
+    "-k",
+    "--kind",
+    "kinds",
+    help="Kind of archived logs, can be repeated, defaults to all",
+    multiple=True,
+    type=click.Choice(LOG_KINDS),
+)
+match_option = click.option(
+    "-m",
+    "--match",
+    "patterns",
+    help="Only archived logs of runs, or their Task, Pipeline or Build, "
+    "with names matching this glob pattern, can be repeated",
+    multiple=True,
+    type=str,
+)
+
+
+def _archived_filter(
+    archived: list[ArchivedLog], project: str | None, stage: str | None
+) -> list[ArchivedLog]:
+    return [
+        log
+        for log in archived
+        if (project is None or log.index.get("project") == project)
+        and (stage is None or log.index.get("stage") == stage)
+    ]
+
+
+@click.command(name="archived-logs", help="List logs in the local archive")
+@click.pass_context
+@kind_option
+@match_option
+@click.option("--project", help="Set Project Name", required=False, type=str)
+@click.option("--stage", help="Set Project Stage", required=False, type=str)
+@output_format_option
+def list_archived_logs(
+    ctx: click.Context,
+    kinds: tuple[LogKind, ...],
+    patterns: tuple[str, ...],
+    project: str | None,
+    stage: str | None,
+    output: str,
+):
+    archived = _archived_filter(
+        LogArchive(archive_scope(ctx)).list(kinds or LOG_KINDS, patterns),
+        project,
+        stage,
+    )
+    if not archived:
+        click.echo(f" {wrn} No archived logs found!")
+        return
+    data = [
+        {
+            "kind": log.kind,
+            "name": log.name,
+            "parent": log.index.get("parent"),
+            "project": log.index.get("project"),
+            "stage": log.index.get("stage"),
+            "status": log.index.get("status"),
+            "lines": log.lines,
+            "size": log.size,
+            "updated_at": datetime.fromtimestamp(
+                log.index.get("updated_at", 0), tz=timezone.utc
+            ).isoformat(),
+        }
+        for log in archived
+    ]
+    fields = [
+        RenderField(label="Kind", path="$.kind"),
+        RenderField(label="Name", path="$.name"),
+        RenderField(label="Parent", path="$.parent", mod=lambda x: x or ""),
+        RenderField(label="Project", path="$.project", mod=lambda x: x or ""),
+        RenderField(label="Stage", path="$.stage", mod=lambda x: x or ""),
+        RenderField(label="Status", path="$.status", mod=lambda x: x or ""),
+        RenderField(label="Lines", path="$.lines"),
+        RenderField(
+            label="Size",
+            path="$.size",
+            mod=lambda x: humanize.naturalsize(x, binary=True),
+        ),
+        RenderField(label="Archived at", path="$.updated_at"),
+    ]
+    click.echo(Renderer(data=data, fields=fields).render(output_format=output))
+
+
+def _parse_time_option(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> datetime | None:
+    if value is None:
+        return None
+    try:
+        return parse_time(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e), ctx=ctx, param=param)
+
+
+@click.command(name="search", help="Search the local log archive")
+@click.pass_context
+@click.argument("pattern", type=str)
+@kind_option
+@match_option
+@click.option("--project", help="Set Project Name", required=False, type=str)
+@click.option("--stage", help="Set Project Stage", required=False, type=str)
+@click.option(
+    "-i", "--ignore-case", help="Ignore case", default=False, is_flag=True, type=bool
+)
+@click.option(
+    "--since",
+    help="Only lines logged after this time, as an ISO datetime or a duration like 15m",
+    callback=_parse_time_option,
+)
+@click.option(
+    "--until",
+    help="Only lines logged before this time, as an ISO datetime or a duration like 15m",
+    callback=_parse_time_option,
+)
+@click.option(
+    "--max-count",
+    help="Stop after this many matching lines",
+    default=None,
+    type=click.IntRange(min=1),
+)
+def search_logs(
+    ctx: click.Context,
+    pattern: str,
+    kinds: tuple[LogKind, ...],
+    patterns: tuple[str, ...],
+    project: str | None,
+    stage: str | None,
+    ignore_case: bool,
+    since: datetime | None,
+    until: datetime | None,
+    max_count: int | None,
+):
+    try:
+        regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+    except re.error as e:
+        click.echo(f" {err} Invalid regular expression '{pattern}': {e}")
+        sys.exit(2)
+    archived = _archived_filter(
+        LogArchive(archive_scope(ctx)).list(kinds or LOG_KINDS, patterns),
+        project,
+        stage,
+    )
+    if not archived:
+        click.echo(f" {wrn} No archived logs found!")
+        return
+    matches = 0
+    with LogWriter() as writer:
+        for log in archived:
+            prefix = click.style(f"{log.kind}/{log.name}", fg="cyan")
+            for archived_at, line in log.read(since, until):
+                if not regex.search(line):
+                    continue
+                writer.write(f"{prefix} {archived_at:%Y-%m-%d %H:%M:%S} | {line}")
+                matches += 1
+                if max_count is not None and matches >= max_count:
+                    break
+            if max_count is not None and matches >= max_count:
+                break
+    if not matches:
+        sys.exit(1)
@@ -0,0 +1,407 @@
+from __future__ import annotations
+
+import copy
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable
+
+import click
+
+from . import models
+
+LOG_FILTER_META_KEY = "oceanum.prax.logfilter"
+ARCHIVE_META_KEY = "oceanum.prax.logarchive"
+
+DEFAULT_BATCH_SIZE = 512
+DEFAULT_FLUSH_INTERVAL = 0.2
+
+LEVELS = {
+    "trace": 5,
+    "debug": 10,
+    "info": 20,
+    "notice": 25,
+    "warn": 30,
+    "warning": 30,
+    "err": 40,
+    "error": 40,
+    "critical": 50,
+    "fatal": 50,
+}
+LEVEL_CHOICES = ["debug", "info", "warning", "error", "critical"]
+
+_JSON_LEVEL_KEYS = ["level", "levelname", "severity", "lvl", "log.level"]
+_JSON_TIME_KEYS = ["time", "timestamp", "ts", "@timestamp", "asctime", "t"]
+
+_TEXT_LEVEL = re.compile(
+    r"\b(?:level|lvl|severity)=\"?(?P<kv>[A-Za-z]+)"
+    r"|\b(?P<word>TRACE|DEBUG|INFO|NOTICE|WARNING|WARN|ERROR|CRITICAL|FATAL)\b"
+)
+_TEXT_TIME = re.compile(
+    r"^\W{0,2}(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?)"
+)
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)([smhdw])$")
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_duration(value: str) -> float | None:
+    """Parse a duration such as 30s, 15m, 2h or 1d into seconds."""
+    if match := _DURATION.match(value.strip()):
+        return float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+    return None
+
+
+def parse_time(value: str) -> datetime:
+    """
+    Parse an ISO 8601 datetime, or a duration such as 30s, 15m, 2h or 1d
+    counted back from now. Naive datetimes are in local time.
+    """
+    value = value.strip()
+    if (seconds := parse_duration(value)) is not None:
+        return datetime.now(tz=timezone.utc) - timedelta(seconds=seconds)
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(
+            f"Invalid time '{value}', expected an ISO datetime or a duration like 15m"
+        ) from None
+    return parsed if parsed.tzinfo else parsed.astimezone()
+
+
+def _parse_log_time(value: Any) -> datetime | None:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # Epoch seconds, or milliseconds from JavaScript loggers
+        seconds = value / 1000 if value > 1e11 else value
+        try:
+            return datetime.fromtimestamp(seconds, tz=timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            return None
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.replace(",", "."))
+        except ValueError:
+            return None
+        # Containers log in UTC unless they say otherwise
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    return None
+
+
+def _lookup(record: dict, path: str) -> Any:
+    if path in record:
+        return record[path]
+    value: Any = record
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _record_time(record: dict) -> datetime | None:
+    for key in _JSON_TIME_KEYS:
+        if (logged_at := _parse_log_time(_lookup(record, key))) is not None:
+            return logged_at
+    return None
+
+
+def log_time(line: str) -> datetime | None:
+    """
+    Return the time a line was logged, from the fields of a JSON log record
+    or the start of a plain text line, or None when it has no timestamp.
+    """
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if isinstance(record, dict):
+            return _record_time(record)
+    if match := _TEXT_TIME.match(line):
+        return _parse_log_time(match.group(1))
+    return None
+
+
+class LogFilter:
+    """
+    Streaming filter for log lines, keeping state between lines, use `fork`
+    for another log stream.
+    """
+
+    def __init__(
+        self,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        level: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        fields: Iterable[str] = (),
+    ) -> None:
+        self.include = [re.compile(p) for p in include]
+        self.exclude = [re.compile(p) for p in exclude]
+        self.level = LEVELS[level.lower()] if level else None
+        self.since = since
+        self.until = until
+        self.fields = list(fields)
+        self._parse = bool(self.level is not None or since or until or self.fields)
+        self._last_level: int | None = None
+        self._last_time: datetime | None = None
+
+    @classmethod
+    def from_context(cls, ctx: click.Context) -> "LogFilter | None":
+        """
+        Return the filter set by the command line options, None when no
+        filtering was asked for.
+        """
+        options = ctx.meta.get(LOG_FILTER_META_KEY)
+        if not options or not any(options.values()):
+            return None
+        return cls(**options)
+
+    @property
+    def active(self) -> bool:
+        return bool(self.include or self.exclude or self._parse)
+
+    def fork(self) -> "LogFilter":
+        forked = copy.copy(self)
+        forked._last_level = None
+        forked._last_time = None
+        return forked
+
+    def __call__(self, line: str) -> str | None:
+        """Return the line to show, or None to drop it."""
+        if self.include and not any(p.search(line) for p in self.include):
+            return None
+        if self.exclude and any(p.search(line) for p in self.exclude):
+            return None
+        if not self._parse:
+            return line
+        record = None
+        if line.startswith("{"):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                pass
+        if isinstance(record, dict):
+            level, logged_at = self._parse_record(record)
+        else:
+            record = None
+            level, logged_at = self._parse_text(line)
+        if level is None and logged_at is None:
+            level, logged_at = self._last_level, self._last_time
+        else:
+            self._last_level, self._last_time = level, logged_at
+        if self.level is not None and level is not None and level < self.level:
+            return None
+        if logged_at is not None:
+            if self.since is not None and logged_at < self.since:
+                return None
+            if self.until is not None and logged_at > self.until:
+                return None
+        elif self.since is not None or self.until is not None:
+            return None
+        if record is not None and self.fields:
+            values = [_lookup(record, f) for f in self.fields]
+            return " ".join(v if isinstance(v, str) else json.dumps(v) for v in values)
+        return line
+
+    def _parse_record(self, record: dict) -> tuple[int | None, datetime | None]:
+        level = None
+        for key in _JSON_LEVEL_KEYS:
+            value = _lookup(record, key)
+            if isinstance(value, str) and value.lower() in LEVELS:
+                level = LEVELS[value.lower()]
+                break
+            if isinstance(value, int) and not isinstance(value, bool):
+                # Numeric levels follow the Python logging scale
+                level = value
+                break
+        return level, _record_time(record)
+
+    def _parse_text(self, line: str) -> tuple[int | None, datetime | None]:
+        level = logged_at = None
+        if self.level is not None and (match := _TEXT_LEVEL.search(line, 0, 200)):
+            name = (match.group("kv") or match.group("word")).lower()
+            level = LEVELS.get(name)
+        if (self.since or self.until) and (match := _TEXT_TIME.match(line)):
+            logged_at = _parse_log_time(match.group(1))
+        return level, logged_at
+
+
+class LogWriter:
+    """
+    Write log lines to stdout in batches rather than one call per line.
+
+    A batch is written once it holds `batch_size` lines, or when `interval`
+    seconds passed since the last write. Used as a context manager, a
+    background thread also writes pending lines of a quiet followed stream.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        interval: float = DEFAULT_FLUSH_INTERVAL,
+        color: bool | None = None,
+    ) -> None:
+        self.batch_size = batch_size
+        self.interval = interval
+        self.color = color
+        self._batch: list[str] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._closed = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "LogWriter":
+        self._thread = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self.interval):
+            if time.monotonic() - self._last_flush >= self.interval:
+                self.flush()
+
+    def write(self, line: str) -> None:
+        with self._lock:
+            self._batch.append(line)
+            if (
+                len(self._batch) < self.batch_size
+                and time.monotonic() - self._last_flush < self.interval
+            ):
+                return
+            batch, self._batch = self._batch, []
+            self._last_flush = time.monotonic()
+            click.echo("\n".join(batch), color=self.color)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if self._batch:
+                batch, self._batch = self._batch, []
+                click.echo("\n".join(batch), color=self.color)
+
+
+def write_logs(
+    lines: Iterable[bytes | str | models.ErrorResponse],
+    log_filter: LogFilter | None = None,
+) -> models.ErrorResponse | None:
+    """
+    Write a log stream through `log_filter` in batches, returning the error
+    that interrupted the stream if any.
+    """
+    if log_filter is not None and not log_filter.active:
+        log_filter = None
+    with LogWriter() as writer:
+        for line in lines:
+            if isinstance(line, models.ErrorResponse):
+                return line
+            if isinstance(line, bytes):
+                line = line.decode("utf-8", errors="replace")
+            if log_filter is not None and (line := log_filter(line)) is None:
+                continue
+            writer.write(line)
+    return None
+
+
+def _store_option(name: str) -> Callable[[click.Context, click.Parameter, Any], Any]:
+    def callback(ctx: click.Context, param: click.Parameter, value: Any) -> Any:
+        if name in ("since", "until") and value is not None:
+            try:
+                value = parse_time(value)
+            except ValueError as e:
+                raise click.BadParameter(str(e), ctx=ctx, param=param)
+        elif name in ("include", "exclude"):
+            for pattern in value:
+                try:
+                    re.compile(pattern)
+                except re.error as e:
+                    raise click.BadParameter(
+                        f"Invalid regular expression '{pattern}': {e}",
+                        ctx=ctx,
+                        param=param,
+                    )
+        ctx.meta.setdefault(LOG_FILTER_META_KEY, {})[name] = value
+        return value
+
+    return callback
+
+
+def log_filter_options(func: Callable) -> Callable:
+    """
+    Add the log filtering options to a log command, read them back with
+    `LogFilter.from_context`.
+    """
+    options = [
+        click.option(
+            "-g",
+            "--grep",
+            help="Show only lines matching this regular expression, can be repeated",
+            multiple=True,
+            expose_value=False,
+            callback=_store_option("include"),
+        ),
+        click.option(
+            "--exclude",
+            help="Hide lines matching this regular expression, can be repeated",
+            multiple=True,
+            expose_value=False,
+            callback=_store_option("exclude"),
+        ),
+        click.option(
+            "--level",
+            help="Show only lines of this level or above",
+            type=click.Choice(LEVEL_CHOICES, case_sensitive=False),
+            expose_value=False,
+            callback=_store_option("level"),
+        ),
+        click.option(
+            "--since",
+            help="Show only lines logged after this time, as an ISO datetime or a duration like 15m",
+            expose_value=False,
+            callback=_store_option("since"),
+        ),
+        click.option(
+            "--until",
+            help="Show only lines logged before this time, as an ISO datetime or a duration like 15m",
+            expose_value=False,
+            callback=_store_option("until"),
+        ),
+        click.option(
+            "--field",
+            help="Show only this field of JSON log lines, can be repeated",
+            multiple=True,
+            expose_value=False,
+            callback=_store_option("fields"),
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def _store_archive(ctx: click.Context, param: click.Parameter, value: Any) -> Any:
+    ctx.meta[ARCHIVE_META_KEY] = value
+    return value
+
+
+def log_archive_option(func: Callable) -> Callable:
+    """
+    Add the --archive/--no-archive option to a log command, read it back with
+    `LogArchive.from_context`.
+    """
+    return click.option(
+        "--archive/--no-archive",
+        help="Keep the logs in a local archive and only fetch new lines, "
+        "defaults to the PRAX_LOG_ARCHIVE env var",
+        default=None,
+        expose_value=False,
+        callback=_store_archive,
+    )(func)
@@ -1,12 +1,49 @@
+import importlib
+
+import click
+
 from oceanum.cli import main
 
+from .deadline import deadline_option
+from .profiling import profile_option
+from .tracing import trace_options
+
+
+class LazyGroup(click.Group):
+    """
+    Group whose `lazy_commands`, name to "module:command" relative to this
+    package, are only imported once they are invoked or listed.
+    """
+
+    def __init__(self, *args, lazy_commands: dict[str, str] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return sorted([*super().list_commands(ctx), *self.lazy_commands])
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        if cmd_name not in self.lazy_commands:
+            return super().get_command(ctx, cmd_name)
+        module_name, command_name = self.lazy_commands[cmd_name].split(":")
+        module = importlib.import_module(f".{module_name}", __package__)
+        return getattr(module, command_name)
+
 
 @main.group(name="prax", help="Oceanum PRAX Projects Management")
+@deadline_option
+@trace_options
+@profile_option
 def prax():
     pass
 
 
-@prax.group(name="list", help="List resources")
+@prax.group(
+    name="list",
+    help="List resources",
+    cls=LazyGroup,
+    lazy_commands={"archived-logs": "logarchive:list_archived_logs"},
+)
 def list_group():
     pass
 
@@ -61,7 +98,12 @@ def allow():
     pass
 
 
-@prax.group(name="logs", help="View container logs")
+@prax.group(
+    name="logs",
+    help="View container logs",
+    cls=LazyGroup,
+    lazy_commands={"tail": "tail:tail_logs", "search": "logarchive:search_logs"},
+)
 def logs():
     pass
 
@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+from graphlib import CycleError, TopologicalSorter
+from typing import TYPE_CHECKING, Any, Iterator
+
+import click
+import humanize
+import requests
+from tabulate import tabulate
+
+from oceanum.cli.symbols import chk, err, info, spin, wrn
+
+from . import models
+from .concurrency import DEFAULT_CONCURRENCY, bounded_map
+from .deadline import DeadlineExceeded
+from .deployment import Backoff, DeploymentWaiter, deployment_failed
+from .specdiff import project_secret_digests, record_secrets, spec_patch
+from .watch import WatchScreen
+
+if TYPE_CHECKING:
+    from .client import PRAXClient
+    from .secretsync import SecretDigests
+
+# Errors of one deployment's requests, CircuitOpenError included, that fail
+# that deployment only
+DEPLOYMENT_ERRORS = (requests.exceptions.RequestException, DeadlineExceeded)
+
+
+def image_repository(image: str) -> str:
+    """Image name without its tag or digest, e.g. 'ghcr.io/org/app'."""
+    image = image.split("@")[0]
+    name, _, tag = image.rpartition(":")
+    if name and "/" not in tag:
+        image = name
+    return image.lower()
+
+
+def _images(value: Any, key: str | None = None) -> Iterator[str]:
+    if isinstance(value, dict):
+        if key in ("image", "baseImage") and isinstance(value.get("name"), str):
+            yield value["name"]
+        for name, child in value.items():
+            if name == "destinations":
+                continue
+            yield from _images(child, name)
+    elif isinstance(value, list):
+        for child in value:
+            yield from _images(child, key)
+    elif key in ("image", "baseImage") and isinstance(value, str):
+        yield value
+
+
+def image_dependencies(specs: dict[str, models.ProjectSpec]) -> dict[str, set[str]]:
+    """
+    Map each project to the other projects building the images it uses, from
+    the destinations of their builds.
+    """
+    builders: dict[str, set[str]] = {}
+    documents = {}
+    for name, spec in specs.items():
+        documents[name] = spec.model_dump(exclude_none=True, by_alias=True, mode="json")
+        for build in documents[name].get("resources", {}).get("builds", []):
+            for destination in build.get("destinations", []):
+                builders.setdefault(image_repository(destination), set()).add(name)
+    return {
+        name: {
+            builder
+            for image in _images(document.get("resources", {}))
+            for builder in builders.get(image_repository(image), ())
+            if builder != name
+        }
+        for name, document in documents.items()
+    }
+
+
+class ProjectDeployment:
+    """Deployment of one project spec and its progress."""
+
+    def __init__(
+        self, specfile: str, spec: models.ProjectSpec, org: str, user: str
+    ) -> None:
+        self.specfile = specfile
+        self.spec = spec
+        self.params = {"project_name": spec.name, "org": org, "user": user}
+        self.depends_on: set[str] = set()
+        self.status = "queued"
+        self.message = ""
+        self.revision: int | None = None
+        self.waiter: DeploymentWaiter | None = None
+        self.started: float | None = None
+        self.finished: float | None = None
+
+    @property
+    def name(self) -> str:
+        return self.spec.name
+
+    @property
+    def duration(self) -> float | None:
+        if self.started is None:
+            return None
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status in ("deployed", "unchanged", "submitted")
+
+    def finish(self, status: str, message: str = "") -> None:
+        self.status = status
+        if message:
+            self.message = message
+        self.finished = time.monotonic()
+
+
+class DeployOrchestrator:
+    """
+    Deploy many projects concurrently, each once the projects building the
+    images it uses finished deploying, following them from one polling loop.
+    """
+
+    def __init__(
+        self,
+        client: PRAXClient,
+        deployments: list[ProjectDeployment],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        wait: bool = True,
+        full: bool = False,
+        initial_interval: float = 1.0,
+        max_interval: float = 15.0,
+        screen: WatchScreen | None = None,
+    ) -> None:
+        self.client = client
+        self.deployments = {d.name: d for d in deployments}
+        self.concurrency = concurrency
+        self.wait = wait
+        self.full = full
+        self.backoff = Backoff(initial_interval, max_interval)
+        self.screen = screen or WatchScreen()
+        self.start = time.monotonic()
+        dependencies = image_dependencies({d.name: d.spec for d in deployments})
+        for name, depends_on in dependencies.items():
+            self.deployments[name].depends_on = depends_on
+
+    def order(self) -> list[list[str]]:
+        """
+        Return the projects in groups that can be deployed together, each
+        after the groups before it.
+        """
+        sorter = self._sorter()
+        groups = []
+        while sorter.is_active():
+            ready = sorted(sorter.get_ready())
+            groups.append(ready)
+            sorter.done(*ready)
+        return groups
+
+    def _sorter(self) -> TopologicalSorter:
+        sorter = TopologicalSorter(
+            {name: d.depends_on for name, d in self.deployments.items()}
+        )
+        try:
+            sorter.prepare()
+        except CycleError as e:
+            cycle = " -> ".join(e.args[1])
+            raise click.UsageError(f"Circular image dependencies: {cycle}")
+        return sorter
+
+    def _update(self, deployment: ProjectDeployment, message: str) -> None:
+        deployment.message = message.strip()
+        if not self.screen.tty:
+            click.echo(f" [{deployment.name}] {deployment.message}")
+
+    def _digests(self, deployment: ProjectDeployment) -> SecretDigests:
+        return project_secret_digests(
+            self.client.service or "", deployment.params["org"], deployment.name
+        )
+
+    def _patch(
+        self,
+        deployment: ProjectDeployment,
+        project: models.ProjectDetailsSchema | None,
+    ) -> list[models.JSONPatchOpSchema] | None:
+        if self.full or project is None or project.last_revision is None:
+            return None
+        ops = spec_patch(
+            project.last_revision.spec, deployment.spec, self._digests(deployment)
+        )
+        if not ops and deployment_failed(project):
+            # Deploy the same spec again as a new revision
+            return None
+        return ops
+
+    def _submit(self, deployment: ProjectDeployment) -> ProjectDeployment:
+        deployment.started = time.monotonic()
+        deployment.status = "submitting"
+        try:
+            return self._send(deployment)
+        except DEPLOYMENT_ERRORS as e:
+            deployment.finish("failed", f"{err} {e}")
+            return deployment
+
+    def _send(self, deployment: ProjectDeployment) -> ProjectDeployment:
+        project = self.client.get_project(**deployment.params)
+        if isinstance(project, models.ErrorResponse):
+            if "not found" not in str(project.detail).lower():
+                deployment.finish("failed", f"{err} {project.detail}")
+                return deployment
+            project = None
+        ops = self._patch(deployment, project)
+        if ops is not None and not ops:
+            deployment.finish("unchanged", f"{chk} No changes to the project spec")
+            return deployment
+        org, user = deployment.params["org"], deployment.params["user"]
+        if ops:
+            result = self.client.patch_project(deployment.name, ops, org=org, user=user)
+        else:
+            result = self.client.deploy_project(deployment.spec)
+        if isinstance(result, models.ErrorResponse):
+            deployment.finish("failed", f"{err} {result.detail}")
+            return deployment
+        record_secrets(self._digests(deployment), deployment.spec)
+        if not self.wait:
+            deployment.finish("submitted", f"{chk} Deployment submitted")
+        else:
+            deployment.status = "deploying"
+            deployment.waiter = DeploymentWaiter(
+                self.client,
+                echo=lambda message: self._update(deployment, message),
+            )
+        return deployment
+
+    def _poll(self, deploying: list[ProjectDeployment]) -> list[ProjectDeployment]:
+        """Advance the deployments with a snapshot each, returning finished ones."""
+        finished = []
+        snapshots = bounded_map(self._snapshot, deploying, self.concurrency)
+        for deployment, project in snapshots:
+            if isinstance(project, Exception):
+                deployment.finish("failed", f"{err} {project}")
+                finished.append(deployment)
+                continue
+            waiter = deployment.waiter
+            if isinstance(project, models.ProjectDetailsSchema):
+                if project.last_revision is not None:
+                    deployment.revision = project.last_revision.number
+            if waiter is not None and waiter.advance(project):
+                deployment.finish("deployed" if waiter.succeeded else "failed")
+                finished.append(deployment)
+            elif waiter is not None:
+                deployment.status = waiter.phase.value
+        return finished
+
+    def _snapshot(
+        self, deployment: ProjectDeployment
+    ) -> models.ProjectDetailsSchema | models.ErrorResponse | Exception:
+        try:
+            return self.client.get_project(**deployment.params)
+        except DEPLOYMENT_ERRORS as e:
+            return e
+
+    def board(self) -> list[str]:
+        rows = []
+        for deployment in self.deployments.values():
+            duration = deployment.duration
+            rows.append(
+                [
+                    deployment.name,
+                    deployment.status,
+                    f"{duration:.0f}s" if duration is not None else "",
+                    deployment.message,
+                ]
+            )
+        done = sum(d.finished is not None for d in self.deployments.values())
+        elapsed = timedelta(seconds=time.monotonic() - self.start)
+        status = (
+            f" {spin} {done} of {len(self.deployments)} projects finished, "
+            f"{humanize.naturaldelta(elapsed)} elapsed"
+        )
+        lines = tabulate(rows, headers=["Project", "Status", "Time", ""]).splitlines()
+        return lines + [status]
+
+    def draw(self) -> None:
+        if self.screen.tty:
+            self.screen.draw(self.board())
+
+    def run(self) -> bool:
+        """Deploy every project, returning whether all of them succeeded."""
+        sorter = self._sorter()
+        deploying: list[ProjectDeployment] = []
+        while sorter.is_active():
+            ready = []
+            for name in sorted(sorter.get_ready()):
+                deployment = self.deployments[name]
+                failed = [
+                    d
+                    for d in deployment.depends_on
+                    if not self.deployments[d].succeeded
+                ]
+                if failed:
+                    deployment.finish(
+                        "blocked", f"{wrn} Depends on {', '.join(sorted(failed))}"
+                    )
+                    sorter.done(name)
+                else:
+                    ready.append(deployment)
+            for deployment, _ in bounded_map(self._submit, ready, self.concurrency):
+                if deployment.waiter is None:
+                    self._update(deployment, deployment.message)
+                    sorter.done(deployment.name)
+                else:
+                    deploying.append(deployment)
+            self.draw()
+            if not deploying:
+                continue
+            finished = self._poll(deploying)
+            for deployment in finished:
+                deploying.remove(deployment)
+                sorter.done(deployment.name)
+            self.draw()
+            if finished:
+                self.backoff.reset()
+            elif deploying:
+                try:
+                    self.client.deadline.sleep(self.backoff.next())
+                except DeadlineExceeded as e:
+                    for deployment in self.deployments.values():
+                        if deployment.finished is None:
+                            deployment.finish("failed", f"{err} {e}")
+                    self.draw()
+                    break
+        return all(d.succeeded for d in self.deployments.values())
+
+    def summary(self) -> None:
+        rows = [
+            [
+                d.name,
+                d.status,
+                f"#{d.revision}" if d.revision is not None else "",
+                humanize.naturaldelta(timedelta(seconds=d.duration))
+                if d.duration is not None
+                else "",
+                ", ".join(sorted(d.depends_on)),
+            ]
+            for d in self.deployments.values()
+        ]
+        click.echo()
+        click.echo(
+            tabulate(
+                rows,
+                headers=["Project", "Result", "Revision", "Duration", "Depends on"],
+            )
+        )
+        failed = [d for d in self.deployments.values() if not d.succeeded]
+        elapsed = timedelta(seconds=time.monotonic() - self.start)
+        if failed:
+            click.echo(
+                f" {err} {len(failed)} of {len(self.deployments)} projects failed "
+                f"to deploy in {humanize.naturaldelta(elapsed)}!"
+            )
+        else:
+            click.echo(
+                f" {chk} {len(self.deployments)} projects deployed in "
+                f"{humanize.naturaldelta(elapsed)}"
+            )
+
+    def dry_run(self) -> None:
+        """Print the deployment order and the changes of every project."""
+
+        def changes(deployment: ProjectDeployment) -> str:
+            try:
+                project = self.client.get_project(**deployment.params)
+            except DEPLOYMENT_ERRORS as e:
+                return f"{err} {e}"
+            if isinstance(project, models.ErrorResponse):
+                if "not found" in str(project.detail).lower():
+                    return "new project"
+                return f"{err} {project.detail}"
+            ops = self._patch(deployment, project)
+            if ops is None:
+                return "whole spec"
+            return f"{len(ops)} changes" if ops else "no changes"
+
+        groups = self.order()
+        found = dict(bounded_map(changes, self.deployments.values(), self.concurrency))
+        rows = [
+            [i, d.name, found[d], ", ".join(sorted(d.depends_on))]
+            for i, group in enumerate(groups, 1)
+            for d in (self.deployments[name] for name in group)
+        ]
+        s = "s" if len(groups) != 1 else ""
+        click.echo(
+            f" {info} {len(self.deployments)} projects in {len(groups)} step{s}:"
+        )
+        click.echo(tabulate(rows, headers=["Step", "Project", "Changes", "Depends on"]))
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import cProfile
+import pstats
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable
+
+import click
+from tabulate import tabulate
+
+from oceanum.cli.symbols import chk, info, wrn
+
+PROFILE_META_KEY = "oceanum.prax.profile"
+
+# Suffixes of the files written as folded stacks, pstats otherwise
+FOLDED_SUFFIXES = (".folded", ".txt")
+
+PHASES = ["Imports", "Requests", "Validation", "Rendering", "Other"]
+
+# Stack walks stop below this many seconds, so rarely called functions
+# reachable through many paths do not blow up the number of stacks
+_MIN_STACK_TIME = 1e-6
+_MAX_STACK_DEPTH = 200
+
+Func = tuple[str, int, str]
+
+
+def _path_is(filename: str, *parts: str) -> bool:
+    return Path(filename).parts[-len(parts) :] == parts
+
+
+def phase(func: Func) -> str | None:
+    """Phase of the command a profiled function belongs to, if any."""
+    filename, _, name = func
+    if name == "_find_and_load":
+        return "Imports"
+    if _path_is(filename, "requests", "sessions.py") and name == "request":
+        return "Requests"
+    if _path_is(filename, "prax", "client.py") and name == "validate_data":
+        return "Validation"
+    if (
+        _path_is(filename, "cli", "renderer.py")
+        or (_path_is(filename, "tabulate", "__init__.py") and name == "tabulate")
+        or (
+            _path_is(filename, "prax", "utils.py")
+            and name in ("echo_rows", "table_rows")
+        )
+        or (_path_is(filename, "click", "utils.py") and name == "echo")
+    ):
+        return "Rendering"
+    return None
+
+
+def label(func: Func) -> str:
+    filename, lineno, name = func
+    if filename == "~":
+        # Built-in functions
+        return name.replace(";", ",")
+    return f"{name} ({Path(filename).name}:{lineno})".replace(";", ",")
+
+
+def folded_stacks(stats: pstats.Stats) -> dict[tuple[Func, ...], float]:
+    """
+    Rebuild call stacks from a profile call graph, splitting the time of a
+    function between its callers, with the seconds spent in each stack.
+    """
+    entries: dict[Func, Any] = stats.stats  # type: ignore[attr-defined]
+    callees: dict[Func, dict[Func, float]] = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge[3]
+    stacks: dict[tuple[Func, ...], float] = {}
+
+    def visit(func: Func, stack: tuple[Func, ...], weight: float) -> None:
+        stack = stack + (func,)
+        own = entries[func][2] * weight
+        if own > 0:
+            stacks[stack] = stacks.get(stack, 0.0) + own
+        if len(stack) >= _MAX_STACK_DEPTH:
+            return
+        for callee, edge_time in callees.get(func, {}).items():
+            total = entries[callee][3]
+            if callee in stack or total <= 0 or edge_time * weight < _MIN_STACK_TIME:
+                continue
+            visit(callee, stack, weight * min(edge_time / total, 1.0))
+
+    for func, (_, _, _, total, callers) in entries.items():
+        # Functions also start stacks for the share of their time spent under
+        # callers that were already running when profiling started
+        known = sum(
+            edge[3]
+            for caller, edge in callers.items()
+            if caller in entries and caller != func
+        )
+        if total > 0 and total - known >= _MIN_STACK_TIME:
+            visit(func, (), (total - known) / total)
+    return stacks
+
+
+class CommandProfiler:
+    """
+    Profile a whole command with cProfile, write folded stacks to .folded or
+    .txt files and pstats data otherwise, and print where the time went.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.profiler = cProfile.Profile()
+        # CPU time before profiling, mostly spent importing the CLI
+        self.startup = time.process_time()
+        self.active = False
+
+    def start(self) -> bool:
+        try:
+            self.profiler.enable()
+        except ValueError as e:
+            # Another profiler or debugger is already tracing this process
+            click.echo(f" {wrn} Profiling disabled: {e}", err=True)
+            return False
+        self.active = True
+        return True
+
+    def stop(self) -> pstats.Stats:
+        self.profiler.disable()
+        self.active = False
+        return pstats.Stats(self.profiler)
+
+    def summary(
+        self, stacks: dict[tuple[Func, ...], float]
+    ) -> tuple[Counter[str], Counter[str]]:
+        """Seconds spent per phase and per outermost client method."""
+        from .client import PRAXClient
+
+        methods = {
+            name
+            for name, value in vars(PRAXClient).items()
+            if not name.startswith("_") and callable(value)
+        }
+        phases: Counter[str] = Counter()
+        by_method: Counter[str] = Counter()
+        for stack, seconds in stacks.items():
+            found = next(
+                (p for p in map(phase, reversed(stack)) if p is not None), "Other"
+            )
+            phases[found] += seconds
+            method = next(
+                (
+                    name
+                    for filename, _, name in stack
+                    if name in methods and _path_is(filename, "prax", "client.py")
+                ),
+                None,
+            )
+            if method is not None:
+                by_method[method] += seconds
+        return phases, by_method
+
+    def write(self, stats: pstats.Stats, stacks: dict[tuple[Func, ...], float]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.suffix in FOLDED_SUFFIXES:
+            lines = [
+                f"{';'.join(label(func) for func in stack)} {round(seconds * 1e6)}"
+                for stack, seconds in stacks.items()
+                if round(seconds * 1e6) > 0
+            ]
+            self.path.write_text("\n".join(sorted(lines)) + "\n")
+        else:
+            stats.dump_stats(self.path)
+
+    def finish(self) -> None:
+        if not self.active:
+            return
+        stats = self.stop()
+        stacks = folded_stacks(stats)
+        self.write(stats, stacks)
+        phases, by_method = self.summary(stacks)
+        total = sum(phases.values())
+        rows = [["Startup", self.startup, "before profiling, CPU time"]]
+        rows += [
+            [name, phases[name], f"{phases[name] / total:.0%}" if total else ""]
+            for name in PHASES
+        ]
+        click.echo(err=True)
+        click.echo(f" {chk} Profile written to {self.path}", err=True)
+        click.echo(
+            tabulate(rows, headers=["Phase", "Seconds", ""], floatfmt=".3f"), err=True
+        )
+        if by_method:
+            click.echo(err=True)
+            click.echo(
+                tabulate(
+                    by_method.most_common(),
+                    headers=["Client method", "Seconds"],
+                    floatfmt=".3f",
+                ),
+                err=True,
+            )
+        click.echo(
+            f" {info} Inspect it with 'python -m pstats {self.path}'"
+            if self.path.suffix not in FOLDED_SUFFIXES
+            else f" {info} Render it with flamegraph.pl or https://speedscope.app",
+            err=True,
+        )
+
+
+def _store_profile(ctx: click.Context, param: click.Parameter, value: Any) -> Any:
+    if value is None:
+        return value
+    profiler = CommandProfiler(value)
+    if profiler.start():
+        ctx.meta[PROFILE_META_KEY] = profiler
+        ctx.call_on_close(profiler.finish)
+    return value
+
+
+def profile_option(func: Callable) -> Callable:
+    """
+    Add the --profile option to a command, profiling everything it runs
+    once the option is parsed.
+    """
+    return click.option(
+        "--profile",
+        help=(
+            "Profile the command and write the profile to PATH, as folded "
+            "stacks for flame graphs when PATH ends in .folded or .txt, "
+            "pstats data otherwise"
+        ),
+        default=None,
+        type=click.Path(dir_okay=False, writable=True),
+        metavar="PATH",
+        envvar="PRAX_PROFILE",
+        callback=_store_profile,
+        expose_value=False,
+    )(func)
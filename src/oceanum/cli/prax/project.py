@@ -1,5 +1,10 @@
+from __future__ import annotations
+
+import json
 import sys
+from functools import partial
 from os import linesep
+from pathlib import Path
 
 import click
 
@@ -9,16 +14,33 @@ from oceanum.cli.symbols import chk, err, info, key, spin, wrn
 from oceanum.cli.utils import format_dt
 
 from . import models
-from .client import PRAXClient
+from .cache import cache_options
+from .client import DEFAULT_POOL_MAXSIZE, PRAXClient
+from .concurrency import DEFAULT_CONCURRENCY, bounded_map
+from .deployment import deployment_failed
 from .main import allow, delete, describe, list_group, prax, update
+from .orchestrator import DeployOrchestrator, ProjectDeployment
+from .secretsync import SecretFileError, load_secrets
+from .specdiff import (
+    masked_patch,
+    project_secret_digests,
+    record_secrets,
+    spec_patch,
+)
+from .specvalidation import find_specfiles, spec_schema_path, validate_specs
 from .utils import (
+    echo_rows,
     echoerr,
     format_permissions_display,
+    format_run_status as frs,
     merge_secrets,
+    parse_secrets,
     project_status_color as psc,
     source_status_color as sosc,
     stage_status_color as ssc,
+    view_fields,
 )
+from .watch import watch_option, watch_rows
 
 name_argument = click.argument("name", type=str)
 name_option = click.option(
@@ -38,6 +60,53 @@ project_stage_option = click.option(
 )
 
 
+def _parse_variables(
+    ctx: click.Context, param: click.Parameter, values: tuple[str, ...]
+) -> dict[str, str]:
+    variables = {}
+    for value in values:
+        name, sep, val = value.partition("=")
+        if not sep or not name:
+            raise click.BadParameter(f"Expected name=value, got '{value}'")
+        variables[name] = val
+    return variables
+
+
+overlay_option = click.option(
+    "-o",
+    "--overlay",
+    "overlays",
+    help="Merge an overlay spec file into the specfiles, can be repeated",
+    multiple=True,
+    type=click.Path(exists=True, dir_okay=False),
+)
+variable_option = click.option(
+    "--var",
+    "variables",
+    help="Set a variable substituted in the specfiles, i.e name=value, can be repeated",
+    multiple=True,
+    callback=_parse_variables,
+)
+
+
+def _render_options(overlays: tuple[str, ...], variables: dict[str, str]) -> dict:
+    """Keyword arguments rendering specfiles with overlays and variables."""
+    render: dict = {}
+    if overlays:
+        render["overlays"] = overlays
+    if variables:
+        render["variables"] = variables
+    return render
+
+
+limit_option = click.option(
+    "--limit",
+    help="Show at most this many items",
+    default=None,
+    type=click.IntRange(min=1),
+)
+
+
 @list_group.command(name="projects", help="List PRAX Projects")
 @click.pass_context
 @click.option(
@@ -46,6 +115,9 @@ project_stage_option = click.option(
 @click.option("--status", help="filter by Project status", default=None, type=str)
 @project_org_option
 @project_user_option
+@limit_option
+@watch_option
+@cache_options
 @login_required
 def list_projects(
     ctx: click.Context,
@@ -53,14 +125,12 @@ def list_projects(
     org: str | None,
     user: str | None,
     status: str | None,
+    limit: int | None,
+    watch: float | None,
 ):
     click.echo(f" {spin} Listing projects...")
     client = PRAXClient(ctx)
     filters = {"search": search, "org": org, "user": user, "status": status}
-    projects = client.list_projects(
-        **{k: v for k, v in filters.items() if v is not None}
-    )
-
     fields = [
         RenderField(label="Name", path="$.name"),
         RenderField(label="Org.", path="$.org"),
@@ -68,35 +138,114 @@ def list_projects(
         RenderField(label="Status", path="$.status", mod=psc),
         RenderField(label="Stages", path="$.stages.*", mod=ssc),
     ]
+    projects = partial(
+        client.iter_projects,
+        limit=limit,
+        fields=view_fields(fields, "table"),
+        **{k: v for k, v in filters.items() if v is not None},
+    )
+    if watch is not None:
+        watch_rows(client, projects, fields, watch)
+        return
 
-    if not projects:
-        click.echo(f" {wrn} No projects found!")
-        sys.exit(1)
-    elif isinstance(projects, models.ErrorResponse):
+    rendered = echo_rows(projects(), fields)
+    if isinstance(rendered, models.ErrorResponse):
         click.echo(f" {err} Could not list projects!")
-        echoerr(projects)
+        echoerr(rendered)
+        sys.exit(1)
+    elif not rendered:
+        click.echo(f" {wrn} No projects found!")
         sys.exit(1)
-    else:
-        click.echo(Renderer(data=projects, fields=fields).render(output_format="table"))
 
 
-@prax.command(name="validate", help="Validate PRAX Project Specfile")
-@click.argument("specfile", type=click.Path(exists=True))
+@prax.command(name="validate", help="Validate PRAX Project Specfiles")
+@click.option(
+    "--offline",
+    help="Only validate locally, without sending the specs to the PRAX API",
+    default=False,
+    is_flag=True,
+)
+@click.option(
+    "-j",
+    "--jobs",
+    help="Processes validating specfiles locally, by default one per CPU",
+    default=None,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--schema",
+    help="Print the path to the JSON Schema of project specs, for editors and linters",
+    default=False,
+    is_flag=True,
+)
+@overlay_option
+@variable_option
+@click.argument("specfiles", nargs=-1, type=click.Path(exists=True))
 @click.pass_context
-@login_required
-def validate_project(ctx: click.Context, specfile: click.Path):
-    click.echo(f" {spin} Validating PRAX Project Spec file...")
-    client = PRAXClient(ctx)
-    response = client.validate(str(specfile))
-    if isinstance(response, models.ErrorResponse):
-        click.echo(f" {err} Validation failed!")
-        echoerr(response)
+def validate_project(
+    ctx: click.Context,
+    specfiles: tuple[str, ...],
+    offline: bool,
+    jobs: int | None,
+    schema: bool,
+    overlays: tuple[str, ...],
+    variables: dict[str, str],
+):
+    if schema:
+        click.echo(spec_schema_path())
+        return
+    if not specfiles:
+        raise click.UsageError("Missing argument 'SPECFILES...'.", ctx=ctx)
+    files = find_specfiles(specfiles)
+    if not files:
+        click.echo(f" {wrn} No specfiles found!")
+        sys.exit(1)
+    s = "s" if len(files) != 1 else ""
+    click.echo(f" {spin} Validating {len(files)} PRAX Project Spec file{s}...")
+    render = _render_options(overlays, variables)
+    failed = []
+    for specfile, error in validate_specs(files, processes=jobs, **render):
+        if error is not None:
+            failed.append(specfile)
+            click.echo(f" {err} Validation failed: {specfile}")
+            echoerr(error)
+    valid = [f for f in files if f not in failed]
+    if valid and not offline:
+        # Only validating with the API needs a login
+        ctx.invoke(login_required(lambda: None))
+        failed += _validate_with_api(ctx, valid, render)
+    if failed:
+        if len(files) > 1:
+            click.echo(f" {err} {len(failed)} of {len(files)} specfiles are invalid!")
         sys.exit(1)
+    if len(files) > 1:
+        click.echo(f" {chk} OK! All {len(files)} Project Spec files are valid!")
     else:
         click.echo(f" {chk} OK! Project Spec file is valid!")
 
 
-@prax.command(name="deploy", help="Deploy a PRAX Project Specfile")
+def _validate_with_api(
+    ctx: click.Context, specfiles: list[str], render: dict
+) -> list[str]:
+    """Validate specfiles with the PRAX API, returning those that failed."""
+    client = PRAXClient(ctx)
+    validate = partial(client.validate, **render)
+    failed = []
+    for specfile, response in bounded_map(validate, specfiles, ordered=True):
+        if isinstance(response, models.ErrorResponse):
+            failed.append(specfile)
+            click.echo(f" {err} Validation failed: {specfile}")
+            echoerr(response)
+    return failed
+
+
+@prax.command(
+    name="deploy",
+    help=(
+        "Deploy PRAX Project Specfiles, several projects are deployed "
+        "concurrently, after the projects building the images they use"
+    ),
+)
 @name_option
 @project_org_option
 @project_user_option
@@ -109,22 +258,92 @@ def validate_project(ctx: click.Context, specfile: click.Path):
     help="Replace existing secret data values, i.e secret-name:key1=value1,key2=value2",
     multiple=True,
 )
-@click.argument(
-    "specfile", type=click.Path(exists=True, dir_okay=False, resolve_path=True)
+@click.option(
+    "--secrets-file",
+    "secrets_files",
+    help=(
+        "Replace the data of the spec secrets found in dotenv, YAML or JSON files "
+        "or directories, can be repeated"
+    ),
+    multiple=True,
+    type=click.Path(exists=True),
+)
+@click.option(
+    "--dry-run",
+    help="Print the changes to the project spec without deploying them",
+    default=False,
+    is_flag=True,
+)
+@click.option(
+    "--full",
+    help="Upload the whole project spec instead of only its changes",
+    default=False,
+    is_flag=True,
+)
+@click.option(
+    "--concurrency",
+    help="Maximum number of API requests in flight when deploying several projects",
+    default=DEFAULT_CONCURRENCY,
+    type=click.IntRange(min=1),
 )
+@overlay_option
+@variable_option
+@click.argument("specfiles", nargs=-1, required=True, type=str)
 @click.pass_context
 @login_required
 def deploy_project(
     ctx: click.Context,
-    specfile: click.Path,
+    specfiles: tuple[str, ...],
     name: str | None,
     org: str | None,
     user: str | None,
     wait: bool,
     secrets: list[str],
+    secrets_files: tuple[str, ...],
+    dry_run: bool,
+    full: bool,
+    concurrency: int,
+    overlays: tuple[str, ...],
+    variables: dict[str, str],
 ):
+    render = _render_options(overlays, variables)
+    try:
+        file_secrets = [
+            {"name": name, "data": data}
+            for name, data in load_secrets(secrets_files).items()
+        ]
+    except (SecretFileError, OSError) as e:
+        raise click.BadParameter(str(e), param_hint="'--secrets-file'")
+    files = find_specfiles(specfiles)
+    for path in files:
+        if not Path(path).is_file():
+            raise click.BadParameter(
+                f"Path '{path}' does not exist.", param_hint="'SPECFILES...'"
+            )
+    if not files:
+        raise click.BadParameter("No specfiles found.", param_hint="'SPECFILES...'")
+    if len(files) > 1:
+        if name is not None:
+            raise click.UsageError("--name can only be used with a single specfile")
+        client = PRAXClient(ctx, pool_maxsize=max(concurrency, DEFAULT_POOL_MAXSIZE))
+        deploy_projects(
+            ctx,
+            client,
+            files,
+            org,
+            user,
+            wait,
+            secrets,
+            dry_run,
+            full,
+            concurrency,
+            render,
+            file_secrets,
+        )
+        return
+    specfile = str(Path(files[0]).resolve())
     client = PRAXClient(ctx)
-    project_spec = client.load_spec(str(specfile))
+    project_spec = client.load_spec(str(specfile), **render)
     if isinstance(project_spec, models.ErrorResponse):
         click.echo(f" {err} Failed to load project spec file!")
         echoerr(project_spec)
@@ -137,8 +356,9 @@ def deploy_project(
     if user is not None:
         project_spec.member_ref = user
 
-    if secrets:
+    if file_secrets or secrets:
         click.echo(f" {key} Parsing and merging secrets...")
+        project_spec = merge_secrets(project_spec, file_secrets, strict=False)
         project_spec = merge_secrets(project_spec, secrets)
 
     user_org = getattr(project_spec.user_ref, "root", None) or ctx.obj.token.active_org
@@ -168,13 +388,45 @@ def deploy_project(
     click.echo(f"  Organization: {user_org}")
     click.echo(f"  Owner:        {user_email}")
     click.echo()
+    ops = None
+    digests = project_secret_digests(client.service or "", user_org, project_spec.name)
+    if (
+        not full
+        and isinstance(project, models.ProjectDetailsSchema)
+        and project.last_revision is not None
+    ):
+        ops = spec_patch(project.last_revision.spec, project_spec, digests)
+        if not ops and deployment_failed(project):
+            # Deploy the same spec again as a new revision
+            ops = None
+    if dry_run:
+        if ops is None:
+            click.echo(f" {info} The whole project spec would be uploaded.")
+        elif not ops:
+            click.echo(f" {chk} No changes to the project spec.")
+        else:
+            s = "s" if len(ops) != 1 else ""
+            click.echo(f" {info} {len(ops)} change{s} to the project spec:")
+            click.echo(json.dumps(masked_patch(ops, project_spec), indent=2))
+        return
+    if ops is not None and not ops:
+        click.echo(f" {chk} No changes to the project spec, nothing to deploy.")
+        return
     click.echo("Safe to Ctrl+C at any time...")
     click.echo()
-    project = client.deploy_project(project_spec)
+    if ops:
+        s = "s" if len(ops) != 1 else ""
+        click.echo(f" {spin} Patching {len(ops)} change{s} to the project spec...")
+        project = client.patch_project(
+            project_spec.name, ops, org=user_org, user=user_email
+        )
+    else:
+        project = client.deploy_project(project_spec)
     if isinstance(project, models.ErrorResponse):
         click.echo(f" {err} Deployment failed!")
         click.echo(f" {wrn} {project.detail}")
         sys.exit(1)
+    record_secrets(digests, project_spec)
     project = client.get_project(**get_params)
     if (
         isinstance(project, models.ProjectDetailsSchema)
@@ -191,6 +443,82 @@ def deploy_project(
         click.echo(f" {wrn} Please check the project status in the PRAX console!")
 
 
+def deploy_projects(
+    ctx: click.Context,
+    client: PRAXClient,
+    specfiles: list[str],
+    org: str | None,
+    user: str | None,
+    wait: bool,
+    secrets: list[str],
+    dry_run: bool,
+    full: bool,
+    concurrency: int,
+    render: dict | None = None,
+    file_secrets: list[dict] | None = None,
+) -> None:
+    parsed_secrets = parse_secrets(secrets)
+    unmatched = {secret["name"] for secret in parsed_secrets}
+    deployments = []
+    for specfile in specfiles:
+        project_spec = client.load_spec(specfile, **(render or {}))
+        if isinstance(project_spec, models.ErrorResponse):
+            click.echo(f" {err} Failed to load project spec file '{specfile}'!")
+            echoerr(project_spec)
+            sys.exit(1)
+        if org is not None:
+            project_spec.user_ref = models.UserRef(org)
+        if user is not None:
+            project_spec.member_ref = user
+        if file_secrets:
+            # Secrets files are shared between projects, unused secrets are skipped
+            project_spec = merge_secrets(project_spec, file_secrets, strict=False)
+        if parsed_secrets:
+            # Each secret only needs to be defined by one of the specs
+            if project_spec.resources is not None:
+                unmatched -= {s.name for s in project_spec.resources.secrets or []}
+            project_spec = merge_secrets(project_spec, parsed_secrets, strict=False)
+        deployments.append(
+            ProjectDeployment(
+                specfile,
+                project_spec,
+                org=getattr(project_spec.user_ref, "root", None)
+                or ctx.obj.token.active_org,
+                user=project_spec.member_ref or ctx.obj.token.email,
+            )
+        )
+    if unmatched:
+        raise click.BadParameter(
+            f"Secrets not found in any project spec: {', '.join(sorted(unmatched))}",
+            param_hint="'-s' / '--secrets'",
+        )
+    names = [d.name for d in deployments]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise click.UsageError(
+            f"Projects deployed by more than one specfile: {', '.join(duplicates)}"
+        )
+    orchestrator = DeployOrchestrator(
+        client, deployments, concurrency=concurrency, wait=wait, full=full
+    )
+    click.echo(f"Using domain: {ctx.obj.token.domain}")
+    click.echo()
+    if dry_run:
+        orchestrator.dry_run()
+        return
+    groups = orchestrator.order()
+    s = "s" if len(groups) != 1 else ""
+    click.echo(
+        f" {spin} Deploying {len(deployments)} PRAX Projects in {len(groups)} step{s}..."
+    )
+    click.echo("Safe to Ctrl+C at any time...")
+    click.echo()
+    succeeded = orchestrator.run()
+    orchestrator.summary()
+    if not succeeded:
+        sys.exit(1)
+
+
 @delete.command(name="project")
 @click.argument("project_name", type=str)
 @project_org_option
@@ -238,6 +566,7 @@ def delete_project(
 @project_org_option
 @project_user_option
 @click.pass_context
+@cache_options
 @login_required
 def describe_project(
     ctx: click.Context,
@@ -383,6 +712,124 @@ def describe_project(
         sys.exit(1)
 
 
+def project_rows(project: models.ProjectDetailsSchema) -> list[dict]:
+    """
+    Summarize a project as one row per stage, with the URLs of its routes and
+    the last run status of its tasks, pipelines and builds.
+    """
+    row = {
+        "project": project.name,
+        "org": project.org,
+        "revision": project.last_revision.number if project.last_revision else None,
+    }
+    rows = []
+    for stage in project.stages:
+        stage_row = row | {"stage": {"name": stage.name, "status": stage.status}}
+        stage_row["routes"] = []
+        stage_row["runs"] = []
+        if stage.resources is not None:
+            stage_row["routes"] = [r.url or r.name for r in stage.resources.routes]
+            for resource in [
+                *stage.resources.tasks,
+                *stage.resources.pipelines,
+                *stage.resources.builds,
+            ]:
+                if resource.last_run is not None:
+                    stage_row["runs"].append(
+                        f"{resource.name}: {frs(resource.last_run.status)}"
+                    )
+        rows.append(stage_row)
+    return rows or [row]
+
+
+@describe.command(name="projects", help="Describe many PRAX Projects at once")
+@click.argument("project_names", nargs=-1, type=str)
+@click.option(
+    "--search", help="Search by project name or description", default=None, type=str
+)
+@click.option("--status", help="filter by Project status", default=None, type=str)
+@project_org_option
+@project_user_option
+@click.option(
+    "-j",
+    "--concurrency",
+    help="Maximum number of projects fetched at once",
+    default=DEFAULT_CONCURRENCY,
+    show_default=True,
+    type=click.IntRange(1, 64),
+)
+@click.option(
+    "-o",
+    "--output",
+    help="Output format, ndjson writes one project per line",
+    default="table",
+    type=click.Choice(["table", "json", "yaml", "ndjson"]),
+)
+@click.pass_context
+@cache_options
+@login_required
+def describe_projects(
+    ctx: click.Context,
+    project_names: tuple[str, ...],
+    search: str | None,
+    status: str | None,
+    org: str | None,
+    user: str | None,
+    concurrency: int,
+    output: str,
+):
+    client = PRAXClient(ctx, pool_maxsize=max(concurrency, DEFAULT_POOL_MAXSIZE))
+    names = list(project_names)
+    if not names:
+        filters = {"search": search, "org": org, "user": user, "status": status}
+        for item in client.iter_projects(
+            fields=["name"], **{k: v for k, v in filters.items() if v is not None}
+        ):
+            if isinstance(item, models.ErrorResponse):
+                click.echo(f" {err} Could not list projects!")
+                echoerr(item)
+                sys.exit(1)
+            names.append(item.name)
+    if not names:
+        click.echo(f" {wrn} No projects found!")
+        sys.exit(1)
+
+    failed = []
+
+    def items():
+        for name, project in client.get_projects(
+            names, concurrency, org=org, user=user
+        ):
+            if isinstance(project, models.ErrorResponse):
+                failed.append(name)
+                error = str(project.detail)
+                if output == "table":
+                    yield {"project": name, "error": error}
+                else:
+                    yield {"name": name, "error": error}
+            elif output == "table":
+                yield from project_rows(project)
+            else:
+                yield project.model_dump(mode="json")
+
+    fields = [
+        RenderField(label="Project", path="$.project"),
+        RenderField(label="Org.", path="$.org"),
+        RenderField(label="Rev.", path="$.revision"),
+        RenderField(label="Stage", path="$.stage", mod=ssc),
+        RenderField(label="Routes", path="$.routes.*"),
+        RenderField(label="Last Runs", path="$.runs.*"),
+        RenderField(label="Error", path="$.error"),
+    ]
+    # Tables wait for a first batch to size their columns, other formats
+    # stream every project as soon as it is fetched
+    echo_rows(items(), fields, output, batch_size=100 if output == "table" else 1)
+    if failed:
+        if output == "table":
+            click.echo(f" {err} {len(failed)} of {len(names)} projects failed!")
+        sys.exit(1)
+
+
 @update.command(name="project", help="Update Project parameters")
 @click.argument("project_name", type=str)
 @project_org_option
@@ -501,6 +948,8 @@ def allow_project(
     "--search", help="Search by project name or description", default=None, type=str
 )
 @click.option("--status", help="filter by Project status", default=None, type=str)
+@limit_option
+@cache_options
 def list_sources(
     ctx: click.Context,
     project: str | None,
@@ -508,6 +957,7 @@ def list_sources(
     user: str | None,
     search: str | None,
     status: str | None,
+    limit: int | None,
 ):
     click.echo(f" {spin} Listing sources...")
     client = PRAXClient(ctx)
@@ -518,8 +968,6 @@ def list_sources(
         "user": user,
         "status": status,
     }
-    sources = client.list_sources(**filters)
-
     fields = [
         RenderField(label="Name", path="$.name"),
         RenderField(label="Org.", path="$.org"),
@@ -529,13 +977,15 @@ def list_sources(
         RenderField(label="Repository", path="$.repository"),
         RenderField(label="Status", path="$.status", mod=sosc),
     ]
+    sources = client.iter_sources(
+        limit=limit, fields=view_fields(fields, "table"), **filters
+    )
 
-    if not sources:
-        click.echo(f" {wrn} No sources found!")
-        sys.exit(1)
-    elif isinstance(sources, models.ErrorResponse):
+    rendered = echo_rows(sources, fields)
+    if isinstance(rendered, models.ErrorResponse):
         click.echo(f" {err} Could not list sources!")
-        echoerr(sources)
+        echoerr(rendered)
+        sys.exit(1)
+    elif not rendered:
+        click.echo(f" {wrn} No sources found!")
         sys.exit(1)
-    else:
-        click.echo(Renderer(data=sources, fields=fields).render(output_format="table"))
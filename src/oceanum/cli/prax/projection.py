@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Annotated, Any, Iterable, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+_PATH_ROOT = re.compile(r"^\$\.?(?:(?P<name>[A-Za-z_][\w-]*)|\[(?P<names>[^\]]+)\])")
+_QUOTED = re.compile(r"""^\s*(['"])(?P<name>.+?)\1\s*$""")
+
+
+def path_keys(path: str) -> list[str] | None:
+    """
+    Return the top level keys read by a JSONPath such as `$.last_run.status`
+    or `$.["suspended", "schedule"]`, None when it may read any key.
+    """
+    match = _PATH_ROOT.match(path)
+    if match is None:
+        return None
+    if match.group("name"):
+        return [match.group("name")]
+    keys = []
+    for part in match.group("names").split(","):
+        if (quoted := _QUOTED.match(part)) is None:
+            return None
+        keys.append(quoted.group("name"))
+    return keys
+
+
+class ModelView:
+    """
+    Light view of some fields of a response model.
+
+    Views are built by a `Projection` and hold only the fields a command
+    shows, validated one by one, so large nested specs are never built.
+    """
+
+    __slots__ = ()
+    __projection__: Projection
+
+    def model_dump(self, mode: str = "python") -> dict[str, Any]:
+        adapters = self.__projection__.adapters
+        return {
+            name: adapters[name].dump_python(getattr(self, name), mode=mode)
+            for name in self.__slots__
+        }
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, k) == getattr(other, k) for k in self.__slots__)
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+class Projection:
+    """
+    Decode response items into views of `fields` of `schema`.
+
+    Used in place of a schema, `Projection(**item)` validates only the
+    projected fields, with the same types, constraints and defaults as the
+    model. Items with a missing or invalid field are validated in full to
+    raise the model's own ValidationError. The `id` field is always kept.
+    """
+
+    def __init__(self, schema: Type[BaseModel], fields: Iterable[str]) -> None:
+        self.schema = schema
+        model_fields = schema.model_fields
+        names = ["id"] if "id" in model_fields else []
+        names += [f for f in fields if f in model_fields and f not in names]
+        self.fields = {name: model_fields[name] for name in names}
+        self.adapters = {
+            name: TypeAdapter(
+                Annotated[(field.annotation, *field.metadata)]
+                if field.metadata
+                else field.annotation
+            )
+            for name, field in self.fields.items()
+        }
+        self.view = type(
+            f"{schema.__name__}View",
+            (ModelView,),
+            {"__slots__": tuple(names), "__projection__": self},
+        )
+
+    @property
+    def __name__(self) -> str:
+        return self.view.__name__
+
+    def __call__(self, **item: Any) -> ModelView | BaseModel:
+        view = self.view()
+        for name, field in self.fields.items():
+            key = field.alias or name
+            if key in item:
+                try:
+                    value = self.adapters[name].validate_python(item[key])
+                except ValidationError:
+                    return self.schema(**item)
+            elif field.is_required():
+                return self.schema(**item)
+            else:
+                value = field.get_default(call_default_factory=True)
+            setattr(view, name, value)
+        return view
+
+
+@lru_cache(maxsize=64)
+def _projection(schema: Type[BaseModel], fields: tuple[str, ...]) -> Projection:
+    return Projection(schema, fields)
+
+
+def project(
+    schema: Type[BaseModel], fields: Iterable[str] | None
+) -> Type[BaseModel] | Projection:
+    """
+    Return the cached projection of `schema` on `fields`, or the schema
+    itself when all fields are needed.
+    """
+    if fields is None:
+        return schema
+    return _projection(schema, tuple(fields))
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NameResolutionError, NewConnectionError
+
+DEFAULT_RETRIES = 4
+DEFAULT_RETRY_BACKOFF = 1.0
+MAX_RETRY_BACKOFF = 30.0
+MAX_RETRY_AFTER = 120.0
+
+CIRCUIT_THRESHOLD = 5
+CIRCUIT_RESET = 30.0
+
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+WRITE_METHODS = frozenset(["POST", "PATCH"])
+
+# Gateway errors may come after the API processed the request, only
+# idempotent requests are retried on them
+GATEWAY_STATUSES = frozenset([502, 504])
+# The API did not process the request, any request can be retried
+UNAVAILABLE_STATUSES = frozenset([429, 503])
+# Responses counted as failures by the circuit breakers
+FAILURE_STATUSES = frozenset([502, 503, 504])
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request to a host that keeps failing."""
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed request, writes only
+    when the API cannot have processed them.
+    """
+
+    def __init__(
+        self,
+        retries: int | None = None,
+        backoff: float | None = None,
+        max_backoff: float = MAX_RETRY_BACKOFF,
+    ) -> None:
+        if retries is None:
+            retries = int(os.getenv("PRAX_RETRIES", DEFAULT_RETRIES))
+        if backoff is None:
+            backoff = float(os.getenv("PRAX_RETRY_BACKOFF", DEFAULT_RETRY_BACKOFF))
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def retry_status(
+        self, method: str, status: int, idempotent: bool | None = None
+    ) -> bool:
+        if status in UNAVAILABLE_STATUSES:
+            return True
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        return status in GATEWAY_STATUSES and idempotent
+
+    def retry_error(
+        self, method: str, error: Exception, idempotent: bool | None = None
+    ) -> bool:
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        if isinstance(reason, NameResolutionError):
+            # An unknown host will not resolve on the next attempt
+            return False
+        if isinstance(error, requests.exceptions.ConnectTimeout) or isinstance(
+            reason, NewConnectionError
+        ):
+            # The request never reached the API
+            return True
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        return idempotent
+
+    def delay(self, attempt: int, response: requests.Response | None = None) -> float:
+        """Seconds to wait before retry number `attempt`, counted from 0."""
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, MAX_RETRY_AFTER)
+        delay = min(self.backoff * 2**attempt, self.max_backoff)
+        # Equal jitter, so clients failing together do not retry together
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(tz=timezone.utc)).total_seconds())
+
+
+class CircuitBreaker:
+    """
+    Stop sending requests to a host after `threshold` failures in a row.
+
+    The circuit stays open for `reset` seconds, then lets a single request
+    through: its success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(
+        self, threshold: int = CIRCUIT_THRESHOLD, reset: float = CIRCUIT_RESET
+    ) -> None:
+        self.threshold = threshold
+        self.reset = reset
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self.opened_at < self.reset:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self) -> None:
+        """End a probe that neither succeeded nor failed, e.g. that raised."""
+        with self._lock:
+            self._probing = False
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit_breaker(host: str) -> CircuitBreaker:
+    """Return the circuit breaker shared by every request to `host`."""
+    with _breakers_lock:
+        return _breakers.setdefault(host, CircuitBreaker())
+
+
+class RetryAdapter(HTTPAdapter):
+    """
+    Transport adapter retrying failed requests following a `RetryPolicy`,
+    with a circuit breaker per host.
+
+    POST and PATCH requests get an Idempotency-Key header, kept across
+    retries, so the API can recognize a write it already processed. Other
+    requests sent with an Idempotency-Key, like the PUT run actions, are
+    retried as writes.
+    """
+
+    def __init__(self, policy: RetryPolicy | None = None, **kwargs) -> None:
+        self.policy = policy or RetryPolicy()
+        super().__init__(**kwargs)
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        method = (request.method or "GET").upper()
+        if method in WRITE_METHODS and IDEMPOTENCY_KEY_HEADER not in request.headers:
+            request.headers[IDEMPOTENCY_KEY_HEADER] = str(uuid.uuid4())
+        idempotent = (
+            method in IDEMPOTENT_METHODS
+            and IDEMPOTENCY_KEY_HEADER not in request.headers
+        )
+        # Streamed uploads can only be sent once
+        retries = (
+            self.policy.retries
+            if request.body is None or isinstance(request.body, (bytes, str))
+            else 0
+        )
+        host = urlparse(request.url).netloc
+        breaker = circuit_breaker(host)
+        # Set by PRAXClient when the command has a --deadline
+        deadline = getattr(kwargs.get("timeout"), "deadline", None)
+        attempt = 0
+        while True:
+            response = error = None
+            if breaker.allow():
+                recorded = False
+                try:
+                    response = super().send(request, **kwargs)
+                except (
+                    requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout,
+                ) as e:
+                    breaker.record_failure()
+                    recorded = True
+                    if not self.policy.retry_error(method, e, idempotent):
+                        raise
+                    error = e
+                else:
+                    if response.status_code in FAILURE_STATUSES:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                    recorded = True
+                    if not self.policy.retry_status(
+                        method, response.status_code, idempotent
+                    ):
+                        response.retry_count = attempt
+                        return response
+                finally:
+                    if not recorded:
+                        # Do not leave the circuit waiting for this probe
+                        breaker.release()
+            delay = self.policy.delay(attempt, response)
+            if attempt >= retries or (
+                deadline is not None and not deadline.allows(delay)
+            ):
+                if response is not None:
+                    response.retry_count = attempt
+                    return response
+                if error is not None:
+                    raise error
+                raise CircuitOpenError(
+                    f"Requests to {host} keep failing, giving up for now",
+                    request=request,
+                )
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+            attempt += 1
@@ -0,0 +1,75 @@
+from typing import Optional
+
+from pydantic import Field, RootModel, SecretStr, model_validator
+
+from . import models
+
+
+class RevealedSecretStr(RootModel):
+    root: Optional[str | SecretStr] = None
+
+    @model_validator(mode="after")
+    def validate_revealed_secret_str(self):
+        if isinstance(self.root, SecretStr):
+            self.root = self.root.get_secret_value()
+        return self
+
+
+class RevealedSecretData(models.SecretData):
+    root: Optional[dict[str, RevealedSecretStr]] = None
+
+
+class RevealedSecretSpec(models.SecretSpec):
+    data: Optional[RevealedSecretData] = None
+
+
+class RevealedSecretsBuildCredentials(models.BuildCredentials):
+    password: Optional[RevealedSecretStr] = None
+
+
+class RevealedSecretsBuildSpec(models.BuildSpec):
+    credentials: Optional[RevealedSecretsBuildCredentials] = None
+
+
+class RevealedSecretsCustomDomainSpec(models.CustomDomainSpec):
+    tls_cert: Optional[RevealedSecretStr] = Field(default=None, alias="tlsCert")
+    tls_key: Optional[RevealedSecretStr] = Field(default=None, alias="tlsKey")
+
+
+class RevealedSecretsRouteSpec(models.ServiceRouteSpec):
+    custom_domains: Optional[list[RevealedSecretsCustomDomainSpec]] = Field(
+        default=None, alias="customDomains"
+    )
+
+
+class RevealedSecretsServiceSpec(models.ServiceSpec):
+    routes: Optional[list[RevealedSecretsRouteSpec]] = None
+
+
+class RevealedSecretsImageSpec(models.ImageSpec):
+    username: Optional[RevealedSecretStr] = None
+    password: Optional[RevealedSecretStr] = None
+
+
+class RevealedSecretsSourceRepositorySpec(models.SourceRepositorySpec):
+    token: Optional[RevealedSecretStr] = None
+
+
+class RevealedSecretProjectResourcesSpec(models.ProjectResourcesSpec):
+    secrets: Optional[list[RevealedSecretSpec]] = None
+    build: Optional[RevealedSecretsBuildCredentials] = None
+    images: Optional[list[RevealedSecretsImageSpec]] = None
+    sources: Optional[list[RevealedSecretsSourceRepositorySpec]] = None
+
+
+class RevealedSecretsProjectSpec(models.ProjectSpec):
+    resources: Optional[RevealedSecretProjectResourcesSpec] = None
+
+
+def dump_with_secrets(spec: models.ProjectSpec) -> dict:
+    spec_dict = spec.model_dump(
+        exclude_none=True, exclude_unset=True, by_alias=True, mode="python"
+    )
+    return RevealedSecretsProjectSpec(**spec_dict).model_dump(
+        exclude_none=True, exclude_unset=True, by_alias=True, mode="json"
+    )
@@ -1,4 +1,7 @@
+from __future__ import annotations
+
 import sys
+from functools import partial
 from os import linesep
 
 import click
@@ -9,9 +12,19 @@ from oceanum.cli.renderer import Renderer, RenderField, output_format_option
 from oceanum.cli.symbols import err, wrn
 
 from . import models
+from .cache import cache_options
 from .client import PRAXClient
+from .logfilter import LogFilter, log_archive_option, log_filter_options, write_logs
 from .main import allow, describe, list_group, logs, update
-from .utils import echoerr, format_permissions_display, format_route_status as _frs
+from .project import limit_option
+from .utils import (
+    echo_rows,
+    echoerr,
+    format_permissions_display,
+    format_route_status as _frs,
+    view_fields,
+)
+from .watch import watch_option, watch_rows
 
 
 @update.group(name="route", help="Update PRAX Routes")
@@ -45,6 +58,7 @@ def update_route():
     default=None,
     type=click.Choice(["backend", "frontend"]),
 )
+@limit_option
 @click.option(
     "--current-org",
     help="Filter routes by the current organization in Oceanum.io",
@@ -52,10 +66,18 @@ def update_route():
     type=bool,
     is_flag=True,
 )
+@watch_option
 @output_format_option
+@cache_options
 @login_required
 def list_routes(
-    ctx: click.Context, output: str, open_access: bool, current_org: bool, **filters
+    ctx: click.Context,
+    output: str,
+    open_access: bool,
+    current_org: bool,
+    limit: int | None = None,
+    watch: float | None = None,
+    **filters,
 ):
     if open_access:
         filters.update({"open": True})
@@ -75,15 +97,22 @@ def list_routes(
         RenderField(label="Status", path="$.status", mod=_frs),
         RenderField(label="URL", path="$.url"),
     ]
-    routes = client.list_routes(**{k: v for k, v in filters.items() if v is not None})
-    if not routes:
-        click.echo(f" {wrn} No routes found!")
-    elif isinstance(routes, models.ErrorResponse):
+    routes = partial(
+        client.iter_routes,
+        limit=limit,
+        fields=view_fields(fields, output),
+        **{k: v for k, v in filters.items() if v is not None},
+    )
+    if watch is not None:
+        watch_rows(client, routes, fields, watch, output)
+        return
+    rendered = echo_rows(routes(), fields, output)
+    if isinstance(rendered, models.ErrorResponse):
         click.echo(f" {err} Error fetching routes:")
-        echoerr(routes)
+        echoerr(rendered)
         sys.exit(1)
-    else:
-        click.echo(Renderer(data=routes, fields=fields).render(output_format=output))
+    elif not rendered and output == "table":
+        click.echo(f" {wrn} No routes found!")
 
 
 @list_group.command(name="notebooks", help="List PRAX Notebooks")
@@ -106,7 +135,9 @@ def list_routes(
     type=bool,
     is_flag=True,
 )
+@limit_option
 @output_format_option
+@cache_options
 @login_required
 def list_notebooks(ctx: click.Context, output: str, open_access: bool, **filters):
     filters.update({"notebook": True})
@@ -116,6 +147,7 @@ def list_notebooks(ctx: click.Context, output: str, open_access: bool, **filters
 @describe.command(name="route", help="Describe a PRAX Service or App Route")
 @click.pass_context
 @click.argument("route_name", type=str)
+@cache_options
 @login_required
 def describe_route(ctx: click.Context, route_name: str):
     client = PRAXClient(ctx)
@@ -240,12 +272,25 @@ def allow_route(
 @click.option(
     "-f", "--follow", help="Follow logs", default=False, type=bool, is_flag=True
 )
+@log_filter_options
+@log_archive_option
 @login_required
 def get_route_logs(ctx: click.Context, route_name: str, lines: int, follow: bool):
+    from .logarchive import log_stream
+
     client = PRAXClient(ctx)
-    for line in client.get_route_logs(route_name, lines, follow):
-        if isinstance(line, models.ErrorResponse):
-            click.echo(f" {err} Error fetching logs:")
-            echoerr(line)
-            sys.exit(1)
-        click.echo(line)
+    logs_err = write_logs(
+        log_stream(
+            ctx,
+            "route",
+            route_name,
+            partial(client.get_route_logs, route_name),
+            lines,
+            follow,
+        ),
+        LogFilter.from_context(ctx),
+    )
+    if logs_err is not None:
+        click.echo(f" {err} Error fetching logs:")
+        echoerr(logs_err)
+        sys.exit(1)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import os
+import re
+import secrets
+from pathlib import Path
+from typing import Any, Iterable
+
+import yaml
+
+from .cache import default_cache_dir
+
+DOTENV_SUFFIXES = (".env",)
+DATA_SUFFIXES = (".yaml", ".yml", ".json")
+SECRET_SUFFIXES = DOTENV_SUFFIXES + DATA_SUFFIXES
+
+_DOTENV_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", '"': '"', "\\": "\\"}
+
+
+class SecretFileError(ValueError):
+    pass
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1]
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r"\\(.)", lambda m: _DOTENV_ESCAPES.get(m[1], m[0]), value[1:-1])
+    # Unquoted values end at an inline comment
+    return re.split(r"\s+#", value, maxsplit=1)[0].rstrip()
+
+
+def parse_dotenv(text: str, source: str = "<dotenv>") -> dict[str, str]:
+    """
+    Parse `KEY=value` lines, skipping blank lines and comments. Values can be
+    single or double quoted, with escapes in double quotes, and keys can be
+    prefixed with `export`.
+    """
+    data = {}
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        line = line.removeprefix("export ").lstrip()
+        name, sep, value = line.partition("=")
+        name = name.strip()
+        if not sep or not name:
+            # Never echo the line, it may hold a secret value
+            raise SecretFileError(f"{source}:{number}: expected KEY=value")
+        data[name] = _unquote(value.strip())
+    return data
+
+
+def _secret_data(name: Any, data: Any, source: str) -> dict[str, str]:
+    if not isinstance(data, dict):
+        raise SecretFileError(f"{source}: data of secret '{name}' is not a mapping")
+    for key, value in data.items():
+        if value is None or isinstance(value, (dict, list)):
+            raise SecretFileError(
+                f"{source}: value of key '{key}' of secret '{name}' is not a scalar"
+            )
+    return {str(k): v if isinstance(v, str) else json.dumps(v) for k, v in data.items()}
+
+
+def load_secrets_file(path: str | Path) -> dict[str, dict[str, str]]:
+    """
+    Load secrets from a file, returning their data by secret name.
+
+    A dotenv file holds the data of the secret named after the file, e.g.
+    `db-credentials.env`. YAML and JSON files hold a mapping of secret names
+    to their data, or a list of secrets with a `name` and `data` like the
+    secrets of a project spec.
+    """
+    path = Path(path)
+    source = str(path)
+    text = path.read_text()
+    if path.suffix in DOTENV_SUFFIXES or path.name.startswith(".env"):
+        if path.stem.startswith(".") or not path.stem:
+            raise SecretFileError(
+                f"{source}: dotenv files are named after their secret, "
+                "e.g. secret-name.env"
+            )
+        return {path.stem: parse_dotenv(text, source)}
+    try:
+        document = json.loads(text) if path.suffix == ".json" else yaml.safe_load(text)
+    except (ValueError, yaml.YAMLError) as e:
+        # Parser messages may quote the content, only report the position
+        mark = getattr(e, "problem_mark", None)
+        where = f":{mark.line + 1}" if mark is not None else ""
+        raise SecretFileError(f"{source}{where}: invalid {path.suffix[1:].upper()}")
+    if isinstance(document, list):
+        found = {}
+        for i, item in enumerate(document):
+            if not isinstance(item, dict) or "name" not in item:
+                raise SecretFileError(f"{source}: secret #{i + 1} has no name")
+            found[str(item["name"])] = _secret_data(
+                item["name"], item.get("data", {}), source
+            )
+        return found
+    if isinstance(document, dict):
+        return {
+            str(name): _secret_data(name, data, source)
+            for name, data in document.items()
+        }
+    raise SecretFileError(f"{source}: expected a mapping or a list of secrets")
+
+
+def find_secret_files(paths: Iterable[str | Path]) -> list[Path]:
+    """Expand directories into the secret files they contain, recursively."""
+    found = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            found += sorted(
+                p
+                for p in path.rglob("*")
+                if p.is_file()
+                and (p.suffix in SECRET_SUFFIXES or p.name.startswith(".env"))
+            )
+        else:
+            found.append(path)
+    return found
+
+
+def load_secrets(paths: Iterable[str | Path]) -> dict[str, dict[str, str]]:
+    """
+    Load the secrets of files and directories, the keys of secrets found in
+    several files being merged, later files taking precedence.
+    """
+    loaded: dict[str, dict[str, str]] = {}
+    for path in find_secret_files(paths):
+        for name, data in load_secrets_file(path).items():
+            loaded.setdefault(name, {}).update(data)
+    return loaded
+
+
+class SecretDigests:
+    """
+    HMAC digests of the secrets last uploaded to an organization, to only
+    upload the secrets that changed since.
+    """
+
+    def __init__(self, scope: str, directory: str | Path | None = None) -> None:
+        self.directory = (
+            Path(directory) if directory else default_cache_dir() / "secrets"
+        )
+        safe_scope = re.sub(r"[^A-Za-z0-9_.-]", "_", scope)
+        self.path = self.directory / f"{safe_scope}.json"
+        self._key: bytes | None = None
+        try:
+            self.digests: dict[str, dict[str, str]] = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.digests = {}
+
+    def _write(self, path: Path, content: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        tmp_path.replace(path)
+
+    @property
+    def key(self) -> bytes:
+        if self._key is None:
+            path = self.directory / "digest.key"
+            try:
+                self._key = path.read_bytes()
+            except OSError:
+                self._key = secrets.token_bytes(32)
+                self._write(path, self._key)
+        return self._key
+
+    def digest(self, name: str, data: dict[str, str]) -> dict[str, str]:
+        """Return the digest of each key of a secret."""
+        return {
+            key: hmac.new(
+                self.key, f"{name}\0{key}\0{value}".encode(), hashlib.sha256
+            ).hexdigest()[:16]
+            for key, value in data.items()
+        }
+
+    def fingerprint(self, name: str, data: dict[str, str]) -> str:
+        """Return a short digest of a whole secret, to tell versions apart."""
+        digests = json.dumps(self.digest(name, data), sort_keys=True)
+        return hmac.new(self.key, digests.encode(), hashlib.sha256).hexdigest()[:12]
+
+    def changes(self, name: str, data: dict[str, str]) -> list[str] | None:
+        """
+        Return the keys of a secret added, changed or removed since its last
+        upload, or None for a secret never uploaded.
+        """
+        previous = self.digests.get(name)
+        if previous is None:
+            return None
+        current = self.digest(name, data)
+        return sorted(
+            k
+            for k in current.keys() | previous.keys()
+            if current.get(k) != previous.get(k)
+        )
+
+    def record(self, name: str, data: dict[str, str]) -> None:
+        self.digests[name] = self.digest(name, data)
+
+    def save(self) -> None:
+        self._write(
+            self.path, json.dumps(self.digests, indent=2, sort_keys=True).encode()
+        )
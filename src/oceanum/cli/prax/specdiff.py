@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+from .cache import default_cache_dir
+from .secretsync import SecretDigests
+
+if TYPE_CHECKING:
+    from . import models
+
+# The project is addressed by the deploy request, these are not patched
+IDENTITY_FIELDS = ("name", "userRef", "memberRef")
+
+
+def escape(token: str | int) -> str:
+    """Escape a JSON Pointer reference token."""
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def resolve(document: Any, pointer: str) -> Any:
+    for token in pointer.split("/")[1:]:
+        token = token.replace("~1", "/").replace("~0", "~")
+        document = document[int(token) if isinstance(document, list) else token]
+    return document
+
+
+def _differs(a: Any, b: Any) -> bool:
+    # True == 1 in Python but not in JSON
+    return type(a) is not type(b) or a != b
+
+
+def json_patch(base: Any, target: Any, path: str = "") -> list[dict]:
+    """
+    Return the add, replace and remove operations of an RFC 6902 JSON Patch
+    turning the JSON document `base` into `target`.
+
+    Lists are compared after their common head and tail, so adding or
+    removing an item in the middle of a list only touches the items in
+    between. The path of every add and replace operation points at the value
+    it sets in `target`.
+    """
+    if isinstance(base, dict) and isinstance(target, dict):
+        ops = []
+        for name, value in target.items():
+            child = f"{path}/{escape(name)}"
+            if name not in base:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops += json_patch(base[name], value, child)
+        for name in base:
+            if name not in target:
+                ops.append({"op": "remove", "path": f"{path}/{escape(name)}"})
+        return ops
+    if isinstance(base, list) and isinstance(target, list):
+        start = 0
+        while start < min(len(base), len(target)) and not _differs(
+            base[start], target[start]
+        ):
+            start += 1
+        end = 0
+        while end < min(len(base), len(target)) - start and not _differs(
+            base[-end - 1], target[-end - 1]
+        ):
+            end += 1
+        old = base[start : len(base) - end]
+        new = target[start : len(target) - end]
+        ops = []
+        for i, (a, b) in enumerate(zip(old, new)):
+            ops += json_patch(a, b, f"{path}/{start + i}")
+        for i in range(len(old), len(new)):
+            ops.append({"op": "add", "path": f"{path}/{start + i}", "value": new[i]})
+        for _ in range(len(new), len(old)):
+            ops.append({"op": "remove", "path": f"{path}/{start + len(new)}"})
+        return ops
+    if _differs(base, target):
+        return [{"op": "replace", "path": path, "value": target}]
+    return []
+
+
+def _overlay(document: Any, values: Any) -> Any:
+    if isinstance(document, dict) and isinstance(values, dict):
+        return document | {
+            name: _overlay(document.get(name), value) for name, value in values.items()
+        }
+    if (
+        isinstance(document, list)
+        and isinstance(values, list)
+        and len(document) == len(values)
+    ):
+        return [_overlay(a, b) for a, b in zip(document, values)]
+    return values
+
+
+def _spec_document(spec: models.ProjectSpec, reveal: bool = False) -> dict:
+    # Defaults are kept so they compare equal to those the API filled in
+    document = spec.model_dump(exclude_none=True, by_alias=True, mode="json")
+    if reveal:
+        # Deferred, the revealed-secrets models subclass the generated ones
+        from .revealed import dump_with_secrets
+
+        document = _overlay(document, dump_with_secrets(spec))
+    for name in IDENTITY_FIELDS:
+        document.pop(name, None)
+    return document
+
+
+def project_secret_digests(service: str, org: str, project: str) -> SecretDigests:
+    """Digests of the secret values last deployed with a project."""
+    return SecretDigests(
+        f"{service}-{org}-{project}", default_cache_dir() / "project-secrets"
+    )
+
+
+def _secrets(document: dict) -> dict[str, dict]:
+    return {
+        secret["name"]: secret
+        for secret in document.get("resources", {}).get("secrets", [])
+    }
+
+
+def record_secrets(digests: SecretDigests, spec: models.ProjectSpec) -> None:
+    from .revealed import dump_with_secrets
+
+    for name, secret in _secrets(dump_with_secrets(spec)).items():
+        digests.record(name, secret.get("data") or {})
+    try:
+        digests.save()
+    except OSError:
+        pass
+
+
+def spec_patch(
+    current: models.ProjectSpec,
+    spec: models.ProjectSpec,
+    digests: SecretDigests | None = None,
+) -> list[models.JSONPatchOpSchema] | None:
+    """
+    Return the JSON Patch updating the `current` project spec to `spec`, an
+    empty list when nothing changed, or None when the patch would not be
+    smaller than uploading the whole spec.
+
+    The API returns secret values masked, so secret values set in `spec`
+    are part of the patch unless `digests` show they were already deployed.
+    """
+    from . import models
+    from .revealed import dump_with_secrets
+
+    base = _spec_document(current)
+    target = _spec_document(spec, reveal=True)
+    deployed = _secrets(base)
+    for name, secret in _secrets(target).items():
+        data = secret.get("data") or {}
+        previous = deployed.get(name, {}).get("data") or {}
+        if (
+            digests is not None
+            and previous.keys() == data.keys()
+            and digests.changes(name, data) == []
+        ):
+            # Unchanged values compare equal to the masked ones
+            secret["data"] = previous
+    ops = json_patch(base, target)
+    if len(json.dumps(ops)) >= len(json.dumps(dump_with_secrets(spec))):
+        return None
+    return [models.JSONPatchOpSchema(**op) for op in ops]
+
+
+def masked_patch(
+    ops: list[models.JSONPatchOpSchema], spec: models.ProjectSpec
+) -> list[dict]:
+    """Return a patch made by `spec_patch` as JSON, with secret values masked."""
+    document = _spec_document(spec)
+    masked = []
+    for op in ops:
+        data = op.model_dump(exclude_none=True, mode="json")
+        if "value" in data:
+            data["value"] = resolve(document, op.path)
+        masked.append(data)
+    return masked
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable
+
+import yaml
+
+from .cache import default_cache_dir
+
+if TYPE_CHECKING:
+    from . import models
+
+DEFAULT_SPEC_CACHE_ENTRIES = 256
+
+# Top-level key of spec files and overlays holding default variable values
+VARIABLES_KEY = "variables"
+
+# ${name} or ${name:-default}, $${ is a literal ${
+_VARIABLE = re.compile(r"\$(\$?)\{([A-Za-z_][A-Za-z0-9_.-]*)(?::-([^}]*))?\}")
+
+
+class SpecRenderError(ValueError):
+    pass
+
+
+class _IncludeLoader(yaml.SafeLoader):
+    pass
+
+
+def _include(loader: _IncludeLoader, node: yaml.Node) -> Any:
+    return loader.render.load(loader.directory / loader.construct_scalar(node))
+
+
+_IncludeLoader.add_constructor("!include", _include)
+
+
+class SpecRenderer:
+    """
+    Render a project spec from a base spec file, `!include` tags, overlays
+    and `${name}` variables.
+    """
+
+    def __init__(
+        self,
+        overlays: Iterable[str | Path] = (),
+        variables: dict[str, str] | None = None,
+    ) -> None:
+        self.overlays = [Path(p) for p in overlays]
+        self.variables = variables or {}
+        # Every file read by the last render, for cache validation
+        self.files: list[Path] = []
+        self._stack: list[Path] = []
+
+    def load(self, path: str | Path) -> Any:
+        path = Path(path).resolve()
+        if path in self._stack:
+            chain = " -> ".join(p.name for p in self._stack + [path])
+            raise SpecRenderError(f"Circular include: {chain}")
+        self._stack.append(path)
+        self.files.append(path)
+        try:
+            loader = _IncludeLoader(path.read_text())
+            loader.render = self  # type: ignore[attr-defined]
+            loader.directory = path.parent  # type: ignore[attr-defined]
+            try:
+                return loader.get_single_data()
+            finally:
+                loader.dispose()
+        finally:
+            self._stack.pop()
+
+    def render(self, specfile: str | Path) -> dict:
+        self.files = []
+        document = self.load(specfile) or {}
+        for overlay in self.overlays:
+            document = merge(document, self.load(overlay) or {})
+        if not isinstance(document, dict):
+            raise SpecRenderError(f"Specfile {specfile} is not a mapping")
+        templated = VARIABLES_KEY in document or self.overlays or self.variables
+        if not templated:
+            # Plain specs are loaded as is, e.g. with ${HOME} in commands
+            return document
+        variables = {
+            str(k): v for k, v in (document.pop(VARIABLES_KEY, None) or {}).items()
+        }
+        variables.update(self.variables)
+        missing: set[str] = set()
+        document = substitute(document, variables, missing)
+        if missing:
+            raise SpecRenderError(
+                f"Undefined variables in {specfile}: {', '.join(sorted(missing))}"
+            )
+        return document
+
+
+def _named(items: list) -> bool:
+    return all(isinstance(item, dict) and "name" in item for item in items)
+
+
+def merge(base: Any, overlay: Any) -> Any:
+    if isinstance(base, dict) and isinstance(overlay, dict):
+        merged = dict(base)
+        for key, value in overlay.items():
+            if value is None:
+                merged.pop(key, None)
+            elif key in merged:
+                merged[key] = merge(merged[key], value)
+            else:
+                merged[key] = value
+        return merged
+    if isinstance(base, list) and isinstance(overlay, list):
+        if base and overlay and _named(base) and _named(overlay):
+            merged_items = {item["name"]: item for item in base}
+            for item in overlay:
+                name = item["name"]
+                base_item = merged_items.get(name)
+                merged_items[name] = merge(base_item, item) if base_item else item
+            return list(merged_items.values())
+    return overlay
+
+
+def substitute(value: Any, variables: dict[str, Any], missing: set[str]) -> Any:
+    if isinstance(value, dict):
+        return {k: substitute(v, variables, missing) for k, v in value.items()}
+    if isinstance(value, list):
+        return [substitute(v, variables, missing) for v in value]
+    if not isinstance(value, str) or "${" not in value:
+        return value
+    match = _VARIABLE.fullmatch(value)
+    if match and not match.group(1):
+        name, default = match.group(2), match.group(3)
+        if name in variables:
+            return variables[name]
+        if default is not None:
+            return default
+        missing.add(name)
+        return value
+
+    def replace(match: re.Match) -> str:
+        escaped, name, default = match.groups()
+        if escaped:
+            return match.group(0)[1:]
+        if name in variables:
+            return str(variables[name])
+        if default is not None:
+            return default
+        missing.add(name)
+        return match.group(0)
+
+    return _VARIABLE.sub(replace, value)
+
+
+def _digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class SpecCache:
+    """
+    On-disk cache of rendered and validated project specs, keyed by their
+    inputs and only readable by their owner.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_entries: int = DEFAULT_SPEC_CACHE_ENTRIES,
+    ) -> None:
+        self.directory = Path(directory) if directory else default_cache_dir() / "specs"
+        self.max_entries = max_entries
+
+    @classmethod
+    def from_env(cls) -> SpecCache | None:
+        """Return the cache unless disabled with PRAX_SPEC_CACHE=0."""
+        if os.getenv("PRAX_SPEC_CACHE", "1").lower() in ["0", "false", "no"]:
+            return None
+        return cls()
+
+    def key(self, specfile: Path, renderer: SpecRenderer) -> str:
+        from . import __version__, models
+
+        # Entries are pickled models, stale once the models change
+        models_mtime = Path(models.__file__).stat().st_mtime_ns
+        parts = [__version__, str(models_mtime)]
+        parts.append(json.dumps(renderer.variables, sort_keys=True, default=str))
+        parts += [_digest(p) for p in [specfile, *renderer.overlays]]
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def get(self, key: str) -> models.ProjectSpec | None:
+        path = self.directory / f"{key}.pickle"
+        try:
+            with path.open("rb") as f:
+                digests, spec = pickle.load(f)
+            if any(_digest(Path(p)) != digest for p, digest in digests.items()):
+                return None
+        except (OSError, pickle.PickleError, EOFError, AttributeError, ValueError):
+            return None
+        os.utime(path)
+        return spec
+
+    def put(self, key: str, spec: models.ProjectSpec, files: list[Path]) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            digests = {str(p): _digest(p) for p in files}
+            path = self.directory / f"{key}.pickle"
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((digests, spec), f)
+            tmp_path.replace(path)
+            entries = sorted(
+                self.directory.glob("*.pickle"), key=lambda p: p.stat().st_mtime
+            )
+            for old in entries[: max(0, len(entries) - self.max_entries)]:
+                old.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def load_spec(
+    specfile: str | Path,
+    overlays: Iterable[str | Path] = (),
+    variables: dict[str, str] | None = None,
+    cache: SpecCache | None = None,
+) -> models.ProjectSpec:
+    """
+    Render and validate a project spec, from the cache when none of its
+    inputs changed.
+    """
+    from . import models
+
+    specfile = Path(specfile)
+    renderer = SpecRenderer(overlays, variables)
+    if cache is None:
+        return models.ProjectSpec(**renderer.render(specfile))
+    key = cache.key(specfile, renderer)
+    spec = cache.get(key)
+    if spec is None:
+        spec = models.ProjectSpec(**renderer.render(specfile))
+        cache.put(key, spec, renderer.files)
+    return spec
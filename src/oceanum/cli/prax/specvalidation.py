@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+from .cache import default_cache_dir
+
+if TYPE_CHECKING:
+    from . import models
+
+SPEC_SUFFIXES = (".yaml", ".yml")
+
+# Files validated by each process when the number of processes is not given,
+# fewer files are validated in-process as starting processes costs more
+FILES_PER_PROCESS = 32
+
+# Reference keys of the spec and the resources they point to
+REFERENCES = {
+    "secretRef": "secrets",
+    "configmapRef": "configmaps",
+    "channelRef": "channels",
+    "imageRef": "images",
+    "sourceRef": "sources",
+    "buildRef": "builds",
+    "taskRef": "tasks",
+    "pipelineRef": "pipelines",
+}
+
+# Resources deployed by listing them in a stage
+STAGED_RESOURCES = ("tasks", "pipelines", "services", "notebooks")
+
+
+def _error(
+    loc: Iterable[str | int], msg: str, type: str
+) -> models.ValidationErrorDetail:
+    from . import models
+
+    return models.ValidationErrorDetail(loc=[str(v) for v in loc], msg=msg, type=type)
+
+
+def _dicts(value: Any, loc: tuple = ()) -> Iterator[tuple[tuple, dict]]:
+    if isinstance(value, dict):
+        yield loc, value
+        for name, child in value.items():
+            yield from _dicts(child, loc + (name,))
+    elif isinstance(value, list):
+        for i, child in enumerate(value):
+            yield from _dicts(child, loc + (i,))
+
+
+def reference_errors(spec: models.ProjectSpec) -> list[models.ValidationErrorDetail]:
+    """
+    Check the references between the resources of a project spec: secret,
+    configmap, channel, image, source, build, task and pipeline references,
+    the keys of referenced secrets and configmaps, the resources listed by
+    each stage and duplicate resource and stage names.
+    """
+    document = spec.model_dump(exclude_none=True, by_alias=True, mode="json")
+    resources = document.get("resources", {})
+    defined: dict[str, dict[str, Any]] = {}
+    errors = []
+    for kind, items in resources.items():
+        defined[kind] = {}
+        for i, item in enumerate(items):
+            name = item.get("name") if isinstance(item, dict) else None
+            if name is None:
+                continue
+            if name in defined[kind]:
+                errors.append(
+                    _error(
+                        ("resources", kind, i, "name"),
+                        f"Duplicate name '{name}' in resources.{kind}",
+                        "duplicate_name",
+                    )
+                )
+            defined[kind][name] = item
+    for loc, value in _dicts(resources, ("resources",)):
+        for ref_key, kind in REFERENCES.items():
+            ref = value.get(ref_key)
+            if ref is None:
+                continue
+            name = ref.get("name") if isinstance(ref, dict) else ref
+            item = defined.get(kind, {}).get(name)
+            if item is None:
+                errors.append(
+                    _error(
+                        loc + (ref_key,),
+                        f"'{name}' is not defined in resources.{kind}",
+                        "reference_error",
+                    )
+                )
+                continue
+            if not isinstance(ref, dict) or not isinstance(item.get("data"), dict):
+                continue
+            keys = [ref["key"]] if "key" in ref else []
+            keys += [k["key"] for k in ref.get("keys", []) if "key" in k]
+            for key in keys:
+                if key not in item["data"]:
+                    errors.append(
+                        _error(
+                            loc + (ref_key, "key"),
+                            f"Key '{key}' is not in the data of '{name}' in "
+                            f"resources.{kind}",
+                            "reference_error",
+                        )
+                    )
+    for i, stage in enumerate(resources.get("stages", [])):
+        for kind in STAGED_RESOURCES:
+            for j, item in enumerate(stage.get("resources", {}).get(kind, [])):
+                name = item.get("name") if isinstance(item, dict) else item
+                if name not in defined.get(kind, {}):
+                    errors.append(
+                        _error(
+                            ("resources", "stages", i, "resources", kind, j),
+                            f"'{name}' is not defined in resources.{kind}",
+                            "reference_error",
+                        )
+                    )
+    return errors
+
+
+def validate_spec(
+    specfile: str,
+    overlays: Iterable[str] = (),
+    variables: dict[str, str] | None = None,
+) -> models.ProjectSpec | models.ErrorResponse:
+    """Validate a project spec file without the PRAX API."""
+    from . import models
+    from .client import PRAXClient
+
+    spec = PRAXClient.load_spec(specfile, overlays, variables)
+    if isinstance(spec, models.ErrorResponse):
+        return spec
+    errors = reference_errors(spec)
+    return models.ErrorResponse(detail=errors) if errors else spec
+
+
+def _validate_file(
+    specfile: str,
+    overlays: Iterable[str] = (),
+    variables: dict[str, str] | None = None,
+) -> tuple[str, models.ErrorResponse | None]:
+    from . import models
+
+    result = validate_spec(specfile, overlays, variables)
+    # Only errors are sent back from the worker processes
+    return specfile, result if isinstance(result, models.ErrorResponse) else None
+
+
+def find_specfiles(paths: Iterable[str]) -> list[str]:
+    """
+    Expand glob patterns, and directories into the YAML files they contain,
+    recursively.
+    """
+    specfiles = []
+    for pattern in paths:
+        if any(c in pattern for c in "*?["):
+            specfiles += find_specfiles(sorted(glob.glob(pattern, recursive=True)))
+            continue
+        path = pattern
+        if Path(path).is_dir():
+            specfiles += sorted(
+                str(p)
+                for p in Path(path).rglob("*")
+                if p.suffix in SPEC_SUFFIXES and p.is_file()
+            )
+        else:
+            specfiles.append(path)
+    return specfiles
+
+
+def validate_specs(
+    specfiles: list[str],
+    processes: int | None = None,
+    overlays: Iterable[str] = (),
+    variables: dict[str, str] | None = None,
+) -> Iterator[tuple[str, models.ErrorResponse | None]]:
+    """
+    Validate project spec files without the PRAX API, yielding each file with
+    its errors, or None when valid, in the order given. The `overlays` and
+    `variables` are applied to every file.
+
+    Files are spread over `processes` worker processes, by default one per
+    CPU but no more than one per FILES_PER_PROCESS files.
+    """
+    validate_file = partial(
+        _validate_file, overlays=tuple(overlays), variables=variables
+    )
+    if processes is None:
+        processes = min(os.cpu_count() or 1, len(specfiles) // FILES_PER_PROCESS)
+    if processes <= 1 or len(specfiles) <= 1:
+        yield from map(validate_file, specfiles)
+        return
+    from . import models
+
+    # Load the models once, forked workers inherit them
+    models.ProjectSpec
+    chunksize = max(1, len(specfiles) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        yield from executor.map(validate_file, specfiles, chunksize=chunksize)
+
+
+def spec_schema_path(directory: str | Path | None = None) -> Path:
+    """
+    Return the path to the JSON Schema of project specs, exported from the
+    models and cached per CLI version, for editors and linters to validate
+    spec files with.
+    """
+    from . import __version__, models
+
+    directory = Path(directory) if directory else default_cache_dir() / "schemas"
+    path = directory / f"project-spec-{__version__}.json"
+    models_path = Path(models.__file__)
+    if path.exists() and path.stat().st_mtime >= models_path.stat().st_mtime:
+        return path
+    schema = models.ProjectSpec.model_json_schema(by_alias=True)
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(schema, indent=2))
+    tmp_path.replace(path)
+    return path
@@ -0,0 +1,453 @@
+from __future__ import annotations
+
+import fnmatch
+import queue
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, Literal, NamedTuple
+
+import click
+import requests
+import urllib3
+
+from oceanum.cli.auth import login_required
+from oceanum.cli.symbols import err, info, wrn
+
+from . import models
+from .client import DEFAULT_POOL_MAXSIZE, PRAXClient
+from .deadline import Deadline, DeadlineExceeded
+from .logfilter import LogFilter, LogWriter, log_filter_options
+from .project import (
+    project_name_option,
+    project_org_option,
+    project_stage_option,
+    project_user_option,
+)
+from .utils import echoerr
+
+LogKind = Literal["task", "pipeline", "build", "route"]
+LOG_KINDS: list[LogKind] = ["task", "pipeline", "build", "route"]
+
+# Lines remembered per source to recognise the ones replayed after a reconnect
+REPLAY_HISTORY = 200
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 30.0
+MAX_RECONNECTS = 10
+DEFAULT_MAX_SOURCES = 20
+
+FINISHED_RUN_STATUSES = {"succeeded", "failed", "error", "stopped", "terminated"}
+
+_PREFIX_COLORS = ["cyan", "magenta", "green", "yellow", "blue", "red"]
+
+
+class LogSource(NamedTuple):
+    kind: LogKind
+    # Task, Pipeline, Build or Route name
+    name: str
+    # Name used for the logs endpoint, the last run name for workflows
+    target: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.kind}/{self.name}"
+
+
+def discover_log_sources(
+    client: PRAXClient,
+    kinds: Iterable[LogKind] = LOG_KINDS,
+    patterns: Iterable[str] = (),
+    **filters,
+) -> list[LogSource] | models.ErrorResponse:
+    """
+    List the runs and routes to follow, keeping the last run of each Task,
+    Pipeline and Build and any Route whose name matches one of the glob
+    `patterns` (all of them when no pattern is given).
+    """
+    filters = {k: v for k, v in filters.items() if v is not None}
+    listers: dict[LogKind, Callable] = {
+        "task": client.list_tasks,
+        "pipeline": client.list_pipelines,
+        "build": client.list_builds,
+        "route": client.list_routes,
+    }
+    patterns = list(patterns)
+    sources = []
+    for kind in kinds:
+        resources = listers[kind](**filters)
+        if isinstance(resources, models.ErrorResponse):
+            return resources
+        for resource in resources:
+            if patterns and not any(
+                fnmatch.fnmatchcase(resource.name, p) for p in patterns
+            ):
+                continue
+            if kind == "route":
+                sources.append(LogSource(kind, resource.name, resource.name))
+            elif resource.last_run is not None:
+                sources.append(LogSource(kind, resource.name, resource.last_run.name))
+    return sources
+
+
+class ReplayFilter:
+    """
+    Remember the last lines of a log stream and drop the ones a reconnected
+    stream sends again.
+    """
+
+    def __init__(self, history: int = REPLAY_HISTORY) -> None:
+        self.seen: deque[str] = deque(maxlen=history)
+        self._replaying = False
+        self._candidates: list[int] = []
+        self._held: list[str] = []
+        self._overlap: int | None = None
+
+    def reconnect(self) -> int:
+        """Start matching a replayed stream, returning the tail to request."""
+        self._release()
+        self._replaying = bool(self.seen)
+        self._candidates = list(range(len(self.seen)))
+        self._held = []
+        self._overlap = None
+        return len(self.seen)
+
+    def feed(self, line: str) -> list[str]:
+        """Return the lines ready to be shown after receiving `line`."""
+        if not self._replaying:
+            self.seen.append(line)
+            return [line]
+        # Held back while they may still be a suffix of the lines already seen
+        self._held.append(line)
+        offset = len(self._held)
+        seen = self.seen
+        alive = []
+        for start in self._candidates:
+            if seen[start + offset - 1] != line:
+                continue
+            if start + offset == len(seen):
+                # The held lines cover this whole suffix, smaller starting
+                # points that are still alive would overlap more
+                self._overlap = offset
+            else:
+                alive.append(start)
+        self._candidates = alive
+        if alive:
+            return []
+        return self._release()
+
+    def _release(self) -> list[str]:
+        if not self._replaying:
+            return []
+        self._replaying = False
+        new = self._held[self._overlap or 0 :]
+        self._held = []
+        self.seen.extend(new)
+        return new
+
+    def flush(self) -> list[str]:
+        """
+        Return the held lines worth showing once the stream ends. Lines still
+        matching history at that point are replays and are dropped.
+        """
+        if self._replaying and self._overlap is None and self._candidates:
+            self._replaying = False
+            self._held = []
+            return []
+        return self._release()
+
+
+class LogEvent(NamedTuple):
+    source: LogSource
+    kind: Literal["line", "notice", "error", "done"]
+    text: str = ""
+    time: datetime | None = None
+
+
+class LogTailer:
+    """
+    Follow the logs of several sources at once on one thread per source,
+    funnelling their lines into a single queue.
+    """
+
+    def __init__(
+        self,
+        client: PRAXClient,
+        sources: Iterable[LogSource],
+        lines: int = 100,
+        follow: bool = False,
+        reconnect_delay: float = RECONNECT_DELAY,
+        max_reconnects: int = MAX_RECONNECTS,
+        deadline: Deadline | None = None,
+    ) -> None:
+        self.client = client
+        self.sources = list(sources)
+        self.lines = lines
+        self.follow = follow
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnects = max_reconnects
+        self.deadline = deadline or Deadline()
+        self._events: queue.Queue[LogEvent] = queue.Queue()
+        self._stop = threading.Event()
+
+    def _stream(self, source: LogSource, tail: int) -> Iterable:
+        getters = {
+            "task": self.client.get_task_run_logs,
+            "pipeline": self.client.get_pipeline_run_logs,
+            "build": self.client.get_build_run_logs,
+            "route": self.client.get_route_logs,
+        }
+        return getters[source.kind](source.target, tail, self.follow)
+
+    def _finished(self, source: LogSource) -> bool:
+        getters = {
+            "task": self.client.get_task_run,
+            "pipeline": self.client.get_pipeline_run,
+            "build": self.client.get_build_run,
+        }
+        if source.kind not in getters:
+            return False
+        run = getters[source.kind](source.target)
+        if isinstance(run, models.ErrorResponse):
+            return False
+        return run.status.lower() in FINISHED_RUN_STATUSES
+
+    def _emit(self, source: LogSource, lines: list[str]) -> None:
+        now = datetime.now()
+        for line in lines:
+            self._events.put(LogEvent(source, "line", line, now))
+
+    def _follow(self, source: LogSource) -> None:
+        replay = ReplayFilter()
+        tail = self.lines
+        failures = 0
+        while not self._stop.is_set():
+            problem = None
+            try:
+                for line in self._stream(source, tail):
+                    if isinstance(line, models.ErrorResponse):
+                        problem = line
+                        break
+                    if isinstance(line, bytes):
+                        line = line.decode("utf-8", errors="replace")
+                    new_lines = replay.feed(line)
+                    if new_lines:
+                        failures = 0
+                    self._emit(source, new_lines)
+                    if self._stop.is_set():
+                        return
+            except (
+                requests.exceptions.RequestException,
+                urllib3.exceptions.HTTPError,
+            ) as e:
+                problem = e
+            self._emit(source, replay.flush())
+            if problem is None:
+                if not self.follow:
+                    break
+                try:
+                    if self._finished(source):
+                        break
+                except (
+                    requests.exceptions.RequestException,
+                    urllib3.exceptions.HTTPError,
+                ) as e:
+                    # Retried like a dropped stream
+                    problem = e
+            elif isinstance(problem, models.ErrorResponse) and not replay.seen:
+                # The log is not available at all, reconnecting will not help
+                self._events.put(LogEvent(source, "error", _detail(problem)))
+                break
+            if problem is None:
+                # Closed cleanly, e.g. an idle route stream
+                delay = self.reconnect_delay
+            else:
+                failures += 1
+                if failures > self.max_reconnects:
+                    self._events.put(
+                        LogEvent(
+                            source,
+                            "error",
+                            f"Giving up after {failures - 1} reconnects",
+                        )
+                    )
+                    break
+                delay = min(
+                    self.reconnect_delay * 2 ** (failures - 1), MAX_RECONNECT_DELAY
+                )
+                self._events.put(
+                    LogEvent(
+                        source,
+                        "notice",
+                        f"Log stream dropped ({_detail(problem)}), reconnecting in {delay:.0f}s...",
+                    )
+                )
+            if self._stop.wait(delay):
+                break
+            tail = replay.reconnect() or self.lines
+
+    def _follow_until_deadline(self, source: LogSource) -> None:
+        try:
+            self._follow(source)
+        except DeadlineExceeded:
+            # Reported by the main thread, which stops waiting at the deadline
+            pass
+        except Exception as e:
+            self._events.put(LogEvent(source, "error", str(e) or type(e).__name__))
+        finally:
+            # Always sent, the main thread waits for one per source
+            self._events.put(LogEvent(source, "done"))
+
+    def events(self) -> Iterator[LogEvent]:
+        """
+        Start following every source and yield their events as they arrive,
+        until every stream has ended or the iterator is closed.
+        """
+        threads = [
+            threading.Thread(
+                target=self._follow_until_deadline, args=(source,), daemon=True
+            )
+            for source in self.sources
+        ]
+        for thread in threads:
+            thread.start()
+        running = len(threads)
+        deadline = self.deadline
+        try:
+            while running:
+                remaining = deadline.remaining()
+                try:
+                    event = self._events.get(
+                        timeout=None if remaining is None else max(remaining, 0.0)
+                    )
+                except queue.Empty:
+                    deadline.check()
+                    continue
+                if event.kind == "done":
+                    running -= 1
+                yield event
+        finally:
+            self._stop.set()
+
+
+def _detail(problem: models.ErrorResponse | Exception) -> str:
+    if isinstance(problem, models.ErrorResponse):
+        return str(problem.detail)
+    return str(problem) or type(problem).__name__
+
+
+@click.command(name="tail", help="Follow the logs of many PRAX Runs and Routes at once")
+@click.pass_context
+@project_org_option
+@project_user_option
+@project_name_option
+@project_stage_option
+@click.option(
+    "-k",
+    "--kind",
+    "kinds",
+    help="Kind of resource to follow, can be repeated, defaults to all",
+    multiple=True,
+    type=click.Choice(LOG_KINDS),
+)
+@click.option(
+    "-m",
+    "--match",
+    "patterns",
+    help="Follow only resources with names matching this glob pattern, can be repeated",
+    multiple=True,
+    type=str,
+)
+@click.option(
+    "-n", "--lines", help="Number of lines to show per source", default=100, type=int
+)
+@click.option(
+    "-f", "--follow", help="Follow logs", default=False, type=bool, is_flag=True
+)
+@click.option(
+    "--timestamps/--no-timestamps",
+    help="Prefix lines with the time they were received",
+    default=True,
+)
+@click.option(
+    "--max-sources",
+    help="Refuse to follow more sources than this",
+    default=DEFAULT_MAX_SOURCES,
+    show_default=True,
+    type=click.IntRange(min=1),
+)
+@log_filter_options
+@login_required
+def tail_logs(
+    ctx: click.Context,
+    kinds: tuple[LogKind, ...],
+    patterns: tuple[str, ...],
+    lines: int,
+    follow: bool,
+    timestamps: bool,
+    max_sources: int,
+    **filters,
+):
+    client = PRAXClient(ctx)
+    sources = discover_log_sources(client, kinds or LOG_KINDS, patterns, **filters)
+    if isinstance(sources, models.ErrorResponse):
+        click.echo(f" {err} Error fetching log sources:")
+        echoerr(sources)
+        sys.exit(1)
+    if not sources:
+        click.echo(f" {wrn} No runs or routes found!")
+        return
+    if len(sources) > max_sources:
+        click.echo(
+            f" {err} {len(sources)} runs and routes match, narrow the selection "
+            f"or raise --max-sources!"
+        )
+        sys.exit(1)
+    click.echo(
+        f" {info} Following logs from {', '.join(s.label for s in sources)} ...",
+        err=True,
+    )
+
+    width = max(len(s.label) for s in sources)
+    prefixes = {
+        s: click.style(s.label.ljust(width), fg=_PREFIX_COLORS[i % len(_PREFIX_COLORS)])
+        for i, s in enumerate(sources)
+    }
+    stream_client = PRAXClient(
+        ctx, pool_maxsize=max(len(sources), DEFAULT_POOL_MAXSIZE)
+    )
+    tailer = LogTailer(
+        stream_client,
+        sources,
+        lines=lines,
+        follow=follow,
+        deadline=Deadline.from_context(ctx),
+    )
+    log_filter = LogFilter.from_context(ctx)
+    line_filters = {s: log_filter.fork() for s in sources} if log_filter else {}
+    failed = False
+    events = tailer.events()
+    try:
+        with LogWriter() as writer:
+            for event in events:
+                prefix = prefixes[event.source]
+                if event.kind == "line":
+                    text = event.text
+                    if (
+                        line_filters
+                        and (text := line_filters[event.source](text)) is None
+                    ):
+                        continue
+                    stamp = f"{event.time:%H:%M:%S} " if timestamps else ""
+                    writer.write(f"{stamp}{prefix} | {text}")
+                elif event.kind == "notice":
+                    click.echo(f" {wrn} {prefix} {event.text}", err=True)
+                elif event.kind == "error":
+                    failed = True
+                    click.echo(f" {err} {prefix} {event.text}", err=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        events.close()
+    if failed:
+        sys.exit(1)
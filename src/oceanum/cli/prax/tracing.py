@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import json
+import secrets
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+import click
+import humanize
+from tabulate import tabulate
+
+from oceanum.cli.symbols import chk, info
+
+TRACE_META_KEY = "oceanum.prax.trace"
+
+SERVICE_NAME = "oceanum-prax-cli"
+
+# OTLP span kinds and status codes
+_KIND_INTERNAL = 1
+_KIND_CLIENT = 3
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+
+class RequestSpan(NamedTuple):
+    """One API request, with its timings in seconds."""
+
+    method: str
+    endpoint: str
+    url: str
+    start: float
+    latency: float
+    status: int | None = None
+    size: int = 0
+    retries: int = 0
+    validation: float = 0.0
+    schema: str | None = None
+    error: str | None = None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None or self.status is None or self.status >= 400
+
+
+def _span_id() -> str:
+    return secrets.token_hex(8)
+
+
+def _nanos(seconds: float) -> str:
+    # OTLP/JSON encodes 64-bit integers as strings
+    return str(int(seconds * 1e9))
+
+
+def _attributes(values: dict[str, Any]) -> list[dict]:
+    attributes = []
+    for key, value in values.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            encoded = {"boolValue": value}
+        elif isinstance(value, int):
+            encoded = {"intValue": str(value)}
+        elif isinstance(value, float):
+            encoded = {"doubleValue": value}
+        else:
+            encoded = {"stringValue": str(value)}
+        attributes.append({"key": key, "value": encoded})
+    return attributes
+
+
+class Tracer:
+    """
+    Record the API requests made by a command, to print a timing summary and
+    export an OTLP/JSON trace when it exits.
+    """
+
+    def __init__(self, summary: bool = False, path: str | Path | None = None) -> None:
+        self.summary = summary
+        self.path = Path(path) if path else None
+        self.command = "oceanum prax"
+        self.spans: list[RequestSpan] = []
+        self.start = time.time()
+        self.end: float | None = None
+        self.trace_id = secrets.token_hex(16)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_context(cls, ctx: click.Context) -> "Tracer | None":
+        """
+        Return the tracer enabled with --trace or --trace-file, naming the
+        trace after the command asking for it.
+        """
+        tracer = ctx.meta.get(TRACE_META_KEY)
+        if tracer is not None:
+            tracer.command = ctx.command_path
+        return tracer
+
+    def record(self, span: RequestSpan) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def summary_rows(self) -> list[list[Any]]:
+        """One row per method and endpoint, the slowest first."""
+        groups: dict[tuple[str, str], list[RequestSpan]] = {}
+        for span in self.spans:
+            groups.setdefault((span.method, span.endpoint), []).append(span)
+        rows = []
+        for (method, endpoint), spans in groups.items():
+            latencies = [s.latency for s in spans]
+            rows.append(
+                [
+                    method,
+                    endpoint,
+                    len(spans),
+                    sum(s.failed for s in spans),
+                    sum(s.retries for s in spans),
+                    sum(s.size for s in spans),
+                    sum(latencies) * 1000,
+                    sum(latencies) / len(spans) * 1000,
+                    max(latencies) * 1000,
+                    sum(s.validation for s in spans) * 1000,
+                ]
+            )
+        return sorted(rows, key=lambda row: row[6], reverse=True)
+
+    def report(self) -> None:
+        rows = [
+            row[:5] + [humanize.naturalsize(row[5], binary=True)] + row[6:]
+            for row in self.summary_rows()
+        ]
+        headers = [
+            "Method",
+            "Endpoint",
+            "Requests",
+            "Errors",
+            "Retries",
+            "Received",
+            "Total (ms)",
+            "Mean (ms)",
+            "Max (ms)",
+            "Validation (ms)",
+        ]
+        elapsed = (self.end or time.time()) - self.start
+        latency = sum(s.latency for s in self.spans)
+        validation = sum(s.validation for s in self.spans)
+        click.echo(err=True)
+        if rows:
+            click.echo(tabulate(rows, headers=headers, floatfmt=".1f"), err=True)
+        s = "s" if len(self.spans) != 1 else ""
+        click.echo(
+            f" {info} {len(self.spans)} API request{s} took {latency:.2f}s and "
+            f"validating their responses {validation:.2f}s, out of {elapsed:.2f}s",
+            err=True,
+        )
+
+    def to_otlp(self) -> dict:
+        """Return the trace in the OTLP/JSON format of OpenTelemetry collectors."""
+        end = self.end or time.time()
+        root_id = _span_id()
+        spans = [
+            {
+                "traceId": self.trace_id,
+                "spanId": root_id,
+                "name": self.command,
+                "kind": _KIND_INTERNAL,
+                "startTimeUnixNano": _nanos(self.start),
+                "endTimeUnixNano": _nanos(end),
+                "attributes": _attributes({"prax.requests": len(self.spans)}),
+            }
+        ]
+        for span in self.spans:
+            span_id = _span_id()
+            status: dict[str, Any] = {
+                "code": _STATUS_ERROR if span.failed else _STATUS_OK
+            }
+            if span.error:
+                status["message"] = span.error
+            spans.append(
+                {
+                    "traceId": self.trace_id,
+                    "spanId": span_id,
+                    "parentSpanId": root_id,
+                    "name": f"{span.method} {span.endpoint}",
+                    "kind": _KIND_CLIENT,
+                    "startTimeUnixNano": _nanos(span.start),
+                    "endTimeUnixNano": _nanos(span.start + span.latency),
+                    "attributes": _attributes(
+                        {
+                            "http.request.method": span.method,
+                            "url.full": span.url,
+                            "http.response.status_code": span.status,
+                            "http.response.body.size": span.size,
+                            "http.request.resend_count": span.retries or None,
+                            "error.type": span.error and span.error.split(":")[0],
+                        }
+                    ),
+                    "status": status,
+                }
+            )
+            if span.schema is not None:
+                validated = span.start + span.latency
+                spans.append(
+                    {
+                        "traceId": self.trace_id,
+                        "spanId": _span_id(),
+                        "parentSpanId": span_id,
+                        "name": f"validate {span.schema}",
+                        "kind": _KIND_INTERNAL,
+                        "startTimeUnixNano": _nanos(validated),
+                        "endTimeUnixNano": _nanos(validated + span.validation),
+                    }
+                )
+        from . import __version__
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _attributes(
+                            {
+                                "service.name": SERVICE_NAME,
+                                "service.version": __version__,
+                            }
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __package__, "version": __version__},
+                            "spans": spans,
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def export(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_otlp(), indent=2))
+
+    def finish(self) -> None:
+        self.end = time.time()
+        if self.path is not None:
+            self.export(self.path)
+            click.echo(f" {chk} Trace written to {self.path}", err=True)
+        if self.summary:
+            self.report()
+
+
+def _store_trace(ctx: click.Context, param: click.Parameter, value: Any) -> Any:
+    if not value:
+        return value
+    tracer = ctx.meta.get(TRACE_META_KEY)
+    if tracer is None:
+        tracer = ctx.meta[TRACE_META_KEY] = Tracer()
+        ctx.call_on_close(tracer.finish)
+    if param.name == "trace":
+        tracer.summary = True
+    else:
+        tracer.path = Path(value)
+    return value
+
+
+def trace_options(func: Callable) -> Callable:
+    """
+    Add the --trace and --trace-file options to a command, read them back
+    with `Tracer.from_context`.
+    """
+    func = click.option(
+        "--trace-file",
+        help="Write a trace of the API requests to PATH as OTLP/JSON",
+        default=None,
+        type=click.Path(dir_okay=False, writable=True),
+        envvar="PRAX_TRACE_FILE",
+        callback=_store_trace,
+        expose_value=False,
+    )(func)
+    func = click.option(
+        "--trace",
+        help="Print the timing of the API requests when the command exits",
+        is_flag=True,
+        default=False,
+        envvar="PRAX_TRACE",
+        callback=_store_trace,
+        expose_value=False,
+    )(func)
+    return func
@@ -1,14 +1,21 @@
+from __future__ import annotations
+
 import os
+import sys
 
 import click
+from tabulate import tabulate
 
 from oceanum.cli.auth import login_required
 from oceanum.cli.renderer import Renderer, RenderField
-from oceanum.cli.symbols import chk, err, wrn
+from oceanum.cli.symbols import chk, err, info, spin, wrn
 
 from . import models
-from .client import PRAXClient
-from .main import create, describe
+from .cache import cache_options
+from .client import DEFAULT_POOL_MAXSIZE, PRAXClient
+from .concurrency import DEFAULT_CONCURRENCY, bounded_map
+from .main import create, describe, update
+from .secretsync import SecretDigests, SecretFileError, load_secrets
 from .utils import echoerr
 
 
@@ -17,6 +24,7 @@ from .utils import echoerr
     "--org", help="Organization name to show resources for", default=None, type=str
 )
 @click.pass_context
+@cache_options
 @login_required
 def describe_user(ctx: click.Context, org: str | None):
     client = PRAXClient(ctx)
@@ -169,45 +177,28 @@ def describe_user(ctx: click.Context, org: str | None):
         return 0
 
 
-@create.command(name="user-secret", help="Create a new PRAX User Secret (API Token)")
-@click.pass_context
-@click.argument("name", type=str)
-@click.option(
-    "--org",
-    help="Organization name. Defaults to your current Org.",
-    default=None,
-    type=str,
-)
-@click.option("--description", help="Secret description", type=str, default=None)
-@click.option(
-    "--data", "-d", help="Secret data key=value pairs", type=str, multiple=True
-)
-@login_required
-def create_user_secret(
-    ctx: click.Context,
-    name: str,
-    org: str | None,
-    description: str | None,
-    data: list[str],
-):
-    client = PRAXClient(ctx)
+def _secrets_org(client: PRAXClient, org: str | None) -> str | None:
+    """
+    Return the organization to manage User Secrets of, by default the
+    current one, or None after printing why the user cannot manage them.
+    """
     users = client.get_users()
 
     if isinstance(users, models.ErrorResponse):
         click.echo(f" {err} Error fetching User information:")
         echoerr(users)
-        return 1
+        return None
     elif users:
         user = users[0]
     else:
         click.echo(f" {err} No user information found.")
-        return 1
+        return None
 
     if not user.current_org:
         click.echo(
             f" {err} No organization specified and user '{user.username}' has no current Org."
         )
-        return 1
+        return None
 
     org = org or user.current_org.name
     user_id = getattr(user.email, "root", user.username)
@@ -217,6 +208,34 @@ def create_user_secret(
         click.echo(
             f" {wrn} User '{user_id}' cannot manage User Resources from Organization '{org}'"
         )
+        return None
+    return org
+
+
+@create.command(name="user-secret", help="Create a new PRAX User Secret (API Token)")
+@click.pass_context
+@click.argument("name", type=str)
+@click.option(
+    "--org",
+    help="Organization name. Defaults to your current Org.",
+    default=None,
+    type=str,
+)
+@click.option("--description", help="Secret description", type=str, default=None)
+@click.option(
+    "--data", "-d", help="Secret data key=value pairs", type=str, multiple=True
+)
+@login_required
+def create_user_secret(
+    ctx: click.Context,
+    name: str,
+    org: str | None,
+    description: str | None,
+    data: list[str],
+):
+    client = PRAXClient(ctx)
+    org = _secrets_org(client, org)
+    if org is None:
         return 1
 
     secret_data = {}
@@ -240,3 +259,124 @@ def create_user_secret(
         click.echo(
             f" {chk} User-Secret '{secret.name}' created successfully in '{org}' namespace!"
         )
+
+
+@update.command(
+    name="user-secrets",
+    help=(
+        "Sync PRAX User Secrets from dotenv, YAML or JSON files and directories, "
+        "only uploading the secrets that changed"
+    ),
+)
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "--org",
+    help="Organization name. Defaults to your current Org.",
+    default=None,
+    type=str,
+)
+@click.option(
+    "--dry-run",
+    help="Show which secrets changed without uploading them",
+    default=False,
+    is_flag=True,
+)
+@click.option(
+    "--force",
+    help="Upload every secret, changed or not",
+    default=False,
+    is_flag=True,
+)
+@click.option(
+    "-j",
+    "--concurrency",
+    help="Maximum number of secrets uploaded at the same time",
+    default=DEFAULT_CONCURRENCY,
+    type=click.IntRange(min=1),
+)
+@click.pass_context
+@login_required
+def sync_user_secrets(
+    ctx: click.Context,
+    paths: tuple[str, ...],
+    org: str | None,
+    dry_run: bool,
+    force: bool,
+    concurrency: int,
+):
+    try:
+        found = load_secrets(paths)
+    except (SecretFileError, OSError) as e:
+        click.echo(f" {err} Could not load secrets!")
+        click.echo(f" {wrn} {e}")
+        sys.exit(1)
+    if not found:
+        click.echo(f" {wrn} No secrets found!")
+        sys.exit(1)
+
+    client = PRAXClient(ctx, pool_maxsize=max(concurrency, DEFAULT_POOL_MAXSIZE))
+    org = _secrets_org(client, org)
+    if org is None:
+        sys.exit(1)
+
+    # Only digests of the uploaded values are kept, per domain and org
+    digests = SecretDigests(f"{ctx.obj.token.domain}-{org}")
+    rows = []
+    upload = []
+    for name, data in sorted(found.items()):
+        changed_keys = digests.changes(name, data)
+        if changed_keys is None:
+            status = "new"
+            changed_keys = sorted(data)
+        else:
+            status = "changed" if changed_keys else "unchanged"
+        if status != "unchanged" or force:
+            upload.append(name)
+        rows.append(
+            [
+                name,
+                len(data),
+                ", ".join(changed_keys),
+                digests.fingerprint(name, data),
+                status,
+            ]
+        )
+    click.echo(
+        tabulate(rows, headers=["Secret", "Keys", "Changed Keys", "Digest", "Status"])
+    )
+    click.echo()
+
+    s = "s" if len(upload) != 1 else ""
+    if dry_run:
+        click.echo(
+            f" {info} {len(upload)} of {len(found)} secret{s} would be uploaded to '{org}'."
+        )
+        return
+    if not upload:
+        click.echo(
+            f" {chk} All {len(found)} secrets are up to date, nothing to upload."
+        )
+        return
+
+    click.echo(f" {spin} Uploading {len(upload)} User-Secret{s} to '{org}'...")
+    failed = 0
+    results = bounded_map(
+        lambda name: client.create_or_update_user_secret(name, org, found[name]),
+        upload,
+        concurrency,
+        ordered=True,
+    )
+    try:
+        for name, secret in results:
+            if isinstance(secret, models.ErrorResponse):
+                failed += 1
+                click.echo(f" {err} Failed to upload User-Secret '{name}'!")
+                echoerr(secret)
+            else:
+                digests.record(name, found[name])
+    finally:
+        digests.save()
+    if failed:
+        click.echo(f" {err} {failed} of {len(upload)} User-Secrets failed to upload!")
+        sys.exit(1)
+    click.echo(f" {chk} {len(upload)} User-Secret{s} uploaded to '{org}' namespace!")
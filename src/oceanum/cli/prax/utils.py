@@ -1,14 +1,20 @@
+from __future__ import annotations
+
+import json
+import re
+from itertools import islice
+from typing import Any, Iterable
+
 import click
+import jsonpath
+import yaml
+from tabulate import tabulate
 
+from oceanum.cli.renderer import Renderer, RenderField
 from oceanum.cli.symbols import chk, info, wrn
 
-from .models import (
-    ErrorResponse,
-    PermissionsSchema,
-    ProjectSpec,
-    ResourcePermissionsSchema,
-    SecretData,
-)
+from . import models
+from .projection import ModelView, path_keys
 
 
 def format_run_status(status: str) -> str:
@@ -27,6 +33,15 @@ def format_run_status(status: str) -> str:
         return status
 
 
+def format_submit_status(status: str) -> str:
+    if status == "submitted":
+        return click.style(status.upper(), fg="green")
+    elif status == "failed":
+        return click.style(status.upper(), fg="red")
+    else:
+        return status
+
+
 def format_route_status(status: str) -> str:
     if status == "online":
         return click.style(status.upper(), fg="green")
@@ -80,7 +95,7 @@ def source_status_color(status: str) -> str:
     return click.style(status.upper(), fg="white")
 
 
-def echoerr(error: ErrorResponse):
+def echoerr(error: models.ErrorResponse):
     if isinstance(error.detail, dict):
         for key, value in error.detail.items():
             click.echo(f" {wrn} {key}: {value}")
@@ -93,35 +108,65 @@ def echoerr(error: ErrorResponse):
         click.echo(f" {wrn} No error message provided!")
 
 
+# Commas only separate pairs when followed by the next key=
+_SECRET_PAIRS = re.compile(r",(?=[^,=]+=)")
+
+
 def parse_secrets(secrets: list) -> list[dict]:
+    """
+    Parse `secret-name:key1=value1,key2=value2` secrets. Values can contain
+    `:`, `=` and commas not followed by another `key=`.
+    """
     parsed_secrets = []
     for secret in secrets:
-        secret_name, secret_data = secret.split(":")
-        secret_data = dict([s.split("=") for s in secret_data.split(",")])
-        secret_dict = {"name": secret_name, "data": secret_data}
+        secret_name, sep, secret_data = secret.partition(":")
+        pairs = [p.partition("=") for p in _SECRET_PAIRS.split(secret_data)]
+        if not sep or not secret_name or any(not k or not s for k, s, _ in pairs):
+            # The secret is not echoed back, it holds values
+            raise click.BadParameter(
+                f"Expected secret-name:key1=value1,key2=value2 for '{secret_name}'",
+                param_hint="'-s' / '--secrets'",
+            )
+        secret_dict = {"name": secret_name, "data": {k: v for k, _, v in pairs}}
         parsed_secrets.append(secret_dict)
     return parsed_secrets
 
 
-def merge_secrets(project_spec: ProjectSpec, secrets: list[str]) -> ProjectSpec:
-    for secret in parse_secrets(secrets):
-        if project_spec.resources is not None:
-            if secret["name"] not in [s.name for s in project_spec.resources.secrets]:
+def merge_secrets(
+    project_spec: models.ProjectSpec,
+    secrets: list[str] | list[dict],
+    strict: bool = True,
+) -> models.ProjectSpec:
+    """
+    Merge secret data into the secrets of a project spec, from
+    `secret-name:key=value` strings or `{"name": ..., "data": ...}` dicts.
+    Secrets not in the spec raise an exception, or are skipped when not
+    `strict`.
+    """
+    if project_spec.resources is None:
+        return project_spec
+    existing_secrets = {s.name: s for s in project_spec.resources.secrets or []}
+    parsed = [s if isinstance(s, dict) else parse_secrets([s])[0] for s in secrets]
+    for secret in parsed:
+        existing_secret = existing_secrets.get(secret["name"])
+        if existing_secret is None:
+            if strict:
                 raise Exception(f"Secret '{secret['name']}' not found in project spec!")
-            for existing_secret in project_spec.resources.secrets:
-                if existing_secret.name == secret["name"]:
-                    if isinstance(existing_secret.data, SecretData):
-                        if existing_secret.data.root is None:
-                            existing_secret.data.root = secret["data"]
-                        else:
-                            existing_secret.data.root.update(secret["data"])
-                    else:
-                        existing_secret.data.update(secret["data"])
+            continue
+        # Stored as secrets, like the values loaded from the spec file
+        data = {k: models.SecretStr(v) for k, v in secret["data"].items()}
+        if isinstance(existing_secret.data, models.SecretData):
+            if existing_secret.data.root is None:
+                existing_secret.data.root = data
+            else:
+                existing_secret.data.root.update(data)
+        else:
+            existing_secret.data.update(data)
     return project_spec
 
 
 def format_permissions_display(
-    permissions: ResourcePermissionsSchema,
+    permissions: models.ResourcePermissionsSchema,
     resource_name: str,
     resource_type: str = "resource",
 ) -> None:
@@ -142,7 +187,9 @@ def format_permissions_display(
         else:
             return click.style("−", fg="yellow")
 
-    def display_permissions_table(perms_list: list[PermissionsSchema], title: str):
+    def display_permissions_table(
+        perms_list: list[models.PermissionsSchema], title: str
+    ):
         if not perms_list:
             click.echo(f"    No {title.lower()} permissions set")
             return
@@ -200,3 +247,136 @@ def format_permissions_display(
         f"    {format_permission_value(True)} = Granted   {format_permission_value(False)} = Denied   {format_permission_value(None)} = Not set"
     )
     click.echo()
+
+
+def view_fields(fields: list[RenderField], output_format: str) -> list[str] | None:
+    """
+    Return the response fields a table of `fields` shows, so the command can
+    skip validating the others. JSON and YAML show every field.
+    """
+    if output_format != "table":
+        return None
+    names: list[str] = []
+    for field in fields:
+        if (keys := path_keys(field.path)) is None:
+            return None
+        names += [k for k in keys if k not in names]
+    return names
+
+
+def _table_cells(item: dict, fields: list[RenderField]) -> list[Any]:
+    row = []
+    for field in fields:
+        matches = jsonpath.findall(field.path, item)
+        if matches:
+            row.append(field.sep.join(str(field.mod(m)) for m in field.lmod(matches)))
+        else:
+            row.append(None)
+    return row
+
+
+def table_rows(
+    items: Iterable[Any], fields: list[RenderField]
+) -> list[list[Any]] | models.ErrorResponse:
+    """
+    Return the table cells of every item, or the ErrorResponse that
+    interrupted `items`.
+    """
+    data = []
+    for item in items:
+        if isinstance(item, models.ErrorResponse):
+            return item
+        if isinstance(item, ModelView):
+            item = item.model_dump(mode="json")
+        data.append(item)
+    return [
+        _table_cells(d, fields) for d in Renderer(data=data, fields=fields).parsed_data
+    ]
+
+
+def echo_rows(
+    items: Iterable[Any],
+    fields: list[RenderField],
+    output_format: str = "table",
+    batch_size: int = 100,
+) -> int | models.ErrorResponse:
+    """
+    Render items as they arrive, one batch at a time, instead of waiting for
+    the whole collection. Tables take their column widths from the first
+    batch, later batches widen the columns holding wider values, so only the
+    rows already printed keep the narrower ones. NDJSON writes one JSON
+    document per line. Returns the number of items rendered, or the
+    ErrorResponse that interrupted `items`.
+    """
+    iterator = iter(items)
+    count = 0
+    widths: list[int] = []
+    numeric: list[bool] = []
+    error = None
+    while True:
+        batch = []
+        for item in islice(iterator, batch_size):
+            if isinstance(item, models.ErrorResponse):
+                error = item
+                break
+            if isinstance(item, ModelView):
+                item = item.model_dump(mode="json")
+            batch.append(item)
+        if batch:
+            data = Renderer(data=batch, fields=fields).parsed_data
+            if output_format == "json":
+                dumped = ", ".join(json.dumps(d) for d in data)
+                click.echo(("[" if not count else ", ") + dumped, nl=False)
+            elif output_format == "ndjson":
+                click.echo("\n".join(json.dumps(d) for d in data))
+            elif output_format == "yaml":
+                click.echo(yaml.dump(data), nl=False)
+            else:
+                rows = [_table_cells(d, fields) for d in data]
+                if not count:
+                    table = tabulate(rows, headers=[f.label for f in fields])
+                    widths = [len(dashes) for dashes in table.splitlines()[1].split()]
+                    # Like tabulate, right align columns holding only numbers
+                    numeric = [
+                        all(v is None or _is_number(v) for v in column)
+                        for column in zip(*rows)
+                    ]
+                    click.echo(table)
+                else:
+                    widths = [
+                        max(width, *(_cell_width(v) for v in column))
+                        for width, column in zip(widths, zip(*rows))
+                    ]
+                    click.echo(
+                        "\n".join(_pad_row(row, widths, numeric) for row in rows)
+                    )
+            count += len(batch)
+        if error is not None or len(batch) < batch_size:
+            break
+    if output_format == "json":
+        # Always a JSON document, even without items
+        click.echo("]" if count else "[]")
+    elif output_format == "yaml":
+        click.echo("" if count else "[]")
+    return error if error is not None else count
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _cell_width(value: Any) -> int:
+    return 0 if value is None else len(click.unstyle(str(value)))
+
+
+def _pad_row(row: list[Any], widths: list[int], numeric: list[bool]) -> str:
+    cells = []
+    for value, width, right in zip(row, widths, numeric):
+        text = "" if value is None else str(value)
+        padding = " " * max(width - _cell_width(value), 0)
+        cells.append(padding + text if right else text + padding)
+    return "  ".join(cells).rstrip()
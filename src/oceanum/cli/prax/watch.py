@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import math
+import shutil
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Iterable, TextIO
+
+import click
+import requests
+from tabulate import tabulate
+
+from oceanum.cli.renderer import RenderField
+from oceanum.cli.symbols import err, wrn
+
+from . import models
+from .client import PRAXClient
+from .deadline import DeadlineExceeded
+from .utils import table_rows
+
+DEFAULT_WATCH_INTERVAL = 2.0
+
+watch_option = click.option(
+    "--watch",
+    help=f"Keep polling every SECONDS (default: {DEFAULT_WATCH_INTERVAL:g}) and redraw the rows that changed",
+    is_flag=False,
+    flag_value=DEFAULT_WATCH_INTERVAL,
+    default=None,
+    type=click.FloatRange(min=0.5),
+    metavar="[SECONDS]",
+)
+
+
+class WatchScreen:
+    """
+    Draw successive versions of a block of lines, rewriting in place only the
+    lines that changed since the previous draw.
+
+    On a terminal, the cursor is moved back up to each changed line, and the
+    whole block is redrawn when its number of lines or the height of a
+    wrapped line changed. Otherwise the block is printed again whenever any
+    line but the last, which holds the status, changed.
+    """
+
+    def __init__(self, stream: TextIO | None = None) -> None:
+        self.stream = stream or sys.stdout
+        self.tty = self.stream.isatty()
+        self.lines: list[str] = []
+        self.heights: list[int] = []
+
+    def _heights(self, lines: list[str]) -> list[int]:
+        width = max(shutil.get_terminal_size().columns, 1)
+        return [max(1, math.ceil(len(click.unstyle(line)) / width)) for line in lines]
+
+    def _write(self, text: str) -> None:
+        click.echo(text, file=self.stream, nl=False)
+        self.stream.flush()
+
+    def draw(self, lines: list[str]) -> None:
+        if not self.tty:
+            if lines[:-1] != self.lines[:-1]:
+                self._write("\n".join(lines) + "\n\n")
+            self.lines = lines
+            return
+        heights = self._heights(lines)
+        if not self.lines:
+            self._write("\n".join(lines) + "\n")
+        elif heights != self.heights:
+            # Back to the first line and clear everything below
+            self._write(f"\x1b[{sum(self.heights)}F\x1b[J" + "\n".join(lines) + "\n")
+        else:
+            moves = []
+            for i, (old, new) in enumerate(zip(self.lines, lines)):
+                if old != new:
+                    up = sum(heights[i:])
+                    moves.append(f"\x1b[{up}F{new}\x1b[K\x1b[{up - heights[i] + 1}E")
+            self._write("".join(moves))
+        self.lines = lines
+        self.heights = heights
+
+
+def watch_rows(
+    client: PRAXClient,
+    fetch: Callable[[], Iterable[Any]],
+    fields: list[RenderField],
+    interval: float,
+    output_format: str = "table",
+    screen: WatchScreen | None = None,
+) -> None:
+    """
+    Poll `fetch` every `interval` seconds until interrupted, keeping a table
+    of its items up to date on screen. A failed poll is reported in the
+    status line and the last table is kept.
+    """
+    if output_format != "table":
+        raise click.UsageError("--watch only supports the table output format")
+    if client.cache is not None:
+        # Revalidate with the API on every poll, unchanged lists cost a 304
+        client.cache.ttl = 0
+    screen = screen or WatchScreen()
+    table = [f" {wrn} No items found!"]
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                rows = table_rows(fetch(), fields)
+            except (requests.exceptions.RequestException, DeadlineExceeded) as e:
+                # Includes CircuitOpenError, retried on the next poll
+                rows = models.ErrorResponse(detail=str(e) or type(e).__name__)
+            status = f"Every {interval:g}s, updated {datetime.now():%H:%M:%S}"
+            if isinstance(rows, models.ErrorResponse):
+                status += f" {err} {rows.detail}"
+            elif rows:
+                table = tabulate(rows, headers=[f.label for f in fields]).splitlines()
+                status += f", {len(rows)} items"
+            else:
+                table = [f" {wrn} No items found!"]
+            screen.draw(table + [status])
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
@@ -1,7 +1,16 @@
+from __future__ import annotations
+
+import json
 import sys
 import time
+from functools import partial
+from pathlib import Path
+from typing import Any, Literal
 
 import click
+import humanize
+import yaml
+from pydantic import BaseModel, ValidationError
 
 from oceanum.cli.auth import login_required
 from oceanum.cli.renderer import Renderer, RenderField, output_format_option
@@ -9,16 +18,34 @@ from oceanum.cli.symbols import chk, err, spin, wrn
 from oceanum.cli.utils import format_dt
 
 from . import models
-from .client import PRAXClient
+from .artifacts import (
+    DEFAULT_SEGMENTS,
+    DownloadResult,
+    download_pipeline_run_artifacts,
+    list_pipeline_run_artifacts,
+    parse_checksum,
+)
+from .cache import cache_options
+from .client import DEFAULT_POOL_MAXSIZE, PRAXClient
+from .concurrency import DEFAULT_CONCURRENCY, bounded_map
+from .logfilter import LogFilter, log_archive_option, log_filter_options, write_logs
 from .main import delete, describe, download, list_group, logs, retry, submit, terminate
 from .project import (
+    limit_option,
     name_argument,
     project_name_option,
     project_org_option,
     project_stage_option,
     project_user_option,
 )
-from .utils import echoerr, format_run_status as frs
+from .utils import (
+    echo_rows,
+    echoerr,
+    format_run_status as frs,
+    format_submit_status as fss,
+    view_fields,
+)
+from .watch import watch_option, watch_rows
 
 
 def parse_parameters(parameters: list[str] | None) -> dict | None:
@@ -36,6 +63,66 @@ def parse_parameters(parameters: list[str] | None) -> dict | None:
     return params or None
 
 
+def validate_checksum(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> str | None:
+    if value is not None:
+        try:
+            parse_checksum(value)
+        except ValueError as e:
+            raise click.BadParameter(str(e)) from e
+    return value
+
+
+segments_option = click.option(
+    "--segments",
+    help="Parallel connections used to download large artifacts",
+    default=DEFAULT_SEGMENTS,
+    show_default=True,
+    type=click.IntRange(1, 32),
+)
+checksum_option = click.option(
+    "--checksum",
+    help="Expected artifact checksum, i.e. sha256:<hexdigest>",
+    default=None,
+    type=str,
+    callback=validate_checksum,
+)
+
+
+class SubmitManifestRow(BaseModel):
+    name: str
+    type: Literal["task", "pipeline"] | None = None
+    project: str | None = None
+    stage: str | None = None
+    org: str | None = None
+    user: str | None = None
+    parameters: dict[str, Any] | None = None
+
+
+def load_submit_manifest(manifest: str) -> list[SubmitManifestRow]:
+    """
+    Load batch submit rows from a YAML list (optionally under a 'submits' key)
+    or a JSON-lines file (.jsonl or .ndjson).
+    """
+    path = Path(manifest)
+    with path.open() as f:
+        if path.suffix in [".jsonl", ".ndjson"]:
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = yaml.safe_load(f) or []
+    if isinstance(rows, dict):
+        rows = rows.get("submits", [])
+    if not isinstance(rows, list):
+        raise click.BadParameter(
+            "Manifest must be a list of submit rows.", param_hint="'MANIFEST'"
+        )
+    for number, row in enumerate(rows, 1):
+        if not isinstance(row, dict):
+            raise ValueError(f"Row {number} must be a mapping of submit fields.")
+    return [SubmitManifestRow(**row) for row in rows]
+
+
 LIST_FIELDS = [
     RenderField(label="Name", path="$.name"),
     RenderField(label="Project", path="$.project"),
@@ -61,11 +148,19 @@ LIST_FIELDS = [
 @project_user_option
 @project_name_option
 @project_stage_option
+@limit_option
+@watch_option
 @output_format_option
+@cache_options
 @login_required
-def list_pipelines(ctx: click.Context, output: str, **filters):
+def list_pipelines(
+    ctx: click.Context,
+    output: str,
+    limit: int | None,
+    watch: float | None,
+    **filters,
+):
     client = PRAXClient(ctx)
-    pipelines = client.list_pipelines(**filters)
 
     def format_schedule(x: list) -> list[str]:
         if len(x) == 2 and x[1] is not None:
@@ -82,18 +177,23 @@ def list_pipelines(ctx: click.Context, output: str, **filters):
             sep=" ",
         ),
     ]
-    if not pipelines:
-        click.echo(f" {wrn} No pipelines found!")
-    elif isinstance(pipelines, models.ErrorResponse):
+    fields = LIST_FIELDS + extra_fields
+    pipelines = partial(
+        client.iter_pipelines,
+        limit=limit,
+        fields=view_fields(fields, output),
+        **filters,
+    )
+    if watch is not None:
+        watch_rows(client, pipelines, fields, watch, output)
+        return
+    rendered = echo_rows(pipelines(), fields, output)
+    if isinstance(rendered, models.ErrorResponse):
         click.echo(f" {err} Error fetching pipelines:")
-        echoerr(pipelines)
+        echoerr(rendered)
         sys.exit(1)
-    else:
-        click.echo(
-            Renderer(data=pipelines, fields=LIST_FIELDS + extra_fields).render(
-                output_format=output
-            )
-        )
+    elif not rendered and output == "table":
+        click.echo(f" {wrn} No pipelines found!")
 
 
 @list_group.command(name="tasks", help="List all PRAX Tasks")
@@ -103,21 +203,35 @@ def list_pipelines(ctx: click.Context, output: str, **filters):
 @project_user_option
 @project_name_option
 @project_stage_option
+@limit_option
+@watch_option
 @output_format_option
+@cache_options
 @login_required
-def list_tasks(ctx: click.Context, output: str, **filters):
+def list_tasks(
+    ctx: click.Context,
+    output: str,
+    limit: int | None,
+    watch: float | None,
+    **filters,
+):
     client = PRAXClient(ctx)
-    tasks = client.list_tasks(**filters)
-    if not tasks:
-        click.echo(f" {wrn} No tasks found!")
-    elif isinstance(tasks, models.ErrorResponse):
+    tasks = partial(
+        client.iter_tasks,
+        limit=limit,
+        fields=view_fields(LIST_FIELDS, output),
+        **filters,
+    )
+    if watch is not None:
+        watch_rows(client, tasks, LIST_FIELDS, watch, output)
+        return
+    rendered = echo_rows(tasks(), LIST_FIELDS, output)
+    if isinstance(rendered, models.ErrorResponse):
         click.echo(f" {err} Error fetching tasks:")
-        echoerr(tasks)
+        echoerr(rendered)
         sys.exit(1)
-    else:
-        click.echo(
-            Renderer(data=tasks, fields=LIST_FIELDS).render(output_format=output)
-        )
+    elif not rendered and output == "table":
+        click.echo(f" {wrn} No tasks found!")
 
 
 @describe.command(name="task", help="Describe PRAX Task")
@@ -127,6 +241,7 @@ def list_tasks(ctx: click.Context, output: str, **filters):
 @project_user_option
 @project_name_option
 @project_stage_option
+@cache_options
 @login_required
 def describe_task(ctx: click.Context, name: str, **filters):
     client = PRAXClient(ctx)
@@ -245,7 +360,7 @@ def terminate_task(ctx: click.Context, name: str, **filters):
                     echoerr(task)
                     sys.exit(1)
                 elif task and task.status == "Running":
-                    time.sleep(1)
+                    client.deadline.sleep(1)
                     continue
                 else:
                     break
@@ -290,8 +405,12 @@ def retry_task(ctx: click.Context, name: str, **filters):
 @click.option(
     "-f", "--follow", help="Follow logs", default=False, type=bool, is_flag=True
 )
+@log_filter_options
+@log_archive_option
 @login_required
 def get_task_logs(ctx: click.Context, name: str, lines: int, follow: bool, **filters):
+    from .logarchive import log_stream
+
     client = PRAXClient(ctx)
     task = client.get_task(name, **filters)
     if isinstance(task, models.TaskSchema):
@@ -304,12 +423,22 @@ def get_task_logs(ctx: click.Context, name: str, lines: int, follow: bool, **fil
             sys.exit(1)
 
     click.echo(f"Fetching logs for Task-Run: {task_run.name} ...")
-    for line in client.get_task_run_logs(task_run.name, lines, follow):
-        if isinstance(line, models.ErrorResponse):
-            click.echo(f" {err} Error fetching logs:")
-            echoerr(line)
-            sys.exit(1)
-        click.echo(line)
+    logs_err = write_logs(
+        log_stream(
+            ctx,
+            "task",
+            task_run.name,
+            partial(client.get_task_run_logs, task_run.name),
+            lines,
+            follow,
+            run=task_run,
+        ),
+        LogFilter.from_context(ctx),
+    )
+    if logs_err is not None:
+        click.echo(f" {err} Error fetching logs:")
+        echoerr(logs_err)
+        sys.exit(1)
 
 
 @download.command(name="task-artifact", help="Download PRAX Task output Artifact")
@@ -333,9 +462,17 @@ def get_task_logs(ctx: click.Context, name: str, lines: int, follow: bool, **fil
     default=None,
     type=str,
 )
+@segments_option
+@checksum_option
 @login_required
 def download_task_artifact(
-    ctx: click.Context, name: str, artifact_name: str, output: str | None, **filters
+    ctx: click.Context,
+    name: str,
+    artifact_name: str,
+    output: str | None,
+    segments: int,
+    checksum: str | None,
+    **filters,
 ):
     client = PRAXClient(ctx)
     task = client.get_task(name, **filters)
@@ -353,7 +490,9 @@ def download_task_artifact(
         echoerr(task_run)
         sys.exit(1)
 
-    if client.download_task_run_artifact(task_run.name, artifact_name, output):
+    if client.download_task_run_artifact(
+        task_run.name, artifact_name, output, segments=segments, checksum=checksum
+    ):
         click.echo(f" {chk} Artifact '{artifact_name}' downloaded successfully!")
 
 
@@ -389,25 +528,28 @@ def delete_task(ctx: click.Context, name: str, **filters):
 @project_user_option
 @project_name_option
 @project_stage_option
+@limit_option
 @output_format_option
+@cache_options
 @login_required
-def list_builds(ctx: click.Context, output: str, **filters):
+def list_builds(ctx: click.Context, output: str, limit: int | None, **filters):
     build_fields = LIST_FIELDS + [
         RenderField(label="Source Branch/Tag", path="$.source_ref"),
     ]
     # build_fields.pop(-2)
     client = PRAXClient(ctx)
-    builds = client.list_builds(**{k: v for k, v in filters.items() if v is not None})
-    if not builds:
-        click.echo(f" {wrn} No builds found!")
-    elif isinstance(builds, models.ErrorResponse):
+    builds = client.iter_builds(
+        limit=limit,
+        fields=view_fields(build_fields, output),
+        **{k: v for k, v in filters.items() if v is not None},
+    )
+    rendered = echo_rows(builds, build_fields, output)
+    if isinstance(rendered, models.ErrorResponse):
         click.echo(f" {err} Error fetching builds:")
-        echoerr(builds)
+        echoerr(rendered)
         sys.exit(1)
-    else:
-        click.echo(
-            Renderer(data=builds, fields=build_fields).render(output_format=output)
-        )
+    elif not rendered and output == "table":
+        click.echo(f" {wrn} No builds found!")
 
 
 @describe.command(name="build", help="Describe PRAX Build")
@@ -417,6 +559,7 @@ def list_builds(ctx: click.Context, output: str, **filters):
 @project_user_option
 @project_name_option
 @project_stage_option
+@cache_options
 @login_required
 def describe_build(ctx: click.Context, name: str, **filters):
     client = PRAXClient(ctx)
@@ -570,8 +713,12 @@ def retry_build(ctx: click.Context, name: str, **filters):
 @click.option(
     "-f", "--follow", help="Follow logs", default=False, type=bool, is_flag=True
 )
+@log_filter_options
+@log_archive_option
 @login_required
 def get_build_logs(ctx: click.Context, name: str, lines: int, follow: bool, **filters):
+    from .logarchive import log_stream
+
     client = PRAXClient(ctx)
     build = client.get_build(name, **filters)
     if isinstance(build, models.BuildSchema):
@@ -583,12 +730,22 @@ def get_build_logs(ctx: click.Context, name: str, lines: int, follow: bool, **fi
             echoerr(build_run)
             sys.exit(1)
     click.echo(f"Fetching logs for Build-Run: {build_run.name} ...")
-    for line in client.get_build_run_logs(build_run.name, lines, follow):
-        if isinstance(line, models.ErrorResponse):
-            click.echo(f" {err} Error fetching logs:")
-            echoerr(line)
-            sys.exit(1)
-        click.echo(line)
+    logs_err = write_logs(
+        log_stream(
+            ctx,
+            "build",
+            build_run.name,
+            partial(client.get_build_run_logs, build_run.name),
+            lines,
+            follow,
+            run=build_run,
+        ),
+        LogFilter.from_context(ctx),
+    )
+    if logs_err is not None:
+        click.echo(f" {err} Error fetching logs:")
+        echoerr(logs_err)
+        sys.exit(1)
 
 
 @delete.command(name="build", help="Delete PRAX Build")
@@ -623,6 +780,7 @@ def delete_build(ctx: click.Context, name: str, **filters):
 @project_user_option
 @project_name_option
 @project_stage_option
+@cache_options
 @login_required
 def describe_pipeline(ctx: click.Context, name: str, **filters):
     client = PRAXClient(ctx)
@@ -728,6 +886,130 @@ def submit_pipeline(
             )
 
 
+@submit.command(name="batch", help="Submit many PRAX Tasks and Pipelines")
+@click.pass_context
+@click.argument(
+    "manifest", type=click.Path(exists=True, dir_okay=False, resolve_path=True)
+)
+@click.option(
+    "-t",
+    "--type",
+    "default_type",
+    help="Resource type of the manifest rows without a 'type'",
+    default="task",
+    type=click.Choice(["task", "pipeline"]),
+)
+@click.option(
+    "-j",
+    "--concurrency",
+    help="Maximum number of submits in flight",
+    default=DEFAULT_CONCURRENCY,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--rate",
+    help="Maximum number of submits started per second",
+    default=None,
+    type=click.FloatRange(min=0, min_open=True),
+)
+@click.option(
+    "--results-file",
+    help="Write the per-row results as JSON-lines to this file",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True),
+)
+@output_format_option
+@login_required
+def submit_batch(
+    ctx: click.Context,
+    manifest: str,
+    default_type: str,
+    concurrency: int,
+    rate: float | None,
+    results_file: str | None,
+    output: str,
+):
+    try:
+        rows = load_submit_manifest(manifest)
+    except (ValueError, ValidationError, yaml.YAMLError) as e:
+        click.echo(f" {err} Failed to load submit manifest!")
+        click.echo(f" {wrn} {e}")
+        sys.exit(1)
+    if not rows:
+        click.echo(f" {wrn} No submits found in manifest!")
+        return
+
+    client = PRAXClient(ctx, pool_maxsize=max(concurrency, DEFAULT_POOL_MAXSIZE))
+
+    def submit_row(item: tuple[int, SubmitManifestRow]) -> dict:
+        index, row = item
+        row_type = row.type or default_type
+        filters = row.model_dump(include={"project", "stage", "org", "user"})
+        start = time.monotonic()
+        try:
+            if row_type == "pipeline":
+                resp = client.submit_pipeline(row.name, row.parameters, **filters)
+            else:
+                resp = client.submit_task(row.name, row.parameters, **filters)
+        except Exception as e:
+            resp = models.ErrorResponse(detail=str(e))
+        result = {
+            "row": index,
+            "type": row_type,
+            "name": row.name,
+            "project": row.project,
+            "stage": row.stage,
+            "status": "submitted",
+            "run": None,
+            "error": None,
+            "elapsed": round(time.monotonic() - start, 3),
+        }
+        if isinstance(resp, models.ErrorResponse):
+            result["status"] = "failed"
+            result["error"] = str(resp.detail)
+        elif resp.last_run is not None:
+            result["run"] = resp.last_run.name
+        return result
+
+    if output == "table":
+        click.echo(
+            f" {spin} Submitting {len(rows)} runs with up to {concurrency} in flight..."
+        )
+    results = sorted(
+        (
+            result
+            for _, result in bounded_map(
+                submit_row, enumerate(rows), concurrency=concurrency, rate=rate
+            )
+        ),
+        key=lambda r: r["row"],
+    )
+
+    if results_file is not None:
+        with open(results_file, "w") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+
+    fields = [
+        RenderField(label="Row", path="$.row"),
+        RenderField(label="Type", path="$.type"),
+        RenderField(label="Name", path="$.name"),
+        RenderField(label="Project", path="$.project"),
+        RenderField(label="Stage", path="$.stage"),
+        RenderField(label="Status", path="$.status", mod=fss),
+        RenderField(label="Run ID", path="$.run"),
+        RenderField(label="Error", path="$.error"),
+    ]
+    click.echo(Renderer(data=results, fields=fields).render(output_format=output))
+    failed = [r for r in results if r["status"] == "failed"]
+    if failed:
+        if output == "table":
+            click.echo(f" {err} {len(failed)} of {len(results)} submits failed!")
+        sys.exit(1)
+    elif output == "table":
+        click.echo(f" {chk} All {len(results)} runs submitted successfully!")
+
+
 @terminate.command(name="pipeline", help="Terminate PRAX Pipeline")
 @click.pass_context
 @name_argument
@@ -793,10 +1075,14 @@ def retry_pipeline(ctx: click.Context, name: str, **filters):
 @click.option(
     "-f", "--follow", help="Follow logs", default=False, type=bool, is_flag=True
 )
+@log_filter_options
+@log_archive_option
 @login_required
 def get_pipeline_logs(
     ctx: click.Context, name: str, lines: int, follow: bool, **filters
 ):
+    from .logarchive import log_stream
+
     client = PRAXClient(ctx)
     pipeline = client.get_pipeline(name, **filters)
     if isinstance(pipeline, models.PipelineSchema):
@@ -808,14 +1094,22 @@ def get_pipeline_logs(
             echoerr(pipeline_run)
             sys.exit(1)
     click.echo(f"Fetching logs for Pipeline-Run: {pipeline_run.name} ...")
-    for line in client.get_pipeline_run_logs(
-        pipeline_run.name, lines, follow, **filters
-    ):
-        if isinstance(line, models.ErrorResponse):
-            click.echo(f" {err} Error fetching logs:")
-            echoerr(line)
-            sys.exit(1)
-        click.echo(line)
+    logs_err = write_logs(
+        log_stream(
+            ctx,
+            "pipeline",
+            pipeline_run.name,
+            partial(client.get_pipeline_run_logs, pipeline_run.name, **filters),
+            lines,
+            follow,
+            run=pipeline_run,
+        ),
+        LogFilter.from_context(ctx),
+    )
+    if logs_err is not None:
+        click.echo(f" {err} Error fetching logs:")
+        echoerr(logs_err)
+        sys.exit(1)
 
 
 @download.command(
@@ -848,6 +1142,8 @@ def get_pipeline_logs(
     default=None,
     type=str,
 )
+@segments_option
+@checksum_option
 @login_required
 def download_pipeline_artifact(
     ctx: click.Context,
@@ -855,6 +1151,8 @@ def download_pipeline_artifact(
     artifact_name: str,
     step_name: str,
     output: str | None = None,
+    segments: int = DEFAULT_SEGMENTS,
+    checksum: str | None = None,
     **filters,
 ):
     client = PRAXClient(ctx)
@@ -874,13 +1172,121 @@ def download_pipeline_artifact(
         sys.exit(1)
 
     if client.download_pipeline_run_artifact(
-        pipeline_run.name, artifact_name, step_name, output
+        pipeline_run.name,
+        artifact_name,
+        step_name,
+        output,
+        segments=segments,
+        checksum=checksum,
     ):
         click.echo(
             f" {chk} Artifact '{artifact_name}' from step '{step_name}' downloaded successfully!"
         )
 
 
+@download.command(
+    name="pipeline-artifacts",
+    help="Download all output Artifacts of a PRAX Pipeline run",
+)
+@click.pass_context
+@name_argument
+@project_org_option
+@project_user_option
+@project_name_option
+@project_stage_option
+@click.option(
+    "-s",
+    "--step-name",
+    help="Only download artifacts of these pipeline steps",
+    multiple=True,
+    type=str,
+)
+@click.option(
+    "-d",
+    "--output-dir",
+    help="Directory to save the artifacts to, defaults to the run name",
+    default=None,
+    type=click.Path(file_okay=False),
+)
+@click.option(
+    "-j",
+    "--concurrency",
+    help="Maximum number of artifacts downloaded at once",
+    default=DEFAULT_CONCURRENCY,
+    show_default=True,
+    type=click.IntRange(1, 64),
+)
+@segments_option
+@login_required
+def download_pipeline_artifacts(
+    ctx: click.Context,
+    name: str,
+    step_name: tuple[str, ...],
+    output_dir: str | None,
+    concurrency: int,
+    segments: int,
+    **filters,
+):
+    client = PRAXClient(
+        ctx, pool_maxsize=max(concurrency * segments, DEFAULT_POOL_MAXSIZE)
+    )
+    pipeline = client.get_pipeline(name, **filters)
+    if isinstance(pipeline, models.PipelineSchema):
+        pipeline_run = pipeline.last_run
+    else:
+        pipeline_run = client.get_pipeline_run(name, **filters)
+
+    if pipeline_run is None:
+        click.echo(f" {err} No pipeline run found for pipeline: {name}")
+        sys.exit(1)
+
+    if isinstance(pipeline_run, models.ErrorResponse):
+        click.echo(f" {err} Error fetching pipeline run:")
+        echoerr(pipeline_run)
+        sys.exit(1)
+
+    click.echo(f" {spin} Listing artifacts of Pipeline-Run '{pipeline_run.name}'...")
+    artifacts = list_pipeline_run_artifacts(client, pipeline_run)
+    if isinstance(artifacts, models.ErrorResponse):
+        click.echo(f" {err} Error listing pipeline run artifacts:")
+        echoerr(artifacts)
+        sys.exit(1)
+    if step_name:
+        artifacts = [a for a in artifacts if a.step in step_name]
+    if not artifacts:
+        click.echo(f" {wrn} No artifacts found!")
+        return
+
+    output_path = Path(output_dir or pipeline_run.name)
+    click.echo(
+        f" {spin} Downloading {len(artifacts)} artifacts to '{output_path}' directory..."
+    )
+    failed = skipped = 0
+    for artifact, result in download_pipeline_run_artifacts(
+        client,
+        pipeline_run.name,
+        artifacts,
+        output_path,
+        concurrency=concurrency,
+        segments=segments,
+    ):
+        if not isinstance(result, DownloadResult):
+            failed += 1
+            click.echo(f" {err} {artifact.path}: {result}")
+        elif result.skipped:
+            skipped += 1
+            click.echo(f" {chk} {artifact.path} is up to date")
+        else:
+            size = humanize.naturalsize(result.size, binary=True)
+            click.echo(f" {chk} {artifact.path} ({size})")
+    downloaded = len(artifacts) - failed - skipped
+    click.echo(
+        f" {chk if not failed else wrn} {downloaded} downloaded, {skipped} up to date, {failed} failed."
+    )
+    if failed:
+        sys.exit(1)
+
+
 @delete.command(name="pipeline", help="Delete PRAX Pipeline")
 @click.pass_context
 @name_argument
@@ -0,0 +1,330 @@
+import base64
+import hashlib
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import requests
+from click.testing import CliRunner
+
+from oceanum.cli import main
+from oceanum.cli.prax import models
+from oceanum.cli.prax.artifacts import (
+    ARTIFACTS_MANIFEST,
+    ArtifactDownloader,
+    DownloadError,
+    DownloadResult,
+    PipelineArtifact,
+    download_pipeline_run_artifacts,
+    list_pipeline_run_artifacts,
+    parse_checksum,
+    pipeline_step_tree,
+)
+from oceanum.cli.prax.client import PRAXClient
+
+ARTIFACT = os.urandom(300_000)
+ENDPOINT = "task-runs/run-123/artifacts/output"
+
+
+class ArtifactServer(ThreadingHTTPServer):
+    def __init__(self, ranges: bool = True, digest: bool = True) -> None:
+        super().__init__(("127.0.0.1", 0), ArtifactHandler)
+        self.ranges = ranges
+        self.digest = digest
+        self.etag = '"v1"'
+        # Close the connection after sending this many bytes of a body
+        self.fail_after: int | None = None
+        self.requested_ranges: list[str] = []
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/api"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+class ArtifactHandler(BaseHTTPRequestHandler):
+    server: ArtifactServer
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        body = ARTIFACT
+        if (
+            self.server.ranges
+            and range_header
+            and (if_range is None or if_range == self.server.etag)
+        ):
+            self.server.requested_ranges.append(range_header)
+            start, _, end = range_header.removeprefix("bytes=").partition("-")
+            start, end = int(start), int(end or len(ARTIFACT) - 1)
+            body = ARTIFACT[start : end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(ARTIFACT)}")
+        else:
+            self.send_response(200)
+        if self.server.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", self.server.etag)
+        if self.server.digest:
+            digest = base64.b64encode(hashlib.sha256(ARTIFACT).digest()).decode()
+            self.send_header("Digest", f"sha-256={digest}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        fail_after = self.server.fail_after
+        if fail_after is not None and len(body) > 1:
+            self.server.fail_after = None
+            self.wfile.write(body[:fail_after])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+class TestArtifactDownloader(TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "output.gz"
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def downloader(self, server: ArtifactServer, **kwargs) -> ArtifactDownloader:
+        client = PRAXClient(service=server.url)
+        kwargs.setdefault("chunk_size", 16 * 1024)
+        return ArtifactDownloader(client, progress=False, **kwargs)
+
+    def test_single_stream(self):
+        with ArtifactServer() as server:
+            result = self.downloader(server).download(ENDPOINT, self.path)
+        assert self.path.read_bytes() == ARTIFACT
+        assert result.segments == 1
+        assert result.verified == ["sha256"]
+        assert not self.path.with_name("output.gz.part").exists()
+
+    def test_parallel_segments(self):
+        with ArtifactServer() as server:
+            downloader = self.downloader(server, segments=4, segment_threshold=1024)
+            result = downloader.download(ENDPOINT, self.path)
+            assert len(server.requested_ranges) == 5
+        assert result.segments == 4
+        assert self.path.read_bytes() == ARTIFACT
+
+    def test_resume_after_dropped_connection(self):
+        with ArtifactServer() as server:
+            downloader = self.downloader(server, segments=1)
+            server.fail_after = 100_000
+            with self.assertRaises(DownloadError) as ctx:
+                downloader.download(ENDPOINT, self.path)
+            assert ctx.exception.resumable
+            assert self.path.with_name("output.gz.part").exists()
+            result = downloader.download(ENDPOINT, self.path)
+            assert server.requested_ranges[-1] != "bytes=0-299999"
+        assert result.resumed
+        assert result.downloaded < len(ARTIFACT)
+        assert self.path.read_bytes() == ARTIFACT
+
+    def test_restart_when_artifact_changed(self):
+        with ArtifactServer() as server:
+            downloader = self.downloader(server, segments=1)
+            server.fail_after = 100_000
+            with self.assertRaises(DownloadError):
+                downloader.download(ENDPOINT, self.path)
+            server.etag = '"v2"'
+            result = downloader.download(ENDPOINT, self.path)
+        assert not result.resumed
+        assert self.path.read_bytes() == ARTIFACT
+
+    def test_no_range_support(self):
+        with ArtifactServer(ranges=False, digest=False) as server:
+            result = self.downloader(server).download(ENDPOINT, self.path)
+        assert result.verified == []
+        assert self.path.read_bytes() == ARTIFACT
+
+    def test_checksum_mismatch(self):
+        with ArtifactServer(digest=False) as server:
+            downloader = self.downloader(server, checksum="md5:" + "0" * 32)
+            with self.assertRaises(DownloadError) as ctx:
+                downloader.download(ENDPOINT, self.path)
+        assert "Checksum mismatch" in str(ctx.exception)
+        assert not self.path.exists()
+        assert not self.path.with_name("output.gz.part").exists()
+
+    def test_parse_checksum(self):
+        assert parse_checksum("SHA-256:ABC") == ("sha256", "abc")
+        with self.assertRaises(ValueError):
+            parse_checksum("crc32:abc")
+
+
+timestamp = datetime.now(tz=timezone.utc)
+pipeline_spec = models.PipelineSpec(
+    name="test-pipeline",
+    dag=[
+        {"name": "fetch", "taskRef": "fetch-task"},
+        {"name": "process", "taskRef": "process-task", "dependencies": ["fetch"]},
+        {"name": "nested", "pipelineRef": "other", "dependencies": ["process"]},
+    ],
+)
+pipeline_run = models.StagedRunSchema(
+    id="run-123",
+    name="run-123",
+    org="test-org",
+    stage="dev",
+    project="test-project",
+    parent="test-pipeline",
+    status="Succeeded",
+    spec=pipeline_spec,
+    created_at=timestamp,
+    updated_at=timestamp,
+)
+
+
+def task_schema(name: str, *artifacts: str) -> models.TaskSchema:
+    return models.TaskSchema(
+        id=name,
+        name=name,
+        org="test-org",
+        stage="dev",
+        project="test-project",
+        created_at=timestamp,
+        updated_at=timestamp,
+        spec=models.TaskSpec(
+            name=name,
+            image="python:3.12",
+            command="echo",
+            outputs={"artifacts": [{"name": a} for a in artifacts]},
+        ),
+    )
+
+
+tasks = {
+    "fetch-task": task_schema("fetch-task", "raw"),
+    "process-task": task_schema("process-task", "grid", "stats"),
+}
+
+
+class TestPipelineRunArtifacts(TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_step_tree_mirrors_dag(self):
+        tree = pipeline_step_tree(pipeline_spec)
+        assert tree["fetch"] == ("fetch-task", Path("fetch"))
+        assert tree["process"] == ("process-task", Path("fetch/process"))
+        assert tree["nested"] == (None, Path("fetch/process/nested"))
+
+    def test_step_tree_parallel_steps(self):
+        spec = models.PipelineSpec(
+            name="test-pipeline",
+            steps=[
+                [{"name": "fetch", "taskRef": "fetch-task"}],
+                [
+                    {"name": "left", "taskRef": "process-task"},
+                    {"name": "right", "taskRef": "process-task"},
+                ],
+            ],
+        )
+        tree = pipeline_step_tree(spec)
+        assert tree["right"] == ("process-task", Path("fetch/right"))
+
+    def test_list_artifacts(self):
+        client = MagicMock()
+        client.get_task.side_effect = lambda name, **filters: tasks[name]
+        artifacts = list_pipeline_run_artifacts(client, pipeline_run)
+        assert [a.path for a in artifacts] == [
+            Path("fetch/raw.gz"),
+            Path("fetch/process/grid.gz"),
+            Path("fetch/process/stats.gz"),
+        ]
+        assert client.get_task.call_count == 2
+
+    def test_list_artifacts_task_error(self):
+        def get_task(name, **filters):
+            if name == "process-task":
+                raise requests.exceptions.ConnectionError("Connection refused")
+            return tasks[name]
+
+        client = MagicMock()
+        client.get_task.side_effect = get_task
+        error = list_pipeline_run_artifacts(client, pipeline_run)
+        assert isinstance(error, models.ErrorResponse)
+        assert "process-task" in error.detail
+        assert "Connection refused" in error.detail
+
+    def test_download_skips_matching_copies(self):
+        artifacts = [
+            PipelineArtifact("fetch", "raw", Path("fetch")),
+            PipelineArtifact("process", "grid", Path("fetch/process")),
+        ]
+        with ArtifactServer(digest=False) as server:
+            client = PRAXClient(service=server.url)
+            results = dict(
+                download_pipeline_run_artifacts(
+                    client, "run-123", artifacts, self.tmpdir.name
+                )
+            )
+            assert all(isinstance(r, DownloadResult) for r in results.values())
+            assert not any(r.skipped for r in results.values())
+            results = dict(
+                download_pipeline_run_artifacts(
+                    client, "run-123", artifacts, self.tmpdir.name
+                )
+            )
+            assert all(r.skipped for r in results.values())
+            assert not any(r.resumed for r in results.values())
+            # A changed artifact is downloaded again
+            server.etag = '"v2"'
+            results = dict(
+                download_pipeline_run_artifacts(
+                    client, "run-123", artifacts[:1], self.tmpdir.name
+                )
+            )
+            assert not results[artifacts[0]].skipped
+        output = Path(self.tmpdir.name)
+        assert (output / "fetch/process/grid.gz").read_bytes() == ARTIFACT
+        assert (output / ARTIFACTS_MANIFEST).exists()
+
+    def test_download_command(self):
+        with ArtifactServer() as server:
+            client = PRAXClient(service=server.url)
+            client.get_pipeline = MagicMock(
+                return_value=models.ErrorResponse(detail="Not found")
+            )
+            client.get_pipeline_run = MagicMock(return_value=pipeline_run)
+            client.get_task = MagicMock(side_effect=lambda name, **f: tasks[name])
+            with patch("oceanum.cli.prax.workflows.PRAXClient", return_value=client):
+                result = CliRunner().invoke(
+                    main,
+                    [
+                        "prax",
+                        "download",
+                        "pipeline-artifacts",
+                        "run-123",
+                        "-d",
+                        self.tmpdir.name,
+                        "-s",
+                        "process",
+                    ],
+                )
+        assert result.exit_code == 0, result.output
+        assert "2 downloaded, 0 up to date, 0 failed" in result.output
+        assert (Path(self.tmpdir.name) / "fetch/process/stats.gz").exists()
+        assert not (Path(self.tmpdir.name) / "fetch/raw.gz").exists()
@@ -0,0 +1,168 @@
+import asyncio
+import gzip
+import os
+import tempfile
+from datetime import datetime, timezone
+from unittest import IsolatedAsyncioTestCase
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from oceanum.cli.prax import models
+from oceanum.cli.prax.async_client import AsyncPRAXClient
+
+timestamp = datetime.now(tz=timezone.utc).isoformat()
+
+task = {
+    "id": "task-123",
+    "name": "test-task",
+    "project": "test-project",
+    "stage": "dev",
+    "org": "test-org",
+    "created_at": timestamp,
+    "updated_at": timestamp,
+}
+
+task_run = {
+    "id": "run-123",
+    "name": "run-123",
+    "project": "test-project",
+    "stage": "dev",
+    "org": "test-org",
+    "parent": "test-task",
+    "status": "Running",
+    "created_at": timestamp,
+    "updated_at": timestamp,
+}
+
+
+async def list_tasks(request: web.Request) -> web.Response:
+    assert request.headers["Authorization"] == "Bearer test-token"
+    assert request.query["project"] == "test-project"
+    return web.json_response([task])
+
+
+async def submit_task(request: web.Request) -> web.Response:
+    body = await request.json()
+    return web.json_response(task | {"last_run": task_run | body["parameters"]})
+
+
+async def get_task_run(request: web.Request) -> web.Response:
+    if request.match_info["name"] != "run-123":
+        return web.json_response({"detail": "Task run not found!"}, status=404)
+    return web.json_response(task_run)
+
+
+async def get_project(request: web.Request) -> web.Response:
+    return web.json_response({"name": "incomplete-project"})
+
+
+async def get_logs(request: web.Request) -> web.Response:
+    assert request.query["tail"] == "10"
+    assert request.query["follow"] == "False"
+    return web.Response(text="line 1\nline 2\n")
+
+
+async def get_artifact(request: web.Request) -> web.Response:
+    return web.Response(
+        body=gzip.compress(b"artifact-data"), headers={"Content-Encoding": "gzip"}
+    )
+
+
+async def follow_route_logs(request: web.Request) -> web.StreamResponse:
+    response = web.StreamResponse()
+    await response.prepare(request)
+    for line in [b"first\n", b"after a quiet while\n"]:
+        await response.write(line)
+        await asyncio.sleep(0.3)
+    return response
+
+
+async def get_truncated_artifact(request: web.Request) -> web.StreamResponse:
+    response = web.StreamResponse(headers={"Content-Length": "1000"})
+    await response.prepare(request)
+    await response.write(b"partial")
+    request.transport.close()
+    return response
+
+
+class TestAsyncPRAXClient(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        app = web.Application()
+        app.router.add_get("/api/tasks", list_tasks)
+        app.router.add_post("/api/tasks/{name}/submit", submit_task)
+        app.router.add_get("/api/task-runs/{name}", get_task_run)
+        app.router.add_get("/api/task-runs/{name}/logs", get_logs)
+        app.router.add_get("/api/task-runs/{name}/artifacts/{artifact}", get_artifact)
+        app.router.add_get("/api/projects/{name}", get_project)
+        app.router.add_get("/api/routes/{name}/logs", follow_route_logs)
+        app.router.add_get(
+            "/api/task-runs/{name}/artifacts/truncated/{artifact}",
+            get_truncated_artifact,
+        )
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.client = AsyncPRAXClient(
+            token="Bearer test-token", service=str(self.server.make_url("/api"))
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+        await self.server.close()
+
+    async def test_list_tasks(self):
+        tasks = await self.client.list_tasks(project="test-project", stage=None)
+        assert isinstance(tasks, list)
+        assert isinstance(tasks[0], models.TaskSchema)
+        assert tasks[0].name == "test-task"
+
+    async def test_submit_task(self):
+        resp = await self.client.submit_task("test-task", {"message": "hello"})
+        assert isinstance(resp, models.TaskSchema)
+        assert resp.last_run.name == "run-123"
+
+    async def test_get_task_run_not_found(self):
+        resp = await self.client.get_task_run("missing-run")
+        assert isinstance(resp, models.ErrorResponse)
+        assert resp.detail == "Task run not found!"
+
+    async def test_get_project_validation_error(self):
+        resp = await self.client.get_project("incomplete-project")
+        assert isinstance(resp, models.ErrorResponse)
+        assert isinstance(resp.detail, list)
+
+    async def test_task_run_logs(self):
+        lines = [
+            line async for line in self.client.get_task_run_logs("run-123", 10, False)
+        ]
+        assert lines == ["line 1", "line 2"]
+
+    async def test_download_artifact(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "artifact.gz")
+            assert await self.client.download_task_run_artifact(
+                "run-123", "output", output_path
+            )
+            with gzip.open(output_path) as f:
+                assert f.read() == b"artifact-data"
+
+    async def test_followed_logs_have_no_read_timeout(self):
+        self.client.timeout = (5.0, 0.1)
+        lines = [line async for line in self.client.get_route_logs("route", 10, True)]
+        assert lines == ["first", "after a quiet while"]
+        lines = [line async for line in self.client.get_route_logs("route", 10, False)]
+        assert lines[0] == "first"
+        assert isinstance(lines[-1], models.ErrorResponse)
+
+    async def test_download_artifact_truncated(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "artifact.gz")
+            assert not await self.client.download_task_run_artifact(
+                "run-123", "truncated/output", output_path
+            )
+
+    async def test_connection_error(self):
+        client = AsyncPRAXClient(service="http://127.0.0.1:1/api")
+        async with client:
+            resp = await client.list_tasks()
+        assert isinstance(resp, models.ErrorResponse)
@@ -0,0 +1,159 @@
+import json
+import tempfile
+import time
+from datetime import datetime, timezone
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import click
+import requests
+from click.testing import CliRunner
+
+from oceanum.cli import main as oceanum_main
+from oceanum.cli.prax import models
+from oceanum.cli.prax.cache import ResponseCache
+from oceanum.cli.prax.client import PRAXClient
+
+project = {
+    "id": "test-project",
+    "name": "test-project",
+    "org": "test-org",
+    "owner": "test-user",
+    "created_at": datetime.now(tz=timezone.utc).isoformat(),
+    "status": "healthy",
+    "stages": [],
+}
+
+
+def make_response(
+    status_code: int = 200, data: list | dict | None = None, **headers
+) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = "http://prax.test/api/projects"
+    response.headers.update(headers)
+    response._content = json.dumps(data).encode() if data is not None else b""
+    return response
+
+
+class TestResponseCache(TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.tmpdir.name, ttl=60)
+        self.session = MagicMock(spec=requests.Session)
+        self.client = PRAXClient(
+            service="http://prax.test/api",
+            token="Bearer x",
+            session=self.session,
+            cache=self.cache,
+        )
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_fresh_entry_skips_request(self):
+        self.session.request.return_value = make_response(data=[project])
+        first = self.client.list_projects(org="test-org")
+        second = self.client.list_projects(org="test-org")
+        assert self.session.request.call_count == 1
+        assert isinstance(second[0], models.ProjectItemSchema)
+        assert first == second
+
+    def test_entries_private_to_the_user(self):
+        self.session.request.return_value = make_response(data=[project])
+        self.client.list_projects(org="test-org")
+        entries = list(self.cache.directory.glob("*.json"))
+        assert len(entries) == 1
+        assert entries[0].stat().st_mode & 0o777 == 0o600
+
+    def test_key_includes_filters_and_credentials(self):
+        self.session.request.return_value = make_response(data=[project])
+        self.client.list_projects(org="test-org")
+        self.client.list_projects(org="other-org")
+        other_user = PRAXClient(
+            service="http://prax.test/api",
+            token="Bearer y",
+            session=self.session,
+            cache=self.cache,
+        )
+        other_user.list_projects(org="test-org")
+        assert self.session.request.call_count == 3
+
+    def test_stale_entry_revalidated_with_etag(self):
+        self.cache.ttl = 0
+        self.session.request.return_value = make_response(data=[project], ETag='"v1"')
+        self.client.list_projects()
+        self.session.request.return_value = make_response(304)
+        projects = self.client.list_projects()
+        assert projects[0].name == "test-project"
+        headers = self.session.request.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"v1"'
+
+    def test_refresh_ignores_cached_entry(self):
+        self.session.request.return_value = make_response(data=[project])
+        self.client.list_projects()
+        self.cache.refresh = True
+        self.session.request.return_value = make_response(data=[])
+        assert self.client.list_projects() == []
+        self.cache.refresh = False
+        assert self.client.list_projects() == []
+        assert self.session.request.call_count == 2
+
+    def test_errors_and_no_store_not_cached(self):
+        self.session.request.return_value = make_response(404, {"detail": "Missing"})
+        assert isinstance(self.client.list_projects(), models.ErrorResponse)
+        self.session.request.return_value = make_response(
+            data=[project], **{"Cache-Control": "no-store"}
+        )
+        self.client.list_projects()
+        assert not list(self.cache.directory.glob("*.json"))
+
+    def test_changes_clear_cache(self):
+        self.session.request.return_value = make_response(data=[project])
+        self.client.list_projects()
+        self.client.delete_project("test-project")
+        assert not list(self.cache.directory.glob("*.json"))
+
+    def test_lru_eviction(self):
+        self.session.request.return_value = make_response(data=[project])
+        self.client.list_projects(org="a")
+        entry_size = next(self.cache.directory.glob("*.json")).stat().st_size
+        # Room for two entries, whose sizes vary by a few bytes
+        self.cache.max_size = entry_size * 2 + entry_size // 2
+        self.client.list_projects(org="b")
+        time.sleep(0.01)
+        # Reading "a" makes "b" the least recently used entry
+        self.client.list_projects(org="a")
+        self.client.list_projects(org="c")
+        assert len(list(self.cache.directory.glob("*.json"))) == 2
+        self.client.list_projects(org="a")
+        assert self.session.request.call_count == 3
+        self.client.list_projects(org="b")
+        assert self.session.request.call_count == 4
+
+    def test_from_context(self):
+        ctx = click.Context(click.Command("test"))
+        assert ResponseCache.from_context(ctx) is None
+        ctx.meta["oceanum.prax.cache"] = None
+        with patch.dict("os.environ", {"PRAX_CACHE": "1"}):
+            assert isinstance(ResponseCache.from_context(ctx), ResponseCache)
+        assert ResponseCache.from_context(ctx) is None
+        ctx.meta["oceanum.prax.cache.refresh"] = True
+        assert ResponseCache.from_context(ctx).refresh
+        ctx.meta["oceanum.prax.cache"] = False
+        assert ResponseCache.from_context(ctx) is None
+
+
+class TestCacheOptions(TestCase):
+    def test_list_projects_cached(self):
+        runner = CliRunner()
+        with patch(
+            "requests.Session.request", return_value=make_response(data=[project])
+        ) as mock_request:
+            for args in [["--cache"], ["--cache"], ["--refresh"], ["--no-cache"]]:
+                result = runner.invoke(
+                    oceanum_main, ["prax", "list", "projects", "--org", "x", *args]
+                )
+                assert result.exit_code == 0
+                assert "test-project" in result.output
+            assert mock_request.call_count == 3
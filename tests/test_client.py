@@ -0,0 +1,65 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from oceanum.cli.prax import client
+
+
+class TestClientSession(TestCase):
+    def tearDown(self) -> None:
+        client.close_sessions()
+        return super().tearDown()
+
+    def test_session_is_shared(self):
+        client_a = client.PRAXClient(service="http://prax.test/api")
+        client_b = client.PRAXClient(service="http://prax.test/api")
+        assert client_a.session is client_b.session
+
+    def test_session_pool_settings(self):
+        prax = client.PRAXClient(
+            service="http://prax.test/api", pool_maxsize=4, pool_block=True
+        )
+        adapter = prax.session.get_adapter("https://prax.test/api")
+        assert adapter._pool_maxsize == 4
+        assert adapter._pool_block is True
+        assert prax.session is not client.get_session()
+
+    def test_session_no_keep_alive(self):
+        session = client.get_session(keep_alive=False)
+        assert session.headers["Connection"] == "close"
+
+    def test_private_session_closed(self):
+        session = MagicMock(spec=requests.Session)
+        with client.PRAXClient(service="http://prax.test/api", session=session):
+            pass
+        session.close.assert_called_once()
+
+    def test_request_uses_session(self):
+        response = MagicMock(status_code=200)
+        response.json.return_value = []
+        with patch("requests.Session.request", return_value=response) as mock_request:
+            prax = client.PRAXClient(service="http://prax.test/api", token="Bearer x")
+            prax.list_projects()
+            prax.list_projects()
+            assert mock_request.call_count == 2
+            mock_request.assert_called_with(
+                "GET",
+                "http://prax.test/api/projects",
+                headers={"Authorization": "Bearer x"},
+                params=None,
+                timeout=(10.0, 60.0),
+            )
+
+    def test_run_actions_are_keyed(self):
+        response = MagicMock(status_code=200)
+        response.json.return_value = {}
+        with patch("requests.Session.request", return_value=response) as mock_request:
+            prax = client.PRAXClient(service="http://prax.test/api", token="Bearer x")
+            prax.retry_pipeline_run("run-1")
+            prax.terminate_task_run("run-2")
+            keys = [
+                c.kwargs["headers"].get("Idempotency-Key")
+                for c in mock_request.call_args_list
+            ]
+            assert all(keys) and len(set(keys)) == 2
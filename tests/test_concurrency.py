@@ -0,0 +1,48 @@
+import threading
+import time
+
+from oceanum.cli.prax.concurrency import RateLimiter, bounded_map
+
+
+def test_bounded_map_limits_concurrency():
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+
+    def work(item: int) -> int:
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.01)
+        with lock:
+            state["running"] -= 1
+        return item * 2
+
+    results = dict(bounded_map(work, range(20), concurrency=3))
+    assert results == {i: i * 2 for i in range(20)}
+    assert state["peak"] <= 3
+
+
+def test_bounded_map_ordered():
+    def work(item: int) -> int:
+        # Later items finish first
+        time.sleep(0.002 * (10 - item))
+        return item
+
+    pairs = list(bounded_map(work, range(10), concurrency=10, ordered=True))
+    assert pairs == [(i, i) for i in range(10)]
+
+
+def test_rate_limiter_spacing():
+    limiter = RateLimiter(rate=50)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.wait()
+    assert time.monotonic() - start >= 0.09
+
+
+def test_rate_limiter_disabled():
+    limiter = RateLimiter(rate=None)
+    start = time.monotonic()
+    for _ in range(100):
+        limiter.wait()
+    assert time.monotonic() - start < 0.05
@@ -0,0 +1,117 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import pytest
+import requests
+from click.testing import CliRunner
+from urllib3.util import Timeout
+
+from oceanum.cli import main
+from oceanum.cli.prax import models
+from oceanum.cli.prax.client import PRAXClient
+from oceanum.cli.prax.deadline import (
+    DEADLINE_EXIT_CODE,
+    Deadline,
+    DeadlineExceeded,
+    DeadlineTimeout,
+    request_timeout,
+)
+
+runner = CliRunner()
+
+
+class TestDeadline(TestCase):
+    def test_unlimited(self):
+        deadline = Deadline()
+        assert deadline.remaining() is None
+        assert deadline.allows(1e9)
+        deadline.check()
+        assert deadline.timeout((5, 30)) == (5, 30)
+
+    def test_expired(self):
+        deadline = Deadline(0)
+        assert deadline.expired
+        with pytest.raises(DeadlineExceeded) as e:
+            deadline.check()
+        assert e.value.exit_code == DEADLINE_EXIT_CODE
+
+    def test_sleep(self):
+        deadline = Deadline(10)
+        with patch("time.sleep") as mock_sleep:
+            deadline.sleep(1)
+            with pytest.raises(DeadlineExceeded):
+                deadline.sleep(60)
+        assert mock_sleep.call_args_list[0].args[0] == 1
+        assert 9 < mock_sleep.call_args_list[1].args[0] <= 10
+
+    def test_timeout(self):
+        timeout = Deadline(5).timeout((10, None))
+        assert isinstance(timeout, DeadlineTimeout)
+        bounded = timeout.clone()
+        assert isinstance(bounded, Timeout)
+        assert 4 < bounded.connect_timeout <= 5
+        assert 4 < bounded.read_timeout <= 5
+        bounded = Deadline(60).timeout(2.0).clone()
+        assert bounded.connect_timeout == bounded.read_timeout == 2.0
+
+    def test_request_timeout_env(self):
+        assert request_timeout() == (10.0, 60.0)
+        with patch.dict(
+            "os.environ", {"PRAX_CONNECT_TIMEOUT": "3", "PRAX_READ_TIMEOUT": "0"}
+        ):
+            assert request_timeout() == (3.0, None)
+
+
+class TestClientTimeouts(TestCase):
+    def test_timed_out_request(self):
+        client = PRAXClient(service="http://prax.test/api", timeout=(1, 2))
+        with patch(
+            "requests.Session.request", side_effect=requests.exceptions.ReadTimeout()
+        ) as mock_request:
+            project = client.get_project("test-project")
+        assert isinstance(project, models.ErrorResponse)
+        assert "timed out" in project.detail
+        assert mock_request.call_args.kwargs["timeout"] == (1, 2)
+
+    def test_expired_deadline(self):
+        client = PRAXClient(service="http://prax.test/api", deadline=Deadline(0))
+        with patch("requests.Session.request") as mock_request:
+            with pytest.raises(DeadlineExceeded):
+                client.get_project("test-project")
+        mock_request.assert_not_called()
+
+
+class TestDeadlineOption(TestCase):
+    def test_exit_code(self):
+        with patch(
+            "oceanum.cli.prax.client.PRAXClient.get_project",
+            side_effect=DeadlineExceeded(90),
+        ):
+            result = runner.invoke(
+                main, ["prax", "--deadline", "90s", "describe", "project", "test"]
+            )
+        assert result.exit_code == DEADLINE_EXIT_CODE
+        assert "Deadline of 1 minute and 30 seconds exceeded" in result.output
+
+    def test_context(self):
+        def get_project(client, *args, **kwargs):
+            assert 0 < client.deadline.remaining() <= 900
+            return models.ErrorResponse(detail="Not found")
+
+        with patch(
+            "oceanum.cli.prax.client.PRAXClient.get_project",
+            autospec=True,
+            side_effect=get_project,
+        ):
+            result = runner.invoke(
+                main,
+                ["prax", "describe", "project", "test"],
+                env={"PRAX_DEADLINE": "15m"},
+            )
+        assert result.exit_code == 1
+        assert "Not found" in result.output
+
+    def test_invalid(self):
+        result = runner.invoke(main, ["prax", "--deadline", "soon", "list", "routes"])
+        assert result.exit_code == 2
+        assert "Invalid duration 'soon'" in result.output
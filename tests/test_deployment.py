@@ -0,0 +1,288 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+import pytest
+import requests
+import yaml
+
+from oceanum.cli.prax import models
+from oceanum.cli.prax.client import PRAXClient
+from oceanum.cli.prax.deadline import Deadline, DeadlineExceeded
+from oceanum.cli.prax.deployment import (
+    Backoff,
+    DeploymentPhase,
+    DeploymentWaiter,
+    iter_sse_data,
+)
+
+specfile = Path(__file__).parent / "data/dpm-project.yaml"
+now = datetime.now(tz=timezone.utc)
+
+
+def project_state(
+    revision_status: str,
+    stage_status: str,
+    route_status: str = "pending",
+    builds: list[models.BuildSchema] | None = None,
+) -> dict:
+    with specfile.open() as f:
+        spec = yaml.safe_load(f)
+    if builds:
+        spec["resources"]["builds"] = [
+            {"name": b.name, "baseImage": "python:3.12"} for b in builds
+        ]
+    project = models.ProjectDetailsSchema(
+        id="test-project",
+        name="test-project",
+        org="test-org",
+        owner="test-user",
+        created_at=now,
+        last_revision=models.RevisionDetailsSchema(
+            id="test-revision",
+            author="test-user",
+            created_at=now,
+            number=2,
+            status=revision_status,
+            spec=models.ProjectSpec(**spec),
+        ),
+        stages=[
+            models.StageDetailsSchema(
+                id="test-stage",
+                name="test-stage",
+                status=stage_status,
+                updated_at=now,
+                resources=models.StageResourcesSchema(
+                    pipelines=[],
+                    tasks=[],
+                    sources=[],
+                    builds=builds or [],
+                    routes=[
+                        models.RouteSchema(
+                            id="test-route",
+                            name="test-route",
+                            org="test-org",
+                            project="test-project",
+                            stage="test-stage",
+                            display_name="test-route",
+                            created_at=now,
+                            updated_at=now,
+                            status=route_status,
+                            url="https://test-route.oceanum.test",
+                            notebook=False,
+                        )
+                    ],
+                ),
+            )
+        ],
+    )
+    return project.model_dump(mode="json", by_alias=True)
+
+
+def build_state(status: str) -> models.BuildSchema:
+    return models.BuildSchema(
+        id="test-build",
+        org="test-org",
+        stage="test-stage",
+        project="test-project",
+        name="test-build",
+        created_at=now,
+        updated_at=now,
+        last_run=models.StagedRunSchema(
+            id="test-build-run",
+            org="test-org",
+            stage="test-stage",
+            project="test-project",
+            parent="test-build",
+            name="test-build-run",
+            status=status,
+            created_at=now + timedelta(hours=1),
+            updated_at=now + timedelta(hours=1),
+        ),
+    )
+
+
+class FakePRAXServer(ThreadingHTTPServer):
+    def __init__(self, states: list[dict], events: bool = False) -> None:
+        super().__init__(("127.0.0.1", 0), FakePRAXHandler)
+        self.states = states
+        self.events = events
+        self.project_requests = 0
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/api"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+class FakePRAXHandler(BaseHTTPRequestHandler):
+    server: FakePRAXServer
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        path = self.path.split("?")[0]
+        if path == "/api/projects/test-project":
+            index = min(self.server.project_requests, len(self.server.states) - 1)
+            self.server.project_requests += 1
+            body = json.dumps(self.server.states[index]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif path == "/api/projects/test-project/events" and self.server.events:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for state in self.server.states:
+                self.wfile.write(
+                    f"event: project\ndata: {json.dumps(state)}\n\n".encode()
+                )
+                self.wfile.flush()
+        else:
+            body = b'{"detail": "Not found"}'
+            self.send_response(404)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+
+class TestDeploymentWaiter(TestCase):
+    states = [
+        project_state("created", "ready"),
+        project_state("commited", "updating"),
+        project_state("commited", "updating", "starting"),
+        project_state("commited", "healthy", "online"),
+    ]
+
+    def test_backoff(self):
+        backoff = Backoff(initial=1, maximum=4, factor=2)
+        assert [backoff.next() for _ in range(4)] == [1, 2, 4, 4]
+        backoff.reset()
+        assert backoff.next() == 1
+
+    def test_iter_sse_data(self):
+        lines = [b"event: project", b'data: {"a":', b"data: 1}", b"", b": ping", b""]
+        assert list(iter_sse_data(iter(lines))) == ['{"a":\n1}']
+
+    def test_wait_polling(self):
+        messages = []
+        with FakePRAXServer(self.states) as server:
+            client = PRAXClient(service=server.url)
+            waiter = DeploymentWaiter(
+                client, initial_interval=0.01, max_interval=0.05, echo=messages.append
+            )
+            assert waiter.wait(project_name="test-project", org="test-org")
+            assert server.project_requests == len(self.states)
+        output = "\n".join(messages)
+        assert "Revision #2 committed successfully" in output
+        assert "finished being updated" in output
+        assert "https://test-route.oceanum.test" in output
+        assert output.count("Waiting for Revision #2") == 1
+
+    def test_wait_event_stream(self):
+        messages = []
+        with FakePRAXServer(self.states, events=True) as server:
+            client = PRAXClient(service=server.url)
+            waiter = DeploymentWaiter(
+                client, initial_interval=0.01, max_interval=1, echo=messages.append
+            )
+            assert waiter.wait(project_name="test-project")
+            # Only the initial snapshot is fetched, the rest is pushed
+            assert server.project_requests == 1
+        assert "finished being updated" in "\n".join(messages)
+
+    def test_wait_event_stream_unreachable(self):
+        messages = []
+        with FakePRAXServer(self.states, events=True) as server:
+            client = PRAXClient(service=server.url)
+            request = client._request
+
+            def unreachable_events(method, endpoint, **kwargs):
+                if endpoint.endswith("/events"):
+                    raise requests.exceptions.ConnectionError("Connection refused")
+                return request(method, endpoint, **kwargs)
+
+            waiter = DeploymentWaiter(
+                client, initial_interval=0.01, max_interval=0.05, echo=messages.append
+            )
+            with patch.object(client, "_request", side_effect=unreachable_events):
+                assert waiter.wait(project_name="test-project")
+            # The waiter fell back to polling every state
+            assert server.project_requests == len(self.states)
+        assert "finished being updated" in "\n".join(messages)
+
+    def test_wait_no_change(self):
+        messages = []
+        with FakePRAXServer([project_state("no-change", "healthy")]) as server:
+            client = PRAXClient(service=server.url)
+            waiter = DeploymentWaiter(client, echo=messages.append)
+            assert not waiter.wait(project_name="test-project")
+        assert "No changes to commit" in messages[0]
+
+    def test_wait_deadline(self):
+        stuck = [project_state("created", "ready")]
+        with FakePRAXServer(stuck) as server:
+            client = PRAXClient(service=server.url, deadline=Deadline(0.3))
+            waiter = DeploymentWaiter(
+                client, initial_interval=0.05, max_interval=0.05, echo=lambda m: None
+            )
+            with pytest.raises(DeadlineExceeded):
+                waiter.wait(project_name="test-project")
+            assert 1 < server.project_requests < 10
+
+    def test_build_failed(self):
+        messages = []
+        waiter = DeploymentWaiter(PRAXClient(), echo=messages.append)
+        running = [build_state("Running")]
+        assert not waiter.advance(
+            models.ProjectDetailsSchema(
+                **project_state("commited", "updating", builds=running)
+            )
+        )
+        assert waiter.phase == "builds"
+        failed = [build_state("Failed")]
+        assert waiter.advance(
+            models.ProjectDetailsSchema(
+                **project_state("commited", "updating", builds=failed)
+            )
+        )
+        assert not waiter.succeeded
+        assert any("failed to start or while running" in m for m in messages)
+
+    def test_builds_not_started(self):
+        messages = []
+        waiter = DeploymentWaiter(
+            PRAXClient(), build_start_grace=0.05, echo=messages.append
+        )
+        waiter.phase = DeploymentPhase.BUILDS
+        not_started = [build_state("Pending").model_copy(update={"last_run": None})]
+        project = models.ProjectDetailsSchema(
+            **project_state("commited", "updating", builds=not_started)
+        )
+        assert not waiter.advance(project)
+        time.sleep(0.1)
+        assert waiter.advance(project)
+        assert waiter.succeeded
+        assert "Builds did not start" in messages[-1]
+
+    def test_project_error(self):
+        waiter = DeploymentWaiter(PRAXClient(), echo=lambda m: None)
+        assert waiter.advance(models.ErrorResponse(detail="Not found"))
+        assert not waiter.succeeded
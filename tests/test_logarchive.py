@@ -0,0 +1,200 @@
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from oceanum.cli import main
+from oceanum.cli.prax import models
+from oceanum.cli.prax.logarchive import ArchivedLog, LogArchive, new_lines_offset
+
+timestamp = datetime.now(tz=timezone.utc)
+
+
+def run_schema(status: str) -> models.StagedRunSchema:
+    return models.StagedRunSchema(
+        id="run-123",
+        name="run-123",
+        org="test-org",
+        stage="dev",
+        project="test-project",
+        parent="my-task",
+        status=status,
+        created_at=timestamp,
+        updated_at=timestamp,
+    )
+
+
+class FakeLogs:
+    """Serve the last lines of a log the way the logs endpoint does."""
+
+    def __init__(self, log: list[str]) -> None:
+        self.log = log
+        self.calls: list[tuple[int, bool]] = []
+
+    def __call__(self, tail: int, follow: bool):
+        self.calls.append((tail, follow))
+        return iter([line.encode() for line in self.log[-tail:]])
+
+
+class TestArchivedLog(TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.archive = LogArchive("oceanum.test-test-org", self.tmpdir.name)
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_new_lines_offset(self):
+        assert new_lines_offset([], ["a"]) == 0
+        assert new_lines_offset(["a", "b"], ["x", "a", "b", "c"]) == 3
+        assert new_lines_offset(["a", "b", "c"], ["b", "c", "d"]) == 2
+        assert new_lines_offset(["a", "b"], ["c", "d"]) is None
+
+    def test_segments_tail_and_time_index(self):
+        log = self.archive.open("task", "run-123")
+        start = datetime(2024, 5, 1, tzinfo=timezone.utc).timestamp()
+        with patch("oceanum.cli.prax.logarchive.SEGMENT_LINES", 4):
+            log.append([f"line {i}" for i in range(6)], archived_at=start)
+            log.append([f"line {i}" for i in range(6, 10)], archived_at=start + 3600)
+        assert [s["lines"] for s in log.index["segments"]] == [4, 4, 2]
+        reopened = self.archive.open("task", "run-123")
+        assert reopened.lines == 10
+        assert reopened.tail(3) == ["line 7", "line 8", "line 9"]
+        assert len(reopened.tail(100)) == 10
+        since = datetime.fromtimestamp(start + 60, tz=timezone.utc)
+        with patch.object(
+            ArchivedLog, "_read_segment", wraps=reopened._read_segment
+        ) as read_segment:
+            lines = [line for _, line in reopened.read(since=since)]
+        assert lines == [f"line {i}" for i in range(6, 10)]
+        # The first segment only holds older lines and is not decompressed
+        assert read_segment.call_count == 2
+
+    def test_time_index_uses_logged_time(self):
+        log = self.archive.open("task", "run-123")
+        archived_at = datetime(2024, 5, 2, tzinfo=timezone.utc).timestamp()
+        log.append(
+            [
+                "2024-05-01T10:00:00Z ERROR disk full",
+                "Traceback (most recent call last):",
+                '{"time": "2024-05-01T12:00:00+00:00", "msg": "retrying"}',
+            ],
+            archived_at=archived_at,
+        )
+        log.append(["no timestamp"], archived_at=archived_at)
+        logged = [(t.hour, line) for t, line in log.read()]
+        assert [hour for hour, _ in logged] == [10, 10, 12, 12]
+        since = datetime(2024, 5, 1, 11, tzinfo=timezone.utc)
+        until = datetime(2024, 5, 1, 13, tzinfo=timezone.utc)
+        assert len(list(log.read(since=since, until=until))) == 2
+        [segment] = log.index["segments"]
+        assert segment["last_time"] < archived_at
+
+    def test_new_archive_appended_in_chunks(self):
+        log = self.archive.open("task", "run-123")
+        fetch = FakeLogs([f"line {i}" for i in range(25)])
+        with patch("oceanum.cli.prax.logarchive.SYNC_CHUNK_LINES", 10):
+            with patch.object(ArchivedLog, "append", wraps=log.append) as append:
+                assert log.sync(fetch) == 25
+        assert [len(call.args[0]) for call in append.call_args_list] == [10, 10, 5]
+        assert log.tail(2) == ["line 23", "line 24"]
+
+    def test_sync_fetches_only_new_lines(self):
+        log = self.archive.open("route", "my-route")
+        fetch = FakeLogs([f"line {i}" for i in range(50)])
+        assert log.sync(fetch) == 50
+        fetch.log += ["line 50", "line 51"]
+        with patch("oceanum.cli.prax.logarchive.SYNC_TAILS", [10, 100]):
+            assert log.sync(fetch) == 2
+            # More new lines than the first tail, which does not overlap
+            fetch.log += [f"new {i}" for i in range(30)]
+            assert log.sync(fetch) == 30
+        assert fetch.calls[1:] == [(10, False), (10, False), (100, False)]
+        assert log.lines == 82
+        assert log.tail(2) == ["new 28", "new 29"]
+
+    def test_finished_runs_served_locally(self):
+        fetch = FakeLogs(["a", "b", "c"])
+        lines = list(
+            self.archive.logs("task", "run-123", fetch, 2, run=run_schema("Succeeded"))
+        )
+        assert lines == ["b", "c"]
+        lines = list(
+            self.archive.logs("task", "run-123", fetch, 10, run=run_schema("Succeeded"))
+        )
+        assert lines == ["a", "b", "c"]
+        assert len(fetch.calls) == 1
+        log = self.archive.open("task", "run-123")
+        assert log.complete
+        assert log.index["parent"] == "my-task"
+
+    def test_follow_archives_new_lines(self):
+        fetch = FakeLogs(["a", "b"])
+        list(self.archive.logs("task", "run-123", fetch, 10, run=run_schema("Running")))
+        fetch.log += ["c", "d"]
+        lines = list(
+            self.archive.logs(
+                "task", "run-123", fetch, 10, follow=True, run=run_schema("Running")
+            )
+        )
+        assert lines == ["a", "b", "c", "d"]
+        # The followed stream replays the archived lines, which are dropped
+        assert fetch.calls[-1] == (4, True)
+        assert self.archive.open("task", "run-123").tail(10) == ["a", "b", "c", "d"]
+
+    def test_broken_index_resets_archive(self):
+        log = self.archive.open("task", "run-123")
+        log.append(["a"])
+        (log.directory / "index.json").write_text("{")
+        assert self.archive.open("task", "run-123").lines == 0
+        assert not list(Path(log.directory).glob("*.log.gz"))
+
+    def test_files_private_to_the_user(self):
+        log = self.archive.open("task", "run-123")
+        log.append(["a"])
+        log.append(["b"])
+        for path in log.directory.iterdir():
+            assert path.stat().st_mode & 0o777 == 0o600, path
+        assert log.tail(10) == ["a", "b"]
+
+    def test_scopes_do_not_share_logs(self):
+        self.archive.open("task", "run-123").append(["a"])
+        other = LogArchive("oceanum.test-other-org", self.tmpdir.name)
+        assert other.open("task", "run-123").lines == 0
+        assert other.list() == []
+        assert len(self.archive.list()) == 1
+
+
+class TestArchiveCommands(TestCase):
+    def test_archive_search_and_list(self):
+        runner = CliRunner()
+        lines = [b"INFO starting", b"ERROR disk full", b"INFO done"]
+        with patch(
+            "oceanum.cli.prax.client.PRAXClient.get_route_logs",
+            side_effect=lambda name, tail, follow: iter(lines[-tail:]),
+        ) as get_logs:
+            for _ in range(2):
+                result = runner.invoke(
+                    main,
+                    ["prax", "logs", "route", "archived-route", "--archive", "-n", "2"],
+                )
+                assert result.exit_code == 0, result.output
+                assert result.output.splitlines() == ["ERROR disk full", "INFO done"]
+            assert get_logs.call_count == 2
+        result = runner.invoke(
+            main, ["prax", "logs", "search", "disk", "-m", "archived-*"]
+        )
+        assert result.exit_code == 0, result.output
+        assert "route/archived-route" in result.output
+        assert "ERROR disk full" in result.output
+        since = (datetime.now(tz=timezone.utc) + timedelta(hours=1)).isoformat()
+        result = runner.invoke(
+            main, ["prax", "logs", "search", "disk", "--since", since]
+        )
+        assert result.exit_code == 1
+        result = runner.invoke(main, ["prax", "list", "archived-logs", "-o", "json"])
+        assert result.exit_code == 0
+        assert '"lines": 3' in result.output
@@ -0,0 +1,147 @@
+import json
+from datetime import datetime, timedelta, timezone
+from unittest import TestCase
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from oceanum.cli import main
+from oceanum.cli.prax.logfilter import (
+    LogFilter,
+    LogWriter,
+    log_time,
+    parse_time,
+    write_logs,
+)
+
+
+def run(log_filter: LogFilter, lines: list[str]) -> list[str]:
+    return [out for line in lines if (out := log_filter(line)) is not None]
+
+
+class TestLogFilter(TestCase):
+    def test_parse_time(self):
+        before = datetime.now(tz=timezone.utc)
+        since = parse_time("15m")
+        assert before - timedelta(minutes=15, seconds=1) < since < before
+        assert parse_time("2024-05-01T10:00:00Z") == datetime(
+            2024, 5, 1, 10, tzinfo=timezone.utc
+        )
+        assert parse_time("2024-05-01 10:00").tzinfo is not None
+        with pytest.raises(ValueError):
+            parse_time("yesterday")
+
+    def test_include_exclude(self):
+        log_filter = LogFilter(include=["epoch \\d+"], exclude=["epoch 2"])
+        lines = ["epoch 1 loss=0.3", "epoch 2 loss=0.2", "saving model"]
+        assert run(log_filter, lines) == ["epoch 1 loss=0.3"]
+
+    def test_text_level_and_continuation_lines(self):
+        lines = [
+            "2024-05-01 10:00:00,123 INFO Starting",
+            "2024-05-01 10:00:01,000 ERROR Failed",
+            "Traceback (most recent call last):",
+            '  File "run.py", line 1',
+            "level=warn msg=retrying",
+            "2024-05-01 10:00:02,000 DEBUG details",
+        ]
+        assert run(LogFilter(level="warning"), lines) == lines[1:5]
+
+    def test_json_records(self):
+        start = datetime(2024, 5, 1, 10, tzinfo=timezone.utc)
+        lines = [
+            json.dumps(
+                {
+                    "time": (start + timedelta(minutes=i)).isoformat(),
+                    "level": level,
+                    "msg": f"step {i}",
+                    "ctx": {"epoch": i},
+                }
+            )
+            for i, level in enumerate(["info", "warning", "error"])
+        ]
+        log_filter = LogFilter(
+            since=start + timedelta(seconds=30),
+            level="info",
+            fields=["level", "msg", "ctx.epoch"],
+        )
+        assert run(log_filter, lines) == ["warning step 1 1", "error step 2 2"]
+        log_filter = LogFilter(until=start + timedelta(seconds=30))
+        assert run(log_filter, lines + ["no time"]) == lines[:1]
+
+    def test_epoch_timestamps(self):
+        since = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        old = json.dumps({"ts": since.timestamp() - 60, "msg": "old"})
+        new = json.dumps({"ts": (since.timestamp() + 60) * 1000, "msg": "new"})
+        assert run(LogFilter(since=since), [old, new]) == [new]
+
+    def test_log_time(self):
+        logged = datetime(2024, 5, 1, 10, tzinfo=timezone.utc)
+        assert log_time("2024-05-01 10:00:00 INFO started") == logged
+        assert log_time(json.dumps({"@timestamp": logged.isoformat()})) == logged
+        assert log_time('{"msg": "no time"}') is None
+        assert log_time("INFO 2024-05-01T10:00:00Z") is None
+
+    def test_fork_resets_state(self):
+        log_filter = LogFilter(level="error")
+        assert log_filter("ERROR Failed") is not None
+        assert log_filter("continued") is not None
+        assert log_filter.fork()("continued") == "continued"
+        assert LogFilter(level="error")("DEBUG noise") is None
+
+
+class TestLogWriter(TestCase):
+    def test_batches_output(self):
+        with patch("click.echo") as echo:
+            result = write_logs(
+                (f"line {i}".encode() for i in range(1200)),
+                LogFilter(exclude=["line 1$"]),
+            )
+        assert result is None
+        written = "\n".join(call.args[0] for call in echo.call_args_list).split("\n")
+        assert len(written) == 1199
+        assert echo.call_count <= 3
+
+    def test_flushes_quiet_streams(self):
+        with patch("click.echo") as echo:
+            with LogWriter(interval=0.05) as writer:
+                writer.write("first")
+                for _ in range(50):
+                    if echo.called:
+                        break
+                    writer._closed.wait(0.01)
+                assert echo.called
+        echo.assert_called_once_with("first", color=None)
+
+
+class TestLogCommands(TestCase):
+    def test_route_logs_filters(self):
+        lines = [b"INFO ready", b"ERROR boom", b"WARNING slow"]
+        with patch(
+            "oceanum.cli.prax.client.PRAXClient.get_route_logs",
+            return_value=iter(lines),
+        ):
+            result = CliRunner().invoke(
+                main,
+                [
+                    "prax",
+                    "logs",
+                    "route",
+                    "my-route",
+                    "--level",
+                    "warning",
+                    "--exclude",
+                    "slow",
+                ],
+            )
+        assert result.exit_code == 0, result.output
+        assert result.output.strip() == "ERROR boom"
+
+    def test_invalid_options(self):
+        runner = CliRunner()
+        result = runner.invoke(main, ["prax", "logs", "route", "r", "-g", "("])
+        assert result.exit_code == 2
+        assert "Invalid regular expression" in result.output
+        result = runner.invoke(main, ["prax", "logs", "route", "r", "--since", "x"])
+        assert result.exit_code == 2
@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 from pathlib import Path
 from unittest import TestCase
-from unittest.mock import patch
+from unittest.mock import ANY, patch
 
 from click.testing import CliRunner
 
@@ -48,39 +48,39 @@ class TestPRAXCommands(TestCase):
         assert result.exit_code != 0
 
     def test_list_routes(self):
-        with patch("oceanum.cli.prax.client.PRAXClient.list_routes") as mock_list:
+        with patch("oceanum.cli.prax.client.PRAXClient.iter_routes") as mock_list:
             result = self.runner.invoke(main, ["prax", "list", "routes"])
             assert result.exit_code == 0
-            mock_list.assert_called_once_with()
+            mock_list.assert_called_once_with(limit=None, fields=ANY)
 
     def test_list_routes_apps(self):
-        with patch("oceanum.cli.prax.client.PRAXClient.list_routes") as mock_list:
+        with patch("oceanum.cli.prax.client.PRAXClient.iter_routes") as mock_list:
             result = self.runner.invoke(
                 main, ["prax", "list", "routes", "--tier", "frontend"]
             )
             assert result.exit_code == 0
-            mock_list.assert_called_once_with(tier="frontend")
+            mock_list.assert_called_once_with(limit=None, fields=ANY, tier="frontend")
 
     def test_list_routes_services(self):
-        with patch("oceanum.cli.prax.client.PRAXClient.list_routes") as mock_list:
+        with patch("oceanum.cli.prax.client.PRAXClient.iter_routes") as mock_list:
             result = self.runner.invoke(
                 main, ["prax", "list", "routes", "--tier", "backend"]
             )
             print(result.output)
             assert result.exit_code == 0
 
-            mock_list.assert_called_once_with(tier="backend")
+            mock_list.assert_called_once_with(limit=None, fields=ANY, tier="backend")
 
     def test_list_routes_open(self):
-        with patch("oceanum.cli.prax.client.PRAXClient.list_routes") as mock_list:
+        with patch("oceanum.cli.prax.client.PRAXClient.iter_routes") as mock_list:
             result = self.runner.invoke(
                 main, ["prax", "list", "routes", "--open-access"]
             )
             assert result.exit_code == 0
-            mock_list.assert_called_once_with(open=True)
+            mock_list.assert_called_once_with(limit=None, fields=ANY, open=True)
 
     def test_list_no_routes(self):
-        with patch("oceanum.cli.prax.client.PRAXClient.list_routes") as mock_list:
+        with patch("oceanum.cli.prax.client.PRAXClient.iter_routes") as mock_list:
             mock_list.return_value = []
             result = self.runner.invoke(main, ["prax", "list", "routes"])
             assert result.exit_code == 0
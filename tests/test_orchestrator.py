@@ -0,0 +1,218 @@
+import io
+from datetime import datetime, timezone
+from unittest import TestCase
+
+import click
+import pytest
+import requests
+
+from oceanum.cli.prax import models
+from oceanum.cli.prax.deadline import Deadline
+from oceanum.cli.prax.orchestrator import (
+    DeployOrchestrator,
+    ProjectDeployment,
+    image_dependencies,
+    image_repository,
+)
+from oceanum.cli.prax.retry import CircuitOpenError
+from oceanum.cli.prax.watch import WatchScreen
+
+now = datetime.now(tz=timezone.utc)
+
+
+def spec(
+    name: str, image: str = "python:3.12", builds: list[str] = ()
+) -> models.ProjectSpec:
+    return models.ProjectSpec(
+        name=name,
+        resources={
+            "builds": [
+                {
+                    "name": f"build-{i}",
+                    "baseImage": "python:3.12",
+                    "destinations": [destination],
+                }
+                for i, destination in enumerate(builds)
+            ],
+            "services": [
+                {
+                    "name": "service",
+                    "image": image,
+                    "command": "python -m http.server 8000",
+                    "servicePort": 8000,
+                    "healthCheck": {"port": 8000, "path": "/"},
+                }
+            ],
+            "stages": [{"name": "prod", "resources": {"services": ["service"]}}],
+        },
+    )
+
+
+def snapshot(name: str, revision: str, stage: str) -> models.ProjectDetailsSchema:
+    return models.ProjectDetailsSchema(
+        id=name,
+        name=name,
+        org="test-org",
+        owner="test-user",
+        created_at=now,
+        last_revision=models.RevisionDetailsSchema(
+            id=f"{name}-revision",
+            author="test-user",
+            created_at=now,
+            number=1,
+            status=revision,
+            spec=models.ProjectSpec(name=name),
+        ),
+        stages=[
+            models.StageDetailsSchema(
+                id="prod",
+                name="prod",
+                status=stage,
+                updated_at=now,
+                resources=models.StageResourcesSchema(
+                    routes=[], builds=[], pipelines=[], tasks=[], sources=[]
+                ),
+            )
+        ],
+    )
+
+
+class FakeClient:
+    """Projects are not found until deployed, then go through a deployment."""
+
+    def __init__(self, failing: set[str] = frozenset()) -> None:
+        self.service = "https://prax.oceanum.test/api"
+        self.deadline = Deadline()
+        self.failing = failing
+        self.events: list[tuple[str, str]] = []
+        self.snapshots: dict[str, list[models.ProjectDetailsSchema]] = {}
+
+    def get_project(self, project_name: str, **filters):
+        if project_name not in self.snapshots:
+            return models.ErrorResponse(detail="Project not found!")
+        states = self.snapshots[project_name]
+        project = states.pop(0) if len(states) > 1 else states[0]
+        if project.stages[0].status == "healthy":
+            self.events.append(("finished", project_name))
+        return project
+
+    def deploy_project(self, spec: models.ProjectSpec):
+        self.events.append(("deploy", spec.name))
+        if spec.name in self.failing:
+            self.snapshots[spec.name] = [snapshot(spec.name, "failed", "ready")]
+        else:
+            self.snapshots[spec.name] = [
+                snapshot(spec.name, "created", "ready"),
+                snapshot(spec.name, "commited", "updating"),
+                snapshot(spec.name, "commited", "healthy"),
+            ]
+        return self.snapshots[spec.name][0]
+
+
+def orchestrator(client: FakeClient, *specs: models.ProjectSpec, **kwargs):
+    deployments = [
+        ProjectDeployment(f"{s.name}.yaml", s, org="test-org", user="test@test.com")
+        for s in specs
+    ]
+    return DeployOrchestrator(
+        client,
+        deployments,
+        initial_interval=0.001,
+        max_interval=0.001,
+        screen=WatchScreen(io.StringIO()),
+        **kwargs,
+    )
+
+
+def test_image_repository():
+    assert image_repository("ghcr.io/org/app:1.2") == "ghcr.io/org/app"
+    assert image_repository("localhost:5000/app") == "localhost:5000/app"
+    assert image_repository("org/app@sha256:abc") == "org/app"
+
+
+def test_image_dependencies():
+    specs = {
+        "base": spec("base", builds=["ghcr.io/org/base:latest"]),
+        "app": spec("app", image="ghcr.io/org/base:1.0"),
+        "other": spec("other"),
+    }
+    assert image_dependencies(specs) == {"base": set(), "app": {"base"}, "other": set()}
+
+
+class TestDeployOrchestrator(TestCase):
+    def test_order(self):
+        deploy = orchestrator(
+            FakeClient(),
+            spec("app", image="ghcr.io/org/base:1.0", builds=["ghcr.io/org/app"]),
+            spec("base", builds=["ghcr.io/org/base"]),
+            spec("web", image="ghcr.io/org/app:2"),
+            spec("docs"),
+        )
+        assert deploy.order() == [["base", "docs"], ["app"], ["web"]]
+
+    def test_cycle(self):
+        deploy = orchestrator(
+            FakeClient(),
+            spec("one", image="org/two", builds=["org/one"]),
+            spec("two", image="org/one", builds=["org/two"]),
+        )
+        with pytest.raises(click.UsageError, match="Circular image dependencies"):
+            deploy.order()
+
+    def test_run(self):
+        client = FakeClient()
+        deploy = orchestrator(
+            client,
+            spec("app", image="ghcr.io/org/base:1.0"),
+            spec("base", builds=["ghcr.io/org/base"]),
+            spec("docs"),
+        )
+        assert deploy.run()
+        # Both independent projects deploy before either finished
+        assert client.events[:2] == [("deploy", "base"), ("deploy", "docs")]
+        assert client.events.index(("deploy", "app")) > client.events.index(
+            ("finished", "base")
+        )
+        assert {d.status for d in deploy.deployments.values()} == {"deployed"}
+
+    def test_failed_dependency(self):
+        client = FakeClient(failing={"base"})
+        deploy = orchestrator(
+            client,
+            spec("app", image="ghcr.io/org/base:1.0"),
+            spec("base", builds=["ghcr.io/org/base"]),
+        )
+        assert not deploy.run()
+        assert deploy.deployments["base"].status == "failed"
+        assert deploy.deployments["app"].status == "blocked"
+        assert ("deploy", "app") not in client.events
+
+    def test_request_errors_fail_one_deployment(self):
+        client = FakeClient()
+        get_project = client.get_project
+
+        def flaky_get_project(project_name: str, **filters):
+            if project_name == "docs":
+                raise requests.exceptions.ConnectionError("Connection refused")
+            if project_name == "api" and project_name in client.snapshots:
+                raise CircuitOpenError("Circuit open")
+            return get_project(project_name, **filters)
+
+        client.get_project = flaky_get_project
+        deploy = orchestrator(client, spec("app"), spec("api"), spec("docs"))
+        assert not deploy.run()
+        statuses = {d.name: d.status for d in deploy.deployments.values()}
+        assert statuses == {"app": "deployed", "api": "failed", "docs": "failed"}
+        assert "Connection refused" in deploy.deployments["docs"].message
+        assert "Circuit open" in deploy.deployments["api"].message
+
+    def test_no_wait(self):
+        client = FakeClient()
+        deploy = orchestrator(
+            client,
+            spec("app", image="ghcr.io/org/base:1.0"),
+            spec("base", builds=["ghcr.io/org/base"]),
+            wait=False,
+        )
+        assert deploy.run()
+        assert client.events == [("deploy", "base"), ("deploy", "app")]
@@ -0,0 +1,148 @@
+import json
+from unittest import TestCase
+from unittest.mock import patch
+
+import click
+from click.testing import CliRunner
+
+from oceanum.cli.prax import client, models
+from oceanum.cli.prax.utils import echo_rows
+from oceanum.cli.renderer import RenderField
+
+
+def item(n: int) -> dict:
+    return {"id": f"item-{n}", "name": f"item-{n}", "size": n}
+
+
+class FakeEndpoint:
+    """Serve `total` items with limit/offset paging, like the PRAX API."""
+
+    def __init__(self, total: int, honor_limit=True, honor_offset=True):
+        self.items = [item(n) for n in range(total)]
+        self.honor_limit = honor_limit
+        self.honor_offset = honor_offset
+        self.calls: list[dict] = []
+
+    def __call__(self, method, endpoint, params=None, schema=None, **kwargs):
+        self.calls.append(dict(params))
+        offset = params["offset"] if self.honor_offset else 0
+        end = offset + params["limit"] if self.honor_limit else None
+        return [models.SourceSchema.model_construct(**i) for i in self.items][
+            offset:end
+        ], None
+
+
+class TestPaginate(TestCase):
+    def setUp(self) -> None:
+        self.prax = client.PRAXClient(service="http://prax.test/api")
+        return super().setUp()
+
+    def paginate(self, endpoint: FakeEndpoint, **kwargs) -> list:
+        with patch.object(self.prax, "_request", side_effect=endpoint):
+            return [i.id for i in self.prax.iter_sources(**kwargs)]
+
+    def test_pages(self):
+        endpoint = FakeEndpoint(25)
+        ids = self.paginate(endpoint, page_size=10, project="test")
+        assert ids == [f"item-{n}" for n in range(25)]
+        assert [(c["offset"], c["limit"]) for c in endpoint.calls] == [
+            (0, 10),
+            (10, 10),
+            (20, 10),
+        ]
+        assert all(c["project"] == "test" for c in endpoint.calls)
+
+    def test_exact_pages(self):
+        endpoint = FakeEndpoint(20)
+        assert len(self.paginate(endpoint, page_size=10)) == 20
+        assert len(endpoint.calls) == 3
+
+    def test_limit(self):
+        endpoint = FakeEndpoint(100)
+        ids = self.paginate(endpoint, limit=15, page_size=10)
+        assert ids == [f"item-{n}" for n in range(15)]
+        assert [c["limit"] for c in endpoint.calls] == [10, 5]
+
+    def test_api_ignores_offset(self):
+        endpoint = FakeEndpoint(30, honor_offset=False)
+        assert len(self.paginate(endpoint, page_size=10)) == 10
+        assert len(endpoint.calls) == 2
+
+    def test_api_ignores_paging(self):
+        endpoint = FakeEndpoint(30, honor_limit=False, honor_offset=False)
+        assert len(self.paginate(endpoint, page_size=10)) == 30
+        assert len(endpoint.calls) == 1
+        assert len(self.paginate(endpoint, limit=5, page_size=10)) == 5
+
+    def test_error_page(self):
+        pages = [
+            ([models.SourceSchema.model_construct(**item(0))], None),
+            (None, models.ErrorResponse(detail="test-error")),
+        ]
+        with patch.object(self.prax, "_request", side_effect=pages):
+            items = list(self.prax.iter_sources(page_size=1))
+        assert items[0].id == "item-0"
+        assert items[-1] == models.ErrorResponse(detail="test-error")
+
+
+class TestEchoRows(TestCase):
+    fields = [
+        RenderField(label="Name", path="$.name"),
+        RenderField(label="Size", path="$.size"),
+    ]
+
+    def echo(self, items, output_format="table", batch_size=100):
+        result = {}
+
+        @click.command()
+        def command():
+            result["rendered"] = echo_rows(
+                items, self.fields, output_format, batch_size=batch_size
+            )
+
+        output = CliRunner().invoke(command).output
+        return output, result["rendered"]
+
+    def test_table_batches_align(self):
+        output, rendered = self.echo([item(n) for n in range(12)], batch_size=5)
+        assert rendered == 12
+        lines = output.splitlines()
+        assert lines[0].split() == ["Name", "Size"]
+        assert len(lines) == 14
+        # Rows of later batches keep the columns of the first one
+        assert len(lines[7]) == len(lines[2])
+        assert lines[7].endswith(" 5")
+        assert lines[-1].startswith("item-11")
+
+    def test_json(self):
+        output, rendered = self.echo(
+            [item(n) for n in range(7)], output_format="json", batch_size=3
+        )
+        assert rendered == 7
+        assert [i["name"] for i in json.loads(output)] == [
+            f"item-{n}" for n in range(7)
+        ]
+
+    def test_table_later_batches_widen_columns(self):
+        items = [item(n) for n in range(4)]
+        items[3]["name"] = "a-much-longer-item-name"
+        output, _ = self.echo(items + [item(4)], batch_size=2)
+        lines = output.splitlines()
+        assert lines[-2].startswith("a-much-longer-item-name ")
+        # The batch holding the wide value and the later ones are aligned
+        assert len({len(line) for line in lines[-3:]}) == 1
+        assert len(lines[-3]) > len(lines[2])
+
+    def test_empty(self):
+        output, rendered = self.echo([], output_format="json")
+        assert rendered == 0
+        assert json.loads(output) == []
+        output, _ = self.echo([], output_format="yaml")
+        assert output == "[]\n"
+
+    def test_error(self):
+        error = models.ErrorResponse(detail="test-error")
+        output, rendered = self.echo([item(0), item(1), error, item(2)])
+        assert rendered is error
+        assert "item-1" in output
+        assert "item-2" not in output
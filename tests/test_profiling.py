@@ -0,0 +1,109 @@
+import cProfile
+import json
+import pstats
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+import pytest
+import requests
+from click.testing import CliRunner
+
+from oceanum.cli import main
+from oceanum.cli.prax.profiling import folded_stacks, label, phase
+
+
+def leaf():
+    time.sleep(0.01)
+
+
+def shared():
+    leaf()
+
+
+def caller():
+    shared()
+    shared()
+
+
+def other():
+    shared()
+
+
+def names(stack):
+    return tuple(name for _, _, name in stack)
+
+
+def response(status: int, body: list) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = json.dumps(body).encode()
+    return resp
+
+
+class TestFoldedStacks(TestCase):
+    def test_split_between_callers(self):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        caller()
+        other()
+        profiler.disable()
+        stats = pstats.Stats(profiler)
+        stacks = {names(s): t for s, t in folded_stacks(stats).items()}
+        sleep = "<built-in method time.sleep>"
+        under_caller = stacks[("caller", "shared", "leaf", sleep)]
+        under_other = stacks[("other", "shared", "leaf", sleep)]
+        # Two thirds of the sleeps happened under caller
+        assert under_caller == pytest.approx(2 * under_other, rel=0.2)
+        assert sum(stacks.values()) == pytest.approx(stats.total_tt, rel=0.01)
+
+    def test_phase(self):
+        site = "/venv/lib/python3.11/site-packages"
+        assert phase((f"{site}/requests/sessions.py", 500, "request")) == "Requests"
+        assert (
+            phase((f"{site}/oceanum/cli/prax/client.py", 72, "validate_data"))
+            == "Validation"
+        )
+        assert (
+            phase(("<frozen importlib._bootstrap>", 1, "_find_and_load")) == "Imports"
+        )
+        assert phase((f"{site}/tabulate/__init__.py", 1, "tabulate")) == "Rendering"
+        assert phase((f"{site}/oceanum/cli/prax/client.py", 1, "get_project")) is None
+
+    def test_label(self):
+        assert (
+            label(("/a/b/client.py", 10, "get_project")) == "get_project (client.py:10)"
+        )
+        assert label(("~", 0, "<built-in method a;b>")) == "<built-in method a,b>"
+
+
+class TestProfileOption(TestCase):
+    def invoke(self, path):
+        with patch("requests.Session.request", return_value=response(200, [])):
+            return CliRunner().invoke(
+                main, ["prax", "--profile", str(path), "list", "routes"]
+            )
+
+    def test_pstats(self):
+        path = self.tmp / "routes.prof"
+        result = self.invoke(path)
+        assert "Profile written to" in result.output
+        assert "Client method" in result.output
+        assert "iter_routes" in result.output
+        stats = pstats.Stats(str(path))
+        assert any(name == "iter_routes" for _, _, name in stats.stats)
+
+    def test_folded(self):
+        path = self.tmp / "routes.folded"
+        result = self.invoke(path)
+        assert "speedscope" in result.output
+        lines = path.read_text().splitlines()
+        assert lines
+        for line in lines:
+            stack, micros = line.rsplit(" ", 1)
+            assert int(micros) > 0
+        assert any("iter_routes (client.py:" in line for line in lines)
+
+    @pytest.fixture(autouse=True)
+    def _tmp(self, tmp_path):
+        self.tmp = tmp_path
@@ -1,7 +1,10 @@
+import json
+import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
+from types import SimpleNamespace
 from unittest import TestCase
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import requests
 import yaml
@@ -90,7 +93,7 @@ class TestDeleteProject(TestCase):
         response = MagicMock(status_code=404)
         response.json.return_value = {"detail": "not found!"}
         response.raise_for_status.side_effect = requests.exceptions.HTTPError("404")
-        with patch("requests.request", return_value=response) as mock_request:
+        with patch("requests.Session.request", return_value=response) as mock_request:
             result = runner.invoke(
                 oceanum_main, ["prax", "delete", "project", "some-random-project"]
             )
@@ -106,7 +109,9 @@ class TestDeleteProject(TestCase):
             "oceanum.cli.prax.client.PRAXClient.get_project",
             return_value=project_schema,
         ) as mock_get:
-            with patch("requests.request", return_value=response) as mock_request:
+            with patch(
+                "requests.Session.request", return_value=response
+            ) as mock_request:
                 result = runner.invoke(
                     oceanum_main,
                     ["prax", "delete", "project", "test-project"],
@@ -137,22 +142,22 @@ class TestDeleteProject(TestCase):
 class TestListProject(TestCase):
     def test_list_error(self):
         with patch(
-            "oceanum.cli.prax.client.PRAXClient.list_projects",
-            return_value=models.ErrorResponse(detail="test-error"),
+            "oceanum.cli.prax.client.PRAXClient.iter_projects",
+            return_value=iter([models.ErrorResponse(detail="test-error")]),
         ) as mock_list:
             result = runner.invoke(oceanum_main, ["prax", "list", "projects"])
             assert result.exit_code == 1
             assert "Could not list" in result.output
-            mock_list.assert_called_once_with()
+            mock_list.assert_called_once_with(limit=None, fields=ANY)
 
     def test_list_project_not_found(self):
         with patch(
-            "oceanum.cli.prax.client.PRAXClient.list_projects", return_value=[]
+            "oceanum.cli.prax.client.PRAXClient.iter_projects", return_value=[]
         ) as mock_list:
             result = runner.invoke(oceanum_main, ["prax", "list", "projects"])
             assert result.exit_code == 1
             assert "No projects found!" in result.output
-            mock_list.assert_called_once_with()
+            mock_list.assert_called_once_with(limit=None, fields=ANY)
 
     def test_list_project(self):
         projects = [
@@ -169,11 +174,11 @@ class TestListProject(TestCase):
         ]
 
         with patch(
-            "oceanum.cli.prax.client.PRAXClient.list_projects", return_value=projects
+            "oceanum.cli.prax.client.PRAXClient.iter_projects", return_value=projects
         ) as mock_list:
             result = runner.invoke(oceanum_main, ["prax", "list", "projects"])
             assert result.exit_code == 0
-            mock_list.assert_called_once_with()
+            mock_list.assert_called_once_with(limit=None, fields=ANY)
 
 
 class TestValidateProject(TestCase):
@@ -218,6 +223,20 @@ class TestValidateProject(TestCase):
             assert result.exit_code == 0
             mock_validate.assert_called_once_with(str(self.specfile))
 
+    def test_validate_login_only_online(self):
+        with patch("oceanum.cli.prax.client.PRAXClient.validate"):
+            with patch(
+                "oceanum.cli.prax.project.login_required",
+                return_value=lambda: None,
+            ) as mock_login:
+                args = ["prax", "validate", str(self.specfile)]
+                result = runner.invoke(oceanum_main, args + ["--offline"])
+                assert result.exit_code == 0, result.output
+                mock_login.assert_not_called()
+                result = runner.invoke(oceanum_main, args)
+                assert result.exit_code == 0, result.output
+                mock_login.assert_called_once()
+
 
 class TestUpdateProject(TestCase):
     def test_update_active(self):
@@ -282,6 +301,15 @@ class TestDeployProject(TestCase):
     def setUp(self) -> None:
         self.specfile = str(Path(__file__).parent / "data/dpm-project.yaml")
         self.bad_specfile = str(Path(__file__).parent / "data/bad-project.yaml")
+        # Deployed secret digests are kept per test
+        cache_tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_tmp.cleanup)
+        cache_dir = patch(
+            "oceanum.cli.prax.specdiff.default_cache_dir",
+            return_value=Path(cache_tmp.name),
+        )
+        cache_dir.start()
+        self.addCleanup(cache_dir.stop)
         return super().setUp()
 
     def tearDown(self) -> None:
@@ -316,7 +344,8 @@ class TestDeployProject(TestCase):
                 return_value=project_schema,
             ) as mock_deploy:
                 result = runner.invoke(
-                    oceanum_main, ["prax", "deploy", str(self.specfile), "--wait=0"]
+                    oceanum_main,
+                    ["prax", "deploy", str(self.specfile), "--wait=0", "--full"],
                 )
                 assert "created successfully" in result.output
                 assert result.exit_code == 0
@@ -341,13 +370,41 @@ class TestDeployProject(TestCase):
                         "-s",
                         secret_overlay,
                         "--wait=0",
+                        "--full",
                     ],
                 )
                 assert result.exit_code == 0
-                assert (
-                    mock_deploy.call_args[0][0].resources.secrets[0].data.root["token"]
-                    == "123456"
-                )
+                secret = mock_deploy.call_args[0][0].resources.secrets[0]
+                assert secret.data.root["token"].get_secret_value() == "123456"
+
+    def test_deploy_specfile_with_secrets_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            secrets_file = Path(tmp) / "test-secret.env"
+            secrets_file.write_text("token=abc:123=\n")
+            (Path(tmp) / "other.yaml").write_text("other-secret:\n  key: value\n")
+            with patch(
+                "oceanum.cli.prax.client.PRAXClient.get_project",
+                return_value=project_schema,
+            ):
+                with patch(
+                    "oceanum.cli.prax.client.PRAXClient.deploy_project",
+                    return_value=project_schema,
+                ) as mock_deploy:
+                    result = runner.invoke(
+                        oceanum_main,
+                        [
+                            "prax",
+                            "deploy",
+                            str(self.specfile),
+                            "--secrets-file",
+                            tmp,
+                            "--wait=0",
+                            "--full",
+                        ],
+                    )
+                    assert result.exit_code == 0, result.output
+                    secret = mock_deploy.call_args[0][0].resources.secrets[0]
+                    assert secret.data.root["token"].get_secret_value() == "abc:123="
 
     def test_deploy_with_org_member(self):
         with patch(
@@ -368,12 +425,195 @@ class TestDeployProject(TestCase):
                         "test",
                         "--wait=0",
                         "--user=test@test.com",
+                        "--full",
                     ],
                 )
                 assert result.exit_code == 0
                 assert mock_deploy.call_args[0][0].user_ref.root == "test"
                 assert mock_deploy.call_args[0][0].member_ref == "test@test.com"
 
+    def test_deploy_patch(self):
+        with patch(
+            "oceanum.cli.prax.client.PRAXClient.get_project",
+            return_value=project_schema,
+        ):
+            with patch(
+                "oceanum.cli.prax.client.PRAXClient.patch_project",
+                return_value=project_schema,
+            ) as mock_patch:
+                with patch(
+                    "oceanum.cli.prax.client.PRAXClient.deploy_project"
+                ) as mock_deploy:
+                    result = runner.invoke(
+                        oceanum_main,
+                        ["prax", "deploy", str(self.specfile), "--wait=0"],
+                    )
+                    assert result.exit_code == 0
+                    assert "Patching 1 change" in result.output
+                    mock_deploy.assert_not_called()
+                    name, ops = mock_patch.call_args[0]
+                    assert name == "test-project"
+                    # Secrets come back masked, their values are always sent
+                    assert ops[0].path == "/resources/secrets/0/data/token"
+                    assert ops[0].value == "..."
+                    result = runner.invoke(
+                        oceanum_main,
+                        [
+                            "prax",
+                            "deploy",
+                            str(self.specfile),
+                            "--wait=0",
+                            "-s",
+                            "test-secret:token=new",
+                        ],
+                    )
+                    assert result.exit_code == 0, result.output
+                    _, ops = mock_patch.call_args[0]
+                    assert ops[0].value == "new"
+
+    def test_deploy_dry_run(self):
+        with patch(
+            "oceanum.cli.prax.client.PRAXClient.get_project",
+            return_value=project_schema,
+        ):
+            with patch(
+                "oceanum.cli.prax.client.PRAXClient.patch_project"
+            ) as mock_patch:
+                result = runner.invoke(
+                    oceanum_main,
+                    ["prax", "deploy", str(self.specfile), "--dry-run"],
+                )
+                assert result.exit_code == 0
+                assert "1 change to the project spec" in result.output
+                assert '"value": "**********"' in result.output
+                mock_patch.assert_not_called()
+
+    def test_deploy_no_changes(self):
+        with patch(
+            "oceanum.cli.prax.client.PRAXClient.get_project",
+            return_value=project_schema,
+        ):
+            with patch("oceanum.cli.prax.project.spec_patch", return_value=[]):
+                with patch(
+                    "oceanum.cli.prax.client.PRAXClient.deploy_project"
+                ) as mock_deploy:
+                    result = runner.invoke(
+                        oceanum_main, ["prax", "deploy", str(self.specfile)]
+                    )
+                    assert result.exit_code == 0
+                    assert "nothing to deploy" in result.output
+                    mock_deploy.assert_not_called()
+
+    def test_deploy_unchanged_after_failure(self):
+        failed = project_schema.model_copy(
+            update={
+                "last_revision": project_schema.last_revision.model_copy(
+                    update={"status": "failed"}
+                )
+            }
+        )
+        with patch(
+            "oceanum.cli.prax.client.PRAXClient.get_project", return_value=failed
+        ):
+            with patch("oceanum.cli.prax.project.spec_patch", return_value=[]):
+                with patch(
+                    "oceanum.cli.prax.client.PRAXClient.deploy_project",
+                    return_value=project_schema,
+                ) as mock_deploy:
+                    result = runner.invoke(
+                        oceanum_main, ["prax", "deploy", str(self.specfile), "--wait=0"]
+                    )
+                    assert result.exit_code == 0, result.output
+                    mock_deploy.assert_called_once()
+
+    def test_deploy_secrets_unchanged(self):
+        with patch(
+            "oceanum.cli.prax.client.PRAXClient.get_project",
+            return_value=project_schema,
+        ):
+            with patch(
+                "oceanum.cli.prax.client.PRAXClient.patch_project",
+                return_value=project_schema,
+            ) as mock_patch:
+                args = ["prax", "deploy", str(self.specfile), "--wait=0"]
+                result = runner.invoke(oceanum_main, args)
+                assert "Patching 1 change" in result.output
+                # The secret values deployed before are not sent again
+                result = runner.invoke(oceanum_main, args)
+                assert result.exit_code == 0, result.output
+                assert "nothing to deploy" in result.output
+                assert mock_patch.call_count == 1
+
+    def test_deploy_many_dry_run(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ["project-a", "project-b"]:
+                spec = yaml.safe_load(Path(self.specfile).read_text())
+                spec["name"] = name
+                (Path(tmp) / f"{name}.yaml").write_text(yaml.dump(spec))
+            with patch(
+                "oceanum.cli.prax.client.PRAXClient.get_project",
+                return_value=models.ErrorResponse(detail="Project not found"),
+            ):
+                with patch(
+                    "oceanum.cli.prax.client.PRAXClient.deploy_project"
+                ) as mock_deploy:
+                    result = runner.invoke(
+                        oceanum_main,
+                        ["prax", "deploy", f"{tmp}/*.yaml", "--dry-run"],
+                    )
+        assert result.exit_code == 0
+        assert "2 projects in 1 step:" in result.output
+        assert result.output.count("new project") == 2
+        mock_deploy.assert_not_called()
+
+    def test_deploy_many_with_secrets(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ["project-a", "project-b"]:
+                spec = yaml.safe_load(Path(self.specfile).read_text())
+                spec["name"] = name
+                if name == "project-b":
+                    spec["resources"]["secrets"][0]["name"] = "other-secret"
+                (Path(tmp) / f"{name}.yaml").write_text(yaml.dump(spec))
+            with patch(
+                "oceanum.cli.prax.client.PRAXClient.get_project",
+                return_value=models.ErrorResponse(detail="Project not found"),
+            ):
+                result = runner.invoke(
+                    oceanum_main,
+                    [
+                        "prax",
+                        "deploy",
+                        f"{tmp}/*.yaml",
+                        "--dry-run",
+                        "-s",
+                        "test-secret:token=new",
+                    ],
+                )
+                assert result.exit_code == 0, result.output
+                result = runner.invoke(
+                    oceanum_main,
+                    [
+                        "prax",
+                        "deploy",
+                        f"{tmp}/*.yaml",
+                        "--dry-run",
+                        "-s",
+                        "missing-secret:token=new",
+                    ],
+                )
+                assert result.exit_code == 2
+                assert "not found in any project spec: missing-secret" in (
+                    result.output
+                )
+
+    def test_deploy_many_with_name(self):
+        result = runner.invoke(
+            oceanum_main,
+            ["prax", "deploy", self.specfile, self.bad_specfile, "--name", "test"],
+        )
+        assert result.exit_code == 2
+        assert "--name can only be used with a single specfile" in result.output
+
 
 class TestDescribeProject(TestCase):
     def setUp(self) -> None:
@@ -459,7 +699,7 @@ class TestDescribeProject(TestCase):
         response = MagicMock(status_code=404)
         response.json.return_value = {"detail": "not found!"}
         response.raise_for_status.side_effect = requests.exceptions.HTTPError("404")
-        with patch("requests.request", return_value=response) as mock_request:
+        with patch("requests.Session.request", return_value=response) as mock_request:
             result = runner.invoke(
                 oceanum_main, ["prax", "describe", "project", "some-random-project"]
             )
@@ -503,6 +743,71 @@ class TestDescribeProject(TestCase):
             assert "test-project" in result.output
 
 
+class TestDescribeProjects(TestCase):
+    def get_project(self, project_name: str, **filters):
+        if project_name == "missing-project":
+            return models.ErrorResponse(detail="Project not found")
+        return project_schema.model_copy(update={"name": project_name})
+
+    def test_describe_projects(self):
+        with patch(
+            "oceanum.cli.prax.client.PRAXClient.get_project",
+            side_effect=self.get_project,
+        ) as mock_get:
+            result = runner.invoke(
+                oceanum_main,
+                ["prax", "describe", "projects", "project-b", "project-a"],
+            )
+            assert result.exit_code == 0
+            assert result.output.index("project-b") < result.output.index("project-a")
+            assert "test-stage" in result.output
+            assert mock_get.call_count == 2
+
+    def test_describe_projects_error(self):
+        with patch(
+            "oceanum.cli.prax.client.PRAXClient.get_project",
+            side_effect=self.get_project,
+        ):
+            result = runner.invoke(
+                oceanum_main,
+                ["prax", "describe", "projects", "missing-project", "project-a"],
+            )
+            assert result.exit_code == 1
+            assert "Project not found" in result.output
+            assert "project-a" in result.output
+            assert "1 of 2 projects failed!" in result.output
+
+    def test_describe_projects_ndjson(self):
+        listed = [SimpleNamespace(name=n) for n in ["project-a", "project-b"]]
+        with (
+            patch(
+                "oceanum.cli.prax.client.PRAXClient.iter_projects",
+                return_value=iter(listed),
+            ) as mock_list,
+            patch(
+                "oceanum.cli.prax.client.PRAXClient.get_project",
+                side_effect=self.get_project,
+            ),
+        ):
+            result = runner.invoke(
+                oceanum_main,
+                ["prax", "describe", "projects", "--org", "test-org", "-o", "ndjson"],
+            )
+            assert result.exit_code == 0
+            mock_list.assert_called_once_with(fields=["name"], org="test-org")
+            lines = [json.loads(line) for line in result.output.splitlines()]
+            assert [p["name"] for p in lines] == ["project-a", "project-b"]
+            assert lines[0]["stages"][0]["name"] == "test-stage"
+
+    def test_describe_projects_not_found(self):
+        with patch(
+            "oceanum.cli.prax.client.PRAXClient.iter_projects", return_value=iter([])
+        ):
+            result = runner.invoke(oceanum_main, ["prax", "describe", "projects"])
+            assert result.exit_code == 1
+            assert "No projects found!" in result.output
+
+
 class TestAllowProject(TestCase):
     def test_allow_help(self):
         result = runner.invoke(oceanum_main, ["prax", "allow", "project", "--help"])
@@ -512,7 +817,7 @@ class TestAllowProject(TestCase):
         response = MagicMock(status_code=404)
         response.json.return_value = {"detail": "not found!"}
         response.raise_for_status.side_effect = requests.exceptions.HTTPError("404")
-        with patch("requests.request", return_value=response) as mock_request:
+        with patch("requests.Session.request", return_value=response) as mock_request:
             result = runner.invoke(
                 oceanum_main,
                 [
@@ -578,14 +883,20 @@ class TestListSources(TestCase):
         ]
 
         with patch(
-            "oceanum.cli.prax.client.PRAXClient.list_sources",
+            "oceanum.cli.prax.client.PRAXClient.iter_sources",
             return_value=sources_response,
         ) as mock_list:
             result = runner.invoke(oceanum_main, ["prax", "list", "sources"])
             assert result.exit_code == 0
             assert "test-source" in result.output
             mock_list.assert_called_once_with(
-                search=None, project=None, org=None, user=None, status=None
+                limit=None,
+                fields=ANY,
+                search=None,
+                project=None,
+                org=None,
+                user=None,
+                status=None,
             )
 
     def test_list_sources_with_filters(self):
@@ -604,7 +915,7 @@ class TestListSources(TestCase):
         ]
 
         with patch(
-            "oceanum.cli.prax.client.PRAXClient.list_sources",
+            "oceanum.cli.prax.client.PRAXClient.iter_sources",
             return_value=sources_response,
         ) as mock_list:
             result = runner.invoke(
@@ -628,6 +939,8 @@ class TestListSources(TestCase):
             assert result.exit_code == 0
             assert "test-source" in result.output
             mock_list.assert_called_once_with(
+                limit=None,
+                fields=ANY,
                 search="test",
                 project="test-project",
                 org="test-org",
@@ -637,7 +950,7 @@ class TestListSources(TestCase):
 
     def test_list_sources_empty(self):
         with patch(
-            "oceanum.cli.prax.client.PRAXClient.list_sources", return_value=[]
+            "oceanum.cli.prax.client.PRAXClient.iter_sources", return_value=[]
         ) as mock_list:
             result = runner.invoke(oceanum_main, ["prax", "list", "sources"])
             assert result.exit_code == 1
@@ -648,8 +961,8 @@ class TestListSources(TestCase):
             status_code=500, detail="Internal server error"
         )
         with patch(
-            "oceanum.cli.prax.client.PRAXClient.list_sources",
-            return_value=error_response,
+            "oceanum.cli.prax.client.PRAXClient.iter_sources",
+            return_value=iter([error_response]),
         ) as mock_list:
             result = runner.invoke(oceanum_main, ["prax", "list", "sources"])
             assert result.exit_code == 1
@@ -660,7 +973,7 @@ class TestListSources(TestCase):
         response.json.return_value = {"detail": "Not authenticated"}
         response.raise_for_status.side_effect = requests.exceptions.HTTPError("401")
 
-        with patch("requests.request", return_value=response):
+        with patch("requests.Session.request", return_value=response):
             result = runner.invoke(oceanum_main, ["prax", "list", "sources"])
             assert result.exit_code == 1
             assert "Not authenticated" in result.output
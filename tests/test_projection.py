@@ -0,0 +1,104 @@
+from unittest import TestCase
+
+import pytest
+from pydantic import ValidationError
+
+from oceanum.cli.prax import models
+from oceanum.cli.prax.client import validate_data
+from oceanum.cli.prax.projection import ModelView, path_keys, project
+from oceanum.cli.prax.utils import view_fields
+from oceanum.cli.prax.workflows import LIST_FIELDS
+
+TASK_FIELDS = ["name", "project", "stage", "org", "last_run"]
+
+
+def task_data(**kwargs) -> dict:
+    return {
+        "id": "task-id",
+        "name": "test-task",
+        "org": "test-org",
+        "project": "test-project",
+        "stage": "dev",
+        "created_at": "2024-01-01T00:00:00.123456+00:00",
+        "updated_at": "2024-01-01T00:00:00+00:00",
+        "last_run": {
+            "id": "run-id",
+            "name": "test-task-run",
+            "parent": "test-task",
+            "org": "test-org",
+            "project": "test-project",
+            "stage": "dev",
+            "status": "Succeeded",
+            "created_at": "2024-01-01T00:00:00+00:00",
+            "updated_at": "2024-01-01T00:00:00+00:00",
+            "started_at": "2024-01-01T00:00:00.500000+00:00",
+        },
+        "spec": {"not": "a task spec"},
+    } | kwargs
+
+
+class TestPathKeys(TestCase):
+    def test_keys(self):
+        assert path_keys("$.name") == ["name"]
+        assert path_keys("$.last_run.status") == ["last_run"]
+        assert path_keys("$.stages.*") == ["stages"]
+        assert path_keys("$project") == ["project"]
+        assert path_keys('$.["suspended", "schedule"]') == ["suspended", "schedule"]
+
+    def test_any_key(self):
+        assert path_keys("$") is None
+        assert path_keys("$..name") is None
+        assert path_keys("$.[*]") is None
+
+    def test_view_fields(self):
+        assert view_fields(LIST_FIELDS, "table") == TASK_FIELDS
+        assert view_fields(LIST_FIELDS, "json") is None
+
+
+class TestProjection(TestCase):
+    def test_view(self):
+        projection = project(models.TaskSchema, TASK_FIELDS)
+        assert projection is project(models.TaskSchema, TASK_FIELDS)
+        view = projection(**task_data())
+        assert isinstance(view, ModelView)
+        assert view.id == "task-id"
+        assert view.last_run.status == "Succeeded"
+        assert not hasattr(view, "spec")
+        with pytest.raises(AttributeError):
+            view.__dict__
+
+    def test_dump_matches_model(self):
+        data = task_data(spec=None)
+        view = project(models.TaskSchema, TASK_FIELDS)(**data)
+        full = models.TaskSchema(**data).model_dump(mode="json")
+        assert view.model_dump(mode="json") == {
+            k: full[k] for k in ["id", *TASK_FIELDS]
+        }
+
+    def test_defaults(self):
+        data = task_data()
+        del data["last_run"]
+        view = project(models.TaskSchema, TASK_FIELDS)(**data)
+        assert view.last_run is None
+
+    def test_missing_required(self):
+        data = task_data()
+        del data["stage"]
+        with pytest.raises(ValidationError, match="stage"):
+            project(models.TaskSchema, TASK_FIELDS)(**data)
+
+    def test_constraints(self):
+        with pytest.raises(ValidationError, match="name"):
+            project(models.TaskSchema, TASK_FIELDS)(**task_data(name="x" * 256))
+
+    def test_validate_data(self):
+        views = validate_data(
+            [task_data(), task_data(id="other")], project(models.TaskSchema, ["name"])
+        )
+        assert [v.id for v in views] == ["task-id", "other"]
+        assert views[0] != views[1]
+        with pytest.raises(ValidationError):
+            validate_data([task_data()], models.TaskSchema)
+
+    def test_no_projection(self):
+        assert project(models.TaskSchema, None) is models.TaskSchema
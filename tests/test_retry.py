@@ -0,0 +1,195 @@
+import io
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest import TestCase
+from unittest.mock import patch
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from oceanum.cli.prax import client, retry
+from oceanum.cli.prax.deadline import Deadline
+from oceanum.cli.prax.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryAdapter,
+    RetryPolicy,
+    parse_retry_after,
+)
+
+
+def response(status: int, **headers) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers.update(headers)
+    resp.raw = io.BytesIO(b"")
+    return resp
+
+
+def refused() -> requests.exceptions.ConnectionError:
+    reason = NewConnectionError(None, "Connection refused")
+    return requests.exceptions.ConnectionError(MaxRetryError(None, "/", reason))
+
+
+class TestRetryPolicy(TestCase):
+    def test_delay(self):
+        policy = RetryPolicy(retries=3, backoff=1.0, max_backoff=4.0)
+        for attempt, ceiling in [(0, 1.0), (1, 2.0), (2, 4.0), (5, 4.0)]:
+            delay = policy.delay(attempt)
+            assert ceiling / 2 <= delay <= ceiling
+
+    def test_retry_after(self):
+        policy = RetryPolicy(retries=3, backoff=1.0)
+        assert policy.delay(0, response(429, **{"Retry-After": "7"})) == 7.0
+        assert parse_retry_after("soon") is None
+        retry_at = datetime.now(tz=timezone.utc) + timedelta(seconds=60)
+        assert 55 < parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 60
+
+    def test_retry_status(self):
+        policy = RetryPolicy()
+        assert policy.retry_status("GET", 502)
+        assert policy.retry_status("POST", 503)
+        assert policy.retry_status("POST", 429)
+        assert not policy.retry_status("POST", 502)
+        assert not policy.retry_status("GET", 500)
+
+    def test_retry_error(self):
+        policy = RetryPolicy()
+        timeout = requests.exceptions.ReadTimeout()
+        assert policy.retry_error("GET", timeout)
+        assert not policy.retry_error("POST", timeout)
+        assert policy.retry_error("POST", refused())
+
+    def test_env(self):
+        with patch.dict("os.environ", {"PRAX_RETRIES": "1"}):
+            assert RetryPolicy().retries == 1
+
+
+class TestCircuitBreaker(TestCase):
+    def test_open_and_probe(self):
+        breaker = CircuitBreaker(threshold=2, reset=0)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.open
+        # A single probe once the circuit is half open
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        assert not breaker.open
+        assert breaker.allow()
+
+    def test_failed_probe(self):
+        breaker = CircuitBreaker(threshold=1, reset=60)
+        breaker.record_failure()
+        assert not breaker.allow()
+
+    def test_probe_raises(self):
+        breaker = CircuitBreaker(threshold=1, reset=0)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.release()
+        assert breaker.allow()
+
+
+class TestRetryAdapter(TestCase):
+    def setUp(self) -> None:
+        retry._breakers.clear()
+        self.session = requests.Session()
+        self.session.mount(
+            "http://", RetryAdapter(RetryPolicy(retries=2, backoff=0.01))
+        )
+        return super().setUp()
+
+    def send(self, method: str, responses: list, **kwargs):
+        with patch.object(HTTPAdapter, "send", side_effect=responses) as mock_send:
+            with patch("time.sleep") as mock_sleep:
+                try:
+                    return self.session.request(
+                        method, "http://prax.test/api/projects", **kwargs
+                    )
+                finally:
+                    self.sends = mock_send.call_args_list
+                    self.sleeps = mock_sleep.call_args_list
+
+    def test_retry_gateway_error(self):
+        resp = self.send("GET", [response(502), response(200)])
+        assert resp.status_code == 200
+        assert len(self.sends) == 2
+
+    def test_give_up(self):
+        resp = self.send("GET", [response(503) for _ in range(3)])
+        assert resp.status_code == 503
+        assert len(self.sends) == 3
+
+    def test_write_not_retried_on_gateway_error(self):
+        resp = self.send("POST", [response(502), response(200)], json={})
+        assert resp.status_code == 502
+        assert len(self.sends) == 1
+
+    def test_write_idempotency_key(self):
+        resp = self.send("POST", [response(503), refused(), response(201)], json={})
+        assert resp.status_code == 201
+        keys = {c.args[0].headers["Idempotency-Key"] for c in self.sends}
+        assert len(self.sends) == 3
+        assert len(keys) == 1
+
+    def test_keyed_put_not_retried(self):
+        headers = {"Idempotency-Key": "key"}
+        resp = self.send("PUT", [response(502), response(200)], headers=headers)
+        assert resp.status_code == 502
+        assert len(self.sends) == 1
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            self.send("PUT", [requests.exceptions.ReadTimeout()], headers=headers)
+        assert len(self.sends) == 1
+
+    def test_probe_error_releases_circuit(self):
+        breaker = retry.circuit_breaker("prax.test")
+        for _ in range(retry.CIRCUIT_THRESHOLD):
+            breaker.record_failure()
+        breaker.reset = 0
+        with pytest.raises(ValueError):
+            self.send("GET", [ValueError("Invalid URL")])
+        resp = self.send("GET", [response(200)])
+        assert resp.status_code == 200
+
+    def test_read_timeout_write(self):
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            self.send("POST", [requests.exceptions.ReadTimeout()], json={})
+        assert len(self.sends) == 1
+
+    def test_retry_after(self):
+        self.send("GET", [response(429, **{"Retry-After": "3"}), response(200)])
+        assert self.sleeps[0].args[0] == 3.0
+
+    def test_deadline(self):
+        timeout = Deadline(5).timeout((1, 1))
+        resp = self.send(
+            "GET", [response(503, **{"Retry-After": "10"})], timeout=timeout
+        )
+        assert resp.status_code == 503
+        assert len(self.sleeps) == 0
+
+    def test_circuit_open(self):
+        retry.circuit_breaker("prax.test").record_failure()
+        for _ in range(retry.CIRCUIT_THRESHOLD):
+            retry.circuit_breaker("prax.test").record_failure()
+        with pytest.raises(CircuitOpenError):
+            self.send("GET", [response(200)])
+        assert len(self.sends) == 0
+        assert len(self.sleeps) == 2
+
+
+class TestSessionRetries(TestCase):
+    def tearDown(self) -> None:
+        client.close_sessions()
+        return super().tearDown()
+
+    def test_session_adapter(self):
+        session = client.get_session(retries=2)
+        adapter = session.get_adapter("https://prax.test/api")
+        assert isinstance(adapter, RetryAdapter)
+        assert adapter.policy.retries == 2
+        assert client.get_session(retries=0) is not session
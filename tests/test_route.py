@@ -30,7 +30,7 @@ class TestAllowProject(TestCase):
         response.json.return_value = [
             route_schema.model_copy(update={"notebook": True}).model_dump()
         ]
-        with patch("requests.request", return_value=response) as mock_request:
+        with patch("requests.Session.request", return_value=response) as mock_request:
             result = runner.invoke(main, ["prax", "list", "notebooks"])
             print(result.output)
             assert result.exit_code == 0
@@ -44,7 +44,7 @@ class TestAllowProject(TestCase):
         response = MagicMock(status_code=404)
         response.json.return_value = {"detail": "not found!"}
         response.raise_for_status.side_effect = requests.exceptions.HTTPError("404")
-        with patch("requests.request", return_value=response) as mock_request:
+        with patch("requests.Session.request", return_value=response) as mock_request:
             result = runner.invoke(
                 main,
                 ["prax", "allow", "route", "some-random-route", "--user", "some-user"],
@@ -0,0 +1,215 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+import click
+from click.testing import CliRunner
+
+from oceanum.cli import main as oceanum_main
+from oceanum.cli.prax import client, models
+from oceanum.cli.prax.secretsync import (
+    SecretDigests,
+    SecretFileError,
+    load_secrets,
+    parse_dotenv,
+)
+from oceanum.cli.prax.utils import merge_secrets, parse_secrets
+
+runner = CliRunner()
+
+DOTENV = """
+# Database credentials
+export DB_USER=admin
+DB_PASSWORD="p@ss:word=1\\n"
+DB_URL='postgres://db:5432/app?ssl=true'
+DB_HOST=db.local # primary
+"""
+
+users = [
+    models.UserSchema(
+        username="test-user",
+        email="test-user@test.com",
+        token="test-token",
+        admin_orgs=["test-org"],
+        current_org={
+            "name": "test-org",
+            "tier": {"name": "test-tier"},
+            "usage": {"name": "usage"},
+            "resources": [],
+        },
+    )
+]
+
+
+class TestParseSecrets(TestCase):
+    def test_parse_secrets(self):
+        [secret] = parse_secrets(["db:url=postgres://db:5432/app?a=b,c,user=admin"])
+        assert secret == {
+            "name": "db",
+            "data": {"url": "postgres://db:5432/app?a=b,c", "user": "admin"},
+        }
+
+    def test_parse_secrets_invalid(self):
+        with self.assertRaises(click.BadParameter) as e:
+            parse_secrets(["db:hunter2"])
+        assert "hunter2" not in str(e.exception)
+
+    def test_merge_secrets(self):
+        spec = models.ProjectSpec(
+            name="test",
+            resources={"secrets": [{"name": "db-secret", "data": {"user": "x"}}]},
+        )
+        spec = merge_secrets(
+            spec,
+            [
+                {"name": "db-secret", "data": {"password": "y"}},
+                {"name": "other", "data": {}},
+            ],
+            strict=False,
+        )
+        assert set(spec.resources.secrets[0].data.root) == {"user", "password"}
+        with self.assertRaises(Exception):
+            merge_secrets(spec, ["other:key=value"])
+
+
+class TestLoadSecrets(TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def write(self, name: str, text: str) -> Path:
+        path = self.directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+        return path
+
+    def test_parse_dotenv(self):
+        assert parse_dotenv(DOTENV) == {
+            "DB_USER": "admin",
+            "DB_PASSWORD": "p@ss:word=1\n",
+            "DB_URL": "postgres://db:5432/app?ssl=true",
+            "DB_HOST": "db.local",
+        }
+
+    def test_parse_dotenv_invalid(self):
+        with self.assertRaises(SecretFileError) as e:
+            parse_dotenv("KEY=value\nhunter2", "app.env")
+        assert str(e.exception) == "app.env:2: expected KEY=value"
+
+    def test_load_secrets(self):
+        self.write("db.env", DOTENV)
+        self.write("more/api.yaml", "api:\n  token: abc\n  port: 8080\n")
+        self.write("more/list.json", '[{"name": "db", "data": {"DB_USER": "root"}}]')
+        self.write("README.md", "not a secret")
+        secrets = load_secrets([self.directory])
+        assert secrets["api"] == {"token": "abc", "port": "8080"}
+        assert secrets["db"]["DB_USER"] == "root"
+        assert secrets["db"]["DB_HOST"] == "db.local"
+
+    def test_load_secrets_invalid(self):
+        path = self.write("api.yaml", "api:\n  token: [hunter2\n")
+        with self.assertRaises(SecretFileError) as e:
+            load_secrets([path])
+        assert "hunter2" not in str(e.exception)
+        path = self.write("api.yaml", "api:\n  token: null\n")
+        with self.assertRaises(SecretFileError):
+            load_secrets([path])
+
+
+class TestSecretDigests(TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_changes(self):
+        digests = SecretDigests("test-org", self.directory)
+        data = {"user": "admin", "password": "hunter2"}
+        assert digests.changes("db", data) is None
+        assert digests.changes("empty", {}) is None
+        digests.record("db", data)
+        digests.save()
+        digests = SecretDigests("test-org", self.directory)
+        assert digests.changes("db", data) == []
+        assert digests.changes("db", {"user": "admin", "token": "x"}) == [
+            "password",
+            "token",
+        ]
+        stored = (self.directory / "test-org.json").read_text()
+        assert "hunter2" not in stored
+        assert (self.directory / "digest.key").stat().st_mode & 0o777 == 0o600
+
+
+class TestSyncUserSecrets(TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name)
+        (self.directory / "db.env").write_text("USER=admin\nPASSWORD=hunter2\n")
+        (self.directory / "api.env").write_text("TOKEN=abc\n")
+        self.cache_tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_tmp.cleanup)
+        cache_dir = patch(
+            "oceanum.cli.prax.secretsync.default_cache_dir",
+            return_value=Path(self.cache_tmp.name),
+        )
+        cache_dir.start()
+        self.addCleanup(cache_dir.stop)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def sync(self, *args: str):
+        secret = models.SecretSpec(name="secret", data={"key": "value"})
+        with patch.object(client.PRAXClient, "get_users", return_value=users):
+            with patch.object(
+                client.PRAXClient, "create_or_update_user_secret", return_value=secret
+            ) as mock_upload:
+                result = runner.invoke(
+                    oceanum_main,
+                    ["prax", "update", "user-secrets", str(self.directory), *args],
+                )
+        assert result.exit_code == 0, result.output
+        assert "hunter2" not in result.output
+        return result, sorted(call.args[0] for call in mock_upload.call_args_list)
+
+    def test_sync(self):
+        result, uploaded = self.sync("--dry-run")
+        assert uploaded == []
+        assert "2 of 2 secrets would be uploaded" in result.output
+        result, uploaded = self.sync()
+        assert uploaded == ["api", "db"]
+        _, uploaded = self.sync()
+        assert uploaded == []
+        (self.directory / "db.env").write_text("USER=admin\nPASSWORD=changed\n")
+        result, uploaded = self.sync()
+        assert uploaded == ["db"]
+        assert "PASSWORD" in result.output
+        _, uploaded = self.sync("--force")
+        assert uploaded == ["api", "db"]
+
+    def test_sync_empty_secret(self):
+        (self.directory / "empty.env").write_text("# No keys yet\n")
+        _, uploaded = self.sync()
+        assert uploaded == ["api", "db", "empty"]
+        _, uploaded = self.sync()
+        assert uploaded == []
+
+    def test_sync_failed(self):
+        with patch.object(client.PRAXClient, "get_users", return_value=users):
+            with patch.object(
+                client.PRAXClient,
+                "create_or_update_user_secret",
+                return_value=models.ErrorResponse(detail="Forbidden"),
+            ):
+                result = runner.invoke(
+                    oceanum_main,
+                    ["prax", "update", "user-secrets", str(self.directory)],
+                )
+        assert result.exit_code == 1
+        assert "2 of 2 User-Secrets failed to upload" in result.output
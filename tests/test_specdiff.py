@@ -0,0 +1,120 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import yaml
+
+from oceanum.cli.prax import models
+from oceanum.cli.prax.secretsync import SecretDigests
+from oceanum.cli.prax.specdiff import (
+    json_patch,
+    masked_patch,
+    record_secrets,
+    resolve,
+    spec_patch,
+)
+
+specfile = Path(__file__).parent / "data/dpm-project.yaml"
+
+
+def apply(document, ops: list[dict]):
+    """Minimal RFC 6902 add/replace/remove, enough to check the patches."""
+    for op in ops:
+        *parents, last = op["path"].split("/")
+        parent = resolve(document, "/".join(parents))
+        key = last.replace("~1", "/").replace("~0", "~")
+        if isinstance(parent, list):
+            key = int(key)
+            if op["op"] == "add":
+                parent.insert(key, op["value"])
+                continue
+        if op["op"] == "remove":
+            del parent[key]
+        else:
+            parent[key] = op["value"]
+    return document
+
+
+class TestJSONPatch(TestCase):
+    def test_dicts(self):
+        base = {"a": 1, "b": {"c": True}, "d/e": "x"}
+        target = {"a": 1, "b": {"c": 1}, "f": [1]}
+        ops = json_patch(base, target)
+        assert ops == [
+            {"op": "replace", "path": "/b/c", "value": 1},
+            {"op": "add", "path": "/f", "value": [1]},
+            {"op": "remove", "path": "/d~1e"},
+        ]
+        assert apply(base, ops) == target
+
+    def test_lists(self):
+        cases = [
+            ([1, 2, 3, 4], [1, 5, 4]),
+            ([1, 4], [1, 2, 3, 4]),
+            ([{"name": "a"}, {"name": "b"}], [{"name": "b"}]),
+            ([], [1, 2]),
+            ([1, 2], []),
+        ]
+        for base, target in cases:
+            assert apply(list(base), json_patch(base, target)) == target
+
+    def test_insert_touches_only_new_items(self):
+        base = [{"name": str(i)} for i in range(50)]
+        target = base[:10] + [{"name": "new"}] + base[10:]
+        assert json_patch(base, target) == [
+            {"op": "add", "path": "/10", "value": {"name": "new"}}
+        ]
+
+    def test_no_changes(self):
+        assert json_patch({"a": [1, {"b": None}]}, {"a": [1, {"b": None}]}) == []
+
+
+class TestSpecPatch(TestCase):
+    def setUp(self) -> None:
+        self.spec = yaml.safe_load(specfile.read_text())
+        del self.spec["resources"]["secrets"]
+        self.current = models.ProjectSpec(**self.spec)
+        return super().setUp()
+
+    def test_unchanged(self):
+        assert spec_patch(self.current, models.ProjectSpec(**self.spec)) == []
+
+    def test_changed_image(self):
+        self.spec["resources"]["services"][0]["image"] = "python:3.13-slim"
+        self.spec["userRef"] = "other-org"
+        ops = spec_patch(self.current, models.ProjectSpec(**self.spec))
+        assert [op.model_dump(mode="json", exclude_none=True) for op in ops] == [
+            {
+                "op": "replace",
+                "path": "/resources/services/0/image",
+                "value": "python:3.13-slim",
+            }
+        ]
+
+    def test_secrets(self):
+        spec = yaml.safe_load(specfile.read_text())
+        current = models.ProjectSpec(**spec)
+        ops = spec_patch(current, models.ProjectSpec(**spec))
+        assert [(op.path, op.value) for op in ops] == [
+            ("/resources/secrets/0/data/token", "...")
+        ]
+        masked = masked_patch(ops, models.ProjectSpec(**spec))
+        assert masked[0]["value"] == "**********"
+
+    def test_secrets_unchanged_by_digest(self):
+        spec = yaml.safe_load(specfile.read_text())
+        current = models.ProjectSpec(**spec)
+        with tempfile.TemporaryDirectory() as tmp:
+            digests = SecretDigests("test", tmp)
+            assert len(spec_patch(current, models.ProjectSpec(**spec), digests)) == 1
+            record_secrets(digests, models.ProjectSpec(**spec))
+            assert spec_patch(current, models.ProjectSpec(**spec), digests) == []
+            spec["resources"]["secrets"][0]["data"]["token"] = "changed"
+            ops = spec_patch(current, models.ProjectSpec(**spec), digests)
+            assert [(op.path, op.value) for op in ops] == [
+                ("/resources/secrets/0/data/token", "changed")
+            ]
+
+    def test_larger_than_spec(self):
+        current = models.ProjectSpec(name="test-project")
+        assert spec_patch(current, models.ProjectSpec(**self.spec)) is None
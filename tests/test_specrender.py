@@ -0,0 +1,214 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from oceanum.cli import main as oceanum_main
+from oceanum.cli.prax import models
+from oceanum.cli.prax.client import PRAXClient
+from oceanum.cli.prax.specrender import (
+    SpecCache,
+    SpecRenderer,
+    SpecRenderError,
+    load_spec,
+    merge,
+    substitute,
+)
+
+runner = CliRunner()
+
+BASE = """
+name: app-${region}
+variables:
+  region: nz
+  replicas: 1
+resources:
+  secrets: !include secrets.yaml
+  services:
+    - name: app
+      image: python:3.12-slim
+      command: python -m http.server 8000
+      servicePort: 8000
+      healthCheck:
+        port: 8000
+        path: /
+      env:
+        - name: REGION
+          value: ${region}
+        - name: DEBUG
+          value: "${debug:-false}"
+  stages:
+    - name: main
+      resources:
+        services: [app]
+"""
+
+SECRETS = """
+- name: app-secret
+  data:
+    token: $${not-a-variable}
+"""
+
+OVERLAY = """
+description: Deployed in ${region}
+variables:
+  region: au
+resources:
+  services:
+    - name: app
+      image: python:3.13-slim
+      env:
+        - name: DEBUG
+          value: "true"
+"""
+
+
+class TestMerge(TestCase):
+    def test_merge(self):
+        base = {"a": {"b": 1, "c": 2}, "d": [1, 2], "e": 3}
+        overlay = {"a": {"c": 4}, "d": [3], "e": None, "f": 5}
+        assert merge(base, overlay) == {"a": {"b": 1, "c": 4}, "d": [3], "f": 5}
+
+    def test_merge_named(self):
+        base = [{"name": "a", "x": 1}, {"name": "b", "x": 2}]
+        overlay = [{"name": "b", "y": 3}, {"name": "c"}]
+        assert merge(base, overlay) == [
+            {"name": "a", "x": 1},
+            {"name": "b", "x": 2, "y": 3},
+            {"name": "c"},
+        ]
+
+
+class TestSubstitute(TestCase):
+    def test_substitute(self):
+        missing: set[str] = set()
+        variables = {"a": "x", "n": 3}
+        assert substitute(
+            {"s": "${a}-${b:-y}", "n": "${n}", "e": "$${a}", "l": ["${c}"]},
+            variables,
+            missing,
+        ) == {"s": "x-y", "n": 3, "e": "${a}", "l": ["${c}"]}
+        assert missing == {"c"}
+
+
+class TestSpecRenderer(TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name)
+        self.specfile = self.write("project.yaml", BASE)
+        self.write("secrets.yaml", SECRETS)
+        self.overlay = self.write("overlay.yaml", OVERLAY)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def write(self, name: str, text: str) -> Path:
+        path = self.directory / name
+        path.write_text(text)
+        return path
+
+    def test_render(self):
+        spec = SpecRenderer().render(self.specfile)
+        assert spec["name"] == "app-nz"
+        assert "variables" not in spec
+        assert spec["resources"]["secrets"][0]["data"]["token"] == "${not-a-variable}"
+        env = spec["resources"]["services"][0]["env"]
+        assert env == [
+            {"name": "REGION", "value": "nz"},
+            {"name": "DEBUG", "value": "false"},
+        ]
+
+    def test_render_overlay(self):
+        renderer = SpecRenderer([self.overlay], {"region": "us"})
+        spec = renderer.render(self.specfile)
+        assert spec["name"] == "app-us"
+        assert spec["description"] == "Deployed in us"
+        service = spec["resources"]["services"][0]
+        assert service["image"] == "python:3.13-slim"
+        assert service["command"] == "python -m http.server 8000"
+        assert service["env"][1] == {"name": "DEBUG", "value": "true"}
+        assert len(renderer.files) == 3
+
+    def test_undefined_variable(self):
+        self.write("project.yaml", BASE.replace("region: nz", "other: nz"))
+        with self.assertRaises(SpecRenderError) as e:
+            SpecRenderer().render(self.specfile)
+        assert "region" in str(e.exception)
+
+    def test_plain_spec(self):
+        text = BASE.replace("variables:\n  region: nz\n  replicas: 1\n", "")
+        text = text.replace("app-${region}", "app").replace(
+            "python -m http.server 8000", "echo ${HOME}"
+        )
+        self.write("project.yaml", text)
+        spec = SpecRenderer().render(self.specfile)
+        assert spec["resources"]["services"][0]["command"] == "echo ${HOME}"
+        result = runner.invoke(
+            oceanum_main, ["prax", "validate", "--offline", str(self.specfile)]
+        )
+        assert result.exit_code == 0, result.output
+
+    def test_circular_include(self):
+        self.write("secrets.yaml", "!include project.yaml")
+        with self.assertRaises(SpecRenderError) as e:
+            SpecRenderer().render(self.specfile)
+        assert "Circular include" in str(e.exception)
+
+    def test_cache(self):
+        cache = SpecCache(self.directory / "cache")
+        spec = load_spec(self.specfile, cache=cache)
+        assert isinstance(spec, models.ProjectSpec)
+        [entry] = (self.directory / "cache").glob("*.pickle")
+        assert entry.stat().st_mode & 0o777 == 0o600
+        with patch("oceanum.cli.prax.specrender.SpecRenderer.render") as mock_render:
+            assert load_spec(self.specfile, cache=cache) == spec
+            mock_render.assert_not_called()
+        # Changing an included file invalidates the entry
+        self.write("secrets.yaml", SECRETS.replace("app-secret", "other-secret"))
+        spec = load_spec(self.specfile, cache=cache)
+        assert spec.resources.secrets[0].name == "other-secret"
+        # Variables are part of the key
+        spec = load_spec(self.specfile, variables={"region": "us"}, cache=cache)
+        assert spec.name == "app-us"
+
+    def test_cache_max_entries(self):
+        cache = SpecCache(self.directory / "cache", max_entries=2)
+        for region in ["nz", "au", "us"]:
+            load_spec(self.specfile, variables={"region": region}, cache=cache)
+        assert len(list((self.directory / "cache").glob("*.pickle"))) == 2
+
+    def test_load_spec_errors(self):
+        self.write("secrets.yaml", "!include missing.yaml")
+        spec = PRAXClient.load_spec(str(self.specfile))
+        assert isinstance(spec, models.ErrorResponse)
+        assert "Specfile not found" in str(spec.detail)
+        self.write("secrets.yaml", "[")
+        spec = PRAXClient.load_spec(str(self.specfile))
+        assert isinstance(spec, models.ErrorResponse)
+        assert "Invalid specfile" in str(spec.detail)
+
+    def test_validate_command(self):
+        result = runner.invoke(
+            oceanum_main,
+            [
+                "prax",
+                "validate",
+                "--offline",
+                "-o",
+                str(self.overlay),
+                "--var",
+                "region=us",
+                str(self.specfile),
+            ],
+        )
+        assert result.exit_code == 0, result.output
+
+    def test_validate_command_bad_variable(self):
+        result = runner.invoke(
+            oceanum_main,
+            ["prax", "validate", "--offline", "--var", "region", str(self.specfile)],
+        )
+        assert result.exit_code == 2
+        assert "Expected name=value" in result.output
@@ -0,0 +1,129 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+import yaml
+from click.testing import CliRunner
+
+from oceanum.cli import main as oceanum_main
+from oceanum.cli.prax import models
+from oceanum.cli.prax.specvalidation import (
+    find_specfiles,
+    reference_errors,
+    spec_schema_path,
+    validate_specs,
+)
+
+runner = CliRunner()
+
+specfile = Path(__file__).parent / "data/dpm-project.yaml"
+
+
+def load() -> dict:
+    return yaml.safe_load(specfile.read_text())
+
+
+class TestReferenceErrors(TestCase):
+    def errors(self, spec: dict) -> list[tuple[str, str]]:
+        return [
+            (".".join(e.loc), e.msg)
+            for e in reference_errors(models.ProjectSpec(**spec))
+        ]
+
+    def test_valid(self):
+        assert self.errors(load()) == []
+
+    def test_missing_secret(self):
+        spec = load()
+        spec["resources"]["secrets"][0]["name"] = "other-secret"
+        assert self.errors(spec) == [
+            (
+                "resources.services.0.env.0.secretRef",
+                "'test-secret' is not defined in resources.secrets",
+            )
+        ]
+
+    def test_missing_secret_key(self):
+        spec = load()
+        spec["resources"]["secrets"][0]["data"] = {"password": "..."}
+        [(loc, msg)] = self.errors(spec)
+        assert loc == "resources.services.0.env.0.secretRef.key"
+        assert "Key 'token'" in msg
+
+    def test_stage_resources(self):
+        spec = load()
+        spec["resources"]["stages"][0]["resources"]["services"] = ["other-service"]
+        spec["resources"]["stages"].append(spec["resources"]["stages"][0])
+        errors = self.errors(spec)
+        assert (
+            "resources.stages.0.resources.services.0",
+            "'other-service' is not defined in resources.services",
+        ) in errors
+        assert (
+            "resources.stages.1.name",
+            "Duplicate name 'test-stage' in resources.stages",
+        ) in errors
+
+    def test_builds_only(self):
+        spec = load()
+        del spec["resources"]["stages"]
+        del spec["resources"]["services"]
+        spec["resources"]["builds"] = [
+            {"name": "image-builder", "baseImage": "python:3.12"}
+        ]
+        assert self.errors(spec) == []
+
+
+class TestValidateSpecs(TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name)
+        for i in range(4):
+            spec = load()
+            spec["name"] = f"project-{i}"
+            if i == 2:
+                spec["resources"]["secrets"] = []
+            (self.directory / f"project-{i}.yaml").write_text(yaml.dump(spec))
+        (self.directory / "README.md").write_text("Not a spec")
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    def test_find_specfiles(self):
+        files = find_specfiles([str(self.directory)])
+        assert [Path(f).name for f in files] == [f"project-{i}.yaml" for i in range(4)]
+
+    def test_processes(self):
+        files = find_specfiles([str(self.directory)])
+        results = list(validate_specs(files, processes=2))
+        assert [f for f, _ in results] == files
+        assert [error is None for _, error in results] == [True, True, False, True]
+
+    def test_offline_command(self):
+        with patch("oceanum.cli.prax.client.PRAXClient.validate") as mock_validate:
+            result = runner.invoke(
+                oceanum_main,
+                ["prax", "validate", "--offline", "-j", "2", str(self.directory)],
+            )
+        assert result.exit_code == 1
+        assert "Validation failed: " in result.output
+        assert "1 of 4 specfiles are invalid" in result.output
+        mock_validate.assert_not_called()
+
+    def test_api_after_local_validation(self):
+        with patch("oceanum.cli.prax.client.PRAXClient.validate") as mock_validate:
+            result = runner.invoke(oceanum_main, ["prax", "validate", self.tmp.name])
+        assert result.exit_code == 1
+        # Only the specs valid locally are sent to the API
+        assert mock_validate.call_count == 3
+
+    def test_schema_cache(self):
+        path = spec_schema_path(self.directory / "schemas")
+        schema = path.read_text()
+        assert '"title": "ProjectSpec"' in schema
+        with patch.object(models.ProjectSpec, "model_json_schema") as mock_schema:
+            assert spec_schema_path(self.directory / "schemas") == path
+            mock_schema.assert_not_called()
@@ -0,0 +1,67 @@
+import subprocess
+import sys
+from unittest import TestCase
+
+LAZY_CHECK = "import sys; print(type(sys.modules['oceanum.cli.prax.models']).__name__)"
+
+
+def run_python(code: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip().splitlines()[-1]
+
+
+class TestLazyModels(TestCase):
+    def test_import_does_not_load_models(self):
+        assert run_python(f"import oceanum.cli.prax; {LAZY_CHECK}") == "_LazyModule"
+
+    def test_help_does_not_load_models(self):
+        for args in [
+            ["--help"],
+            ["list", "--help"],
+            ["deploy", "--help"],
+            ["submit", "batch", "--help"],
+        ]:
+            code = (
+                "import oceanum.cli.prax; from oceanum.cli import main; "
+                f"main(['prax', *{args!r}], standalone_mode=False); {LAZY_CHECK}"
+            )
+            assert run_python(code) == "_LazyModule", args
+
+    def test_log_commands_load_on_use(self):
+        loaded = (
+            "print(sorted(m for m in sys.modules "
+            "if m.endswith(('.tail', '.logarchive'))))"
+        )
+        code = (
+            "import sys; from oceanum.cli import main; import oceanum.cli.prax; "
+            f"main(['prax', '--help'], standalone_mode=False); {loaded}"
+        )
+        assert run_python(code) == "[]"
+        code = (
+            "import sys; from oceanum.cli import main; import oceanum.cli.prax; "
+            f"main(['prax', 'logs', 'tail', '--help'], standalone_mode=False); {loaded}"
+        )
+        assert run_python(code) == "['oceanum.cli.prax.tail']"
+
+    def test_concurrent_first_access(self):
+        code = (
+            "from concurrent.futures import ThreadPoolExecutor; "
+            "from oceanum.cli.prax import client, models; "
+            "pool = ThreadPoolExecutor(8); "
+            "names = ['ProjectSpec', 'TaskSchema', 'ErrorResponse'] * 8; "
+            "classes = list(pool.map(lambda n: getattr(models, n), names)); "
+            "print(classes[0] is client.models.ProjectSpec is models.ProjectSpec)"
+        )
+        assert run_python(code) == "True"
+
+    def test_schemas_build_on_first_use(self):
+        code = (
+            "from oceanum.cli.prax.base import BaseModel; "
+            "Model = type('Model', (BaseModel,), {'__annotations__': {'name': str}}); "
+            "built = Model.__pydantic_complete__; "
+            "Model(name='model'); "
+            "print(built, Model.__pydantic_complete__)"
+        )
+        assert run_python(code) == "False True"
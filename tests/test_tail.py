@@ -0,0 +1,202 @@
+from datetime import datetime, timezone
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import requests
+from click.testing import CliRunner
+
+from oceanum.cli import main
+from oceanum.cli.prax import models
+from oceanum.cli.prax.tail import (
+    LogSource,
+    LogTailer,
+    ReplayFilter,
+    discover_log_sources,
+)
+
+timestamp = datetime.now(tz=timezone.utc)
+
+
+def run_schema(name: str, status: str = "Running") -> models.StagedRunSchema:
+    return models.StagedRunSchema(
+        id=name,
+        name=name,
+        org="test-org",
+        stage="dev",
+        project="test-project",
+        parent="parent",
+        status=status,
+        created_at=timestamp,
+        updated_at=timestamp,
+    )
+
+
+def task_schema(name: str, last_run: str | None) -> models.TaskSchema:
+    return models.TaskSchema(
+        id=name,
+        name=name,
+        org="test-org",
+        stage="dev",
+        project="test-project",
+        created_at=timestamp,
+        updated_at=timestamp,
+        last_run=run_schema(last_run) if last_run else None,
+    )
+
+
+def feed(replay: ReplayFilter, lines: list[str]) -> list[str]:
+    shown = []
+    for line in lines:
+        shown.extend(replay.feed(line))
+    return shown + replay.flush()
+
+
+class TestReplayFilter(TestCase):
+    def test_drops_replayed_lines(self):
+        replay = ReplayFilter(history=5)
+        assert feed(replay, ["a", "b", "c", "d"]) == ["a", "b", "c", "d"]
+        assert replay.reconnect() == 4
+        # Two lines were logged while disconnected
+        assert feed(replay, ["c", "d", "e", "f"]) == ["e", "f"]
+        assert list(replay.seen) == ["b", "c", "d", "e", "f"]
+
+    def test_replay_without_new_lines(self):
+        replay = ReplayFilter()
+        feed(replay, ["a", "b"])
+        replay.reconnect()
+        assert replay.feed("a") == []
+        assert replay.feed("b") == []
+        assert replay.feed("c") == ["c"]
+
+    def test_stream_ends_during_replay(self):
+        replay = ReplayFilter()
+        feed(replay, ["a", "b", "c"])
+        replay.reconnect()
+        assert feed(replay, ["b"]) == []
+
+    def test_gap_longer_than_history(self):
+        replay = ReplayFilter(history=2)
+        feed(replay, ["a", "b"])
+        replay.reconnect()
+        assert feed(replay, ["x", "y"]) == ["x", "y"]
+
+    def test_repeated_lines_prefer_longest_overlap(self):
+        replay = ReplayFilter()
+        feed(replay, ["x", "x", "x"])
+        replay.reconnect()
+        assert feed(replay, ["x", "x", "x", "y"]) == ["y"]
+
+
+class FlakyLogs:
+    """Log stream that drops the connection once after `drop_after` lines."""
+
+    def __init__(self, log: list[str], drop_after: int) -> None:
+        self.log = log
+        self.drop_after = drop_after
+        self.tails: list[int] = []
+
+    def __call__(self, name: str, tail: int, follow: bool):
+        self.tails.append(tail)
+        for i, line in enumerate(self.log[-tail:]):
+            if self.drop_after is not None and i == self.drop_after:
+                self.drop_after = None
+                raise requests.exceptions.ChunkedEncodingError("Connection broken")
+            yield line.encode()
+
+
+class TestLogTailer(TestCase):
+    def test_reconnects_without_duplicates(self):
+        client = MagicMock()
+        client.get_task_run_logs = FlakyLogs(["one", "two", "three"], drop_after=2)
+        client.get_task_run.return_value = run_schema("task-run", "Succeeded")
+        source = LogSource("task", "my-task", "task-run")
+        tailer = LogTailer(client, [source], lines=10, follow=True, reconnect_delay=0)
+        events = list(tailer.events())
+        assert [e.text for e in events if e.kind == "line"] == ["one", "two", "three"]
+        assert [e.kind for e in events].count("notice") == 1
+        assert client.get_task_run_logs.tails == [10, 2]
+
+    def test_clean_closes_do_not_count_as_failures(self):
+        client = MagicMock()
+        logs = FlakyLogs(["route"], drop_after=None)
+
+        def get_route_logs(name: str, tail: int, follow: bool):
+            if len(logs.tails) >= 5:
+                raise requests.exceptions.ConnectionError("Connection refused")
+            return logs(name, tail, follow)
+
+        client.get_route_logs = get_route_logs
+        source = LogSource("route", "my-route", "my-route")
+        tailer = LogTailer(
+            client, [source], follow=True, reconnect_delay=0, max_reconnects=2
+        )
+        events = list(tailer.events())
+        # Idle streams closed by the server are reopened without giving up
+        assert len(logs.tails) == 5
+        assert [e.kind for e in events] == ["line", "notice", "notice", "error", "done"]
+
+    def test_missing_log_is_an_error(self):
+        client = MagicMock()
+        client.get_build_run_logs.return_value = iter(
+            [models.ErrorResponse(detail="Not found")]
+        )
+        tailer = LogTailer(client, [LogSource("build", "b", "b-run")])
+        events = list(tailer.events())
+        assert [e.kind for e in events] == ["error", "done"]
+        assert events[0].text == "Not found"
+
+    def test_run_status_errors(self):
+        client = MagicMock()
+        client.get_task_run_logs = FlakyLogs(["one"], drop_after=None)
+        client.get_task_run.side_effect = [
+            requests.exceptions.ConnectionError("Connection refused"),
+            RuntimeError("Invalid response"),
+        ]
+        source = LogSource("task", "my-task", "task-run")
+        tailer = LogTailer(client, [source], follow=True, reconnect_delay=0)
+        events = list(tailer.events())
+        assert [e.kind for e in events] == ["line", "notice", "error", "done"]
+        assert "Connection refused" in events[1].text
+        assert events[2].text == "Invalid response"
+
+
+class TestTailCommand(TestCase):
+    def test_discover_sources(self):
+        client = MagicMock()
+        client.list_tasks.return_value = [
+            task_schema("ingest-a", "ingest-a-run"),
+            task_schema("ingest-b", None),
+            task_schema("other", "other-run"),
+        ]
+        sources = discover_log_sources(
+            client, ["task"], ["ingest-*"], project="test-project", stage=None
+        )
+        assert sources == [LogSource("task", "ingest-a", "ingest-a-run")]
+        client.list_tasks.assert_called_once_with(project="test-project")
+
+    def test_tail_command(self):
+        client = MagicMock()
+        client.list_tasks.return_value = [task_schema("ingest", "ingest-run")]
+        client.list_pipelines.return_value = []
+        client.get_task_run_logs.return_value = iter([b"hello"])
+        with patch("oceanum.cli.prax.tail.PRAXClient", return_value=client):
+            result = CliRunner().invoke(
+                main,
+                ["prax", "logs", "tail", "-k", "task", "-k", "pipeline"],
+            )
+        assert result.exit_code == 0, result.output
+        assert "task/ingest | hello" in result.output
+        client.list_builds.assert_not_called()
+
+    def test_too_many_sources(self):
+        client = MagicMock()
+        client.list_routes.return_value = [
+            models.RouteSchema.model_construct(name=f"route-{i}") for i in range(3)
+        ]
+        with patch("oceanum.cli.prax.tail.PRAXClient", return_value=client):
+            result = CliRunner().invoke(
+                main,
+                ["prax", "logs", "tail", "-k", "route", "--max-sources", "2"],
+            )
+        assert result.exit_code == 1
+        assert "--max-sources" in result.output
@@ -0,0 +1,142 @@
+import json
+import re
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+import requests
+from click.testing import CliRunner
+
+from oceanum.cli import main
+from oceanum.cli.prax import models
+from oceanum.cli.prax.client import PRAXClient
+from oceanum.cli.prax.tracing import RequestSpan, Tracer
+
+
+def response(status: int, body: dict | list) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = json.dumps(body).encode()
+    resp.headers["Content-Type"] = "application/json"
+    return resp
+
+
+def span(endpoint: str, latency: float, **kwargs) -> RequestSpan:
+    return RequestSpan(
+        method="GET",
+        endpoint=endpoint,
+        url=f"http://prax.test/api/{endpoint}",
+        start=1700000000.0,
+        latency=latency,
+        **kwargs,
+    )
+
+
+class TestTracer(TestCase):
+    def test_summary_rows(self):
+        tracer = Tracer()
+        tracer.record(span("projects/a", 0.1, status=200, size=10, validation=0.01))
+        tracer.record(span("projects/a", 0.3, status=502, size=20, retries=2))
+        tracer.record(span("routes", 0.2, status=200))
+        rows = tracer.summary_rows()
+        assert [row[1] for row in rows] == ["projects/a", "routes"]
+        method, endpoint, count, errors, retries, size, total, mean, slowest, val = (
+            rows[0]
+        )
+        assert (count, errors, retries, size) == (2, 1, 2, 30)
+        assert round(total) == 400 and round(mean) == 200 and round(slowest) == 300
+        assert round(val) == 10
+
+    def test_otlp(self):
+        tracer = Tracer()
+        tracer.command = "oceanum prax describe project"
+        tracer.record(span("projects/a", 0.5, status=200, size=10, schema="Project"))
+        tracer.record(span("routes", 0.1, error="ReadTimeout: timed out"))
+        tracer.end = tracer.start + 1
+        resource = tracer.to_otlp()["resourceSpans"][0]
+        spans = resource["scopeSpans"][0]["spans"]
+        root, request, validation, failed = spans
+        assert root["name"] == "oceanum prax describe project"
+        assert "parentSpanId" not in root
+        assert request["parentSpanId"] == failed["parentSpanId"] == root["spanId"]
+        assert validation["parentSpanId"] == request["spanId"]
+        assert validation["name"] == "validate Project"
+        assert request["name"] == "GET projects/a"
+        assert int(request["endTimeUnixNano"]) - int(
+            request["startTimeUnixNano"]
+        ) == int(0.5e9)
+        attributes = {a["key"]: a["value"] for a in request["attributes"]}
+        assert attributes["http.response.status_code"] == {"intValue": "200"}
+        assert attributes["url.full"] == {
+            "stringValue": "http://prax.test/api/projects/a"
+        }
+        assert request["status"] == {"code": 1}
+        assert failed["status"] == {"code": 2, "message": "ReadTimeout: timed out"}
+        assert {a["key"] for a in resource["resource"]["attributes"]} == {
+            "service.name",
+            "service.version",
+        }
+
+
+class TestClientTracing(TestCase):
+    def test_request_spans(self):
+        tracer = Tracer()
+        client = PRAXClient(service="http://prax.test/api", token="x", tracer=tracer)
+        with patch(
+            "requests.Session.request",
+            side_effect=[
+                response(200, []),
+                response(404, {"detail": "Not found"}),
+                requests.exceptions.ConnectTimeout("timed out"),
+            ],
+        ):
+            client.list_routes()
+            assert isinstance(client.get_route("missing"), models.ErrorResponse)
+            assert isinstance(client.get_route("slow"), models.ErrorResponse)
+        listed, missing, slow = tracer.spans
+        assert (listed.endpoint, listed.status, listed.size) == ("routes", 200, 2)
+        assert listed.schema == "RouteSchema"
+        assert listed.validation > 0
+        assert (missing.status, missing.schema, missing.failed) == (404, None, True)
+        assert slow.status is None
+        assert slow.error.startswith("ConnectTimeout")
+
+
+class TestTraceOptions(TestCase):
+    def test_trace(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            trace_file = Path(tmp) / "trace.json"
+            with patch(
+                "requests.Session.request",
+                return_value=response(404, {"detail": "Not found"}),
+            ):
+                result = CliRunner().invoke(
+                    main,
+                    [
+                        "prax",
+                        "--trace",
+                        "--trace-file",
+                        str(trace_file),
+                        "describe",
+                        "route",
+                        "missing",
+                    ],
+                    prog_name="oceanum",
+                )
+            trace = json.loads(trace_file.read_text())
+        assert result.exit_code == 1
+        assert re.search(r"GET +routes/missing +1 +1", result.output)
+        assert "1 API request took" in result.output
+        spans = trace["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert spans[0]["name"] == "oceanum prax describe route"
+        assert spans[1]["name"] == "GET routes/missing"
+
+    def test_no_trace(self):
+        with patch(
+            "requests.Session.request",
+            return_value=response(404, {"detail": "Not found"}),
+        ):
+            result = CliRunner().invoke(main, ["prax", "describe", "route", "missing"])
+        assert result.exit_code == 1
+        assert "API request took" not in result.output
@@ -0,0 +1,107 @@
+import io
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import requests
+from click.testing import CliRunner
+
+from oceanum.cli import main
+from oceanum.cli.prax import models
+from oceanum.cli.prax.watch import WatchScreen, watch_rows
+from oceanum.cli.renderer import RenderField
+
+runner = CliRunner()
+
+
+class TerminalIO(io.StringIO):
+    def isatty(self) -> bool:
+        return True
+
+
+class TestWatchScreen(TestCase):
+    def test_redraw_changed_lines(self):
+        stream = TerminalIO()
+        screen = WatchScreen(stream)
+        screen.draw(["a", "b", "c"])
+        assert stream.getvalue() == "a\nb\nc\n"
+        stream.truncate(0)
+        stream.seek(0)
+        screen.draw(["a", "B", "c"])
+        # Up to the second line, rewrite it and back below the last one
+        assert stream.getvalue() == "\x1b[2FB\x1b[K\x1b[2E"
+
+    def test_redraw_all(self):
+        stream = TerminalIO()
+        screen = WatchScreen(stream)
+        screen.draw(["a", "b", "c"])
+        stream.truncate(0)
+        stream.seek(0)
+        screen.draw(["a", "b"])
+        assert stream.getvalue() == "\x1b[3F\x1b[Ja\nb\n"
+
+    def test_not_a_terminal(self):
+        stream = io.StringIO()
+        screen = WatchScreen(stream)
+        screen.draw(["a", "status 1"])
+        screen.draw(["a", "status 2"])
+        assert stream.getvalue() == "a\nstatus 1\n\n"
+        screen.draw(["b", "status 3"])
+        assert stream.getvalue() == "a\nstatus 1\n\nb\nstatus 3\n\n"
+
+
+class TestWatchRows(TestCase):
+    fields = [
+        RenderField(label="Name", path="$.name"),
+        RenderField(label="Status", path="$.status"),
+    ]
+
+    def test_polls(self):
+        polls = [
+            [{"name": "task-a", "status": "running"}],
+            [models.ErrorResponse(detail="Bad gateway")],
+            requests.exceptions.ConnectionError("Connection refused"),
+            [{"name": "task-a", "status": "succeeded"}],
+        ]
+
+        def fetch():
+            poll = polls.pop(0)
+            if isinstance(poll, Exception):
+                raise poll
+            return iter(poll)
+
+        screen = MagicMock()
+        client = MagicMock()
+        with patch("time.sleep", side_effect=[None, None, None, KeyboardInterrupt]):
+            watch_rows(client, fetch, self.fields, 1, screen=screen)
+        assert client.cache.ttl == 0
+        draws = [call.args[0] for call in screen.draw.call_args_list]
+        assert len(draws) == 4
+        assert "running" in draws[0][2]
+        # A failed poll keeps the last table
+        assert draws[1][:-1] == draws[0][:-1]
+        assert "Bad gateway" in draws[1][-1]
+        assert draws[2][:-1] == draws[0][:-1]
+        assert "Connection refused" in draws[2][-1]
+        assert "succeeded" in draws[3][2]
+
+
+class TestWatchOption(TestCase):
+    def test_default_interval(self):
+        with patch("oceanum.cli.prax.workflows.watch_rows") as mock_watch:
+            result = runner.invoke(main, ["prax", "list", "tasks", "--watch"])
+            assert result.exit_code == 0
+            assert mock_watch.call_args.args[3] == 2.0
+
+    def test_interval(self):
+        with patch("oceanum.cli.prax.route.watch_rows") as mock_watch:
+            result = runner.invoke(main, ["prax", "list", "routes", "--watch", "5"])
+            assert result.exit_code == 0
+            assert mock_watch.call_args.args[3] == 5.0
+
+    def test_table_only(self):
+        with patch("time.sleep"):
+            result = runner.invoke(
+                main, ["prax", "list", "pipelines", "--watch", "-o", "json"]
+            )
+        assert result.exit_code == 2
+        assert "only supports the table output" in result.output
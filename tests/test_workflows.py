@@ -1,3 +1,4 @@
+import json
 import os
 import tempfile
 from datetime import datetime, timezone
@@ -10,6 +11,7 @@ from requests import Response
 from oceanum.cli import main
 from oceanum.cli.models import TokenResponse
 from oceanum.cli.prax import models
+from oceanum.cli.prax.projection import project
 
 timestamp = datetime.now(tz=timezone.utc)
 
@@ -89,8 +91,21 @@ class TestPipelineCommands:
                     "org": None,
                     "search": None,
                     "user": None,
+                    "limit": 100,
+                    "offset": 0,
                 },
-                schema=models.PipelineSchema,
+                schema=project(
+                    models.PipelineSchema,
+                    [
+                        "name",
+                        "project",
+                        "stage",
+                        "org",
+                        "last_run",
+                        "suspended",
+                        "schedule",
+                    ],
+                ),
             )
 
     def test_list_pipelines_error(self, runner, mock_client, error_response):
@@ -378,8 +393,12 @@ class TestTaskCommands:
                     "org": None,
                     "search": None,
                     "user": None,
+                    "limit": 100,
+                    "offset": 0,
                 },
-                schema=models.TaskSchema,
+                schema=project(
+                    models.TaskSchema, ["name", "project", "stage", "org", "last_run"]
+                ),
             )
 
     def test_describe_task_success(self, runner, mock_client, mock_response):
@@ -691,7 +710,11 @@ class TestDownloadCommands:
                         "test-task-run-123"
                     )
                     client_instance.download_task_run_artifact.assert_called_once_with(
-                        "test-task-run-123", "test-artifact", output_path
+                        "test-task-run-123",
+                        "test-artifact",
+                        output_path,
+                        segments=4,
+                        checksum=None,
                     )
 
     def test_download_task_artifact_default_path(
@@ -732,7 +755,11 @@ class TestDownloadCommands:
                 assert result.exit_code == 0
                 # Should use None for output path (default behavior)
                 client_instance.download_task_run_artifact.assert_called_once_with(
-                    "test-task-run-123", "test-artifact", None
+                    "test-task-run-123",
+                    "test-artifact",
+                    None,
+                    segments=4,
+                    checksum=None,
                 )
 
     def test_download_task_artifact_task_not_found(self, runner, mock_client):
@@ -852,6 +879,8 @@ class TestDownloadCommands:
                     "test-artifact",
                     "test-step",
                     "/tmp/pipeline_artifact.gz",
+                    segments=4,
+                    checksum=None,
                 )
 
     def test_download_pipeline_artifact_missing_step_name(self, runner, mock_client):
@@ -924,7 +953,12 @@ class TestDownloadCommands:
 
                 # Should use the last_run from the pipeline schema
                 client_instance.download_pipeline_run_artifact.assert_called_once_with(
-                    "test-pipeline-run-456", "test-artifact", "test-step", None
+                    "test-pipeline-run-456",
+                    "test-artifact",
+                    "test-step",
+                    None,
+                    segments=4,
+                    checksum=None,
                 )
 
     def test_download_pipeline_artifact_no_run_found(self, runner, mock_client):
@@ -965,3 +999,127 @@ class TestDownloadCommands:
                 assert (
                     "No pipeline run found for pipeline: test-pipeline" in result.output
                 )
+
+
+class TestBatchSubmit:
+    def write_manifest(self, directory: str, name: str, content: str) -> str:
+        path = os.path.join(directory, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def submit_response(self, name: str) -> models.TaskSchema:
+        return models.TaskSchema(
+            id=f"{name}-id",
+            name=name,
+            project="test-project",
+            stage="dev",
+            org="test-org",
+            created_at=timestamp,
+            updated_at=timestamp,
+            last_run=models.StagedRunSchema(
+                id=f"{name}-run",
+                name=f"{name}-run",
+                project="test-project",
+                stage="dev",
+                org="test-org",
+                parent=name,
+                status="Pending",
+                created_at=timestamp,
+                updated_at=timestamp,
+            ),
+        )
+
+    def test_submit_batch_yaml(self, runner):
+        manifest = (
+            "- name: task-a\n"
+            "  project: test-project\n"
+            "  parameters: {date: '2024-01-01'}\n"
+            "- name: pipeline-b\n"
+            "  type: pipeline\n"
+            "  stage: dev\n"
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = self.write_manifest(temp_dir, "manifest.yaml", manifest)
+            results_file = os.path.join(temp_dir, "results.jsonl")
+            with (
+                patch("oceanum.cli.models.TokenResponse.load", return_value=token),
+                patch(
+                    "oceanum.cli.prax.client.PRAXClient.submit_task",
+                    return_value=self.submit_response("task-a"),
+                ) as mock_task,
+                patch(
+                    "oceanum.cli.prax.client.PRAXClient.submit_pipeline",
+                    return_value=models.ErrorResponse(detail="Pipeline not found"),
+                ) as mock_pipeline,
+            ):
+                result = runner.invoke(
+                    main,
+                    ["prax", "submit", "batch", path, "--results-file", results_file],
+                )
+                assert result.exit_code == 1
+                assert "task-a-run" in result.output
+                assert "1 of 2 submits failed" in result.output
+                mock_task.assert_called_once_with(
+                    "task-a",
+                    {"date": "2024-01-01"},
+                    project="test-project",
+                    stage=None,
+                    org=None,
+                    user=None,
+                )
+                mock_pipeline.assert_called_once()
+            with open(results_file) as f:
+                results = [json.loads(line) for line in f]
+            assert [r["status"] for r in results] == ["submitted", "failed"]
+            assert results[1]["error"] == "Pipeline not found"
+
+    def test_submit_batch_jsonl_json_output(self, runner):
+        rows = [{"name": f"task-{i}", "parameters": {"i": i}} for i in range(20)]
+        manifest = "\n".join(json.dumps(row) for row in rows)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = self.write_manifest(temp_dir, "manifest.jsonl", manifest)
+            with (
+                patch("oceanum.cli.models.TokenResponse.load", return_value=token),
+                patch(
+                    "oceanum.cli.prax.client.PRAXClient.submit_task",
+                    side_effect=lambda name, params, **f: self.submit_response(name),
+                ) as mock_task,
+            ):
+                result = runner.invoke(
+                    main,
+                    ["prax", "submit", "batch", path, "-j", "4", "-o", "json"],
+                )
+                assert result.exit_code == 0
+                assert mock_task.call_count == 20
+                results = json.loads(result.output)
+                assert [r["run"] for r in results] == [
+                    f"task-{i}-run" for i in range(20)
+                ]
+
+    def test_submit_batch_bad_manifest(self, runner):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = self.write_manifest(temp_dir, "manifest.yaml", "- project: x\n")
+            with patch("oceanum.cli.models.TokenResponse.load", return_value=token):
+                result = runner.invoke(main, ["prax", "submit", "batch", path])
+                assert result.exit_code == 1
+                assert "Failed to load submit manifest" in result.output
+
+    def test_submit_batch_invalid_yaml(self, runner):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = self.write_manifest(temp_dir, "manifest.yaml", "- name: [x\n")
+            with patch("oceanum.cli.models.TokenResponse.load", return_value=token):
+                result = runner.invoke(main, ["prax", "submit", "batch", path])
+                assert result.exit_code == 1
+                assert "Failed to load submit manifest" in result.output
+                assert "Traceback" not in result.output
+
+    def test_submit_batch_row_not_mapping(self, runner):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = self.write_manifest(
+                temp_dir, "manifest.yaml", "- name: task-a\n- foo\n"
+            )
+            with patch("oceanum.cli.models.TokenResponse.load", return_value=token):
+                result = runner.invoke(main, ["prax", "submit", "batch", path])
+                assert result.exit_code == 1
+                assert "Row 2 must be a mapping" in result.output